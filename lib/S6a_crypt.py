@@ -1,4 +1,5 @@
 from milenage import Milenage
+from latencyTrace import traceStage
 import binascii
 import base64
 import logging
@@ -18,6 +19,7 @@ CryptoLogger.info("Initialised Diameter Logger, importing database")
 
 #The EUTRAN Authentication Vector generator is based on the one used in [Facebook Magma](https://github.com/facebookincubator/magma), which in turn is based off [OAI-CN](https://github.com/OPENAIRINTERFACE/openair-cn).
 
+@traceStage('crypto')
 def generate_eutran_vector(key, op_c, amf, sqn, plmn):
     CryptoLogger.debug("Generating EUTRAN Vectors")
 
@@ -66,6 +68,7 @@ def generate_eutran_vector(key, op_c, amf, sqn, plmn):
     CryptoLogger.debug("Successfully an S6a_crypt.generate_eutran_vector")
     return (rand, xres, autn, kasme)
  
+@traceStage('crypto')
 def generate_maa_vector(key, op_c, amf, sqn, plmn):
     CryptoLogger.debug("Generating Multimedia Authentication Vector")
     key = key.encode('utf-8')
@@ -111,6 +114,7 @@ def generate_maa_vector(key, op_c, amf, sqn, plmn):
     # print("ik: " + str(ik))
     return (rand, autn, xres, ck, ik)
 
+@traceStage('crypto')
 def generate_eap_aka_vector(key, op_c, amf, sqn, plmn):
     CryptoLogger.debug("Generating EAP-AKA Vector")
     key = key.encode('utf-8')
@@ -137,6 +141,7 @@ def generate_eap_aka_vector(key, op_c, amf, sqn, plmn):
 
     return crypto_obj.generate_eap_aka_vector(key, op_c, sqn, plmn)
 
+@traceStage('crypto')
 def generate_resync_s6a(key, op_c, amf, auts, rand):
     CryptoLogger.debug("Generating correct SQN value from AUTS")
 
@@ -1,5 +1,5 @@
 from sqlalchemy import Column, Integer, String, MetaData, Table, Boolean, ForeignKey, select, UniqueConstraint, DateTime, BigInteger, Text, DateTime, Float
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.engine.reflection import Inspector
 from sqlalchemy.sql import desc, func
 from sqlalchemy_utils import database_exists, create_database
@@ -15,7 +15,9 @@ import uuid
 import socket
 import pprint
 import S6a_crypt
+import latencyTrace
 from messaging import RedisMessaging
+from metricAggregator import MetricAggregator
 import yaml
 import json
 import socket
@@ -335,7 +337,7 @@ class SUBSCRIBER_ATTRIBUTES_OPERATION_LOG(OPERATION_LOG_BASE):
 
 class Database:
 
-    def __init__(self, logTool, redisMessaging=None):
+    def __init__(self, logTool, redisMessaging=None, metricAggregator=None):
         with open("../config.yaml", 'r') as stream:
             self.config = (yaml.safe_load(stream))
         
@@ -349,6 +351,10 @@ class Database:
             self.redisMessaging = redisMessaging
         else:
             self.redisMessaging = RedisMessaging(host=self.redisHost, port=self.redisPort, useUnixSocket=self.redisUseUnixSocket, unixSocketPath=self.redisUnixSocketPath)
+        if metricAggregator:
+            self.metricAggregator = metricAggregator
+        else:
+            self.metricAggregator = MetricAggregator(redisMessaging=self.redisMessaging, hostname=socket.gethostname(), flushInterval=float(self.config.get('prometheus', {}).get('metric_flush_interval', 1)))
 
         if str(self.config['database']['db_type']) == 'postgresql':
             db_string = 'postgresql+psycopg2://' + str(self.config['database']['username']) + ':' + str(self.config['database']['password']) + '@' + str(self.config['database']['server']) + '/' + str(self.config['database']['database'])
@@ -364,6 +370,10 @@ class Database:
             pool_size=self.config['logging'].get('sqlalchemy_pool_size', 30),
             max_overflow=self.config['logging'].get('sqlalchemy_max_overflow', 0))
 
+        #Time spent in queries is recorded against the 'database' stage of any latency trace running on the calling thread
+        event.listen(self.engine, 'before_cursor_execute', self.startQueryTimer)
+        event.listen(self.engine, 'after_cursor_execute', self.stopQueryTimer)
+
         # Create database if it does not exist.
         if not database_exists(self.engine.url):
             self.logTool.log(service='Database', level='debug', message="Creating database", redisClient=self.redisMessaging)
@@ -384,10 +394,10 @@ class Database:
         inspector = Inspector.from_engine(self.engine)
         for table_name in Base.metadata.tables.keys():
             if table_name not in inspector.get_table_names():
-                self.logTool.log(service='Database', level='debug', message=f"Creating table {table_name}", redisClient=self.redisMessaging)
+                self.logTool.log(service='Database', level='debug', message=lambda: f"Creating table {table_name}", redisClient=self.redisMessaging)
                 Base.metadata.tables[table_name].create(bind=self.engine)
             else:
-                self.logTool.log(service='Database', level='debug', message=f"Table {table_name} already exists", redisClient=self.redisMessaging)
+                self.logTool.log(service='Database', level='debug', message=lambda: f"Table {table_name} already exists", redisClient=self.redisMessaging)
 
 
     def load_IMEI_database_into_Redis(self):
@@ -427,6 +437,14 @@ class Database:
             self.logTool.log(service='Database', level='error', message="Failed to load IMEI Database into Redis due to error: " + (str(E)), redisClient=self.redisMessaging)
             return
 
+    def startQueryTimer(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info['queryStartTime'] = time.perf_counter()
+
+    def stopQueryTimer(self, conn, cursor, statement, parameters, context, executemany):
+        queryStartTime = conn.info.pop('queryStartTime', None)
+        if queryStartTime is not None:
+            latencyTrace.addStageTime('database', time.perf_counter() - queryStartTime)
+
     def safe_rollback(self, session):
         try:
             if session.is_active:
@@ -557,11 +575,11 @@ class Database:
                     changes = []
                     for attr in class_mapper(obj.__class__).column_attrs:
                         hist = get_history(obj, attr.key)
-                        self.logTool.log(service='Database', level='debug', message=f"History {hist}", redisClient=self.redisMessaging)
+                        self.logTool.log(service='Database', level='debug', message=lambda: f"History {hist}", redisClient=self.redisMessaging)
                         if hist.has_changes() and hist.added and hist.deleted:
                             old_value, new_value = hist.deleted[0], hist.added[0]
-                            self.logTool.log(service='Database', level='debug', message=f"Old Value {old_value}", redisClient=self.redisMessaging)
-                            self.logTool.log(service='Database', level='debug', message=f"New Value {new_value}", redisClient=self.redisMessaging)
+                            self.logTool.log(service='Database', level='debug', message=lambda: f"Old Value {old_value}", redisClient=self.redisMessaging)
+                            self.logTool.log(service='Database', level='debug', message=lambda: f"New Value {new_value}", redisClient=self.redisMessaging)
                             changes.append((attr.key, old_value, new_value))
                             continue
 
@@ -987,7 +1005,7 @@ class Database:
                 if result[keys] == None:
                     continue
                 else:
-                    self.logTool.log(service='Database', level='debug', message="Key " + str(keys) + " is type DateTime with value: " + str(result[keys]) + " - Formatting to String", redisClient=self.redisMessaging)
+                    self.logTool.log(service='Database', level='debug', message=lambda: "Key " + str(keys) + " is type DateTime with value: " + str(result[keys]) + " - Formatting to String", redisClient=self.redisMessaging)
                     try:
                         result[keys] = result[keys].strftime('%Y-%m-%dT%H:%M:%SZ')
                     except Exception as e:
@@ -1004,7 +1022,7 @@ class Database:
         return result 
 
     def GetObj(self, obj_type, obj_id=None, page=None, page_size=None):
-        self.logTool.log(service='Database', level='debug', message="Called GetObj for type " + str(obj_type), redisClient=self.redisMessaging)
+        self.logTool.log(service='Database', level='debug', message=lambda: "Called GetObj for type " + str(obj_type), redisClient=self.redisMessaging)
 
         Base.metadata.create_all(self.engine)
         Session = sessionmaker(bind=self.engine)
@@ -1050,7 +1068,7 @@ class Database:
         return result
 
     def GetAll(self, obj_type):
-        self.logTool.log(service='Database', level='debug', message="Called GetAll for type " + str(obj_type), redisClient=self.redisMessaging)
+        self.logTool.log(service='Database', level='debug', message=lambda: "Called GetAll for type " + str(obj_type), redisClient=self.redisMessaging)
 
         Base.metadata.create_all(self.engine)
         Session = sessionmaker(bind = self.engine)
@@ -1075,7 +1093,7 @@ class Database:
         return final_result_list
 
     def getAllPaginated(self, obj_type, page=0, page_size=0, existingSession=None):
-        self.logTool.log(service='Database', level='debug', message="Called getAllPaginated for type " + str(obj_type), redisClient=self.redisMessaging)
+        self.logTool.log(service='Database', level='debug', message=lambda: "Called getAllPaginated for type " + str(obj_type), redisClient=self.redisMessaging)
 
         if not existingSession:
             Base.metadata.create_all(self.engine)
@@ -1113,7 +1131,7 @@ class Database:
 
 
     def GetAllByTable(self, obj_type, table):
-        self.logTool.log(service='Database', level='debug', message=f"Called GetAll for type {str(obj_type)} and table {table}", redisClient=self.redisMessaging)
+        self.logTool.log(service='Database', level='debug', message=lambda: f"Called GetAll for type {str(obj_type)} and table {table}", redisClient=self.redisMessaging)
 
         Base.metadata.create_all(self.engine)
         Session = sessionmaker(bind = self.engine)
@@ -1138,11 +1156,11 @@ class Database:
         return final_result_list
 
     def UpdateObj(self, obj_type, json_data, obj_id, disable_logging=False, operation_id=None):
-        self.logTool.log(service='Database', level='debug', message=f"Called UpdateObj() for type {obj_type} id {obj_id} with JSON data: {json_data} and operation_id: {operation_id}", redisClient=self.redisMessaging)
+        self.logTool.log(service='Database', level='debug', message=lambda: f"Called UpdateObj() for type {obj_type} id {obj_id} with JSON data: {json_data} and operation_id: {operation_id}", redisClient=self.redisMessaging)
         Session = sessionmaker(bind=self.engine)
         session = Session()
         obj_type_str = str(obj_type.__table__.name).upper()
-        self.logTool.log(service='Database', level='debug', message=f"obj_type_str is {obj_type_str}", redisClient=self.redisMessaging)
+        self.logTool.log(service='Database', level='debug', message=lambda: f"obj_type_str is {obj_type_str}", redisClient=self.redisMessaging)
         filter_input = eval(obj_type_str + "." + obj_type_str.lower() + "_id==obj_id")
         try:
             obj = session.query(obj_type).filter(filter_input).one()
@@ -1174,7 +1192,7 @@ class Database:
         return self.GetObj(obj_type, obj_id)
 
     def DeleteObj(self, obj_type, obj_id, disable_logging=False, operation_id=None):
-        self.logTool.log(service='Database', level='debug', message=f"Called DeleteObj for type {obj_type} with id {obj_id}", redisClient=self.redisMessaging)
+        self.logTool.log(service='Database', level='debug', message=lambda: f"Called DeleteObj for type {obj_type} with id {obj_id}", redisClient=self.redisMessaging)
 
         Session = sessionmaker(bind=self.engine)
         session = Session()
@@ -1206,7 +1224,7 @@ class Database:
 
 
     def CreateObj(self, obj_type, json_data, disable_logging=False, operation_id=None):
-        self.logTool.log(service='Database', level='debug', message="Called CreateObj to create " + str(obj_type) + " with value: " + str(json_data), redisClient=self.redisMessaging)
+        self.logTool.log(service='Database', level='debug', message=lambda: "Called CreateObj to create " + str(obj_type) + " with value: " + str(json_data), redisClient=self.redisMessaging)
         last_modified_value = datetime.datetime.now(tz=datetime.timezone.utc).strftime('%Y-%m-%dT%H:%M:%S') + 'Z'
         json_data["last_modified"] = last_modified_value  # set last_modified value in json_data
         newObj = obj_type(**json_data)
@@ -1236,7 +1254,7 @@ class Database:
             self.safe_close(session)
 
     def Generate_JSON_Model_for_Flask(self, obj_type):
-        self.logTool.log(service='Database', level='debug', message="Generating JSON model for Flask for object type: " + str(obj_type), redisClient=self.redisMessaging)
+        self.logTool.log(service='Database', level='debug', message=lambda: "Generating JSON model for Flask for object type: " + str(obj_type), redisClient=self.redisMessaging)
 
         dictty = dict(self.generate_json_schema(obj_type))
         # pprint.pprint(dictty)
@@ -1263,14 +1281,14 @@ class Database:
         session = Session()
 
         if 'iccid' in kwargs:
-            self.logTool.log(service='Database', level='debug', message="Get_AuC for iccid " + str(kwargs['iccid']), redisClient=self.redisMessaging)
+            self.logTool.log(service='Database', level='debug', message=lambda: "Get_AuC for iccid " + str(kwargs['iccid']), redisClient=self.redisMessaging)
             try:
                 result = session.query(AUC).filter_by(iccid=str(kwargs['iccid'])).one()
             except Exception as E:
                 self.safe_close(session)
                 raise ValueError(E)
         elif 'imsi' in kwargs:
-            self.logTool.log(service='Database', level='debug', message="Get_AuC for imsi " + str(kwargs['imsi']), redisClient=self.redisMessaging)
+            self.logTool.log(service='Database', level='debug', message=lambda: "Get_AuC for imsi " + str(kwargs['imsi']), redisClient=self.redisMessaging)
             try:
                 result = session.query(AUC).filter_by(imsi=str(kwargs['imsi'])).one()
             except Exception as E:
@@ -1281,7 +1299,7 @@ class Database:
         result = self.Sanitize_Datetime(result)
         result.pop('_sa_instance_state')
 
-        self.logTool.log(service='Database', level='debug', message="Got back result: " + str(result), redisClient=self.redisMessaging)
+        self.logTool.log(service='Database', level='debug', message=lambda: "Got back result: " + str(result), redisClient=self.redisMessaging)
         self.safe_close(session)
         return result
 
@@ -1290,14 +1308,14 @@ class Database:
         Session = sessionmaker(bind = self.engine)
         session = Session()
         if 'msisdn' in kwargs:
-            self.logTool.log(service='Database', level='debug', message="Get_IMS_Subscriber for msisdn " + str(kwargs['msisdn']), redisClient=self.redisMessaging)
+            self.logTool.log(service='Database', level='debug', message=lambda: "Get_IMS_Subscriber for msisdn " + str(kwargs['msisdn']), redisClient=self.redisMessaging)
             try:
                 result = session.query(IMS_SUBSCRIBER).filter_by(msisdn=str(kwargs['msisdn'])).one()
             except Exception as E:
                 self.safe_close(session)
                 raise ValueError(E)
         elif 'imsi' in kwargs:
-            self.logTool.log(service='Database', level='debug', message="Get_IMS_Subscriber for imsi " + str(kwargs['imsi']), redisClient=self.redisMessaging)
+            self.logTool.log(service='Database', level='debug', message=lambda: "Get_IMS_Subscriber for imsi " + str(kwargs['imsi']), redisClient=self.redisMessaging)
             try:
                 result = session.query(IMS_SUBSCRIBER).filter_by(imsi=str(kwargs['imsi'])).one()
             except Exception as E:
@@ -1310,7 +1328,7 @@ class Database:
         except:
             pass
         result = self.Sanitize_Datetime(result)
-        self.logTool.log(service='Database', level='debug', message="Returning IMS Subscriber Data: " + str(result), redisClient=self.redisMessaging)
+        self.logTool.log(service='Database', level='debug', message=lambda: "Returning IMS Subscriber Data: " + str(result), redisClient=self.redisMessaging)
         self.safe_close(session)
         return result
 
@@ -1321,21 +1339,21 @@ class Database:
         session = Session()
 
         if 'subscriber_id' in kwargs:
-            self.logTool.log(service='Database', level='debug', message="Get_Subscriber for id " + str(kwargs['subscriber_id']), redisClient=self.redisMessaging)
+            self.logTool.log(service='Database', level='debug', message=lambda: "Get_Subscriber for id " + str(kwargs['subscriber_id']), redisClient=self.redisMessaging)
             try:
                 result = session.query(SUBSCRIBER).filter_by(subscriber_id=int(kwargs['subscriber_id'])).one()
             except Exception as E:
                 self.safe_close(session)
                 raise ValueError(E)
         elif 'msisdn' in kwargs:
-            self.logTool.log(service='Database', level='debug', message="Get_Subscriber for msisdn " + str(kwargs['msisdn']), redisClient=self.redisMessaging)
+            self.logTool.log(service='Database', level='debug', message=lambda: "Get_Subscriber for msisdn " + str(kwargs['msisdn']), redisClient=self.redisMessaging)
             try:
                 result = session.query(SUBSCRIBER).filter_by(msisdn=str(kwargs['msisdn'])).one()
             except Exception as E:
                 self.safe_close(session)
                 raise ValueError(E)
         elif 'imsi' in kwargs:
-            self.logTool.log(service='Database', level='debug', message="Get_Subscriber for imsi " + str(kwargs['imsi']), redisClient=self.redisMessaging)
+            self.logTool.log(service='Database', level='debug', message=lambda: "Get_Subscriber for imsi " + str(kwargs['imsi']), redisClient=self.redisMessaging)
             try:
                 result = session.query(SUBSCRIBER).filter_by(imsi=str(kwargs['imsi'])).one()
             except Exception as E:
@@ -1351,14 +1369,14 @@ class Database:
                 attributes = self.Get_Subscriber_Attributes(result['subscriber_id'])
                 result['attributes'] = attributes
 
-        self.logTool.log(service='Database', level='debug', message="Got back result: " + str(result), redisClient=self.redisMessaging)
+        self.logTool.log(service='Database', level='debug', message=lambda: "Got back result: " + str(result), redisClient=self.redisMessaging)
         self.safe_close(session)
         return result
 
     def Get_Subscribers_By_Pcscf(self, pcscf: str):
         Session = sessionmaker(bind = self.engine)
         session = Session()
-        self.logTool.log(service='Database', level='debug', message=f"[database.py] [Get_Subscribers_By_Pcscf] Get_Subscribers_By_Pcscf for PCSCF: {pcscf}", redisClient=self.redisMessaging)
+        self.logTool.log(service='Database', level='debug', message=lambda: f"[database.py] [Get_Subscribers_By_Pcscf] Get_Subscribers_By_Pcscf for PCSCF: {pcscf}", redisClient=self.redisMessaging)
         try:
             result = session.query(IMS_SUBSCRIBER).filter_by(pcscf=pcscf).all()
         except Exception as E:
@@ -1383,7 +1401,7 @@ class Database:
         Session = sessionmaker(bind = self.engine)
         session = Session()
 
-        self.logTool.log(service='Database', level='debug', message="Get_SUBSCRIBER_ROUTING for subscriber_id " + str(subscriber_id) + " and apn_id " + str(apn_id), redisClient=self.redisMessaging)
+        self.logTool.log(service='Database', level='debug', message=lambda: "Get_SUBSCRIBER_ROUTING for subscriber_id " + str(subscriber_id) + " and apn_id " + str(apn_id), redisClient=self.redisMessaging)
         try:
             result = session.query(SUBSCRIBER_ROUTING).filter_by(subscriber_id=subscriber_id, apn_id=apn_id).one()
         except Exception as E:
@@ -1394,7 +1412,7 @@ class Database:
         result = self.Sanitize_Datetime(result)
         result.pop('_sa_instance_state')
 
-        self.logTool.log(service='Database', level='debug', message="Got back result: " + str(result), redisClient=self.redisMessaging)
+        self.logTool.log(service='Database', level='debug', message=lambda: "Got back result: " + str(result), redisClient=self.redisMessaging)
         self.safe_close(session)
         return result
 
@@ -1404,7 +1422,7 @@ class Database:
         Session = sessionmaker(bind = self.engine)
         session = Session()
 
-        self.logTool.log(service='Database', level='debug', message="Get_Subscriber_Attributes for subscriber_id " + str(subscriber_id), redisClient=self.redisMessaging)
+        self.logTool.log(service='Database', level='debug', message=lambda: "Get_Subscriber_Attributes for subscriber_id " + str(subscriber_id), redisClient=self.redisMessaging)
         try:
             result = session.query(SUBSCRIBER_ATTRIBUTES).filter_by(subscriber_id=subscriber_id)
         except Exception as E:
@@ -1416,7 +1434,7 @@ class Database:
             result = self.Sanitize_Datetime(result)
             result.pop('_sa_instance_state')
             final_res.append(result)
-        self.logTool.log(service='Database', level='debug', message="Got back result: " + str(final_res), redisClient=self.redisMessaging)
+        self.logTool.log(service='Database', level='debug', message=lambda: "Got back result: " + str(final_res), redisClient=self.redisMessaging)
         self.safe_close(session)
         return final_res
 
@@ -1432,7 +1450,7 @@ class Database:
             results = session.query(SUBSCRIBER).filter(SUBSCRIBER.serving_mme.isnot(None))
             for result in results:
                 result = result.__dict__
-                self.logTool.log(service='Database', level='debug', message="Result: " + str(result) + " type: " + str(type(result)), redisClient=self.redisMessaging)
+                self.logTool.log(service='Database', level='debug', message=lambda: "Result: " + str(result) + " type: " + str(type(result)), redisClient=self.redisMessaging)
                 result = self.Sanitize_Datetime(result)
                 result.pop('_sa_instance_state')
 
@@ -1440,7 +1458,7 @@ class Database:
                     self.logTool.log(service='Database', level='debug', message="Filtering to locally served IMS Subs only", redisClient=self.redisMessaging)
                     try:
                         serving_hss = result['serving_mme_peer'].split(';')[1]
-                        self.logTool.log(service='Database', level='debug', message="Serving HSS: " + str(serving_hss) + " and this is: " + str(self.config['hss']['OriginHost']), redisClient=self.redisMessaging)
+                        self.logTool.log(service='Database', level='debug', message=lambda: "Serving HSS: " + str(serving_hss) + " and this is: " + str(self.config['hss']['OriginHost']), redisClient=self.redisMessaging)
                         if serving_hss == self.config['hss']['OriginHost']:
                             self.logTool.log(service='Database', level='debug', message="Serving HSS matches local HSS", redisClient=self.redisMessaging)
                             Served_Subs[result['imsi']] = {}
@@ -1448,7 +1466,7 @@ class Database:
                             #self.logTool.log(service='Database', level='debug', message="Processed result", redisClient=self.redisMessaging)
                             continue
                         else:
-                            self.logTool.log(service='Database', level='debug', message="Sub is served by remote HSS: " + str(serving_hss), redisClient=self.redisMessaging)
+                            self.logTool.log(service='Database', level='debug', message=lambda: "Sub is served by remote HSS: " + str(serving_hss), redisClient=self.redisMessaging)
                     except Exception as E:
                         self.logTool.log(service='Database', level='debug', message="Error in filtering Get_Served_Subscribers to local peer only: " + str(E), redisClient=self.redisMessaging)
                         continue
@@ -1460,7 +1478,7 @@ class Database:
         except Exception as E:
             self.safe_close(session)
             raise ValueError(E)
-        self.logTool.log(service='Database', level='debug', message="Final Served_Subs: " + str(Served_Subs), redisClient=self.redisMessaging)
+        self.logTool.log(service='Database', level='debug', message=lambda: "Final Served_Subs: " + str(Served_Subs), redisClient=self.redisMessaging)
         self.safe_close(session)
         return Served_Subs
 
@@ -1477,22 +1495,22 @@ class Database:
                 IMS_SUBSCRIBER.scscf.isnot(None))
             for result in results:
                 result = result.__dict__
-                self.logTool.log(service='Database', level='debug', message="Result: " + str(result) + " type: " + str(type(result)), redisClient=self.redisMessaging)
+                self.logTool.log(service='Database', level='debug', message=lambda: "Result: " + str(result) + " type: " + str(type(result)), redisClient=self.redisMessaging)
                 result = self.Sanitize_Datetime(result)
                 result.pop('_sa_instance_state')
                 if get_local_users_only == True:
                     self.logTool.log(service='Database', level='debug', message="Filtering Get_Served_IMS_Subscribers to locally served IMS Subs only", redisClient=self.redisMessaging)
                     try:
                         serving_ims_hss = result['scscf_peer'].split(';')[1]
-                        self.logTool.log(service='Database', level='debug', message="Serving IMS-HSS: " + str(serving_ims_hss) + " and this is: " + str(self.config['hss']['OriginHost']), redisClient=self.redisMessaging)
+                        self.logTool.log(service='Database', level='debug', message=lambda: "Serving IMS-HSS: " + str(serving_ims_hss) + " and this is: " + str(self.config['hss']['OriginHost']), redisClient=self.redisMessaging)
                         if serving_ims_hss == self.config['hss']['OriginHost']:
-                            self.logTool.log(service='Database', level='debug', message="Serving IMS-HSS matches local HSS for " + str(result['imsi']), redisClient=self.redisMessaging)
+                            self.logTool.log(service='Database', level='debug', message=lambda: "Serving IMS-HSS matches local HSS for " + str(result['imsi']), redisClient=self.redisMessaging)
                             Served_Subs[result['imsi']] = {}
                             Served_Subs[result['imsi']] = result
                             self.logTool.log(service='Database', level='debug', message="Processed result", redisClient=self.redisMessaging)
                             continue
                         else:
-                            self.logTool.log(service='Database', level='debug', message="Sub is served by remote IMS-HSS: " + str(serving_ims_hss), redisClient=self.redisMessaging)
+                            self.logTool.log(service='Database', level='debug', message=lambda: "Sub is served by remote IMS-HSS: " + str(serving_ims_hss), redisClient=self.redisMessaging)
                     except Exception as E:
                         self.logTool.log(service='Database', level='debug', message="Error in filtering to local peer only: " + str(E), redisClient=self.redisMessaging)
                         continue
@@ -1503,7 +1521,7 @@ class Database:
         except Exception as E:
             self.safe_close(session)
             raise ValueError(E)
-        self.logTool.log(service='Database', level='debug', message="Final Served_Subs: " + str(Served_Subs), redisClient=self.redisMessaging)
+        self.logTool.log(service='Database', level='debug', message=lambda: "Final Served_Subs: " + str(Served_Subs), redisClient=self.redisMessaging)
         self.safe_close(session)
         return Served_Subs
 
@@ -1517,7 +1535,7 @@ class Database:
             results = session.query(SERVING_APN).all()
             for result in results:
                 result = result.__dict__
-                self.logTool.log(service='Database', level='debug', message="Result: " + str(result) + " type: " + str(type(result)), redisClient=self.redisMessaging)
+                self.logTool.log(service='Database', level='debug', message=lambda: "Result: " + str(result) + " type: " + str(type(result)), redisClient=self.redisMessaging)
                 result = self.Sanitize_Datetime(result)
                 result.pop('_sa_instance_state')
 
@@ -1525,13 +1543,13 @@ class Database:
                     self.logTool.log(service='Database', level='debug', message="Filtering to locally served IMS Subs only", redisClient=self.redisMessaging)
                     try:
                         serving_pcrf = result['serving_pgw_peer'].split(';')[1]
-                        self.logTool.log(service='Database', level='debug', message="Serving PCRF: " + str(serving_pcrf) + " and this is: " + str(self.config['hss']['OriginHost']), redisClient=self.redisMessaging)
+                        self.logTool.log(service='Database', level='debug', message=lambda: "Serving PCRF: " + str(serving_pcrf) + " and this is: " + str(self.config['hss']['OriginHost']), redisClient=self.redisMessaging)
                         if serving_pcrf == self.config['hss']['OriginHost']:
                             self.logTool.log(service='Database', level='debug', message="Serving PCRF matches local PCRF", redisClient=self.redisMessaging)
                             self.logTool.log(service='Database', level='debug', message="Processed result", redisClient=self.redisMessaging)
                             
                         else:
-                            self.logTool.log(service='Database', level='debug', message="Sub is served by remote PCRF: " + str(serving_pcrf), redisClient=self.redisMessaging)
+                            self.logTool.log(service='Database', level='debug', message=lambda: "Sub is served by remote PCRF: " + str(serving_pcrf), redisClient=self.redisMessaging)
                             continue
                     except Exception as E:
                         self.logTool.log(service='Database', level='debug', message="Error in filtering Get_Served_PCRF_Subscribers to local peer only: " + str(E), redisClient=self.redisMessaging)
@@ -1557,7 +1575,7 @@ class Database:
         return Served_Subs
 
     def Get_Vectors_AuC(self, auc_id, action, **kwargs):
-        self.logTool.log(service='Database', level='debug', message="Getting Vectors for auc_id " + str(auc_id) + " with action " + str(action), redisClient=self.redisMessaging)
+        self.logTool.log(service='Database', level='debug', message=lambda: "Getting Vectors for auc_id " + str(auc_id) + " with action " + str(action), redisClient=self.redisMessaging)
         key_data = self.GetObj(AUC, auc_id)
         vector_dict = {}
         
@@ -1577,14 +1595,14 @@ class Database:
             self.logTool.log(service='Database', level='debug', message="Resync SQN", redisClient=self.redisMessaging)
             rand = kwargs['rand']       
             sqn, mac_s = S6a_crypt.generate_resync_s6a(key_data['ki'], key_data['opc'], key_data['amf'], kwargs['auts'], rand)
-            self.logTool.log(service='Database', level='debug', message="SQN from resync: " + str(sqn) + " SQN in DB is "  + str(key_data['sqn']) + "(Difference of " + str(int(sqn) - int(key_data['sqn'])) + ")", redisClient=self.redisMessaging)
+            self.logTool.log(service='Database', level='debug', message=lambda: "SQN from resync: " + str(sqn) + " SQN in DB is "  + str(key_data['sqn']) + "(Difference of " + str(int(sqn) - int(key_data['sqn'])) + ")", redisClient=self.redisMessaging)
             self.Update_AuC(auc_id, sqn=sqn+100)
             return
         
         elif action == "sip_auth":
             rand, autn, xres, ck, ik = S6a_crypt.generate_maa_vector(key_data['ki'], key_data['opc'], key_data['amf'], key_data['sqn'], kwargs['plmn'])
-            self.logTool.log(service='Database', level='debug', message="RAND is: " + str(rand), redisClient=self.redisMessaging)
-            self.logTool.log(service='Database', level='debug', message="AUTN is: " + str(autn), redisClient=self.redisMessaging)
+            self.logTool.log(service='Database', level='debug', message=lambda: "RAND is: " + str(rand), redisClient=self.redisMessaging)
+            self.logTool.log(service='Database', level='debug', message=lambda: "AUTN is: " + str(autn), redisClient=self.redisMessaging)
             vector_dict['SIP_Authenticate'] = rand + autn
             vector_dict['xres'] = xres
             vector_dict['ck'] = ck
@@ -1595,10 +1613,10 @@ class Database:
         elif action == "2g3g":
             rand, autn, xres, ck, ik = S6a_crypt.generate_maa_vector(key_data['ki'], key_data['opc'], key_data['amf'], key_data['sqn'], kwargs['plmn'])
             vector_list = []
-            self.logTool.log(service='Database', level='debug', message="Generating " + str(kwargs['requested_vectors']) + " vectors for GSM use", redisClient=self.redisMessaging)
+            self.logTool.log(service='Database', level='debug', message=lambda: "Generating " + str(kwargs['requested_vectors']) + " vectors for GSM use", redisClient=self.redisMessaging)
             while kwargs['requested_vectors'] != 0:
-                self.logTool.log(service='Database', level='debug', message="RAND is: " + str(rand), redisClient=self.redisMessaging)
-                self.logTool.log(service='Database', level='debug', message="AUTN is: " + str(autn), redisClient=self.redisMessaging)
+                self.logTool.log(service='Database', level='debug', message=lambda: "RAND is: " + str(rand), redisClient=self.redisMessaging)
+                self.logTool.log(service='Database', level='debug', message=lambda: "AUTN is: " + str(autn), redisClient=self.redisMessaging)
                 
                 vector_dict['rand'] = binascii.hexlify(rand).decode("utf-8")
                 vector_dict['autn'] = binascii.hexlify(autn).decode("utf-8")
@@ -1613,8 +1631,8 @@ class Database:
 
         elif action == "eap_aka":
             rand, xres, autn, mac_a, ak = S6a_crypt.generate_eap_aka_vector(key_data['ki'], key_data['opc'], key_data['amf'], key_data['sqn'], kwargs['plmn'])
-            self.logTool.log(service='Database', level='debug', message="RAND is: " + str(rand), redisClient=self.redisMessaging)
-            self.logTool.log(service='Database', level='debug', message="AUTN is: " + str(autn), redisClient=self.redisMessaging)
+            self.logTool.log(service='Database', level='debug', message=lambda: "RAND is: " + str(rand), redisClient=self.redisMessaging)
+            self.logTool.log(service='Database', level='debug', message=lambda: "AUTN is: " + str(autn), redisClient=self.redisMessaging)
             vector_dict['rand'] = binascii.hexlify(rand).decode("utf-8")
             vector_dict['autn'] = binascii.hexlify(autn).decode("utf-8")
             vector_dict['xres'] = binascii.hexlify(xres).decode("utf-8")
@@ -1625,7 +1643,7 @@ class Database:
 
         elif action == "Digest-MD5":
             self.logTool.log(service='Database', level='debug', message="Generating Digest-MD5 Auth vectors", redisClient=self.redisMessaging)
-            self.logTool.log(service='Database', level='debug', message="key_data: " + str(key_data), redisClient=self.redisMessaging)
+            self.logTool.log(service='Database', level='debug', message=lambda: "key_data: " + str(key_data), redisClient=self.redisMessaging)
             nonce = uuid.uuid4().hex
             #nonce = "beef4d878f2642ed98afe491b943ca60"
             vector_dict['nonce'] = nonce
@@ -1635,7 +1653,7 @@ class Database:
             self.logTool.log(service='Database', level='error', message="Invalid action: " + str(action), redisClient=self.redisMessaging)
 
     def Get_APN(self, apn_id):
-        self.logTool.log(service='Database', level='debug', message="Getting APN " + str(apn_id), redisClient=self.redisMessaging)
+        self.logTool.log(service='Database', level='debug', message=lambda: "Getting APN " + str(apn_id), redisClient=self.redisMessaging)
         Session = sessionmaker(bind = self.engine)
         session = Session()
 
@@ -1650,7 +1668,7 @@ class Database:
         return result    
 
     def Get_APN_by_Name(self, apn):
-        self.logTool.log(service='Database', level='debug', message="Getting APN named " + str(apn), redisClient=self.redisMessaging)
+        self.logTool.log(service='Database', level='debug', message=lambda: "Getting APN named " + str(apn), redisClient=self.redisMessaging)
         Session = sessionmaker(bind = self.engine)
         session = Session()    
         try:
@@ -1664,8 +1682,9 @@ class Database:
         return result 
 
     def Update_AuC(self, auc_id, sqn=1, propagate=True):
-        self.logTool.log(service='Database', level='debug', message=f"Updating AuC record for ID: {auc_id}", redisClient=self.redisMessaging)
-        self.logTool.log(service='Database', level='debug', message=self.UpdateObj(AUC, {'sqn': sqn}, auc_id, True), redisClient=self.redisMessaging)
+        self.logTool.log(service='Database', level='debug', message=lambda: f"Updating AuC record for ID: {auc_id}", redisClient=self.redisMessaging)
+        updated_auc = self.UpdateObj(AUC, {'sqn': sqn}, auc_id, True)
+        self.logTool.log(service='Database', level='debug', message=lambda: str(updated_auc), redisClient=self.redisMessaging)
 
         if propagate:
             if self.config['geored'].get('enabled', False) == True:
@@ -1674,12 +1693,12 @@ class Database:
                     "sqn": sqn,
                 }
                 self.handleGeored(aucBody)
-        self.logTool.log(service='Database', level='debug', message=f"Sent Geored update for AuC: {auc_id} with SQN {sqn}", redisClient=self.redisMessaging)
+        self.logTool.log(service='Database', level='debug', message=lambda: f"Sent Geored update for AuC: {auc_id} with SQN {sqn}", redisClient=self.redisMessaging)
 
         return
 
     def Update_Serving_MME(self, imsi, serving_mme, serving_mme_realm=None, serving_mme_peer=None, serving_mme_timestamp=None, propagate=True):
-        self.logTool.log(service='Database', level='debug', message="Updating Serving MME for sub " + str(imsi) + " to MME " + str(serving_mme), redisClient=self.redisMessaging)
+        self.logTool.log(service='Database', level='debug', message=lambda: "Updating Serving MME for sub " + str(imsi) + " to MME " + str(serving_mme), redisClient=self.redisMessaging)
         Session = sessionmaker(bind = self.engine)
         session = Session()
         try:
@@ -1688,22 +1707,22 @@ class Database:
                 self.logTool.log(service='Database', level='debug', message="Evaluating if we should trigger sending a CLR.", redisClient=self.redisMessaging)
                 serving_hss = str(result.serving_mme_peer).split(';',1)[1]
                 serving_mme_peer = str(result.serving_mme_peer).split(';',1)[0]
-                self.logTool.log(service='Database', level='debug', message="Subscriber is currently served by serving_mme: " + str(result.serving_mme) + " at realm " + str(result.serving_mme_realm) + " through Diameter peer " + str(result.serving_mme_peer), redisClient=self.redisMessaging)
-                self.logTool.log(service='Database', level='debug', message="Subscriber is now       served by serving_mme: " + str(serving_mme) + " at realm " + str(serving_mme_realm) + " through Diameter peer " + str(serving_mme_peer), redisClient=self.redisMessaging)
+                self.logTool.log(service='Database', level='debug', message=lambda: "Subscriber is currently served by serving_mme: " + str(result.serving_mme) + " at realm " + str(result.serving_mme_realm) + " through Diameter peer " + str(result.serving_mme_peer), redisClient=self.redisMessaging)
+                self.logTool.log(service='Database', level='debug', message=lambda: "Subscriber is now       served by serving_mme: " + str(serving_mme) + " at realm " + str(serving_mme_realm) + " through Diameter peer " + str(serving_mme_peer), redisClient=self.redisMessaging)
                 #Evaluate if we need to send a CLR to the old MME
                 if result.serving_mme != None:
                     if str(result.serving_mme) == str(serving_mme):
-                        self.logTool.log(service='Database', level='debug', message="This MME is unchanged (" + str(serving_mme) + ") - so no need to send a CLR", redisClient=self.redisMessaging)
+                        self.logTool.log(service='Database', level='debug', message=lambda: "This MME is unchanged (" + str(serving_mme) + ") - so no need to send a CLR", redisClient=self.redisMessaging)
                     elif (str(result.serving_mme) != str(serving_mme)):
-                        self.logTool.log(service='Database', level='debug', message="There is a difference in serving MME, old MME is '" + str(result.serving_mme) + "' new MME is '" + str(serving_mme) + "' - We need to trigger sending a CLR", redisClient=self.redisMessaging)
+                        self.logTool.log(service='Database', level='debug', message=lambda: "There is a difference in serving MME, old MME is '" + str(result.serving_mme) + "' new MME is '" + str(serving_mme) + "' - We need to trigger sending a CLR", redisClient=self.redisMessaging)
                         if serving_hss != self.config['hss']['OriginHost']:
-                            self.logTool.log(service='Database', level='debug', message="This subscriber is not served by this HSS it is served by HSS at " + serving_hss + " - We need to trigger sending a CLR on " + str(serving_hss), redisClient=self.redisMessaging)
+                            self.logTool.log(service='Database', level='debug', message=lambda: "This subscriber is not served by this HSS it is served by HSS at " + serving_hss + " - We need to trigger sending a CLR on " + str(serving_hss), redisClient=self.redisMessaging)
                             URL = 'http://' + serving_hss + '.' + self.config['hss']['OriginRealm'] + ':8080/push/clr/' + str(imsi)
                         else:
                             self.logTool.log(service='Database', level='debug', message="This subscriber is served by this HSS we need to send a CLR to old MME from this HSS", redisClient=self.redisMessaging)
                         
                         URL = 'http://' + serving_hss + '.' + self.config['hss']['OriginRealm'] + ':8080/push/clr/' + str(imsi)
-                        self.logTool.log(service='Database', level='debug', message="Sending CLR to API at " + str(URL), redisClient=self.redisMessaging)
+                        self.logTool.log(service='Database', level='debug', message=lambda: "Sending CLR to API at " + str(URL), redisClient=self.redisMessaging)
 
                         clrBody = {
                             "imsi": str(imsi), 
@@ -1713,7 +1732,7 @@ class Database:
                             "diameterPeer": serving_mme_peer,
                             }
                         
-                        self.logTool.log(service='Database', level='debug', message="Pushing CLR to API on " + str(URL) + " with JSON body: " + str(clrBody), redisClient=self.redisMessaging)
+                        self.logTool.log(service='Database', level='debug', message=lambda: "Pushing CLR to API on " + str(URL) + " with JSON body: " + str(clrBody), redisClient=self.redisMessaging)
                         transaction_id = str(uuid.uuid4())
                         self.handleGeored(clrBody, asymmetric=True, asymmetricUrls=[URL])
                 else:
@@ -1769,7 +1788,7 @@ class Database:
 
 
     def Update_Proxy_CSCF(self, imsi, proxy_cscf, pcscf_realm=None, pcscf_peer=None, pcscf_timestamp=None, pcscf_active_session=None, propagate=True):
-        self.logTool.log(service='Database', level='debug', message="Update_Proxy_CSCF for sub " + str(imsi) + " to pcscf " + str(proxy_cscf) + " with realm " + str(pcscf_realm) + " and peer " + str(pcscf_peer) + " for session id " + str(pcscf_active_session), redisClient=self.redisMessaging)
+        self.logTool.log(service='Database', level='debug', message=lambda: "Update_Proxy_CSCF for sub " + str(imsi) + " to pcscf " + str(proxy_cscf) + " with realm " + str(pcscf_realm) + " and peer " + str(pcscf_peer) + " for session id " + str(pcscf_active_session), redisClient=self.redisMessaging)
         Session = sessionmaker(bind = self.engine)
         session = Session()
 
@@ -1825,7 +1844,7 @@ class Database:
             self.safe_close(session)
 
     def Update_Serving_CSCF(self, imsi, serving_cscf, scscf_realm=None, scscf_peer=None, scscf_timestamp=None, propagate=True):
-        self.logTool.log(service='Database', level='debug', message="Update_Serving_CSCF for sub " + str(imsi) + " to SCSCF " + str(serving_cscf) + " with realm " + str(scscf_realm) + " and peer " + str(scscf_peer), redisClient=self.redisMessaging)
+        self.logTool.log(service='Database', level='debug', message=lambda: "Update_Serving_CSCF for sub " + str(imsi) + " to SCSCF " + str(serving_cscf) + " with realm " + str(scscf_realm) + " and peer " + str(scscf_peer), redisClient=self.redisMessaging)
         Session = sessionmaker(bind = self.engine)
         session = Session()
 
@@ -1879,10 +1898,10 @@ class Database:
             self.safe_close(session)
 
     def Update_Serving_APN(self, imsi, apn, pcrf_session_id, serving_pgw, subscriber_routing, serving_pgw_realm=None, serving_pgw_peer=None, serving_pgw_timestamp=None, propagate=True):
-        self.logTool.log(service='Database', level='debug', message="Called Update_Serving_APN() for imsi " + str(imsi) + " with APN " + str(apn), redisClient=self.redisMessaging)
-        self.logTool.log(service='Database', level='debug', message="PCRF Session ID " + str(pcrf_session_id) + " and serving PGW " + str(serving_pgw) + " and subscriber routing " + str(subscriber_routing), redisClient=self.redisMessaging)
-        self.logTool.log(service='Database', level='debug', message="Serving PGW Realm is: " + str(serving_pgw_realm) + " and peer is: " + str(serving_pgw_peer), redisClient=self.redisMessaging)
-        self.logTool.log(service='Database', level='debug', message="subscriber_routing: " + str(subscriber_routing), redisClient=self.redisMessaging)
+        self.logTool.log(service='Database', level='debug', message=lambda: "Called Update_Serving_APN() for imsi " + str(imsi) + " with APN " + str(apn), redisClient=self.redisMessaging)
+        self.logTool.log(service='Database', level='debug', message=lambda: "PCRF Session ID " + str(pcrf_session_id) + " and serving PGW " + str(serving_pgw) + " and subscriber routing " + str(subscriber_routing), redisClient=self.redisMessaging)
+        self.logTool.log(service='Database', level='debug', message=lambda: "Serving PGW Realm is: " + str(serving_pgw_realm) + " and peer is: " + str(serving_pgw_peer), redisClient=self.redisMessaging)
+        self.logTool.log(service='Database', level='debug', message=lambda: "subscriber_routing: " + str(subscriber_routing), redisClient=self.redisMessaging)
 
         #Get Subscriber ID from IMSI
         subscriber_details = self.Get_Subscriber(imsi=str(imsi))
@@ -1890,7 +1909,7 @@ class Database:
 
         #Split the APN list into a list
         apn_list = subscriber_details['apn_list'].split(',')
-        self.logTool.log(service='Database', level='debug', message="Current APN List: " + str(apn_list), redisClient=self.redisMessaging)
+        self.logTool.log(service='Database', level='debug', message=lambda: "Current APN List: " + str(apn_list), redisClient=self.redisMessaging)
         #Remove the default APN from the list
         try:
             apn_list.remove(str(subscriber_details['default_apn']))
@@ -1906,9 +1925,9 @@ class Database:
             apn_data = self.Get_APN(apn_id)
             self.logTool.log(service='Database', level='debug', message=apn_data, redisClient=self.redisMessaging)
             if str(apn_data['apn']).lower() == str(apn).lower():
-                self.logTool.log(service='Database', level='debug', message="Matched named APN " + str(apn_data['apn']) + " with APN ID " + str(apn_id), redisClient=self.redisMessaging)
+                self.logTool.log(service='Database', level='debug', message=lambda: "Matched named APN " + str(apn_data['apn']) + " with APN ID " + str(apn_id), redisClient=self.redisMessaging)
                 break
-        self.logTool.log(service='Database', level='debug', message="APN ID is " + str(apn_id), redisClient=self.redisMessaging)
+        self.logTool.log(service='Database', level='debug', message=lambda: "APN ID is " + str(apn_id), redisClient=self.redisMessaging)
 
         try:
             if serving_pgw_timestamp != None and serving_pgw_timestamp != 'None':
@@ -1938,7 +1957,7 @@ class Database:
         if serving_pgw is None:
             try:
                 ServingAPN = self.Get_Serving_APN(subscriber_id=subscriber_id, apn_id=apn_id)
-                self.logTool.log(service='Database', level='debug', message="Clearing PCRF session ID on serving_apn_id: " + str(ServingAPN['serving_apn_id']), redisClient=self.redisMessaging)
+                self.logTool.log(service='Database', level='debug', message=lambda: "Clearing PCRF session ID on serving_apn_id: " + str(ServingAPN['serving_apn_id']), redisClient=self.redisMessaging)
                 objectData = self.GetObj(SERVING_APN, ServingAPN['serving_apn_id'])
                 self.handleWebhook(objectData, 'DELETE')
                 self.DeleteObj(SERVING_APN, ServingAPN['serving_apn_id'], True)
@@ -1947,7 +1966,7 @@ class Database:
         else:
             try:
             #Check if already a serving APN on record
-                self.logTool.log(service='Database', level='debug', message="Checking to see if subscriber id " + str(subscriber_id) + " already has an active PCRF profile on APN id " + str(apn_id), redisClient=self.redisMessaging)
+                self.logTool.log(service='Database', level='debug', message=lambda: "Checking to see if subscriber id " + str(subscriber_id) + " already has an active PCRF profile on APN id " + str(apn_id), redisClient=self.redisMessaging)
                 ServingAPN = self.Get_Serving_APN(subscriber_id=subscriber_id, apn_id=apn_id)
                 self.logTool.log(service='Database', level='debug', message="Existing Serving APN ID on record, updating", redisClient=self.redisMessaging)
                 try:
@@ -1993,7 +2012,7 @@ class Database:
             return
 
     def Get_Serving_APN(self, subscriber_id, apn_id):
-        self.logTool.log(service='Database', level='debug', message="Getting Serving APN " + str(apn_id) + " with subscriber_id " + str(subscriber_id), redisClient=self.redisMessaging)
+        self.logTool.log(service='Database', level='debug', message=lambda: "Getting Serving APN " + str(apn_id) + " with subscriber_id " + str(subscriber_id), redisClient=self.redisMessaging)
         Session = sessionmaker(bind = self.engine)
         session = Session()
 
@@ -2014,7 +2033,7 @@ class Database:
         Returns all a dictionary containing all APNs that a subscriber is configured for (subscriber/apn_list), 
         with active sessions being a populated dictionary, and inactive sessions being an empty dictionary.
         """
-        self.logTool.log(service='Database', level='debug', message=f"Getting Serving APNs for subscriber_id: {subscriber_id}", redisClient=self.redisMessaging)
+        self.logTool.log(service='Database', level='debug', message=lambda: f"Getting Serving APNs for subscriber_id: {subscriber_id}", redisClient=self.redisMessaging)
         Session = sessionmaker(bind = self.engine)
         session = Session()
         apnDict = {'apns': {}}
@@ -2032,7 +2051,7 @@ class Database:
                 apnName = apnData.get('apn', 'Unknown')
                 try:
                     servingApn = self.Sanitize_Datetime(self.Get_Serving_APN(subscriber_id=subscriber_id, apn_id=apnId))
-                    self.logTool.log(service='Database', level='debug', message=f"Got serving APN: {servingApn}", redisClient=self.redisMessaging)
+                    self.logTool.log(service='Database', level='debug', message=lambda: f"Got serving APN: {servingApn}", redisClient=self.redisMessaging)
                     if len(servingApn) > 0:
                         apnDict['apns'][apnName] = servingApn
                     else:
@@ -2043,12 +2062,12 @@ class Database:
             except Exception as E:
                 self.logTool.log(service='Database', level='debug', message=f"Error getting apn for subscriber id: {subscriber_id}: {traceback.format_exc()} ", redisClient=self.redisMessaging)
         
-        self.logTool.log(service='Database', level='debug', message=f"Returning: {apnDict}", redisClient=self.redisMessaging)
+        self.logTool.log(service='Database', level='debug', message=lambda: f"Returning: {apnDict}", redisClient=self.redisMessaging)
 
         return apnDict
 
     def Get_Charging_Rule(self, charging_rule_id):
-        self.logTool.log(service='Database', level='debug', message="Called Get_Charging_Rule() for  charging_rule_id " + str(charging_rule_id), redisClient=self.redisMessaging)
+        self.logTool.log(service='Database', level='debug', message=lambda: "Called Get_Charging_Rule() for  charging_rule_id " + str(charging_rule_id), redisClient=self.redisMessaging)
         Session = sessionmaker(bind = self.engine)
         session = Session()
         #Get base Rule
@@ -2068,13 +2087,13 @@ class Database:
         return ChargingRule
 
     def Get_Charging_Rules(self, imsi, apn):
-        self.logTool.log(service='Database', level='debug', message="Called Get_Charging_Rules() for IMSI " + str(imsi) + " and APN " + str(apn), redisClient=self.redisMessaging)
+        self.logTool.log(service='Database', level='debug', message=lambda: "Called Get_Charging_Rules() for IMSI " + str(imsi) + " and APN " + str(apn), redisClient=self.redisMessaging)
         #Get Subscriber ID from IMSI
         subscriber_details = self.Get_Subscriber(imsi=str(imsi))
 
         #Split the APN list into a list
         apn_list = subscriber_details['apn_list'].split(',')
-        self.logTool.log(service='Database', level='debug', message="Current APN List: " + str(apn_list), redisClient=self.redisMessaging)
+        self.logTool.log(service='Database', level='debug', message=lambda: "Current APN List: " + str(apn_list), redisClient=self.redisMessaging)
         #Remove the default APN from the list
         try:
             apn_list.remove(str(subscriber_details['default_apn']))
@@ -2086,14 +2105,14 @@ class Database:
 
         #Get APN ID from APN
         for apn_id in apn_list:
-            self.logTool.log(service='Database', level='debug', message="Getting APN ID " + str(apn_id) + " to see if it matches APN " + str(apn), redisClient=self.redisMessaging)
+            self.logTool.log(service='Database', level='debug', message=lambda: "Getting APN ID " + str(apn_id) + " to see if it matches APN " + str(apn), redisClient=self.redisMessaging)
             #Get each APN in List
             apn_data = self.Get_APN(apn_id)
             self.logTool.log(service='Database', level='debug', message=apn_data, redisClient=self.redisMessaging)
             if str(apn_data['apn']).lower() == str(apn).lower():
-                self.logTool.log(service='Database', level='debug', message="Matched named APN " + str(apn_data['apn']) + " with APN ID " + str(apn_id), redisClient=self.redisMessaging)
+                self.logTool.log(service='Database', level='debug', message=lambda: "Matched named APN " + str(apn_data['apn']) + " with APN ID " + str(apn_id), redisClient=self.redisMessaging)
 
-                self.logTool.log(service='Database', level='debug', message="Getting charging rule list from " + str(apn_data['charging_rule_list']), redisClient=self.redisMessaging)
+                self.logTool.log(service='Database', level='debug', message=lambda: "Getting charging rule list from " + str(apn_data['charging_rule_list']), redisClient=self.redisMessaging)
                 ChargingRule = {}
                 ChargingRule['charging_rule_list'] = str(apn_data['charging_rule_list']).split(',')
                 ChargingRule['apn_data'] = apn_data
@@ -2104,21 +2123,21 @@ class Database:
                     ChargingRule['charging_rules'] = None
                     return ChargingRule
 
-                self.logTool.log(service='Database', level='debug', message="ChargingRule['charging_rule_list'] is: " + str(ChargingRule['charging_rule_list']), redisClient=self.redisMessaging)
+                self.logTool.log(service='Database', level='debug', message=lambda: "ChargingRule['charging_rule_list'] is: " + str(ChargingRule['charging_rule_list']), redisClient=self.redisMessaging)
                 #Empty dict for the Charging Rules to go into
                 ChargingRule['charging_rules'] = []
                 #Add each of the Charging Rules for the APN
                 for individual_charging_rule in ChargingRule['charging_rule_list']:
-                    self.logTool.log(service='Database', level='debug', message="Getting Charging rule " + str(individual_charging_rule), redisClient=self.redisMessaging)
+                    self.logTool.log(service='Database', level='debug', message=lambda: "Getting Charging rule " + str(individual_charging_rule), redisClient=self.redisMessaging)
                     individual_charging_rule_complete = self.Get_Charging_Rule(individual_charging_rule)
-                    self.logTool.log(service='Database', level='debug', message="Got individual_charging_rule_complete: " + str(individual_charging_rule_complete), redisClient=self.redisMessaging)
+                    self.logTool.log(service='Database', level='debug', message=lambda: "Got individual_charging_rule_complete: " + str(individual_charging_rule_complete), redisClient=self.redisMessaging)
                     ChargingRule['charging_rules'].append(individual_charging_rule_complete)
                 self.logTool.log(service='Database', level='debug', message="Completed Get_Charging_Rules()", redisClient=self.redisMessaging)
                 self.logTool.log(service='Database', level='debug', message=ChargingRule, redisClient=self.redisMessaging)
                 return ChargingRule
 
     def Get_UE_by_IP(self, subscriber_routing):   
-        self.logTool.log(service='Database', level='debug', message="Called Get_UE_by_IP() for IP " + str(subscriber_routing), redisClient=self.redisMessaging)
+        self.logTool.log(service='Database', level='debug', message=lambda: "Called Get_UE_by_IP() for IP " + str(subscriber_routing), redisClient=self.redisMessaging)
 
         Session = sessionmaker(bind = self.engine)
         session = Session()    
@@ -2134,7 +2153,7 @@ class Database:
         return result
 
     def Get_IMS_Subscriber_By_Session_Id(self, sessionId):   
-        self.logTool.log(service='Database', level='debug', message="Called Get_IMS_Subscriber_By_Session_Id() for Session " + str(sessionId), redisClient=self.redisMessaging)
+        self.logTool.log(service='Database', level='debug', message=lambda: "Called Get_IMS_Subscriber_By_Session_Id() for Session " + str(sessionId), redisClient=self.redisMessaging)
 
         Session = sessionmaker(bind = self.engine)
         session = Session()    
@@ -2161,27 +2180,27 @@ class Database:
                 if imsi and not result:
                     result = session.query(EMERGENCY_SUBSCRIBER).filter_by(imsi=imsi).first()
                     if result:
-                        self.logTool.log(service='Database', level='debug', message=f"[database.py] [Get_Emergency_Subscriber] Matched emergency subscriber on IMSI: {imsi}", redisClient=self.redisMessaging)
+                        self.logTool.log(service='Database', level='debug', message=lambda: f"[database.py] [Get_Emergency_Subscriber] Matched emergency subscriber on IMSI: {imsi}", redisClient=self.redisMessaging)
                         break
                 if emergencySubscriberId and not result:
                     result = session.query(EMERGENCY_SUBSCRIBER).filter_by(emergency_subscriber_id=emergencySubscriberId).first()
                     if result:
-                        self.logTool.log(service='Database', level='debug', message=f"[database.py] [Get_Emergency_Subscriber] Matched emergency subscriber on IMSI: {imsi}", redisClient=self.redisMessaging)
+                        self.logTool.log(service='Database', level='debug', message=lambda: f"[database.py] [Get_Emergency_Subscriber] Matched emergency subscriber on IMSI: {imsi}", redisClient=self.redisMessaging)
                         break
                 if subscriberIp and not result:
                     result = session.query(EMERGENCY_SUBSCRIBER).filter_by(ip=subscriberIp).first()
                     if result:
-                        self.logTool.log(service='Database', level='debug', message=f"[database.py] [Get_Emergency_Subscriber] Matched emergency subscriber on IMSI: {imsi}", redisClient=self.redisMessaging)
+                        self.logTool.log(service='Database', level='debug', message=lambda: f"[database.py] [Get_Emergency_Subscriber] Matched emergency subscriber on IMSI: {imsi}", redisClient=self.redisMessaging)
                         break
                 if gxSessionId and not result:
                     result = session.query(EMERGENCY_SUBSCRIBER).filter_by(serving_pgw=gxSessionId).first()
                     if result:
-                        self.logTool.log(service='Database', level='debug', message=f"[database.py] [Get_Emergency_Subscriber] Matched emergency subscriber on IMSI: {imsi}", redisClient=self.redisMessaging)
+                        self.logTool.log(service='Database', level='debug', message=lambda: f"[database.py] [Get_Emergency_Subscriber] Matched emergency subscriber on IMSI: {imsi}", redisClient=self.redisMessaging)
                         break
                 if rxSessionId and not result:
                     result = session.query(EMERGENCY_SUBSCRIBER).filter_by(serving_pcscf=rxSessionId).first()
                     if result:
-                        self.logTool.log(service='Database', level='debug', message=f"[database.py] [Get_Emergency_Subscriber] Matched emergency subscriber on IMSI: {imsi}", redisClient=self.redisMessaging)
+                        self.logTool.log(service='Database', level='debug', message=lambda: f"[database.py] [Get_Emergency_Subscriber] Matched emergency subscriber on IMSI: {imsi}", redisClient=self.redisMessaging)
                         break
                 break
 
@@ -2212,23 +2231,23 @@ class Database:
         while not result:
             if imsi and not result:
                 result = session.query(EMERGENCY_SUBSCRIBER).filter_by(imsi=imsi).first()
-                self.logTool.log(service='Database', level='debug', message=f"[database.py] [Update_Emergency_Subscriber] Matched emergency subscriber on IMSI: {imsi}", redisClient=self.redisMessaging)
+                self.logTool.log(service='Database', level='debug', message=lambda: f"[database.py] [Update_Emergency_Subscriber] Matched emergency subscriber on IMSI: {imsi}", redisClient=self.redisMessaging)
                 break
             if emergencySubscriberId and not result:
                 result = session.query(EMERGENCY_SUBSCRIBER).filter_by(emergency_subscriber_id=emergencySubscriberId).first()
-                self.logTool.log(service='Database', level='debug', message=f"[database.py] [Update_Emergency_Subscriber] Matched emergency subscriber on emergency_subscriber_id: {emergencySubscriberId}", redisClient=self.redisMessaging)
+                self.logTool.log(service='Database', level='debug', message=lambda: f"[database.py] [Update_Emergency_Subscriber] Matched emergency subscriber on emergency_subscriber_id: {emergencySubscriberId}", redisClient=self.redisMessaging)
                 break
             if subscriberIp and not result:
                 result = session.query(EMERGENCY_SUBSCRIBER).filter_by(ip=subscriberIp).first()
-                self.logTool.log(service='Database', level='debug', message=f"[database.py] [Update_Emergency_Subscriber] Matched emergency subscriber on IP: {subscriberIp}", redisClient=self.redisMessaging)
+                self.logTool.log(service='Database', level='debug', message=lambda: f"[database.py] [Update_Emergency_Subscriber] Matched emergency subscriber on IP: {subscriberIp}", redisClient=self.redisMessaging)
                 break
             if gxSessionId and not result:
                 result = session.query(EMERGENCY_SUBSCRIBER).filter_by(serving_pgw=gxSessionId).first()
-                self.logTool.log(service='Database', level='debug', message=f"[database.py] [Update_Emergency_Subscriber] Matched emergency subscriber on Gx Session ID: {gxSessionId}", redisClient=self.redisMessaging)
+                self.logTool.log(service='Database', level='debug', message=lambda: f"[database.py] [Update_Emergency_Subscriber] Matched emergency subscriber on Gx Session ID: {gxSessionId}", redisClient=self.redisMessaging)
                 break
             if rxSessionId and not result:
                 result = session.query(EMERGENCY_SUBSCRIBER).filter_by(serving_pcscf=rxSessionId).first()
-                self.logTool.log(service='Database', level='debug', message=f"[database.py] [Update_Emergency_Subscriber] Matched emergency subscriber on Rx Session ID: {rxSessionId}", redisClient=self.redisMessaging)
+                self.logTool.log(service='Database', level='debug', message=lambda: f"[database.py] [Update_Emergency_Subscriber] Matched emergency subscriber on Rx Session ID: {rxSessionId}", redisClient=self.redisMessaging)
                 break
             break
 
@@ -2292,23 +2311,23 @@ class Database:
         while not result:
             if imsi and not result:
                 result = session.query(EMERGENCY_SUBSCRIBER).filter_by(imsi=imsi).first()
-                self.logTool.log(service='Database', level='debug', message=f"[database.py] [Update_Emergency_Subscriber] Matched emergency subscriber on IMSI: {imsi}", redisClient=self.redisMessaging)
+                self.logTool.log(service='Database', level='debug', message=lambda: f"[database.py] [Update_Emergency_Subscriber] Matched emergency subscriber on IMSI: {imsi}", redisClient=self.redisMessaging)
                 break
             if emergencySubscriberId and not result:
                 result = session.query(EMERGENCY_SUBSCRIBER).filter_by(emergency_subscriber_id=emergencySubscriberId).first()
-                self.logTool.log(service='Database', level='debug', message=f"[database.py] [Update_Emergency_Subscriber] Matched emergency subscriber on emergency_subscriber_id: {emergencySubscriberId}", redisClient=self.redisMessaging)
+                self.logTool.log(service='Database', level='debug', message=lambda: f"[database.py] [Update_Emergency_Subscriber] Matched emergency subscriber on emergency_subscriber_id: {emergencySubscriberId}", redisClient=self.redisMessaging)
                 break
             if subscriberIp and not result:
                 result = session.query(EMERGENCY_SUBSCRIBER).filter_by(ip=subscriberIp).first()
-                self.logTool.log(service='Database', level='debug', message=f"[database.py] [Update_Emergency_Subscriber] Matched emergency subscriber on IP: {subscriberIp}", redisClient=self.redisMessaging)
+                self.logTool.log(service='Database', level='debug', message=lambda: f"[database.py] [Update_Emergency_Subscriber] Matched emergency subscriber on IP: {subscriberIp}", redisClient=self.redisMessaging)
                 break
             if gxSessionId and not result:
-                self.logTool.log(service='Database', level='debug', message=f"[database.py] [Update_Emergency_Subscriber] Matched emergency subscriber on Gx Session ID: {gxSessionId}", redisClient=self.redisMessaging)
+                self.logTool.log(service='Database', level='debug', message=lambda: f"[database.py] [Update_Emergency_Subscriber] Matched emergency subscriber on Gx Session ID: {gxSessionId}", redisClient=self.redisMessaging)
                 result = session.query(EMERGENCY_SUBSCRIBER).filter_by(serving_pgw=gxSessionId).first()
                 break
             if rxSessionId and not result:
                 result = session.query(EMERGENCY_SUBSCRIBER).filter_by(serving_pcscf=rxSessionId).first()
-                self.logTool.log(service='Database', level='debug', message=f"[database.py] [Update_Emergency_Subscriber] Matched emergency subscriber on Rx Session ID: {rxSessionId}", redisClient=self.redisMessaging)
+                self.logTool.log(service='Database', level='debug', message=lambda: f"[database.py] [Update_Emergency_Subscriber] Matched emergency subscriber on Rx Session ID: {rxSessionId}", redisClient=self.redisMessaging)
                 break
             break
 
@@ -2338,7 +2357,7 @@ class Database:
         #IMSI           14-15 Digits
         #IMEI           15 Digits
         #IMEI-SV        2 Digits
-        self.logTool.log(service='Database', level='debug', message="Called Store_IMSI_IMEI_Binding() with IMSI: " + str(imsi) + " IMEI: " + str(imei) + " match_response_code: " + str(match_response_code), redisClient=self.redisMessaging)
+        self.logTool.log(service='Database', level='debug', message=lambda: "Called Store_IMSI_IMEI_Binding() with IMSI: " + str(imsi) + " IMEI: " + str(imei) + " match_response_code: " + str(match_response_code), redisClient=self.redisMessaging)
         if self.config['eir']['imsi_imei_logging'] != True:
             self.logTool.log(service='Database', level='debug', message="Skipping storing binding", redisClient=self.redisMessaging)
             return
@@ -2380,7 +2399,7 @@ class Database:
                 try:
                     device_info = self.get_device_info_from_TAC(imei=str(imei))
                     self.logTool.log(service='Database', level='debug', message="Got Device Info: " + str(device_info), redisClient=self.redisMessaging)
-                    self.redisMessaging.sendMetric(serviceName='database', metricName='prom_eir_devices',
+                    self.metricAggregator.sendMetric(serviceName='database', metricName='prom_eir_devices',
                                                     metricType='counter', metricAction='inc', 
                                                     metricValue=1, metricHelp='Profile of attached devices',
                                                     metricLabels={'imei_prefix': device_info['tacPrefix'],
@@ -2392,7 +2411,7 @@ class Database:
                                                     prefixServiceName='metric')
                 except Exception as E:
                     self.logTool.log(service='Database', level='debug', message="Failed to get device info from TAC", redisClient=self.redisMessaging)
-                    self.redisMessaging.sendMetric(serviceName='database', metricName='prom_eir_devices',
+                    self.metricAggregator.sendMetric(serviceName='database', metricName='prom_eir_devices',
                                 metricType='counter', metricAction='inc', 
                                 metricValue=1, metricHelp='Profile of attached devices',
                                 metricLabels={'imei_prefix': str(imei)[0:8],
@@ -2424,7 +2443,7 @@ class Database:
             return
 
     def Get_IMEI_IMSI_History(self, attribute):
-        self.logTool.log(service='Database', level='debug', message="Called Get_IMEI_IMSI_History() for entry matching " + str(self.Get_IMEI_IMSI_History), redisClient=self.redisMessaging)
+        self.logTool.log(service='Database', level='debug', message=lambda: "Called Get_IMEI_IMSI_History() for entry matching " + str(self.Get_IMEI_IMSI_History), redisClient=self.redisMessaging)
         Session = sessionmaker(bind = self.engine)
         session = Session()
         result_array = []
@@ -2451,7 +2470,7 @@ class Database:
 
     def Check_EIR(self, imsi, imei):
         eir_response_code_table = {0 : 'Whitelist', 1: 'Blacklist', 2: 'Greylist'}
-        self.logTool.log(service='Database', level='debug', message="Called Check_EIR() for  imsi " + str(imsi) + " and imei: " + str(imei), redisClient=self.redisMessaging)
+        self.logTool.log(service='Database', level='debug', message=lambda: "Called Check_EIR() for  imsi " + str(imsi) + " and imei: " + str(imei), redisClient=self.redisMessaging)
         Session = sessionmaker(bind = self.engine)
         session = Session()
         #Check for Exact Matches
@@ -2482,7 +2501,7 @@ class Database:
                 result = result.__dict__
                 match_response_code = result['match_response_code']
                 if re.match(result['imei'], imei):
-                    self.logTool.log(service='Database', level='debug', message="IMEI matched " + str(result['imei']), redisClient=self.redisMessaging)
+                    self.logTool.log(service='Database', level='debug', message=lambda: "IMEI matched " + str(result['imei']), redisClient=self.redisMessaging)
                     #Check if IMSI also specified
                     if len(result['imsi']) != 0:
                         self.logTool.log(service='Database', level='debug', message="With IMEI matched, now checking if IMSI matches regex", redisClient=self.redisMessaging)
@@ -2526,7 +2545,7 @@ class Database:
             self.safe_rollback(session)
             self.safe_close(session)
             raise ValueError(E)
-        self.logTool.log(service='Database', level='debug', message="Final EIR_Rules: " + str(EIR_Rules), redisClient=self.redisMessaging)
+        self.logTool.log(service='Database', level='debug', message=lambda: "Final EIR_Rules: " + str(EIR_Rules), redisClient=self.redisMessaging)
         self.safe_close(session)
         return EIR_Rules 
 
@@ -2552,12 +2571,12 @@ class Database:
         return {}
 
     def get_device_info_from_TAC(self, imei) -> dict:
-        self.logTool.log(service='Database', level='debug', message="Getting Device Info from IMEI: " + str(imei), redisClient=self.redisMessaging)
+        self.logTool.log(service='Database', level='debug', message=lambda: "Getting Device Info from IMEI: " + str(imei), redisClient=self.redisMessaging)
         try:
             self.logTool.log(service='Database', level='debug', message="Taclist: self.tacList ", redisClient=self.redisMessaging)
             imei_result = self.find_imei_in_tac_list(imei, self.tacData)
             assert(len(imei_result) != 0)
-            self.logTool.log(service='Database', level='debug', message="Found match for IMEI " + str(imei) + " with result " + str(imei_result), redisClient=self.redisMessaging)
+            self.logTool.log(service='Database', level='debug', message=lambda: "Found match for IMEI " + str(imei) + " with result " + str(imei_result), redisClient=self.redisMessaging)
             return imei_result
         except:
             self.logTool.log(service='Database', level='debug', message="Failed to match on 8 digit IMEI", redisClient=self.redisMessaging)
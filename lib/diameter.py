@@ -9,6 +9,7 @@ import ipaddress
 import jinja2
 from database import Database
 from messaging import RedisMessaging
+from metricAggregator import MetricAggregator
 from redis import Redis
 import yaml
 import json
@@ -16,16 +17,21 @@ import time
 import socket
 import traceback
 import re
+import threading
+import diameterCodec
 
 class Diameter:
 
-    def __init__(self, logTool, originHost: str="hss01", originRealm: str="epc.mnc999.mcc999.3gppnetwork.org", productName: str="PyHSS", mcc: str="999", mnc: str="999", redisMessaging=None):
+    def __init__(self, logTool, originHost: str="hss01", originRealm: str="epc.mnc999.mcc999.3gppnetwork.org", productName: str="PyHSS", mcc: str="999", mnc: str="999", redisMessaging=None, metricAggregator=None):
         with open("../config.yaml", 'r') as stream:
             self.config = (yaml.safe_load(stream))
 
         self.OriginHost = self.string_to_hex(originHost)
         self.OriginRealm = self.string_to_hex(originRealm)
         self.ProductName = self.string_to_hex(productName)
+        self.OriginHostBytes = str(originHost).encode('utf-8')
+        self.OriginRealmBytes = str(originRealm).encode('utf-8')
+        self.ProductNameBytes = str(productName).encode('utf-8')
         self.MNC = str(mnc)
         self.MCC = str(mcc)
         self.logTool = logTool
@@ -41,8 +47,15 @@ class Diameter:
             self.redisMessaging = RedisMessaging(host=self.redisHost, port=self.redisPort, useUnixSocket=self.redisUseUnixSocket, unixSocketPath=self.redisUnixSocketPath)
         
         self.hostname = socket.gethostname()
+        if metricAggregator:
+            self.metricAggregator = metricAggregator
+        else:
+            self.metricAggregator = MetricAggregator(redisMessaging=self.redisMessaging, hostname=self.hostname, flushInterval=float(self.config.get('prometheus', {}).get('metric_flush_interval', 1)))
+        #Local copy of the ActiveDiameterPeerTable, loaded on first use by getActivePeers
+        self.activePeers = None
+        self.activePeersLock = threading.Lock()
 
-        self.database = Database(logTool=logTool)
+        self.database = Database(logTool=logTool, metricAggregator=self.metricAggregator)
         self.diameterRequestTimeout = int(self.config.get('hss', {}).get('diameter_request_timeout', 10))
 
         self.templateLoader = jinja2.FileSystemLoader(searchpath="../")
@@ -85,6 +98,73 @@ class Diameter:
                 {"commandCode": 319, "applicationId": 16777251, "requestMethod": self.Request_16777251_319, "failureResultCode": 5012 ,"requestAcronym": "ISD", "responseAcronym": "ISA", "requestName": "Insert Subscriber Data Request", "responseName": "Insert Subscriber Data Answer"},
         ]
 
+        #Dispatch table keyed by (Application ID, Command Code, Request Flag), so inbound messages are classified with a single lookup
+        self.diameterDispatchTable = {}
+        for diameterApplication in self.diameterResponseList:
+            metricLabels = {"diameter_application_id": diameterApplication["applicationId"], "diameter_cmd_code": diameterApplication["commandCode"]}
+            self.diameterDispatchTable[(diameterApplication["applicationId"], diameterApplication["commandCode"], True)] = {
+                "application": diameterApplication, "inbound": diameterApplication["requestAcronym"], "outbound": diameterApplication["responseAcronym"], "metricLabels": metricLabels}
+            self.diameterDispatchTable[(diameterApplication["applicationId"], diameterApplication["commandCode"], False)] = {
+                "application": diameterApplication, "inbound": diameterApplication["responseAcronym"], "outbound": diameterApplication["requestAcronym"], "metricLabels": metricLabels}
+
+        self.buildStaticAvps()
+
+    def buildStaticAvps(self):
+        """
+        Precomputes the AVP blocks and answer templates that never change after startup, so answers only encode what varies per request.
+        """
+        self.originHostAvp = diameterCodec.encodeAvp(264, 0x40, self.OriginHostBytes)                                       #Origin Host
+        self.originRealmAvp = diameterCodec.encodeAvp(296, 0x40, self.OriginRealmBytes)                                     #Origin Realm
+        self.originAvps = self.originHostAvp + self.originRealmAvp
+        self.resultCodeSuccessAvp = diameterCodec.encodeAvp(268, 0x40, diameterCodec.encodeUnsigned32(2001))                #Result Code (DIAMETER_SUCCESS (2001))
+        self.authSessionStateAvp = diameterCodec.encodeAvp(277, 0x40, diameterCodec.encodeUnsigned32(1))                     #Auth-Session-State (NO_STATE_MAINTAINED)
+
+        self.vendorSpecificApplicationIdAvps = {}
+        for applicationId in diameterCodec.capabilitiesApplicationIds:
+            self.vendorSpecificApplicationIdAvps[applicationId] = diameterCodec.encodeVendorSpecificApplicationId(applicationId)  #Vendor-Specific-Application-ID
+
+        #Supported-Features(628) as sent in S6a ULA and PUA
+        self.s6aSupportedFeaturesAvp = diameterCodec.encodeVendorAvp(628, 0x80, 10415,
+            diameterCodec.encodeVendorAvp(266, 0x40, 10415, b'')                                                            #AVP Vendor ID
+            + diameterCodec.encodeVendorAvp(629, 0x80, 10415, diameterCodec.encodeUnsigned32(1))                            #Feature-List ID
+            + diameterCodec.encodeVendorAvp(630, 0x80, 10415, bytes.fromhex("1c000607")))                                   #Feature-List Flags
+
+        #Vendor-Specific-Application-Id(260) as sent in S6a ULA
+        self.ulaVendorSpecificApplicationIdAvp = diameterCodec.encodeAvp(260, 0x40,
+            diameterCodec.encodeVendorAvp(266, 0x40, 10415, b'')                                                            #AVP Vendor ID
+            + diameterCodec.encodeAvp(258, 0x40, diameterCodec.encodeUnsigned32(16777251)))                                 #Auth-Application-ID Relay
+
+        #Vendor-Specific-Application-Id(260) as sent in Cx, Sh and S13 answers, with the Vendor-Id ahead of the Auth-Application-ID
+        self.answerVendorSpecificApplicationIdAvps = {}
+        for applicationId in (16777216, 16777217, 16777252):
+            self.answerVendorSpecificApplicationIdAvps[applicationId] = diameterCodec.encodeAvp(260, 0x40,
+                diameterCodec.encodeAvp(266, 0x40, diameterCodec.encodeUnsigned32(10415))                                   #Vendor-Id
+                + diameterCodec.encodeAvp(258, 0x40, diameterCodec.encodeUnsigned32(applicationId)))                        #Auth-Application-ID
+
+        #Supported-Features(628) as sent in Gx CCA-I (Gx feature list)
+        self.gxSupportedFeaturesAvp = diameterCodec.encodeVendorAvp(628, 0x80, 10415,
+            diameterCodec.encodeAvp(266, 0x40, diameterCodec.encodeUnsigned32(10415))                                       #Vendor-Id
+            + diameterCodec.encodeVendorAvp(629, 0x80, 10415, diameterCodec.encodeUnsigned32(1))                            #Feature-List ID
+            + diameterCodec.encodeVendorAvp(630, 0x80, 10415, diameterCodec.encodeUnsigned32(11)))                          #Feature-List Flags
+
+        capabilitiesAvps = diameterCodec.encodeCapabilitiesAvps(self.ProductNameBytes, self.config['hss']['bind_ip'])
+
+        #Answer templates - the Origin-State-Id, when present, is patched in between the leading and trailing AVPs
+        self.ceaTemplate = diameterCodec.AnswerTemplate(0x00, 257, 0, leadingAvps=self.resultCodeSuccessAvp + self.originAvps, trailingAvps=capabilitiesAvps)
+        self.dwaTemplate = diameterCodec.AnswerTemplate(0x00, 280, 0, leadingAvps=self.resultCodeSuccessAvp + self.originAvps)
+        self.dpaTemplate = diameterCodec.AnswerTemplate(0x00, 282, 0, leadingAvps=self.originAvps + self.resultCodeSuccessAvp)
+        #The Session-Id is patched in ahead of the trailing AVPs
+        self.puaTemplate = diameterCodec.AnswerTemplate(0x40, 321, 16777251, trailingAvps=self.resultCodeSuccessAvp + self.vendorSpecificApplicationIdAvps[16777251] + self.authSessionStateAvp
+            + self.originAvps + diameterCodec.encodeVendorAvp(1442, 0xc0, 10415, diameterCodec.encodeUnsigned32(1)) + self.s6aSupportedFeaturesAvp)
+        self.noaTemplate = diameterCodec.AnswerTemplate(0x40, 323, 16777251, trailingAvps=self.resultCodeSuccessAvp + self.vendorSpecificApplicationIdAvps[16777251] + self.authSessionStateAvp
+            + self.originAvps + diameterCodec.encodeVendorAvp(628, 0x80, 10415, diameterCodec.encodeVendorAvp(266, 0x40, 10415, b'') + diameterCodec.encodeAvp(258, 0x40, diameterCodec.encodeUnsigned32(16777251))))
+
+    def renderAnswer(self, template, packet_vars: diameterCodec.DiameterHeader, variableAvps: bytes=b'') -> bytes:
+        """
+        Renders an answer template for the given request.
+        """
+        return template.render(packet_vars.hopByHopId, packet_vars.endToEndId, variableAvps)
+
     #Generates rounding for calculating padding
     def myround(self, n, base=4):
         if(n > 0):
@@ -156,15 +236,15 @@ class Diameter:
         return (slicedString)
 
     def DecodePLMN(self, plmn):
-        self.logTool.log(service='HSS', level='debug', message="Decoding PLMN: " + str(plmn), redisClient=self.redisMessaging)
+        self.logTool.log(service='HSS', level='debug', message=lambda: "Decoding PLMN: " + str(plmn), redisClient=self.redisMessaging)
         if "f" in plmn:
             mcc = self.Reverse(plmn[0:2]) + self.Reverse(plmn[2:4]).replace('f', '')
             mnc = self.Reverse(plmn[4:6])
         else:
             mcc = self.Reverse(plmn[0:2]) + self.Reverse(plmn[2:4][1])
             mnc = self.Reverse(plmn[4:6]) + str(self.Reverse(plmn[2:4][0]))
-        self.logTool.log(service='HSS', level='debug', message="Decoded MCC: " + mcc, redisClient=self.redisMessaging)
-        self.logTool.log(service='HSS', level='debug', message="Decoded MNC: " + mnc, redisClient=self.redisMessaging)
+        self.logTool.log(service='HSS', level='debug', message=lambda: "Decoded MCC: " + mcc, redisClient=self.redisMessaging)
+        self.logTool.log(service='HSS', level='debug', message=lambda: "Decoded MNC: " + mnc, redisClient=self.redisMessaging)
         return mcc, mnc
         
     def EncodePLMN(self, mcc, mnc):
@@ -189,11 +269,11 @@ class Diameter:
             plmn = ''
         for bits in plmn_list:
             plmn = plmn + bits
-        self.logTool.log(service='HSS', level='debug', message="Encoded PLMN: " + str(plmn), redisClient=self.redisMessaging)
+        self.logTool.log(service='HSS', level='debug', message=lambda: "Encoded PLMN: " + str(plmn), redisClient=self.redisMessaging)
         return plmn
 
     def TBCD_special_chars(self, input):
-        self.logTool.log(service='HSS', level='debug', message="Special character possible in " + str(input), redisClient=self.redisMessaging)
+        self.logTool.log(service='HSS', level='debug', message=lambda: "Special character possible in " + str(input), redisClient=self.redisMessaging)
         if input == "*":
             self.logTool.log(service='HSS', level='debug', message="Found * - Returning 1010", redisClient=self.redisMessaging)
             return "1010"
@@ -211,28 +291,28 @@ class Diameter:
             return "1100"      
         else:
             binform = "{:04b}".format(int(input))
-            self.logTool.log(service='HSS', level='debug', message="input " + str(input) + " is not a special char, converted to bin: " + str(binform), redisClient=self.redisMessaging)
+            self.logTool.log(service='HSS', level='debug', message=lambda: "input " + str(input) + " is not a special char, converted to bin: " + str(binform), redisClient=self.redisMessaging)
             return (binform)
 
     def TBCD_encode(self, input):
-        self.logTool.log(service='HSS', level='debug', message="TBCD_encode input value is " + str(input), redisClient=self.redisMessaging)
+        self.logTool.log(service='HSS', level='debug', message=lambda: "TBCD_encode input value is " + str(input), redisClient=self.redisMessaging)
         offset = 0
         output = ''
         matches = ['*', '#', 'a', 'b', 'c']
         while offset < len(input):
             if len(input[offset:offset+2]) == 2:
-                self.logTool.log(service='HSS', level='debug', message="processing bits " + str(input[offset:offset+2]) + " at position offset " + str(offset), redisClient=self.redisMessaging)
+                self.logTool.log(service='HSS', level='debug', message=lambda: "processing bits " + str(input[offset:offset+2]) + " at position offset " + str(offset), redisClient=self.redisMessaging)
                 bit = input[offset:offset+2]    #Get two digits at a time
                 bit = bit[::-1]                 #Reverse them
                 #Check if *, #, a, b or c
                 if any(x in bit for x in matches):
-                    self.logTool.log(service='HSS', level='debug', message="Special char in bit " + str(bit), redisClient=self.redisMessaging)
+                    self.logTool.log(service='HSS', level='debug', message=lambda: "Special char in bit " + str(bit), redisClient=self.redisMessaging)
                     new_bit = ''
                     new_bit = new_bit + str(self.TBCD_special_chars(bit[0]))
                     new_bit = new_bit + str(self.TBCD_special_chars(bit[1]))
-                    self.logTool.log(service='HSS', level='debug', message="Final bin output of new_bit is " + str(new_bit), redisClient=self.redisMessaging)
+                    self.logTool.log(service='HSS', level='debug', message=lambda: "Final bin output of new_bit is " + str(new_bit), redisClient=self.redisMessaging)
                     bit = hex(int(new_bit, 2))[2:]      #Get Hex value
-                    self.logTool.log(service='HSS', level='debug', message="Formatted as Hex this is " + str(bit), redisClient=self.redisMessaging)
+                    self.logTool.log(service='HSS', level='debug', message=lambda: "Formatted as Hex this is " + str(bit), redisClient=self.redisMessaging)
                 output = output + bit
                 offset = offset + 2
             else:
@@ -240,23 +320,23 @@ class Diameter:
                 last_digit = str(input[offset:offset+2])
                 #Check if *, #, a, b or c
                 if any(x in last_digit for x in matches):
-                    self.logTool.log(service='HSS', level='debug', message="Special char in bit " + str(bit), redisClient=self.redisMessaging)
+                    self.logTool.log(service='HSS', level='debug', message=lambda: "Special char in bit " + str(bit), redisClient=self.redisMessaging)
                     new_bit = ''
                     new_bit = new_bit + '1111'      #Add the F first
                     #Encode the symbol into binary and append it to the new_bit var
                     new_bit = new_bit + str(self.TBCD_special_chars(last_digit))
-                    self.logTool.log(service='HSS', level='debug', message="Final bin output of new_bit is " + str(new_bit), redisClient=self.redisMessaging) 
+                    self.logTool.log(service='HSS', level='debug', message=lambda: "Final bin output of new_bit is " + str(new_bit), redisClient=self.redisMessaging) 
                     bit = hex(int(new_bit, 2))[2:]      #Get Hex value
-                    self.logTool.log(service='HSS', level='debug', message="Formatted as Hex this is " + str(bit), redisClient=self.redisMessaging)
+                    self.logTool.log(service='HSS', level='debug', message=lambda: "Formatted as Hex this is " + str(bit), redisClient=self.redisMessaging)
                 else:
                     bit = "f" + last_digit
                 offset = offset + 2
                 output = output + bit
-        self.logTool.log(service='HSS', level='debug', message="TBCD_encode final output value is " + str(output), redisClient=self.redisMessaging)
+        self.logTool.log(service='HSS', level='debug', message=lambda: "TBCD_encode final output value is " + str(output), redisClient=self.redisMessaging)
         return output
 
     def TBCD_decode(self, input):
-        self.logTool.log(service='HSS', level='debug', message="TBCD_decode Input value is " + str(input), redisClient=self.redisMessaging)
+        self.logTool.log(service='HSS', level='debug', message=lambda: "TBCD_decode Input value is " + str(input), redisClient=self.redisMessaging)
         offset = 0
         output = ''
         while offset < len(input):
@@ -268,271 +348,75 @@ class Diameter:
             else:   #If f in bit strip it
                 bit = input[offset:offset+2]
                 output = output + bit[1]
-                self.logTool.log(service='HSS', level='debug', message="TBCD_decode output value is " + str(output), redisClient=self.redisMessaging)
+                self.logTool.log(service='HSS', level='debug', message=lambda: "TBCD_decode output value is " + str(output), redisClient=self.redisMessaging)
                 return output
 
-    #Generates an AVP with inputs provided (AVP Code, AVP Flags, AVP Content, Padding)
-    #AVP content must already be in HEX - This can be done with binascii.hexlify(avp_content.encode())
+    #Generates an AVP with inputs provided (AVP Code, AVP Flags, AVP Content)
+    #AVP content may be bytes, in which case the AVP is returned as bytes.
+    #Otherwise AVP content must already be in HEX - This can be done with binascii.hexlify(avp_content.encode()) - and the AVP is returned as HEX.
     def generate_avp(self, avp_code, avp_flags, avp_content):
-        avp_code = format(avp_code,"x").zfill(8)
-        
-        avp_length = 1 ##This is a placeholder that's overwritten later
-
-        #AVP Must always be a multiple of 4 - Round up to nearest multiple of 4 and fill remaining bits with padding
-        avp = str(avp_code) + str(avp_flags) + str("000000") + str(avp_content)
-        avp_length = int(len(avp)/2)
+        if isinstance(avp_content, bytes):
+            return diameterCodec.encodeAvp(avp_code, diameterCodec.legacyFlags(avp_flags), avp_content)
+        return diameterCodec.encodeAvp(avp_code, diameterCodec.legacyFlags(avp_flags), bytes.fromhex(avp_content)).hex()
 
-        if avp_length % 4  == 0:    #Multiple of 4 - No Padding needed
-            avp_padding = ''
-        else:                       #Not multiple of 4 - Padding needed
-            rounded_value = self.myround(avp_length)
-            avp_padding = format(0,"x").zfill(int( rounded_value - avp_length) * 2)
-
-        avp = str(avp_code) + str(avp_flags) + str(format(avp_length,"x").zfill(6)) + str(avp_content) + str(avp_padding)
-        return avp
-
-    #Generates an AVP with inputs provided (AVP Code, AVP Flags, AVP Content, Padding)
-    #AVP content must already be in HEX - This can be done with binascii.hexlify(avp_content.encode())
+    #Generates a Vendor AVP with inputs provided (AVP Code, AVP Flags, Vendor ID, AVP Content)
+    #AVP content may be bytes, in which case the AVP is returned as bytes.
+    #Otherwise AVP content must already be in HEX - This can be done with binascii.hexlify(avp_content.encode()) - and the AVP is returned as HEX.
     def generate_vendor_avp(self, avp_code, avp_flags, avp_vendorid, avp_content):
-        avp_code = format(avp_code,"x").zfill(8)
-        
-        avp_length = 1 ##This is a placeholder that gets overwritten later
-
-        avp_vendorid = format(int(avp_vendorid),"x").zfill(8)
-        
-        #AVP Must always be a multiple of 4 - Round up to nearest multiple of 4 and fill remaining bits with padding
-        avp = str(avp_code) + str(avp_flags) + str("000000") + str(avp_vendorid) + str(avp_content)
-        avp_length = int(len(avp)/2)
-
-        if avp_length % 4  == 0:    #Multiple of 4 - No Padding needed
-            avp_padding = ''
-        else:                       #Not multiple of 4 - Padding needed
-            rounded_value = self.myround(avp_length)
-            self.logTool.log(service='HSS', level='debug', message="Rounded value is " + str(rounded_value), redisClient=self.redisMessaging)
-            self.logTool.log(service='HSS', level='debug', message="Has " + str( int( rounded_value - avp_length)) + " bytes of padding", redisClient=self.redisMessaging)
-            avp_padding = format(0,"x").zfill(int( rounded_value - avp_length) * 2)
-
-
-        
-        avp = str(avp_code) + str(avp_flags) + str(format(avp_length,"x").zfill(6)) + str(avp_vendorid) + str(avp_content) + str(avp_padding)
-        return avp
+        if isinstance(avp_content, bytes):
+            return diameterCodec.encodeVendorAvp(avp_code, diameterCodec.legacyFlags(avp_flags), int(avp_vendorid), avp_content)
+        return diameterCodec.encodeVendorAvp(avp_code, diameterCodec.legacyFlags(avp_flags), int(avp_vendorid), bytes.fromhex(avp_content)).hex()
 
+    #Generates a full Diameter packet, returned as bytes.
+    #The AVP block may be bytes or HEX, the Hop-by-Hop and End-to-End Identifiers may be bytes or HEX.
     def generate_diameter_packet(self, packet_version, packet_flags, packet_command_code, packet_application_id, packet_hop_by_hop_id, packet_end_to_end_id, avp):
         try:
-            packet_length = 228
-            packet_length = format(packet_length,"x").zfill(6)
-        
-            packet_command_code = format(packet_command_code,"x").zfill(6)
-            
-            packet_application_id = format(packet_application_id,"x").zfill(8)
-            
-            packet_hex = packet_version + packet_length + packet_flags + packet_command_code + packet_application_id + packet_hop_by_hop_id + packet_end_to_end_id + avp
-            packet_length = int(round(len(packet_hex))/2)
-            packet_length = format(packet_length,"x").zfill(6)
-            
-            packet_hex = packet_version + packet_length + packet_flags + packet_command_code + packet_application_id + packet_hop_by_hop_id + packet_end_to_end_id + avp
-            return packet_hex
+            if not isinstance(avp, bytes):
+                avp = bytes.fromhex(avp)
+            return diameterCodec.encodeDiameterPacket(
+                diameterCodec.legacyFlags(packet_flags),
+                packet_command_code,
+                packet_application_id,
+                diameterCodec.identifierToBytes(packet_hop_by_hop_id),
+                diameterCodec.identifierToBytes(packet_end_to_end_id),
+                avp,
+                version=int(packet_version, 16))
         except Exception as e:
             self.logTool.log(service='HSS', level='error', message=f"[diameter.py] [generate_diameter_packet] Exception: {e}", redisClient=self.redisMessaging)
 
 
 
-    def roundUpToMultiple(self, n, multiple):
-        return ((n + multiple - 1) // multiple) * multiple
-
-
-    def validateSingleAvp(self, data) -> bool:
-        """
-        Attempts to validate a single hex string diameter AVP as being an AVP.
-        """
-        try:
-            avpCode = int(data[0:8], 16)
-            # The next byte contains the AVP Flags
-            avpFlags = data[8:10]
-            # The next 3 bytes contain the AVP Length
-            avpLength = int(data[10:16], 16)
-            if avpFlags not in ['80', '40', '20', '00', 'c0']:
-                return False
-            if int(len(data[16:]) / 2) < ((avpLength - 8)):
-                return False
-            return True
-        except Exception as e:
-            return False
-
-
     def decode_diameter_packet(self, data):
         """
         Handles decoding of a full diameter packet.
+        Accepts bytes (or a hex string), and returns the packet vars dictionary and a list of top level DiameterAvp objects.
+        Grouped AVPs are only expanded when a handler asks for their contents.
         """
-        packet_vars = {}
-        avps = []
-
-        if type(data) is bytes:
-            data = data.hex()
-        # One byte is 2 hex characters
-        # First Byte is the Diameter Packet Version
-        packet_vars['packet_version'] = data[0:2]
-        # Next 3 Bytes are the length of the entire Diameter packet
-        packet_vars['length'] = int(data[2:8], 16)
-        # Next Byte is the Diameter Flags
-        packet_vars['flags'] = data[8:10]
-        packet_vars['flags_bin'] = bin(int(data[8:10], 16))[2:].zfill(8)
-        # Next 3 Bytes are the Diameter Command Code
-        packet_vars['command_code'] = int(data[10:16], 16)
-        # Next 4 Bytes are the Application Id
-        packet_vars['ApplicationId'] = int(data[16:24], 16)
-        # Next 4 Bytes are the Hop By Hop Identifier
-        packet_vars['hop-by-hop-identifier'] = data[24:32]
-        # Next 4 Bytes are the End to End Identifier
-        packet_vars['end-to-end-identifier'] = data[32:40]
-
-
-        lengthOfDiameterVars = int(len(data[:40]) / 2)
-
-        #Length of all AVPs, in bytes
-        avpLength = int(packet_vars['length'] - lengthOfDiameterVars)
-        avpCharLength = int((avpLength * 2))
-        remaining_avps = data[40:]
-
-        avps = self.decodeAvpPacket(remaining_avps)
-
-        return packet_vars, avps
+        if type(data) is str:
+            data = bytes.fromhex(data)
+        return diameterCodec.decodeDiameterPacket(data)
 
     def decodeAvpPacket(self, data):
         """
-        Returns a list of decoded AVP Packet dictionaries.
-        This function is called at a high frequency, decoding methods should stick to iteration and not recursion, to avoid a memory leak.
+        Returns a list of decoded DiameterAvp objects from a block of AVPs, supplied as bytes or a hex string.
         """
-        # Note: After spending hours on this, I'm leaving the following technical debt:
-        # Subavps and all their descendents are lifted up, flat, side by side into the parent's sub_avps list.
-        # It's definitely possible to keep the nested tree structure, if anyone wants to improve this function. But I can't figure out a simple way to do so, without invoking recursion.
-
-
-        # Our final list of AVP Dictionaries, which will be returned once processing is complete.
-        processed_avps = []
-        # Initialize a failsafe counter, to prevent packets that pass validation but aren't AVPs from causing an infinite loop
-        failsafeCounter = 0
-
-        # If the avp data is 8 bytes (16 chars) or less, it's invalid.
-        if len(data) < 16:
-            return []
-
-        # Working stack to aid in iterative processing of sub-avps.
-        subAvpUnprocessedStack = []
-
-        # Keep processing AVPs until they're all dealt with
-        while len(data) > 16:
-            try:
-                failsafeCounter += 1
-
-                if failsafeCounter > 100:
-                    break
-                avp_vars = {}
-                # The first 4 bytes contains the AVP code
-                avp_vars['avp_code'] = int(data[0:8], 16)
-                # The next byte contains the AVP Flags
-                avp_vars['avp_flags'] = data[8:10]
-                # The next 3 bytes contains the AVP Length
-                avp_vars['avp_length'] = int(data[10:16], 16)
-                # The remaining bytes (until the end, defined by avp_length) is the AVP payload.
-                # Padding is excluded from avp_length. It's calculated separately, and unknown by the AVP itself.
-                # We calculate the avp payload length (in bytes) by subtracting 8, because the avp headers are always 8 bytes long. 
-                # The result is then multiplied by 2 to give us chars.
-                avpPayloadLength = int((avp_vars['avp_length'])*2)
-
-                # Work out our vendor id and add the payload itself (misc_data)
-                if avp_vars['avp_flags'] == 'c0' or avp_vars['avp_flags'] == '80':
-                    avp_vars['vendor_id'] = int(data[16:24], 16)
-                    avp_vars['misc_data'] = data[24:avpPayloadLength]
-                else:
-                    avp_vars['vendor_id'] = ''
-                    avp_vars['misc_data'] = data[16:avpPayloadLength]
-
-                payloadContainsSubAvps = self.validateSingleAvp(avp_vars['misc_data'])
-                if payloadContainsSubAvps:
-                    # If the payload contains sub or grouped AVPs, append misc_data to the subAvpUnprocessedStack to start working through one or more subavp
-                    subAvpUnprocessedStack.append(avp_vars["misc_data"])
-                    avp_vars["misc_data"] = ''
-
-                # Rounds up the length to the nearest multiple of 4, which we can differential against the avp length to give us the padding length (if required)
-                avp_padded_length = int((self.roundUpToMultiple(avp_vars['avp_length'], 4)))
-                avpPaddingLength = ((avp_padded_length - avp_vars['avp_length']) * 2)
+        if type(data) is str:
+            data = bytes.fromhex(data)
+        buffer = memoryview(data)
+        return diameterCodec.decodeAvps(buffer, 0, len(buffer))
 
-                # Initialize a blank sub_avps list, regardless of whether or not we have any sub avps.
-                avp_vars['sub_avps'] = []
-
-                while payloadContainsSubAvps:
-                    # Increment our failsafe counter, which will fail after 100 tries. This prevents a rare validation error from causing the function to hang permanently.
-                    failsafeCounter += 1
-
-                    if failsafeCounter > 100:
-                        break
-                    
-                    # Pop the sub avp data from the list (remove from the end)
-                    sub_avp_data = subAvpUnprocessedStack.pop()
-
-                    # Initialize our sub avp dictionary, and grab the usual values
-                    sub_avp = {}
-                    sub_avp['avp_code'] = int(sub_avp_data[0:8], 16)
-                    sub_avp['avp_flags'] = sub_avp_data[8:10]
-                    sub_avp['avp_length'] = int(sub_avp_data[10:16], 16)
-                    sub_avpPayloadLength = int((sub_avp['avp_length'])*2)
-
-                    if sub_avp['avp_flags'] == 'c0' or sub_avp['avp_flags'] == '80':
-                        sub_avp['vendor_id'] = int(sub_avp_data[16:24], 16)
-                        sub_avp['misc_data'] = sub_avp_data[24:sub_avpPayloadLength]
-                    else:
-                        sub_avp['vendor_id'] = ''
-                        sub_avp['misc_data'] = sub_avp_data[16:sub_avpPayloadLength]
-
-                    containsSubAvps = self.validateSingleAvp(sub_avp["misc_data"])
-                    if containsSubAvps:
-                        subAvpUnprocessedStack.append(sub_avp["misc_data"])
-                        sub_avp["misc_data"] = ''
-                    
-                    avp_vars['sub_avps'].append(sub_avp)
-
-                    sub_avp_padded_length = int((self.roundUpToMultiple(sub_avp['avp_length'], 4)))
-                    subAvpPaddingLength = ((sub_avp_padded_length - sub_avp['avp_length']) * 2)
-
-                    sub_avp_data = sub_avp_data[sub_avpPayloadLength+subAvpPaddingLength:]
-                    containsNestedSubAvps = self.validateSingleAvp(sub_avp_data)
-
-                    # Check for nested sub avps and bring them to the top of the stack, for further processing.
-                    if containsNestedSubAvps:
-                        subAvpUnprocessedStack.append(sub_avp_data)
-                    
-                    if containsSubAvps or containsNestedSubAvps:
-                        payloadContainsSubAvps = True
-                    else:
-                        payloadContainsSubAvps = False
-
-                if avpPaddingLength > 0:
-                    processed_avps.append(avp_vars)
-                    data = data[avpPayloadLength+avpPaddingLength:]
-                else:
-                    processed_avps.append(avp_vars)
-                    data = data[avpPayloadLength:]
-            except Exception as e:
-                print(e)
-                continue
-
-        return processed_avps
-
-    def get_avp_data(self, avps, avp_code):               #Loops through list of dicts generated by the packet decoder, and returns the data for a specific AVP code in list (May be more than one AVP with same code but different data)
+    def get_avp_data(self, avps, avp_code):               #Looks up the AVP index built by the packet decoder, and returns the data for a specific AVP code in list (May be more than one AVP with same code but different data)
         misc_data = []
-        for avpObject in avps:
-            if int(avpObject['avp_code']) == int(avp_code):
-                if len(avpObject['misc_data']) == 0:
-                    misc_data.append(avpObject['sub_avps'])
-                else:
-                    misc_data.append(avpObject['misc_data'])
-            if 'sub_avps' in avpObject:
-                for sub_avp in avpObject['sub_avps']:
-                    if int(sub_avp['avp_code']) == int(avp_code):
-                        misc_data.append(sub_avp['misc_data'])
+        for avp in avps.find(int(avp_code)):
+            if avp.isGrouped:
+                misc_data.append(avp.descendants())
+            else:
+                misc_data.append(avp.data.hex())
         return misc_data
 
+    def get_avp_value(self, avps, avp_code):              #Same lookup as get_avp_data, but returns values decoded by their dictionary type (str, int, bytes or sub-AVPs)
+        return [avp.value for avp in avps.find(int(avp_code))]
+
     def decode_diameter_packet_length(self, data):
         packet_vars = {}
         data = data.hex()
@@ -554,6 +438,38 @@ class Diameter:
         except Exception as e:
             return ''
 
+    def getActivePeers(self) -> dict:
+        """
+        Returns the local copy of the ActiveDiameterPeerTable, keyed by '{ipAddress}-{port}'.
+        The table is loaded from Redis on first use, then kept current by a subscriber thread on the ActiveDiameterPeerUpdates channel.
+        The returned dict is never modified in place, so it's safe to iterate while updates arrive.
+        """
+        if self.activePeers is None:
+            with self.activePeersLock:
+                if self.activePeers is None:
+                    self.loadActivePeers()
+                    self.redisMessaging.subscribeToChannel(channel='ActiveDiameterPeerUpdates', messageHandler=self.handleActivePeerUpdate, subscribeHandler=self.loadActivePeers, usePrefix=True, prefixHostname=self.hostname, prefixServiceName='diameter')
+        return self.activePeers
+
+    def loadActivePeers(self):
+        """
+        Replaces the local copy of the ActiveDiameterPeerTable with the table held in Redis.
+        """
+        sharedPeers = self.redisMessaging.getAllHashValues(key='ActiveDiameterPeerTable', usePrefix=True, prefixHostname=self.hostname, prefixServiceName='diameter')
+        self.activePeers = {peerKey: json.loads(peer) for peerKey, peer in sharedPeers.items()}
+
+    def handleActivePeerUpdate(self, message: str):
+        """
+        Applies a single peer change published by diameterService to the local copy of the ActiveDiameterPeerTable.
+        """
+        peerUpdate = json.loads(message)
+        activePeers = dict(self.activePeers or {})
+        if peerUpdate.get('peer', None) is None:
+            activePeers.pop(peerUpdate.get('peerKey'), None)
+        else:
+            activePeers[peerUpdate.get('peerKey')] = peerUpdate.get('peer')
+        self.activePeers = activePeers
+
     def getConnectedPeersByType(self, peerType: str) -> list:
         try:
             peerType = peerType.lower()
@@ -562,11 +478,11 @@ class Diameter:
             if peerType not in peerTypes:
                 return []
             filteredConnectedPeers = []
-            activePeers = json.loads(self.redisMessaging.getValue(key="ActiveDiameterPeers", usePrefix=True, prefixHostname=self.hostname, prefixServiceName='diameter').decode())
+            activePeers = self.getActivePeers()
 
             for key, value in activePeers.items():
-                if activePeers.get(key, {}).get('peerType', '') == peerType and activePeers.get(key, {}).get('connectionStatus', '') == 'connected':
-                    filteredConnectedPeers.append(activePeers.get(key, {}))
+                if value.get('peerType', '') == peerType and value.get('connectionStatus', '') == 'connected':
+                    filteredConnectedPeers.append(value)
             
             return filteredConnectedPeers
 
@@ -574,49 +490,50 @@ class Diameter:
             return []
 
     def getPeerByHostname(self, hostname: str) -> dict:
-        self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [getPeerByHostname] Looking for peer with hostname {hostname}", redisClient=self.redisMessaging)
+        self.logTool.log(service='HSS', level='debug', message=lambda: f"[diameter.py] [getPeerByHostname] Looking for peer with hostname {hostname}", redisClient=self.redisMessaging)
         try:
             hostname = hostname.lower()
-            activePeers = json.loads(self.redisMessaging.getValue(key="ActiveDiameterPeers", usePrefix=True, prefixHostname=self.hostname, prefixServiceName='diameter').decode())
+            activePeers = self.getActivePeers()
 
             for key, value in activePeers.items():
-                if activePeers.get(key, {}).get('diameterHostname', '').lower() == hostname and activePeers.get(key, {}).get('connectionStatus', '') == 'connected':
-                    return(activePeers.get(key, {}))
+                if value.get('diameterHostname', '').lower() == hostname and value.get('connectionStatus', '') == 'connected':
+                    return(value)
 
         except Exception as e:
             self.logTool.log(service='HSS', level='error', message=f"[diameter.py] [getPeerByHostname] Failed to find peer with hostname {hostname}", redisClient=self.redisMessaging)
             return {}
 
-    def getDiameterMessageType(self, binaryData: str) -> dict:
+    def getDispatchEntry(self, packet_vars: diameterCodec.DiameterHeader):
+        """
+        Returns the dispatch table entry for a decoded message, or None if the application and command code aren't handled.
+        """
+        return self.diameterDispatchTable.get((packet_vars.applicationId, packet_vars.commandCode, packet_vars.isRequest), None)
+
+    def getDiameterMessageType(self, binaryData: str=None, packetVars: dict=None) -> dict:
         """
         Determines whether a message is a request or a response, and the appropriate acronyms for each type.
+        If the message has already been decoded, packetVars may be passed in place of binaryData.
         """
-        packet_vars, avps = self.decode_diameter_packet(binaryData)
+        if packetVars is None:
+            packetVars, avps = self.decode_diameter_packet(binaryData)
         response = {}
-        
-        for diameterApplication in self.diameterResponseList:
-            try:
-                assert(packet_vars["command_code"] == diameterApplication["commandCode"])
-                assert(packet_vars["ApplicationId"] == diameterApplication["applicationId"])
-                if packet_vars["flags_bin"][0:1] == "1":
-                    response['inbound'] = diameterApplication["requestAcronym"]
-                    response['outbound'] = diameterApplication["responseAcronym"]
-                else:
-                    response['inbound'] = diameterApplication["responseAcronym"]
-                    response['outbound'] = diameterApplication["requestAcronym"]
-                self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] Matched message types: {response}", redisClient=self.redisMessaging)
-            except Exception as e:
-                continue
+
+        dispatchEntry = self.getDispatchEntry(packetVars)
+        if dispatchEntry is not None:
+            response['inbound'] = dispatchEntry["inbound"]
+            response['outbound'] = dispatchEntry["outbound"]
+            self.logTool.log(service='HSS', level='debug', message=lambda: f"[diameter.py] Matched message types: {response}", redisClient=self.redisMessaging)
         return response
 
-    def sendDiameterRequest(self, requestType: str, hostname: str, **kwargs) -> str:
+    def sendDiameterRequest(self, requestType: str, hostname: str, **kwargs) -> bytes:
         """
         Sends a given diameter request of requestType to the provided peer hostname, if the peer is connected.
+        Returns the request sent, or an empty string on failure.
         """
         try:
             request = ''
             requestType = requestType.upper()
-            self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [sendDiameterRequest] [{requestType}] Generating a diameter outbound request", redisClient=self.redisMessaging)
+            self.logTool.log(service='HSS', level='debug', message=lambda: f"[diameter.py] [sendDiameterRequest] [{requestType}] Generating a diameter outbound request", redisClient=self.redisMessaging)
             
             for diameterApplication in self.diameterRequestList:
                 try:
@@ -631,15 +548,14 @@ class Diameter:
                     return ''
                 try:
                     request = diameterApplication["requestMethod"](**kwargs)
-                    self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [sendDiameterRequest] [{requestType}] Successfully generated request: {request}", redisClient=self.redisMessaging)
+                    self.logTool.log(service='HSS', level='debug', message=lambda: f"[diameter.py] [sendDiameterRequest] [{requestType}] Successfully generated request: {request}", redisClient=self.redisMessaging)
                 except Exception as e:
                     self.logTool.log(service='HSS', level='error', message=f"[diameter.py] [sendDiameterRequest] [{requestType}] Error generating request: {traceback.format_exc()}", redisClient=self.redisMessaging)
                     return ''
                 outboundQueue = f"diameter-outbound-{peerIp}-{peerPort}"
-                sendTime = time.time_ns()
-                outboundMessage = json.dumps({"diameter-outbound": request, "inbound-received-timestamp": sendTime})
+                outboundMessage = diameterCodec.encodeEnvelope(request)
                 self.redisMessaging.sendMessage(queue=outboundQueue, message=outboundMessage, queueExpiry=self.diameterRequestTimeout, usePrefix=True, prefixHostname=self.hostname, prefixServiceName='diameter')
-                self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [sendDiameterRequest] [{requestType}] Queueing for host: {hostname} on {peerIp}-{peerPort}", redisClient=self.redisMessaging)
+                self.logTool.log(service='HSS', level='debug', message=lambda: f"[diameter.py] [sendDiameterRequest] [{requestType}] Queueing for host: {hostname} on {peerIp}-{peerPort}", redisClient=self.redisMessaging)
             return request
         except Exception as e:
             self.logTool.log(service='HSS', level='error', message=f"[diameter.py] [sendDiameterRequest] [{requestType}] Error generating diameter outbound request: {traceback.format_exc()}", redisClient=self.redisMessaging)
@@ -652,7 +568,7 @@ class Diameter:
         try:
             request = ''
             requestType = requestType.upper()
-            self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [broadcastDiameterRequest] [{requestType}] Broadcasting a diameter outbound request of type: {requestType} to peers of type: {peerType}", redisClient=self.redisMessaging)
+            self.logTool.log(service='HSS', level='debug', message=lambda: f"[diameter.py] [broadcastDiameterRequest] [{requestType}] Broadcasting a diameter outbound request of type: {requestType} to peers of type: {peerType}", redisClient=self.redisMessaging)
             
             for diameterApplication in self.diameterRequestList:
                 try:
@@ -668,20 +584,28 @@ class Diameter:
                         return ''
                     try:
                         request = diameterApplication["requestMethod"](**kwargs)
-                        self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [broadcastDiameterRequest] [{requestType}] Successfully generated request: {request}", redisClient=self.redisMessaging)
+                        self.logTool.log(service='HSS', level='debug', message=lambda: f"[diameter.py] [broadcastDiameterRequest] [{requestType}] Successfully generated request: {request}", redisClient=self.redisMessaging)
                     except Exception as e:
                         self.logTool.log(service='HSS', level='error', message=f"[diameter.py] [broadcastDiameterRequest] [{requestType}] Error generating request: {traceback.format_exc()}", redisClient=self.redisMessaging)
                         return ''
-                    self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [broadcastDiameterRequest] [{requestType}] Successfully generated request: {request}", redisClient=self.redisMessaging)
+                    self.logTool.log(service='HSS', level='debug', message=lambda: f"[diameter.py] [broadcastDiameterRequest] [{requestType}] Successfully generated request: {request}", redisClient=self.redisMessaging)
                     outboundQueue = f"diameter-outbound-{peerIp}-{peerPort}"
-                    sendTime = time.time_ns()
-                    outboundMessage = json.dumps({"diameter-outbound": request, "inbound-received-timestamp": sendTime})
+                    outboundMessage = diameterCodec.encodeEnvelope(request)
                     self.redisMessaging.sendMessage(queue=outboundQueue, message=outboundMessage, queueExpiry=self.diameterRequestTimeout, usePrefix=True, prefixHostname=self.hostname, prefixServiceName='diameter')
-                    self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [broadcastDiameterRequest] [{requestType}] Queueing for peer type: {peerType} on {peerIp}-{peerPort}", redisClient=self.redisMessaging)
+                    self.logTool.log(service='HSS', level='debug', message=lambda: f"[diameter.py] [broadcastDiameterRequest] [{requestType}] Queueing for peer type: {peerType} on {peerIp}-{peerPort}", redisClient=self.redisMessaging)
             return connectedPeerList
         except Exception as e:
             return ''
 
+    def getQueuedInboundMessages(self) -> list:
+        """
+        Returns the enveloped messages waiting in every diameter-inbound-{n} shard, without removing them.
+        """
+        queuedMessages = []
+        for inboundShard in range(max(int(self.config.get('hss', {}).get('hss_service_processes', 1)), 1)):
+            queuedMessages += self.redisMessaging.getList(key=f"diameter-inbound-{inboundShard}", decode=False, usePrefix=True, prefixHostname=self.hostname, prefixServiceName='diameter')
+        return queuedMessages
+
     def awaitDiameterRequestAndResponse(self, requestType: str, hostname: str, timeout: float=0.12, **kwargs) -> str:
         """
         Sends a given diameter request of requestType to the provided peer hostname.
@@ -700,7 +624,7 @@ class Diameter:
         try:
             request = ''
             requestType = requestType.upper()
-            self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [awaitDiameterRequestAndResponse] [{requestType}] Generating a diameter outbound request", redisClient=self.redisMessaging)
+            self.logTool.log(service='HSS', level='debug', message=lambda: f"[diameter.py] [awaitDiameterRequestAndResponse] [{requestType}] Generating a diameter outbound request", redisClient=self.redisMessaging)
             
             for diameterApplication in self.diameterRequestList:
                 try:
@@ -708,7 +632,7 @@ class Diameter:
                 except Exception as e:
                     continue
                 connectedPeer = self.getPeerByHostname(hostname=hostname)
-                self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [awaitDiameterRequestAndResponse] [{requestType}] Sending request via connected peer {connectedPeer} from hostname {hostname}", redisClient=self.redisMessaging)
+                self.logTool.log(service='HSS', level='debug', message=lambda: f"[diameter.py] [awaitDiameterRequestAndResponse] [{requestType}] Sending request via connected peer {connectedPeer} from hostname {hostname}", redisClient=self.redisMessaging)
                 try:
                     peerIp = connectedPeer['ipAddress']
                     peerPort = connectedPeer['port']
@@ -718,57 +642,51 @@ class Diameter:
                     
                 try:
                     request = diameterApplication["requestMethod"](**kwargs)
-                    self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [awaitDiameterRequestAndResponse] [{requestType}] Successfully generated request: {request}", redisClient=self.redisMessaging)
+                    self.logTool.log(service='HSS', level='debug', message=lambda: f"[diameter.py] [awaitDiameterRequestAndResponse] [{requestType}] Successfully generated request: {request}", redisClient=self.redisMessaging)
                 except Exception as e:
                     self.logTool.log(service='HSS', level='error', message=f"[diameter.py] [awaitDiameterRequestAndResponse] [{requestType}] Error generating request: {traceback.format_exc()}", redisClient=self.redisMessaging)
                     return ''
                 responseType = diameterApplication["responseAcronym"]
                 sessionId = kwargs.get('sessionId', None)
-                self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [awaitDiameterRequestAndResponse] [{requestType}] Successfully generated request: {request}", redisClient=self.redisMessaging)
-                sendTime = time.time_ns()
+                self.logTool.log(service='HSS', level='debug', message=lambda: f"[diameter.py] [awaitDiameterRequestAndResponse] [{requestType}] Successfully generated request: {request}", redisClient=self.redisMessaging)
+                sendTime = time.time()
                 outboundQueue = f"diameter-outbound-{peerIp}-{peerPort}"
-                outboundMessage = json.dumps({"diameter-outbound": request, "inbound-received-timestamp": sendTime})
+                outboundMessage = diameterCodec.encodeEnvelope(request)
                 self.redisMessaging.sendMessage(queue=outboundQueue, message=outboundMessage, queueExpiry=self.diameterRequestTimeout, usePrefix=True, prefixHostname=self.hostname, prefixServiceName='diameter')
-                self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [awaitDiameterRequestAndResponse] [{requestType}] Queueing for host: {hostname} on {peerIp}-{peerPort}", redisClient=self.redisMessaging)
+                self.logTool.log(service='HSS', level='debug', message=lambda: f"[diameter.py] [awaitDiameterRequestAndResponse] [{requestType}] Queueing for host: {hostname} on {peerIp}-{peerPort}", redisClient=self.redisMessaging)
                 startTimer = time.time()
                 while True:
                     try:
                         if not time.time() >= startTimer + timeout:
                             if sessionId is None:
-                                queuedMessages = self.redisMessaging.getList(key=f"diameter-inbound", usePrefix=True, prefixHostname=self.hostname, prefixServiceName='diameter')
-                                self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [awaitDiameterRequestAndResponse] [{requestType}] queuedMessages(NoSessionId): {queuedMessages}", redisClient=self.redisMessaging)
+                                queuedMessages = self.getQueuedInboundMessages()
+                                self.logTool.log(service='HSS', level='debug', message=lambda: f"[diameter.py] [awaitDiameterRequestAndResponse] [{requestType}] queuedMessages(NoSessionId): {queuedMessages}", redisClient=self.redisMessaging)
                                 for queuedMessage in queuedMessages:
-                                    queuedMessage = json.loads(queuedMessage)
-                                    clientAddress = queuedMessage.get('clientAddress', None)
-                                    clientPort = queuedMessage.get('clientPort', None)
+                                    messageBinary, clientAddress, clientPort, messageReceiveTime = diameterCodec.decodeEnvelope(queuedMessage)
                                     if clientAddress != peerIp or clientPort != peerPort:
                                         continue
-                                    messageReceiveTime = queuedMessage.get('inbound-received-timestamp', None)
-                                    if float(messageReceiveTime) > sendTime:
-                                        messageHex = queuedMessage.get('diameter-inbound')
+                                    if messageReceiveTime > sendTime:
+                                        messageHex = messageBinary.hex()
                                         messageType = self.getDiameterMessageType(messageHex)
                                         if messageType['inbound'].upper() == responseType.upper():
-                                            self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [awaitDiameterRequestAndResponse] [{requestType}] Found inbound response: {messageHex}", redisClient=self.redisMessaging)
+                                            self.logTool.log(service='HSS', level='debug', message=lambda: f"[diameter.py] [awaitDiameterRequestAndResponse] [{requestType}] Found inbound response: {messageHex}", redisClient=self.redisMessaging)
                                             return messageHex
                                 time.sleep(0.02)
                             else:
-                                queuedMessages = self.redisMessaging.getList(key=f"diameter-inbound", usePrefix=True, prefixHostname=self.hostname, prefixServiceName='diameter')
-                                self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [awaitDiameterRequestAndResponse] [{requestType}] queuedMessages({sessionId}): {queuedMessages} responseType: {responseType}", redisClient=self.redisMessaging)
+                                queuedMessages = self.getQueuedInboundMessages()
+                                self.logTool.log(service='HSS', level='debug', message=lambda: f"[diameter.py] [awaitDiameterRequestAndResponse] [{requestType}] queuedMessages({sessionId}): {queuedMessages} responseType: {responseType}", redisClient=self.redisMessaging)
                                 for queuedMessage in queuedMessages:
-                                    queuedMessage = json.loads(queuedMessage)
-                                    clientAddress = queuedMessage.get('clientAddress', None)
-                                    clientPort = queuedMessage.get('clientPort', None)
+                                    messageBinary, clientAddress, clientPort, messageReceiveTime = diameterCodec.decodeEnvelope(queuedMessage)
                                     if clientAddress != peerIp or clientPort != peerPort:
                                         continue
-                                    messageReceiveTime = queuedMessage.get('inbound-received-timestamp', None)
-                                    if float(messageReceiveTime) > sendTime:
-                                        messageHex = queuedMessage.get('diameter-inbound')
-                                        messageType = self.getDiameterMessageType(messageHex)
+                                    if messageReceiveTime > sendTime:
+                                        messageHex = messageBinary.hex()
+                                        packetVars, avps = self.decode_diameter_packet(messageHex)
+                                        messageType = self.getDiameterMessageType(packetVars=packetVars)
                                         if messageType['inbound'].upper() == responseType.upper():
-                                            packetVars, avps = self.decode_diameter_packet(messageHex)
                                             messageSessionId = bytes.fromhex(self.get_avp_data(avps, 263)[0]).decode('ascii')
                                             if messageSessionId == sessionId:
-                                                self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [awaitDiameterRequestAndResponse] [{requestType}] Matched on Session Id: {sessionId}", redisClient=self.redisMessaging)
+                                                self.logTool.log(service='HSS', level='debug', message=lambda: f"[diameter.py] [awaitDiameterRequestAndResponse] [{requestType}] Matched on Session Id: {sessionId}", redisClient=self.redisMessaging)
                                                 return messageHex
                                 time.sleep(0.02)
                         else:
@@ -780,56 +698,54 @@ class Diameter:
             self.logTool.log(service='HSS', level='error', message=f"[diameter.py] [awaitDiameterRequestAndResponse] [{requestType}] Error generating diameter outbound request: {traceback.format_exc()}", redisClient=self.redisMessaging)
             return ''
 
-    def generateDiameterResponse(self, binaryData: str) -> str:
+    def generateDiameterResponse(self, binaryData: bytes=None, packetVars: dict=None, avps: list=None) -> bytes:
+            """
+            Generates the response to an inbound diameter request, as bytes.
+            If the message has already been decoded, packetVars and avps may be passed in place of binaryData.
+            """
             try:
-                packet_vars, avps = self.decode_diameter_packet(binaryData)
-                origin_host = self.get_avp_data(avps, 264)[0]
-                origin_host = binascii.unhexlify(origin_host).decode("utf-8")
+                if packetVars is None or avps is None:
+                    packetVars, avps = self.decode_diameter_packet(binaryData)
+                packet_vars = packetVars
                 response = ''
 
                 self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [generateDiameterResponse] Generating a diameter response", redisClient=self.redisMessaging)
 
                 # Drop packet if it's a response packet:
-                if packet_vars["flags_bin"][0:1] == "0":
+                if not packet_vars.isRequest:
                     self.logTool.log(service='HSS', level='debug', message="[diameter.py] [generateDiameterResponse] Got a Response, not a request - dropping it.", redisClient=self.redisMessaging)
                     self.logTool.log(service='HSS', level='debug', message=packet_vars, redisClient=self.redisMessaging)
                     return
-                
-                self.redisMessaging.sendMetric(serviceName='diameter', metricName='prom_diam_request_count_application_id',
+
+                dispatchEntry = self.getDispatchEntry(packet_vars)
+                if dispatchEntry is not None:
+                    metricLabels = dispatchEntry["metricLabels"]
+                else:
+                    metricLabels = {"diameter_application_id": packet_vars.applicationId, "diameter_cmd_code": packet_vars.commandCode}
+
+                self.metricAggregator.sendMetric(serviceName='diameter', metricName='prom_diam_request_count_application_id',
                     metricType='counter', metricAction='inc', 
-                    metricLabels={
-                        "diameter_application_id": packet_vars["ApplicationId"],
-                        "diameter_cmd_code": packet_vars["command_code"],
-                    },
+                    metricLabels=metricLabels,
                     metricValue=1.0, metricHelp='Number of Diameter Requests by Application Id',
                     metricExpiry=60,
                     usePrefix=True, 
                     prefixHostname=self.hostname, 
                     prefixServiceName='metric')
-                
-                for diameterApplication in self.diameterResponseList:
-                    try:
-                        assert(packet_vars["command_code"] == diameterApplication["commandCode"])
-                        assert(packet_vars["ApplicationId"] == diameterApplication["applicationId"])
-                        if 'flags' in diameterApplication:
-                            assert(str(packet_vars["flags"]) == str(diameterApplication["flags"]))
-                        self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [generateDiameterResponse] [{diameterApplication.get('requestAcronym', '')}] Attempting to generate response", redisClient=self.redisMessaging)
+
+                if dispatchEntry is not None:
+                    diameterApplication = dispatchEntry["application"]
+                    if 'flags' not in diameterApplication or str(packet_vars["flags"]) == str(diameterApplication["flags"]):
+                        self.logTool.log(service='HSS', level='debug', message=lambda: f"[diameter.py] [generateDiameterResponse] [{diameterApplication.get('requestAcronym', '')}] Attempting to generate response", redisClient=self.redisMessaging)
                         try:
                             response = diameterApplication["responseMethod"](packet_vars, avps)
-                            self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [generateDiameterResponse] [{diameterApplication.get('requestAcronym', '')}] Successfully generated response: {response}", redisClient=self.redisMessaging)
+                            self.logTool.log(service='HSS', level='debug', message=lambda: f"[diameter.py] [generateDiameterResponse] [{diameterApplication.get('requestAcronym', '')}] Successfully generated response: {response}", redisClient=self.redisMessaging)
                         except Exception as e:
                             self.logTool.log(service='HSS', level='error', message=f"[diameter.py] [generateDiameterResponse] [{diameterApplication.get('requestAcronym', '')}] Error generating response: {traceback.format_exc()}", redisClient=self.redisMessaging)
                             return ''
-                        break
-                    except Exception as e:
-                        continue
 
-                self.redisMessaging.sendMetric(serviceName='diameter', metricName='prom_diam_response_count_application_id_successful',
+                self.metricAggregator.sendMetric(serviceName='diameter', metricName='prom_diam_response_count_application_id_successful',
                                     metricType='counter', metricAction='inc', 
-                                    metricLabels={
-                                        "diameter_application_id": packet_vars["ApplicationId"],
-                                        "diameter_cmd_code": packet_vars["command_code"],
-                                    },
+                                    metricLabels=metricLabels,
                                     metricValue=1.0, metricHelp='Number of Successful Diameter Responses',
                                     metricExpiry=60,
                                     usePrefix=True, 
@@ -837,11 +753,11 @@ class Diameter:
                                     prefixServiceName='metric')
                 return response
             except Exception as e:
-                self.redisMessaging.sendMetric(serviceName='diameter', metricName='prom_diam_response_count_application_id_fail',
+                self.metricAggregator.sendMetric(serviceName='diameter', metricName='prom_diam_response_count_application_id_fail',
                                                 metricType='counter', metricAction='inc',
                                                 metricLabels={
-                                                    "diameter_application_id": packet_vars["ApplicationId"],
-                                                    "diameter_cmd_code": packet_vars["command_code"],
+                                                    "diameter_application_id": packet_vars.applicationId,
+                                                    "diameter_cmd_code": packet_vars.commandCode,
                                                 },
                                                 metricValue=1.0, metricHelp='Number of Failed Diameter Responses',
                                                 metricExpiry=60,
@@ -850,14 +766,14 @@ class Diameter:
                                                 prefixServiceName='metric')
                 return ''
 
-    def generateDiameterRequest(self, requestType: str, **kwargs) -> str:
+    def generateDiameterRequest(self, requestType: str, **kwargs) -> bytes:
         """
-        Returns a given diameter request of requestType in a hex string.
+        Returns a given diameter request of requestType as bytes.
         """
         try:
             request = ''
             requestType = requestType.upper()
-            self.logTool.log(service='AS', level='debug', message=f"[diameter.py] [generateDiameterRequest] [{requestType}] Generating a diameter outbound request", redisClient=self.redisMessaging)
+            self.logTool.log(service='AS', level='debug', message=lambda: f"[diameter.py] [generateDiameterRequest] [{requestType}] Generating a diameter outbound request", redisClient=self.redisMessaging)
             
             for diameterApplication in self.diameterRequestList:
                 try:
@@ -866,7 +782,7 @@ class Diameter:
                     continue
 
                 request = diameterApplication["requestMethod"](**kwargs)
-                self.logTool.log(service='AS', level='debug', message=f"[diameter.py] [generateDiameterRequest] [{requestType}] Successfully generated request: {request}", redisClient=self.redisMessaging)
+                self.logTool.log(service='AS', level='debug', message=lambda: f"[diameter.py] [generateDiameterRequest] [{requestType}] Successfully generated request: {request}", redisClient=self.redisMessaging)
                 return request
         except Exception as e:
             self.logTool.log(service='AS', level='error', message=f"[diameter.py] [generateDiameterRequest] [{requestType}] Error generating diameter outbound request: {traceback.format_exc()}", redisClient=self.redisMessaging)
@@ -941,7 +857,7 @@ class Diameter:
                             if ';' in servingPgwPeer:
                                 servingPgwPeer = servingPgwPeer.split(';')[0]
                             
-                            self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [deregisterData] Sending CCR-T with Session-ID:{pcrfSessionId} to peer: {servingPgwPeer} {apnKey}", redisClient=self.redisMessaging)
+                            self.logTool.log(service='HSS', level='debug', message=lambda: f"[diameter.py] [deregisterData] Sending CCR-T with Session-ID:{pcrfSessionId} to peer: {servingPgwPeer} {apnKey}", redisClient=self.redisMessaging)
 
                             self.sendDiameterRequest(
                             requestType='CCR',
@@ -954,7 +870,7 @@ class Diameter:
                             domain=servingPgwRealm
                             )
 
-                            self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [deregisterData] Sending RTR to peer: {servingPgwPeer} {apnKey}", redisClient=self.redisMessaging)
+                            self.logTool.log(service='HSS', level='debug', message=lambda: f"[diameter.py] [deregisterData] Sending RTR to peer: {servingPgwPeer} {apnKey}", redisClient=self.redisMessaging)
 
                             self.sendDiameterRequest(
                             requestType='RTR',
@@ -1079,12 +995,12 @@ class Diameter:
         return True
 
     def AVP_278_Origin_State_Incriment(self, avps):                                               #Capabilities Exchange Answer incriment AVP body
-        for avp_dicts in avps:
-            if avp_dicts['avp_code'] == 278:
-                origin_state_incriment_int = int(avp_dicts['misc_data'], 16)
-                origin_state_incriment_int = origin_state_incriment_int + 1
-                origin_state_incriment_hex = format(origin_state_incriment_int,"x").zfill(8)
-                return origin_state_incriment_hex
+        origin_state = avps.findFirst(278)
+        if origin_state is not None:
+            origin_state_incriment_int = int.from_bytes(origin_state.data, 'big')
+            origin_state_incriment_int = origin_state_incriment_int + 1
+            origin_state_incriment_hex = format(origin_state_incriment_int,"x").zfill(8)
+            return origin_state_incriment_hex
 
     def Match_SDP(self, regexPattern, sdpBody):
         """
@@ -1104,7 +1020,7 @@ class Diameter:
             return ''
 
     def Charging_Rule_Generator(self, ChargingRules=None, ue_ip=None, chargingRuleName=None, action="install"):
-        self.logTool.log(service='HSS', level='debug', message=f"Called Charging_Rule_Generator with action: {action}", redisClient=self.redisMessaging)
+        self.logTool.log(service='HSS', level='debug', message=lambda: f"Called Charging_Rule_Generator with action: {action}", redisClient=self.redisMessaging)
         if action not in ['install', 'remove']:
             self.logTool.log(service='HSS', level='debug', message="Invalid action supplied to Charging_Rule_Generator", redisClient=self.redisMessaging)
             return None
@@ -1130,12 +1046,12 @@ class Diameter:
             #Populate all Flow Information AVPs
             Flow_Information = ''
             for tft in ChargingRules['tft']:
-                self.logTool.log(service='HSS', level='debug', message="Adding TFT: " + str(tft), redisClient=self.redisMessaging)
+                self.logTool.log(service='HSS', level='debug', message=lambda: "Adding TFT: " + str(tft), redisClient=self.redisMessaging)
                 #If {{ UE_IP }} in TFT splice in the real UE IP Value
                 try:
                     tft['tft_string'] = tft['tft_string'].replace('{{ UE_IP }}', str(ue_ip))
                     tft['tft_string'] = tft['tft_string'].replace('{{UE_IP}}', str(ue_ip))
-                    self.logTool.log(service='HSS', level='debug', message="Spliced in UE IP into TFT: " + str(tft['tft_string']), redisClient=self.redisMessaging)
+                    self.logTool.log(service='HSS', level='debug', message=lambda: "Spliced in UE IP into TFT: " + str(tft['tft_string']), redisClient=self.redisMessaging)
                 except Exception as E:
                     self.logTool.log(service='HSS', level='error', message="Failed to splice in UE IP into flow description", redisClient=self.redisMessaging)
                 
@@ -1145,7 +1061,7 @@ class Diameter:
                 Flow_Information += self.generate_vendor_avp(1058, "80", 10415, Flow_Direction + Flow_Description)
 
             Flow_Status = self.generate_vendor_avp(511, "c0", 10415, self.int_to_hex(2, 4))
-            self.logTool.log(service='HSS', level='debug', message="Defined Flow_Status: " + str(Flow_Status), redisClient=self.redisMessaging)
+            self.logTool.log(service='HSS', level='debug', message=lambda: "Defined Flow_Status: " + str(Flow_Status), redisClient=self.redisMessaging)
 
             self.logTool.log(service='HSS', level='debug', message="Defining QoS information", redisClient=self.redisMessaging)
             #QCI 
@@ -1170,16 +1086,16 @@ class Diameter:
                 Bandwidth_info += self.generate_vendor_avp(1026, "c0", 10415, self.int_to_hex(int(ChargingRules['gbr_ul']), 4))
             if int(ChargingRules['gbr_dl']) != 0:                
                 Bandwidth_info += self.generate_vendor_avp(1025, "c0", 10415, self.int_to_hex(int(ChargingRules['gbr_dl']), 4))
-            self.logTool.log(service='HSS', level='debug', message="Defined Bandwith Info: " + str(Bandwidth_info), redisClient=self.redisMessaging)
+            self.logTool.log(service='HSS', level='debug', message=lambda: "Defined Bandwith Info: " + str(Bandwidth_info), redisClient=self.redisMessaging)
 
             #Populate QoS Information
             QoS_Information = self.generate_vendor_avp(1016, "c0", 10415, QCI + ARP + Bandwidth_info)
-            self.logTool.log(service='HSS', level='debug', message="Defined QoS_Information: " + str(QoS_Information), redisClient=self.redisMessaging)
+            self.logTool.log(service='HSS', level='debug', message=lambda: "Defined QoS_Information: " + str(QoS_Information), redisClient=self.redisMessaging)
             
             #Precedence
             self.logTool.log(service='HSS', level='debug', message="Defining Precedence information", redisClient=self.redisMessaging)
             Precedence = self.generate_vendor_avp(1010, "c0", 10415, self.int_to_hex(ChargingRules['precedence'], 4))
-            self.logTool.log(service='HSS', level='debug', message="Defined Precedence " + str(Precedence), redisClient=self.redisMessaging)
+            self.logTool.log(service='HSS', level='debug', message=lambda: "Defined Precedence " + str(Precedence), redisClient=self.redisMessaging)
 
             #Rating Group
             self.logTool.log(service='HSS', level='debug', message="Defining Rating Group information", redisClient=self.redisMessaging)
@@ -1187,7 +1103,7 @@ class Diameter:
                 RatingGroup = self.generate_avp(432, 40, format(int(ChargingRules['rating_group']),"x").zfill(8))                   #Rating-Group-ID
             else:
                 RatingGroup = ''
-            self.logTool.log(service='HSS', level='debug', message="Defined Rating Group " + str(ChargingRules['rating_group']), redisClient=self.redisMessaging)
+            self.logTool.log(service='HSS', level='debug', message=lambda: "Defined Rating Group " + str(ChargingRules['rating_group']), redisClient=self.redisMessaging)
             
 
             #Complete Charging Rule Defintion
@@ -1202,38 +1118,38 @@ class Diameter:
     def Get_IMS_Subscriber_Details_from_AVP(self, username):
         #Feed the Username AVP with Tel URI, SIP URI and either MSISDN or IMSI and this returns user data
         username = binascii.unhexlify(username).decode('utf-8')
-        self.logTool.log(service='HSS', level='debug', message="Username AVP is present, value is " + str(username), redisClient=self.redisMessaging)
+        self.logTool.log(service='HSS', level='debug', message=lambda: "Username AVP is present, value is " + str(username), redisClient=self.redisMessaging)
         username = username.split('@')[0]   #Strip Domain to get User part
         username = username[4:]             #Strip tel: or sip: prefix
         #Determine if dealing with IMSI or MSISDN
         if (len(username) == 15) or (len(username) == 16):
-            self.logTool.log(service='HSS', level='debug', message="We have an IMSI: " + str(username), redisClient=self.redisMessaging)
+            self.logTool.log(service='HSS', level='debug', message=lambda: "We have an IMSI: " + str(username), redisClient=self.redisMessaging)
             ims_subscriber_details = self.database.Get_IMS_Subscriber(imsi=username)
         else:
-            self.logTool.log(service='HSS', level='debug', message="We have an msisdn: " + str(username), redisClient=self.redisMessaging)
+            self.logTool.log(service='HSS', level='debug', message=lambda: "We have an msisdn: " + str(username), redisClient=self.redisMessaging)
             ims_subscriber_details = self.database.Get_IMS_Subscriber(msisdn=username)
-        self.logTool.log(service='HSS', level='debug', message="Got subscriber details: " + str(ims_subscriber_details), redisClient=self.redisMessaging)
+        self.logTool.log(service='HSS', level='debug', message=lambda: "Got subscriber details: " + str(ims_subscriber_details), redisClient=self.redisMessaging)
         return ims_subscriber_details
 
 
     def Generate_Prom_Stats(self):
         self.logTool.log(service='HSS', level='debug', message="Called Generate_Prom_Stats", redisClient=self.redisMessaging)
         try:
-            self.redisMessaging.sendMetric(serviceName='diameter', metricName='prom_ims_subs',
+            self.metricAggregator.sendMetric(serviceName='diameter', metricName='prom_ims_subs',
                                             metricType='gauge', metricAction='set', 
                                             metricValue=len(self.database.Get_Served_IMS_Subscribers(get_local_users_only=True)), metricHelp='Number of attached IMS Subscribers',
                                             metricExpiry=60,
                                             usePrefix=True, 
                                             prefixHostname=self.hostname, 
                                             prefixServiceName='metric')
-            self.redisMessaging.sendMetric(serviceName='diameter', metricName='prom_mme_subs',
+            self.metricAggregator.sendMetric(serviceName='diameter', metricName='prom_mme_subs',
                                             metricType='gauge', metricAction='set', 
                                             metricValue=len(self.database.Get_Served_Subscribers(get_local_users_only=True)), metricHelp='Number of attached MME Subscribers',
                                             metricExpiry=60,
                                             usePrefix=True, 
                                             prefixHostname=self.hostname, 
                                             prefixServiceName='metric')
-            self.redisMessaging.sendMetric(serviceName='diameter', metricName='prom_pcrf_subs',
+            self.metricAggregator.sendMetric(serviceName='diameter', metricName='prom_pcrf_subs',
                                             metricType='gauge', metricAction='set', 
                                             metricValue=len(self.database.Get_Served_PCRF_Subscribers(get_local_users_only=True)), metricHelp='Number of attached PCRF Subscribers',
                                             metricExpiry=60,
@@ -1252,115 +1168,62 @@ class Diameter:
 
     #Capabilities Exchange Answer
     def Answer_257(self, packet_vars, avps):
-        avp = ''                                                                                    #Initiate empty var AVP 
-        avp += self.generate_avp(268, 40, self.int_to_hex(2001, 4))                                 #Result Code (DIAMETER_SUCCESS (2001))
-        avp += self.generate_avp(264, 40, self.OriginHost)                                          #Origin Host
-        avp += self.generate_avp(296, 40, self.OriginRealm)                                         #Origin Realm
-        for avps_to_check in avps:                                                                  #Only include AVP 278 (Origin State) if inital request included it
-            if avps_to_check['avp_code'] == 278:
-                avp += self.generate_avp(278, 40, self.AVP_278_Origin_State_Incriment(avps))        #Origin State (Has to be incrimented (Handled by AVP_278_Origin_State_Incriment))
-        for host in self.config['hss']['bind_ip']:                                                  #Loop through all IPs from Config and add to response
-            avp += self.generate_avp(257, 40, self.ip_to_hex(host))                                 #Host-IP-Address (For this to work on Linux this is the IP defined in the hostsfile for localhost)
-        avp += self.generate_avp(266, 40, "00000000")                                               #Vendor-Id
-        avp += self.generate_avp(269, "00", self.ProductName)                                       #Product-Name
-
-        avp += self.generate_avp(267, 40, "000027d9")                                               #Firmware-Revision
-        avp += self.generate_avp(265, 40, format(int(10415),"x").zfill(8))                               #Supported-Vendor-ID (3GPP)
-        avp += self.generate_avp(260, 40, "000001024000000c" + format(int(16777251),"x").zfill(8) +  "0000010a4000000c000028af")      #Vendor-Specific-Application-ID (S6a)
-        avp += self.generate_avp(265, 40, format(int(10415),"x").zfill(8))                               #Supported-Vendor-ID (3GPP)        
-        avp += self.generate_avp(260, 40, "000001024000000c" + format(int(16777216),"x").zfill(8) +  "0000010a4000000c000028af")      #Vendor-Specific-Application-ID (Cx)
-        avp += self.generate_avp(265, 40, format(int(10415),"x").zfill(8))                               #Supported-Vendor-ID (3GPP)        
-        avp += self.generate_avp(260, 40, "000001024000000c" + format(int(16777252),"x").zfill(8) +  "0000010a4000000c000028af")      #Vendor-Specific-Application-ID (S13)
-        avp += self.generate_avp(265, 40, format(int(10415),"x").zfill(8))                               #Supported-Vendor-ID (3GPP)        
-        avp += self.generate_avp(260, 40, "000001024000000c" + format(int(16777291),"x").zfill(8) +  "0000010a4000000c000028af")      #Vendor-Specific-Application-ID (SLh)
-        avp += self.generate_avp(265, 40, format(int(10415),"x").zfill(8))                               #Supported-Vendor-ID (3GPP)
-        avp += self.generate_avp(260, 40, "000001024000000c" + format(int(16777217),"x").zfill(8) +  "0000010a4000000c000028af")      #Vendor-Specific-Application-ID (Sh)       
-        avp += self.generate_avp(265, 40, format(int(10415),"x").zfill(8))                               #Supported-Vendor-ID (3GPP)
-        avp += self.generate_avp(260, 40, "000001024000000c" + format(int(16777236),"x").zfill(8) +  "0000010a4000000c000028af")      #Vendor-Specific-Application-ID (Rx)
-        avp += self.generate_avp(265, 40, format(int(10415),"x").zfill(8))                               #Supported-Vendor-ID (3GPP)
-        avp += self.generate_avp(260, 40, "000001024000000c" + format(int(16777238),"x").zfill(8) +  "0000010a4000000c000028af")      #Vendor-Specific-Application-ID (Gx)
-        avp += self.generate_avp(258, 40, format(int(16777238),"x").zfill(8))                            #Auth-Application-ID - Diameter Gx
-        avp += self.generate_avp(258, 40, format(int(10),"x").zfill(8))                                  #Auth-Application-ID - Diameter CER
-        avp += self.generate_avp(265, 40, format(int(5535),"x").zfill(8))                                #Supported-Vendor-ID (3GGP v2)
-        avp += self.generate_avp(265, 40, format(int(10415),"x").zfill(8))                               #Supported-Vendor-ID (3GPP)
-        avp += self.generate_avp(265, 40, format(int(13019),"x").zfill(8))                               #Supported-Vendor-ID 13019 (ETSI)
-
-        response = self.generate_diameter_packet("01", "00", 257, 0, packet_vars['hop-by-hop-identifier'], packet_vars['end-to-end-identifier'], avp)            #Generate Diameter packet       
+        avp = diameterCodec.encodeOriginStateIncrement(avps)                                        #Only the Origin State varies, everything else is prebuilt in ceaTemplate. Only included if the initial request included it
+        response = self.renderAnswer(self.ceaTemplate, packet_vars, avp)                            #Generate Diameter packet
         self.logTool.log(service='HSS', level='debug', message="Successfully Generated CEA", redisClient=self.redisMessaging)
         return response
 
     #Device Watchdog Answer                                                 
     def Answer_280(self, packet_vars, avps): 
-        avp = ''                                                                                    #Initiate empty var AVP 
-        avp += self.generate_avp(268, 40, self.int_to_hex(2001, 4))                                           #Result Code (DIAMETER_SUCCESS (2001))
-        avp += self.generate_avp(264, 40, self.OriginHost)                                                    #Origin Host
-        avp += self.generate_avp(296, 40, self.OriginRealm)                                                   #Origin Realm
-        for avps_to_check in avps:                                                                  #Only include AVP 278 (Origin State) if inital request included it
-            if avps_to_check['avp_code'] == 278:                                
-                avp += self.generate_avp(278, 40, self.AVP_278_Origin_State_Incriment(avps))                  #Origin State (Has to be incrimented (Handled by AVP_278_Origin_State_Incriment))
-        response = self.generate_diameter_packet("01", "00", 280, 0, packet_vars['hop-by-hop-identifier'], packet_vars['end-to-end-identifier'], avp)            #Generate Diameter packet      
+        avp = diameterCodec.encodeOriginStateIncrement(avps)                                        #Only the Origin State varies, everything else is prebuilt in dwaTemplate. Only included if the initial request included it
+        response = self.renderAnswer(self.dwaTemplate, packet_vars, avp)                            #Generate Diameter packet
         self.logTool.log(service='HSS', level='debug', message="Successfully Generated DWA", redisClient=self.redisMessaging)
         return response
 
     #Disconnect Peer Answer    
     def Answer_282(self, packet_vars, avps):                                                      
-        avp = ''                                                                                    #Initiate empty var AVP 
-        avp += self.generate_avp(264, 40, self.OriginHost)                                                    #Origin Host
-        avp += self.generate_avp(296, 40, self.OriginRealm)                                                   #Origin Realm
-        avp += self.generate_avp(268, 40, "000007d1")                                                    #Result Code (DIAMETER_SUCCESS (2001))
-        response = self.generate_diameter_packet("01", "00", 282, 0, packet_vars['hop-by-hop-identifier'], packet_vars['end-to-end-identifier'], avp)            #Generate Diameter packet
+        response = self.renderAnswer(self.dpaTemplate, packet_vars)                                 #Origin Host, Origin Realm and Result Code (DIAMETER_SUCCESS (2001))
         self.logTool.log(service='HSS', level='debug', message="Successfully Generated DPA", redisClient=self.redisMessaging)
         return response
 
     #3GPP S6a/S6d Update Location Answer
     def Answer_16777251_316(self, packet_vars, avps):
-        avp = ''                                                                                    #Initiate empty var AVP
-        session_id = self.get_avp_data(avps, 263)[0]                                                     #Get Session-ID
+        avp = b''                                                                                    #Initiate empty var AVP
+        session_id = bytes.fromhex(self.get_avp_data(avps, 263)[0])                                                   #Get Session-ID
         avp += self.generate_avp(263, 40, session_id)                                                    #Session-ID AVP set
-        avp += self.generate_avp(264, 40, self.OriginHost)                                                    #Origin Host
-        avp += self.generate_avp(296, 40, self.OriginRealm)                                                   #Origin Realm
+        avp += self.originHostAvp                                                    #Origin Host
+        avp += self.originRealmAvp                                                   #Origin Realm
 
-        #AVP: Vendor-Specific-Application-Id(260) l=32 f=-M-
-        VendorSpecificApplicationId = ''
-        VendorSpecificApplicationId += self.generate_vendor_avp(266, 40, 10415, '')                     #AVP Vendor ID
-        VendorSpecificApplicationId += self.generate_avp(258, 40, format(int(16777251),"x").zfill(8))   #Auth-Application-ID Relay
-        avp += self.generate_avp(260, 40, VendorSpecificApplicationId)                                  #AVP: Auth-Application-Id(258) l=12 f=-M- val=3GPP S6a/S6d (16777251)  
-
-        #AVP: Supported-Features(628) l=36 f=V-- vnd=TGPP
-        SupportedFeatures = ''
-        SupportedFeatures += self.generate_vendor_avp(266, 40, 10415, '')                     #AVP Vendor ID
-        SupportedFeatures += self.generate_vendor_avp(629, 80, 10415, self.int_to_hex(1, 4))  #Feature-List ID
-        SupportedFeatures += self.generate_vendor_avp(630, 80, 10415, "1c000607")             #Feature-List Flags
-        avp += self.generate_vendor_avp(628, "80", 10415, SupportedFeatures)                  #Supported-Features(628) l=36 f=V-- vnd=TGPP
+        avp += self.ulaVendorSpecificApplicationIdAvp                                               #AVP: Vendor-Specific-Application-Id(260) l=32 f=-M-
+        avp += self.s6aSupportedFeaturesAvp                                                         #AVP: Supported-Features(628) l=36 f=V-- vnd=TGPP
 
         #APNs from DB
-        APN_Configuration = ''
-        imsi = self.get_avp_data(avps, 1)[0]                                                            #Get IMSI from User-Name AVP in request
-        imsi = binascii.unhexlify(imsi).decode('utf-8')                                                  #Convert IMSI
+        APN_Configuration = b''
+        imsi = self.get_avp_value(avps, 1)[0]                                                           #Get IMSI from User-Name AVP in request
         try:
             subscriber_details = self.database.Get_Subscriber(imsi=imsi)                                               #Get subscriber details
-            self.logTool.log(service='HSS', level='debug', message="Got back subscriber_details: " + str(subscriber_details), redisClient=self.redisMessaging)
+            self.logTool.log(service='HSS', level='debug', message=lambda: "Got back subscriber_details: " + str(subscriber_details), redisClient=self.redisMessaging)
 
             if subscriber_details['enabled'] == 0:
-                self.logTool.log(service='HSS', level='debug', message=f"Subscriber {imsi} is disabled", redisClient=self.redisMessaging)
+                self.logTool.log(service='HSS', level='debug', message=lambda: f"Subscriber {imsi} is disabled", redisClient=self.redisMessaging)
 
                 #Experimental Result AVP(Response Code for Failure)
-                avp_experimental_result = ''
-                avp_experimental_result += self.generate_vendor_avp(266, 40, 10415, '')                         #AVP Vendor ID
-                avp_experimental_result += self.generate_avp(298, 40, self.int_to_hex(5001, 4), avps=avps, packet_vars=packet_vars)                 #AVP Experimental-Result-Code: DIAMETER_ERROR_USER_UNKNOWN (5001)
+                avp_experimental_result = b''
+                avp_experimental_result += self.generate_vendor_avp(266, 40, 10415, b'')                         #AVP Vendor ID
+                avp_experimental_result += self.generate_avp(298, 40, diameterCodec.encodeUnsigned32(5001))                 #AVP Experimental-Result-Code: DIAMETER_ERROR_USER_UNKNOWN (5001)
                 avp += self.generate_avp(297, 40, avp_experimental_result)                                      #AVP Experimental-Result(297)
                 
-                avp += self.generate_avp(277, 40, "00000001")                                                   #Auth-Session-State
-                self.logTool.log(service='HSS', level='debug', message=f"Successfully Generated ULA for disabled Subscriber: {imsi}", redisClient=self.redisMessaging)
-                response = self.generate_diameter_packet("01", "40", 316, 16777251, packet_vars['hop-by-hop-identifier'], packet_vars['end-to-end-identifier'], avp)
+                avp += self.authSessionStateAvp                                                   #Auth-Session-State
+                self.logTool.log(service='HSS', level='debug', message=lambda: f"Successfully Generated ULA for disabled Subscriber: {imsi}", redisClient=self.redisMessaging)
+                response = self.generate_diameter_packet("01", "40", 316, 16777251, packet_vars.hopByHopId, packet_vars.endToEndId, avp)
                 return response
 
         except ValueError as e:
             self.logTool.log(service='HSS', level='debug', message="failed to get data backfrom database for imsi " + str(imsi), redisClient=self.redisMessaging)
             self.logTool.log(service='HSS', level='debug', message="Error is " + str(e), redisClient=self.redisMessaging)
             self.logTool.log(service='HSS', level='debug', message="Responding with DIAMETER_ERROR_USER_UNKNOWN", redisClient=self.redisMessaging)
-            avp += self.generate_avp(268, 40, self.int_to_hex(5030, 4))
-            response = self.generate_diameter_packet("01", "40", 316, 16777251, packet_vars['hop-by-hop-identifier'], packet_vars['end-to-end-identifier'], avp)     #Generate Diameter packet
+            avp += self.generate_avp(268, 40, diameterCodec.encodeUnsigned32(5030))
+            response = self.generate_diameter_packet("01", "40", 316, 16777251, packet_vars.hopByHopId, packet_vars.endToEndId, avp)     #Generate Diameter packet
             self.logTool.log(service='HSS', level='debug', message="Diameter user unknown - Sending ULA with DIAMETER_ERROR_USER_UNKNOWN", redisClient=self.redisMessaging)
             return response
         except Exception as ex:
@@ -1379,81 +1242,78 @@ class Diameter:
                 subscriberIsRoaming = True
             
             if subscriberIsRoaming:
-                self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [Answer_16777251_318] [ULA] Subscriber {imsi} is roaming", redisClient=self.redisMessaging)
+                self.logTool.log(service='HSS', level='debug', message=lambda: f"[diameter.py] [Answer_16777251_318] [ULA] Subscriber {imsi} is roaming", redisClient=self.redisMessaging)
                 subscriberRoamingAllowed = self.validateSubscriberRoaming(subscriber=subscriber_details, mcc=mcc, mnc=mnc)
 
             if not subscriberRoamingAllowed and subscriberIsRoaming:
-                avp = ''
-                session_id = self.get_avp_data(avps, 263)[0]                                                     #Get Session-ID
+                avp = b''
+                session_id = bytes.fromhex(self.get_avp_data(avps, 263)[0])                                                   #Get Session-ID
                 avp += self.generate_avp(263, 40, session_id)                                                    #Session-ID AVP set
-                avp += self.generate_avp(264, 40, self.OriginHost)                                                    #Origin Host
-                avp += self.generate_avp(296, 40, self.OriginRealm)                                                   #Origin Realm
+                avp += self.originHostAvp                                                    #Origin Host
+                avp += self.originRealmAvp                                                   #Origin Realm
 
                 #Experimental Result AVP(Parent AVP for Roaming Failure)
-                avp_experimental_result = ''
-                avp_experimental_result += self.generate_vendor_avp(266, 40, 10415, '')                         #AVP Vendor ID
-                avp_experimental_result += self.generate_avp(298, 40, self.int_to_hex(5004, 4))                 #AVP Experimental-Result-Code: DIAMETER_ERROR_ROAMING_NOT_ALLOWED (5004)
+                avp_experimental_result = b''
+                avp_experimental_result += self.generate_vendor_avp(266, 40, 10415, b'')                         #AVP Vendor ID
+                avp_experimental_result += self.generate_avp(298, 40, diameterCodec.encodeUnsigned32(5004))                 #AVP Experimental-Result-Code: DIAMETER_ERROR_ROAMING_NOT_ALLOWED (5004)
                 avp += self.generate_avp(297, 40, avp_experimental_result)                                      #AVP Experimental-Result(297)
                 
-                avp += self.generate_avp(277, 40, "00000001")                                                    #Auth-Session-State
-                avp += self.generate_avp(260, 40, "000001024000000c" + format(int(16777251),"x").zfill(8) +  "0000010a4000000c000028af")      #Vendor-Specific-Application-ID (S6a)
-                response = self.generate_diameter_packet("01", "40", 318, 16777251, packet_vars['hop-by-hop-identifier'], packet_vars['end-to-end-identifier'], avp)     #Generate Diameter packet
+                avp += self.authSessionStateAvp                                                    #Auth-Session-State
+                avp += self.vendorSpecificApplicationIdAvps[16777251]      #Vendor-Specific-Application-ID (S6a)
+                response = self.generate_diameter_packet("01", "40", 318, 16777251, packet_vars.hopByHopId, packet_vars.endToEndId, avp)     #Generate Diameter packet
                 return response
             
-            self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [Answer_16777251_318] [AIA] Subscriber {imsi} passed roaming validation for {decodedPlmn}", redisClient=self.redisMessaging)
+            self.logTool.log(service='HSS', level='debug', message=lambda: f"[diameter.py] [Answer_16777251_318] [AIA] Subscriber {imsi} passed roaming validation for {decodedPlmn}", redisClient=self.redisMessaging)
             
         except Exception as e:
             self.logTool.log(service='HSS', level='error', message=f"[diameter.py] [Answer_16777251_318] [AIA] Error when validating subscriber roaming: {traceback.format_exc()}", redisClient=self.redisMessaging)
 
         #Store MME Location into Database
-        OriginHost = self.get_avp_data(avps, 264)[0]                          #Get OriginHost from AVP
-        OriginHost = binascii.unhexlify(OriginHost).decode('utf-8')      #Format it
-        OriginRealm = self.get_avp_data(avps, 296)[0]                          #Get OriginRealm from AVP
-        OriginRealm = binascii.unhexlify(OriginRealm).decode('utf-8')      #Format it
-        self.logTool.log(service='HSS', level='debug', message="Subscriber is served by MME " + str(OriginHost) + " at realm " + str(OriginRealm), redisClient=self.redisMessaging)
+        OriginHost = self.get_avp_value(avps, 264)[0]                          #Get OriginHost from AVP
+        OriginRealm = self.get_avp_value(avps, 296)[0]                          #Get OriginRealm from AVP
+        self.logTool.log(service='HSS', level='debug', message=lambda: "Subscriber is served by MME " + str(OriginHost) + " at realm " + str(OriginRealm), redisClient=self.redisMessaging)
 
         #Find Remote Peer we need to address CLRs through
         try:        #Check if we have a record-route set as that's where we'll need to send the response
-            remote_peer = self.get_avp_data(avps, 282)[-1]                          #Get first record-route header
-            remote_peer = binascii.unhexlify(remote_peer).decode('utf-8')           #Format it
+            remote_peer = self.get_avp_value(avps, 282)[-1]                          #Get first record-route header
         except:     #If we don't have a record-route set, we'll send the response to the OriginHost
             remote_peer = OriginHost
         remote_peer = remote_peer + ";" + str(self.config['hss']['OriginHost'])
-        self.logTool.log(service='HSS', level='debug', message="[diameter.py] [Answer_16777251_316] [ULA] Remote Peer is " + str(remote_peer), redisClient=self.redisMessaging)
+        self.logTool.log(service='HSS', level='debug', message=lambda: "[diameter.py] [Answer_16777251_316] [ULA] Remote Peer is " + str(remote_peer), redisClient=self.redisMessaging)
 
         self.database.Update_Serving_MME(imsi=imsi, serving_mme=OriginHost, serving_mme_peer=remote_peer, serving_mme_realm=OriginRealm)
 
         #Boilerplate AVPs
-        avp += self.generate_avp(268, 40, self.int_to_hex(2001, 4))                                      #Result Code (DIAMETER_SUCCESS (2001))
-        avp += self.generate_avp(277, 40, "00000001")                                                    #Auth-Session-State    
-        avp += self.generate_vendor_avp(1406, "c0", 10415, "00000001")                                   #ULA Flags
+        avp += self.resultCodeSuccessAvp                                      #Result Code (DIAMETER_SUCCESS (2001))
+        avp += self.authSessionStateAvp                                       #Auth-Session-State    
+        avp += self.generate_vendor_avp(1406, "c0", 10415, diameterCodec.encodeUnsigned32(1))                                   #ULA Flags
 
         #Subscription Data: 
-        subscription_data = ''
-        subscription_data += self.generate_vendor_avp(1426, "c0", 10415, "00000000")                     #Access Restriction Data
-        subscription_data += self.generate_vendor_avp(1424, "c0", 10415, "00000000")                     #Subscriber-Status (SERVICE_GRANTED)
-        subscription_data += self.generate_vendor_avp(1417, "c0", 10415, self.int_to_hex(int(subscriber_details['nam']), 4))                     #Network-Access-Mode (PACKET_AND_CIRCUIT)
+        subscription_data = b''
+        subscription_data += self.generate_vendor_avp(1426, "c0", 10415, diameterCodec.encodeUnsigned32(0))                     #Access Restriction Data
+        subscription_data += self.generate_vendor_avp(1424, "c0", 10415, diameterCodec.encodeUnsigned32(0))                     #Subscriber-Status (SERVICE_GRANTED)
+        subscription_data += self.generate_vendor_avp(1417, "c0", 10415, diameterCodec.encodeUnsigned32(int(subscriber_details['nam'])))                     #Network-Access-Mode (PACKET_AND_CIRCUIT)
 
         #AMBR is a sub-AVP of Subscription Data
-        AMBR = ''                                                                                   #Initiate empty var AVP for AMBR
+        AMBR = b''                                                                                   #Initiate empty var AVP for AMBR
         ue_ambr_ul = int(subscriber_details['ue_ambr_ul'])
         ue_ambr_dl = int(subscriber_details['ue_ambr_dl'])
-        AMBR += self.generate_vendor_avp(516, "c0", 10415, self.int_to_hex(ue_ambr_ul, 4))                    #Max-Requested-Bandwidth-UL
-        AMBR += self.generate_vendor_avp(515, "c0", 10415, self.int_to_hex(ue_ambr_dl, 4))                    #Max-Requested-Bandwidth-DL
+        AMBR += self.generate_vendor_avp(516, "c0", 10415, diameterCodec.encodeUnsigned32(ue_ambr_ul))                    #Max-Requested-Bandwidth-UL
+        AMBR += self.generate_vendor_avp(515, "c0", 10415, diameterCodec.encodeUnsigned32(ue_ambr_dl))                    #Max-Requested-Bandwidth-DL
         subscription_data += self.generate_vendor_avp(1435, "c0", 10415, AMBR)                           #Add AMBR AVP in two sub-AVPs
 
 
-        subscription_data += self.generate_vendor_avp(1619, "80", 10415, self.int_to_hex(int(subscriber_details['subscribed_rau_tau_timer']), 4))                                   #Subscribed-Periodic-RAU-TAU-Timer (value 720)
+        subscription_data += self.generate_vendor_avp(1619, "80", 10415, diameterCodec.encodeUnsigned32(int(subscriber_details['subscribed_rau_tau_timer'])))                                   #Subscribed-Periodic-RAU-TAU-Timer (value 720)
 
 
         #APN Configuration Profile is a sub AVP of Subscription Data
-        APN_Configuration_Profile = ''
-        APN_Configuration_Profile += self.generate_vendor_avp(1423, "c0", 10415, self.int_to_hex(1, 4))     #Context Identifier for default APN (First APN is default in our case)
-        APN_Configuration_Profile += self.generate_vendor_avp(1428, "c0", 10415, self.int_to_hex(0, 4))     #All-APN-Configurations-Included-Indicator
+        APN_Configuration_Profile = b''
+        APN_Configuration_Profile += self.generate_vendor_avp(1423, "c0", 10415, diameterCodec.encodeUnsigned32(1))     #Context Identifier for default APN (First APN is default in our case)
+        APN_Configuration_Profile += self.generate_vendor_avp(1428, "c0", 10415, diameterCodec.encodeUnsigned32(0))     #All-APN-Configurations-Included-Indicator
 
         #Split the APN list into a list
         apn_list = subscriber_details['apn_list'].split(',')
-        self.logTool.log(service='HSS', level='debug', message="Current APN List: " + str(apn_list), redisClient=self.redisMessaging)
+        self.logTool.log(service='HSS', level='debug', message=lambda: "Current APN List: " + str(apn_list), redisClient=self.redisMessaging)
         #Remove the default APN from the list
         try:
             apn_list.remove(str(subscriber_details['default_apn']))
@@ -1463,23 +1323,23 @@ class Diameter:
         #Add default APN in first position
         apn_list.insert(0, str(subscriber_details['default_apn']))
 
-        self.logTool.log(service='HSS', level='debug', message="APN list: " + str(apn_list), redisClient=self.redisMessaging)
+        self.logTool.log(service='HSS', level='debug', message=lambda: "APN list: " + str(apn_list), redisClient=self.redisMessaging)
         APN_context_identifer_count = 1
         for apn_id in apn_list:
             #Per APN Setup
-            self.logTool.log(service='HSS', level='debug', message="Processing APN ID " + str(apn_id), redisClient=self.redisMessaging)
+            self.logTool.log(service='HSS', level='debug', message=lambda: "Processing APN ID " + str(apn_id), redisClient=self.redisMessaging)
             try:
                 apn_data = self.database.Get_APN(apn_id)
             except:
                 self.logTool.log(service='HSS', level='error', message="Failed to get APN " + str(apn_id), redisClient=self.redisMessaging)
                 continue
-            APN_Service_Selection = self.generate_avp(493, "40",  self.string_to_hex(str(apn_data['apn'])))
+            APN_Service_Selection = self.generate_avp(493, "40",  str(apn_data['apn']).encode('utf-8'))
 
             self.logTool.log(service='HSS', level='debug', message="Setting APN Configuration Profile", redisClient=self.redisMessaging)
             #Sub AVPs of APN Configuration Profile
-            APN_context_identifer = self.generate_vendor_avp(1423, "c0", 10415, self.int_to_hex(APN_context_identifer_count, 4))
-            APN_PDN_type = self.generate_vendor_avp(1456, "c0", 10415, self.int_to_hex(int(apn_data['ip_version']), 4))
-            NIDD_Parameters = ''
+            APN_context_identifer = self.generate_vendor_avp(1423, "c0", 10415, diameterCodec.encodeUnsigned32(APN_context_identifer_count))
+            APN_PDN_type = self.generate_vendor_avp(1456, "c0", 10415, diameterCodec.encodeUnsigned32(int(apn_data['ip_version'])))
+            NIDD_Parameters = b''
             
             try:
                 nbIotEnabled = apn_data.get('nbiot', False)
@@ -1487,11 +1347,11 @@ class Diameter:
                 if nbIotEnabled and int(apn_data['ip_version']) == 4:
     
                     #Add Non-IP-PDN-Type-Indicator
-                    NIDD_Parameters = NIDD_Parameters + self.generate_vendor_avp(1681, "c0", 10415, self.int_to_hex(1), 4)
+                    NIDD_Parameters = NIDD_Parameters + self.generate_vendor_avp(1681, "c0", 10415, diameterCodec.encodeUnsigned32(1))
     
                     #Add SCEF ID
                     try:
-                        NIDD_Parameters = NIDD_Parameters + self.generate_vendor_avp(3125, "c0", 10415, self.string_to_hex(str(apn_data['nidd_scef_id'])))
+                        NIDD_Parameters = NIDD_Parameters + self.generate_vendor_avp(3125, "c0", 10415, str(apn_data['nidd_scef_id']).encode('utf-8'))
                     except: 
                         pass
     
@@ -1499,85 +1359,85 @@ class Diameter:
                     try:
                         #Check SCEF Realm is not empty
                         if apn_data['nidd_scef_realm'] != '':
-                            NIDD_Parameters = NIDD_Parameters + self.generate_vendor_avp(1684, "c0", 10415, self.string_to_hex(str(apn_data['nidd_scef_realm'])))
+                            NIDD_Parameters = NIDD_Parameters + self.generate_vendor_avp(1684, "c0", 10415, str(apn_data['nidd_scef_realm']).encode('utf-8'))
                     except:
                         pass
     
                     #Add Reliable Data Indicator
                     try:
-                        NIDD_Parameters = NIDD_Parameters + self.generate_vendor_avp(1697, "c0", 10415, self.int_to_hex(int(apn_data['nidd_rds']), 4))
+                        NIDD_Parameters = NIDD_Parameters + self.generate_vendor_avp(1697, "c0", 10415, diameterCodec.encodeUnsigned32(int(apn_data['nidd_rds'])))
                     except:
                         pass
     
                     #Add Preferred Data Mode
                     try:
-                        NIDD_Parameters = NIDD_Parameters + self.generate_vendor_avp(1686, "c0", 10415, self.int_to_hex(int(apn_data['nidd_preferred_data_mode']), 4))
+                        NIDD_Parameters = NIDD_Parameters + self.generate_vendor_avp(1686, "c0", 10415, diameterCodec.encodeUnsigned32(int(apn_data['nidd_preferred_data_mode'])))
                     except:
                         pass
     
                     #Add Non-IP-Data-Delivery-Mechanism
                     try:
-                        NIDD_Parameters = NIDD_Parameters + self.generate_vendor_avp(1682, "c0", 10415, self.int_to_hex(int(apn_data['nidd_mechanism']), 4))
+                        NIDD_Parameters = NIDD_Parameters + self.generate_vendor_avp(1682, "c0", 10415, diameterCodec.encodeUnsigned32(int(apn_data['nidd_mechanism'])))
                     except:
                         pass
     
                 else:
-                    NIDD_Parameters = ''
+                    NIDD_Parameters = b''
                     
             except Exception as e:
                 self.logTool.log(service='HSS', level='error', message=f"Error preparing NIDD parameters: {traceback.format_exc()}", redisClient=self.redisMessaging)
 
             self.logTool.log(service='HSS', level='debug', message="Setting APN AMBR", redisClient=self.redisMessaging)
             #AMBR
-            AMBR = ''                                                                                   #Initiate empty var AVP for AMBR
+            AMBR = b''                                                                                   #Initiate empty var AVP for AMBR
             apn_ambr_ul = int(apn_data['apn_ambr_ul'])
             apn_ambr_dl = int(apn_data['apn_ambr_dl'])
-            AMBR += self.generate_vendor_avp(516, "c0", 10415, self.int_to_hex(apn_ambr_ul, 4))                    #Max-Requested-Bandwidth-UL
-            AMBR += self.generate_vendor_avp(515, "c0", 10415, self.int_to_hex(apn_ambr_dl, 4))                    #Max-Requested-Bandwidth-DL
+            AMBR += self.generate_vendor_avp(516, "c0", 10415, diameterCodec.encodeUnsigned32(apn_ambr_ul))                    #Max-Requested-Bandwidth-UL
+            AMBR += self.generate_vendor_avp(515, "c0", 10415, diameterCodec.encodeUnsigned32(apn_ambr_dl))                    #Max-Requested-Bandwidth-DL
             APN_AMBR = self.generate_vendor_avp(1435, "c0", 10415, AMBR)
 
             self.logTool.log(service='HSS', level='debug', message="Setting APN Allocation-Retention-Priority", redisClient=self.redisMessaging)
             #AVP: Allocation-Retention-Priority(1034) l=60 f=V-- vnd=TGPP
-            AVP_Priority_Level = self.generate_vendor_avp(1046, "80", 10415, self.int_to_hex(int(apn_data['arp_priority']), 4))
-            AVP_Preemption_Capability = self.generate_vendor_avp(1047, "80", 10415, self.int_to_hex(int(not apn_data['arp_preemption_capability']), 4))
-            AVP_Preemption_Vulnerability = self.generate_vendor_avp(1048, "c0", 10415, self.int_to_hex(int(not apn_data['arp_preemption_vulnerability']), 4))
+            AVP_Priority_Level = self.generate_vendor_avp(1046, "80", 10415, diameterCodec.encodeUnsigned32(int(apn_data['arp_priority'])))
+            AVP_Preemption_Capability = self.generate_vendor_avp(1047, "80", 10415, diameterCodec.encodeUnsigned32(int(not apn_data['arp_preemption_capability'])))
+            AVP_Preemption_Vulnerability = self.generate_vendor_avp(1048, "c0", 10415, diameterCodec.encodeUnsigned32(int(not apn_data['arp_preemption_vulnerability'])))
             AVP_ARP = self.generate_vendor_avp(1034, "80", 10415, AVP_Priority_Level + AVP_Preemption_Capability + AVP_Preemption_Vulnerability)
-            AVP_QoS = self.generate_vendor_avp(1028, "c0", 10415, self.int_to_hex(int(apn_data['qci']), 4))
+            AVP_QoS = self.generate_vendor_avp(1028, "c0", 10415, diameterCodec.encodeUnsigned32(int(apn_data['qci'])))
             APN_EPS_Subscribed_QoS_Profile = self.generate_vendor_avp(1431, "c0", 10415, AVP_QoS + AVP_ARP)
 
             #Try static IP allocation
             try:
                 subscriber_routing_dict = self.database.Get_SUBSCRIBER_ROUTING(subscriber_id=subscriber_details['subscriber_id'], apn_id=apn_id)                                               #Get subscriber details
-                self.logTool.log(service='HSS', level='debug', message="Got static UE IP " + str(subscriber_routing_dict), redisClient=self.redisMessaging)
-                self.logTool.log(service='HSS', level='debug', message="Found static IP for UE " + str(subscriber_routing_dict['ip_address']), redisClient=self.redisMessaging)
-                Served_Party_Address = self.generate_vendor_avp(848, "c0", 10415, self.ip_to_hex(subscriber_routing_dict['ip_address']))
+                self.logTool.log(service='HSS', level='debug', message=lambda: "Got static UE IP " + str(subscriber_routing_dict), redisClient=self.redisMessaging)
+                self.logTool.log(service='HSS', level='debug', message=lambda: "Found static IP for UE " + str(subscriber_routing_dict['ip_address']), redisClient=self.redisMessaging)
+                Served_Party_Address = self.generate_vendor_avp(848, "c0", 10415, diameterCodec.encodeAddress(subscriber_routing_dict['ip_address']))
             except Exception as E:
                 self.logTool.log(service='HSS', level='debug', message="No static UE IP found: " + str(E), redisClient=self.redisMessaging)
-                Served_Party_Address = ""
+                Served_Party_Address = b''
 
 
             #if 'PDN_GW_Allocation_Type' in apn_profile:
             #     self.logTool.log(service='HSS', level='info', message="PDN_GW_Allocation_Type present, value " + str(apn_profile['PDN_GW_Allocation_Type']), redisClient=self.redisMessaging)
-            #     PDN_GW_Allocation_Type = self.generate_vendor_avp(1438, 'c0', 10415, self.int_to_hex(int(apn_profile['PDN_GW_Allocation_Type']), 4))
+            #     PDN_GW_Allocation_Type = self.generate_vendor_avp(1438, 'c0', 10415, diameterCodec.encodeUnsigned32(int(apn_profile['PDN_GW_Allocation_Type'])))
             #     self.logTool.log(service='HSS', level='info', message="PDN_GW_Allocation_Type value is " + str(PDN_GW_Allocation_Type), redisClient=self.redisMessaging)
             # else:
             #     PDN_GW_Allocation_Type = ''
             # if 'VPLMN_Dynamic_Address_Allowed' in apn_profile:
             #     self.logTool.log(service='HSS', level='info', message="VPLMN_Dynamic_Address_Allowed present, value " + str(apn_profile['VPLMN_Dynamic_Address_Allowed']), redisClient=self.redisMessaging)
-            #     VPLMN_Dynamic_Address_Allowed = self.generate_vendor_avp(1432, 'c0', 10415, self.int_to_hex(int(apn_profile['VPLMN_Dynamic_Address_Allowed']), 4))
+            #     VPLMN_Dynamic_Address_Allowed = self.generate_vendor_avp(1432, 'c0', 10415, diameterCodec.encodeUnsigned32(int(apn_profile['VPLMN_Dynamic_Address_Allowed'])))
             #     self.logTool.log(service='HSS', level='info', message="VPLMN_Dynamic_Address_Allowed value is " + str(VPLMN_Dynamic_Address_Allowed), redisClient=self.redisMessaging)
             # else:
             #     VPLMN_Dynamic_Address_Allowed = ''            
-            PDN_GW_Allocation_Type = ''
-            VPLMN_Dynamic_Address_Allowed = ''
+            PDN_GW_Allocation_Type = b''
+            VPLMN_Dynamic_Address_Allowed = b''
 
             #If static SMF / PGW-C defined
             if apn_data['pgw_address'] is not None:
-                self.logTool.log(service='HSS', level='debug', message="MIP6-Agent-Info present (Static SMF/PGW-C), value " + str(apn_data['pgw_address']), redisClient=self.redisMessaging)
-                MIP_Home_Agent_Address = self.generate_avp(334, '40', self.ip_to_hex(apn_data['pgw_address']))
+                self.logTool.log(service='HSS', level='debug', message=lambda: "MIP6-Agent-Info present (Static SMF/PGW-C), value " + str(apn_data['pgw_address']), redisClient=self.redisMessaging)
+                MIP_Home_Agent_Address = self.generate_avp(334, '40', diameterCodec.encodeAddress(apn_data['pgw_address']))
                 MIP6_Agent_Info = self.generate_avp(486, '40', MIP_Home_Agent_Address)
             else:
-                MIP6_Agent_Info = ''
+                MIP6_Agent_Info = b''
 
             APN_Configuration_AVPS = APN_context_identifer + APN_PDN_type + APN_AMBR + APN_Service_Selection \
                 + APN_EPS_Subscribed_QoS_Profile + Served_Party_Address + MIP6_Agent_Info + PDN_GW_Allocation_Type + VPLMN_Dynamic_Address_Allowed + NIDD_Parameters
@@ -1586,59 +1446,58 @@ class Diameter:
             
             #Incriment Context Identifier Count to keep track of how many APN Profiles returned
             APN_context_identifer_count = APN_context_identifer_count + 1  
-            self.logTool.log(service='HSS', level='debug', message="Completed processing APN ID " + str(apn_id), redisClient=self.redisMessaging)
+            self.logTool.log(service='HSS', level='debug', message=lambda: "Completed processing APN ID " + str(apn_id), redisClient=self.redisMessaging)
         
         subscription_data += self.generate_vendor_avp(1429, "c0", 10415, APN_Configuration_Profile + APN_Configuration)
 
         try:
-            self.logTool.log(service='HSS', level='debug', message="MSISDN is " + str(subscriber_details['msisdn']) + " - adding in ULA", redisClient=self.redisMessaging)
-            msisdn_avp = self.generate_vendor_avp(701, 'c0', 10415, self.TBCD_encode(str(subscriber_details['msisdn'])))                     #MSISDN
+            self.logTool.log(service='HSS', level='debug', message=lambda: "MSISDN is " + str(subscriber_details['msisdn']) + " - adding in ULA", redisClient=self.redisMessaging)
+            msisdn_avp = self.generate_vendor_avp(701, 'c0', 10415, bytes.fromhex(self.TBCD_encode(str(subscriber_details['msisdn']))))                     #MSISDN
             self.logTool.log(service='HSS', level='debug', message=msisdn_avp, redisClient=self.redisMessaging)
             subscription_data += msisdn_avp
         except Exception as E:
             self.logTool.log(service='HSS', level='error', message="Failed to populate MSISDN in ULA due to error " + str(E), redisClient=self.redisMessaging)
 
         if 'RAT_freq_priorityID' in subscriber_details:
-            self.logTool.log(service='HSS', level='debug', message="RAT_freq_priorityID is " + str(subscriber_details['RAT_freq_priorityID']) + " - Adding in ULA", redisClient=self.redisMessaging)
-            rat_freq_priorityID = self.generate_vendor_avp(1440, "C0", 10415, self.int_to_hex(int(subscriber_details['RAT_freq_priorityID']), 4))                              #RAT-Frequency-Selection-Priority ID
-            self.logTool.log(service='HSS', level='debug', message="Adding rat_freq_priorityID: " + str(rat_freq_priorityID), redisClient=self.redisMessaging)
+            self.logTool.log(service='HSS', level='debug', message=lambda: "RAT_freq_priorityID is " + str(subscriber_details['RAT_freq_priorityID']) + " - Adding in ULA", redisClient=self.redisMessaging)
+            rat_freq_priorityID = self.generate_vendor_avp(1440, "C0", 10415, diameterCodec.encodeUnsigned32(int(subscriber_details['RAT_freq_priorityID'])))                              #RAT-Frequency-Selection-Priority ID
+            self.logTool.log(service='HSS', level='debug', message=lambda: "Adding rat_freq_priorityID: " + str(rat_freq_priorityID), redisClient=self.redisMessaging)
             subscription_data += rat_freq_priorityID
 
         if 'charging_characteristics' in subscriber_details:
-            self.logTool.log(service='HSS', level='debug', message="3gpp-charging-characteristics " + str(subscriber_details['charging_characteristics']) + " - Adding in ULA", redisClient=self.redisMessaging)
-            _3gpp_charging_characteristics = self.generate_vendor_avp(13, "80", 10415, str(subscriber_details['charging_characteristics']))
+            self.logTool.log(service='HSS', level='debug', message=lambda: "3gpp-charging-characteristics " + str(subscriber_details['charging_characteristics']) + " - Adding in ULA", redisClient=self.redisMessaging)
+            _3gpp_charging_characteristics = self.generate_vendor_avp(13, "80", 10415, bytes.fromhex(str(subscriber_details['charging_characteristics'])))
             subscription_data += _3gpp_charging_characteristics
-            self.logTool.log(service='HSS', level='debug', message="Adding _3gpp_charging_characteristics: " + str(_3gpp_charging_characteristics), redisClient=self.redisMessaging)
+            self.logTool.log(service='HSS', level='debug', message=lambda: "Adding _3gpp_charging_characteristics: " + str(_3gpp_charging_characteristics), redisClient=self.redisMessaging)
 
         #ToDo - Fix this  
         # if 'APN_OI_replacement' in subscriber_details:
         #     self.logTool.log(service='HSS', level='debug', message="APN_OI_replacement " + str(subscriber_details['APN_OI_replacement']) + " - Adding in ULA", redisClient=self.redisMessaging)
-        #     subscription_data += self.generate_vendor_avp(1427, "C0", 10415, self.string_to_hex(str(subscriber_details['APN_OI_replacement'])))
+        #     subscription_data += self.generate_vendor_avp(1427, "C0", 10415, str(subscriber_details['APN_OI_replacement']).encode('utf-8'))
 
         avp += self.generate_vendor_avp(1400, "c0", 10415, subscription_data)                            #Subscription-Data
 
-        response = self.generate_diameter_packet("01", "40", 316, 16777251, packet_vars['hop-by-hop-identifier'], packet_vars['end-to-end-identifier'], avp)     #Generate Diameter packet
+        response = self.generate_diameter_packet("01", "40", 316, 16777251, packet_vars.hopByHopId, packet_vars.endToEndId, avp)     #Generate Diameter packet
 
         self.logTool.log(service='HSS', level='debug', message="Successfully Generated ULA", redisClient=self.redisMessaging)
         return response
 
     #3GPP S6a/S6d Authentication Information Answer
     def Answer_16777251_318(self, packet_vars, avps):
-        self.logTool.log(service='HSS', level='debug', message=f"AIA AVPS: {avps}", redisClient=self.redisMessaging)
-        imsi = self.get_avp_data(avps, 1)[0]                                                             #Get IMSI from User-Name AVP in request
-        imsi = binascii.unhexlify(imsi).decode('utf-8')                                                  #Convert IMSI
+        self.logTool.log(service='HSS', level='debug', message=lambda: f"AIA AVPS: {avps}", redisClient=self.redisMessaging)
+        imsi = self.get_avp_value(avps, 1)[0]                                                            #Get IMSI from User-Name AVP in request
         plmn = self.get_avp_data(avps, 1407)[0]                                                          #Get PLMN from User-Name AVP in request
 
         try:
             subscriber_details = self.database.Get_Subscriber(imsi=imsi)                                               #Get subscriber details
             if subscriber_details['enabled'] == 0:
-                self.logTool.log(service='HSS', level='debug', message=f"Subscriber {imsi} is disabled", redisClient=self.redisMessaging)
-                avp = ''
-                session_id = self.get_avp_data(avps, 263)[0]                                                     #Get Session-ID
+                self.logTool.log(service='HSS', level='debug', message=lambda: f"Subscriber {imsi} is disabled", redisClient=self.redisMessaging)
+                avp = b''
+                session_id = bytes.fromhex(self.get_avp_data(avps, 263)[0])                                                   #Get Session-ID
                 avp += self.generate_avp(263, 40, session_id)                                                    #Session-ID AVP set
-                avp += self.generate_avp(264, 40, self.OriginHost)                                                    #Origin Host
-                avp += self.generate_avp(296, 40, self.OriginRealm)                                                   #Origin Realm
-                self.redisMessaging.sendMetric(serviceName='diameter', metricName='prom_diam_auth_event_count',
+                avp += self.originHostAvp                                                    #Origin Host
+                avp += self.originRealmAvp                                                   #Origin Realm
+                self.metricAggregator.sendMetric(serviceName='diameter', metricName='prom_diam_auth_event_count',
                                 metricType='counter', metricAction='inc', 
                                 metricValue=1.0, 
                                 metricLabels={
@@ -1653,21 +1512,21 @@ class Diameter:
                                 prefixServiceName='metric')
 
                 #Experimental Result AVP(Response Code for Failure)
-                avp_experimental_result = ''
-                avp_experimental_result += self.generate_vendor_avp(266, 40, 10415, '')                         #AVP Vendor ID
-                avp_experimental_result += self.generate_avp(298, 40, self.int_to_hex(5001, 4))                 #AVP Experimental-Result-Code: DIAMETER_ERROR_USER_UNKNOWN (5001)
+                avp_experimental_result = b''
+                avp_experimental_result += self.generate_vendor_avp(266, 40, 10415, b'')                         #AVP Vendor ID
+                avp_experimental_result += self.generate_avp(298, 40, diameterCodec.encodeUnsigned32(5001))                 #AVP Experimental-Result-Code: DIAMETER_ERROR_USER_UNKNOWN (5001)
                 avp += self.generate_avp(297, 40, avp_experimental_result)                                      #AVP Experimental-Result(297)
                 
-                avp += self.generate_avp(277, 40, "00000001")                                                    #Auth-Session-State
-                avp += self.generate_avp(260, 40, "000001024000000c" + format(int(16777251),"x").zfill(8) +  "0000010a4000000c000028af")      #Vendor-Specific-Application-ID (S6a)
-                response = self.generate_diameter_packet("01", "40", 318, 16777251, packet_vars['hop-by-hop-identifier'], packet_vars['end-to-end-identifier'], avp)     #Generate Diameter packet
-                self.logTool.log(service='HSS', level='debug', message=f"Successfully Generated AIA for disabled Subscriber: {imsi}", redisClient=self.redisMessaging)
-                self.logTool.log(service='HSS', level='debug', message=f"{response}", redisClient=self.redisMessaging)
+                avp += self.authSessionStateAvp                                                    #Auth-Session-State
+                avp += self.vendorSpecificApplicationIdAvps[16777251]      #Vendor-Specific-Application-ID (S6a)
+                response = self.generate_diameter_packet("01", "40", 318, 16777251, packet_vars.hopByHopId, packet_vars.endToEndId, avp)     #Generate Diameter packet
+                self.logTool.log(service='HSS', level='debug', message=lambda: f"Successfully Generated AIA for disabled Subscriber: {imsi}", redisClient=self.redisMessaging)
+                self.logTool.log(service='HSS', level='debug', message=lambda: f"{response}", redisClient=self.redisMessaging)
                 return response
         except ValueError as e:
             self.logTool.log(service='HSS', level='debug', message="Error getting subscriber details for IMSI " + str(imsi), redisClient=self.redisMessaging)
             self.logTool.log(service='HSS', level='debug', message=e, redisClient=self.redisMessaging)
-            self.redisMessaging.sendMetric(serviceName='diameter', metricName='prom_diam_auth_event_count',
+            self.metricAggregator.sendMetric(serviceName='diameter', metricName='prom_diam_auth_event_count',
                                             metricType='counter', metricAction='inc', 
                                             metricValue=1.0, 
                                             metricLabels={
@@ -1682,21 +1541,21 @@ class Diameter:
                                             prefixServiceName='metric')
             #Handle if the subscriber is not present in HSS return "DIAMETER_ERROR_USER_UNKNOWN"
             self.logTool.log(service='HSS', level='debug', message="Subscriber " + str(imsi) + " is unknown in database", redisClient=self.redisMessaging)
-            avp = ''
-            session_id = self.get_avp_data(avps, 263)[0]                                                     #Get Session-ID
+            avp = b''
+            session_id = bytes.fromhex(self.get_avp_data(avps, 263)[0])                                                   #Get Session-ID
             avp += self.generate_avp(263, 40, session_id)                                                    #Session-ID AVP set
-            avp += self.generate_avp(264, 40, self.OriginHost)                                                    #Origin Host
-            avp += self.generate_avp(296, 40, self.OriginRealm)                                                   #Origin Realm
+            avp += self.originHostAvp                                                    #Origin Host
+            avp += self.originRealmAvp                                                   #Origin Realm
 
             #Experimental Result AVP(Response Code for Failure)
-            avp_experimental_result = ''
-            avp_experimental_result += self.generate_vendor_avp(266, 40, 10415, '')                         #AVP Vendor ID
-            avp_experimental_result += self.generate_avp(298, 40, self.int_to_hex(5001, 4))                 #AVP Experimental-Result-Code: DIAMETER_ERROR_USER_UNKNOWN (5001)
+            avp_experimental_result = b''
+            avp_experimental_result += self.generate_vendor_avp(266, 40, 10415, b'')                         #AVP Vendor ID
+            avp_experimental_result += self.generate_avp(298, 40, diameterCodec.encodeUnsigned32(5001))                 #AVP Experimental-Result-Code: DIAMETER_ERROR_USER_UNKNOWN (5001)
             avp += self.generate_avp(297, 40, avp_experimental_result)                                      #AVP Experimental-Result(297)
             
-            avp += self.generate_avp(277, 40, "00000001")                                                    #Auth-Session-State
-            avp += self.generate_avp(260, 40, "000001024000000c" + format(int(16777251),"x").zfill(8) +  "0000010a4000000c000028af")      #Vendor-Specific-Application-ID (S6a)
-            response = self.generate_diameter_packet("01", "40", 318, 16777251, packet_vars['hop-by-hop-identifier'], packet_vars['end-to-end-identifier'], avp)     #Generate Diameter packet
+            avp += self.authSessionStateAvp                                                    #Auth-Session-State
+            avp += self.vendorSpecificApplicationIdAvps[16777251]      #Vendor-Specific-Application-ID (S6a)
+            response = self.generate_diameter_packet("01", "40", 318, 16777251, packet_vars.hopByHopId, packet_vars.endToEndId, avp)     #Generate Diameter packet
             return response
         except Exception as ex:
             template = "An exception of type {0} occurred. Arguments:\n{1!r}"
@@ -1713,28 +1572,28 @@ class Diameter:
                 subscriberIsRoaming = True
             
             if subscriberIsRoaming:
-                self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [Answer_16777251_318] [AIA] Subscriber {imsi} is roaming", redisClient=self.redisMessaging)
+                self.logTool.log(service='HSS', level='debug', message=lambda: f"[diameter.py] [Answer_16777251_318] [AIA] Subscriber {imsi} is roaming", redisClient=self.redisMessaging)
                 subscriberRoamingAllowed = self.validateSubscriberRoaming(subscriber=subscriber_details, mcc=mcc, mnc=mnc)
 
             if not subscriberRoamingAllowed and subscriberIsRoaming:
-                avp = ''
-                session_id = self.get_avp_data(avps, 263)[0]                                                     #Get Session-ID
+                avp = b''
+                session_id = bytes.fromhex(self.get_avp_data(avps, 263)[0])                                                   #Get Session-ID
                 avp += self.generate_avp(263, 40, session_id)                                                    #Session-ID AVP set
-                avp += self.generate_avp(264, 40, self.OriginHost)                                                    #Origin Host
-                avp += self.generate_avp(296, 40, self.OriginRealm)                                                   #Origin Realm
+                avp += self.originHostAvp                                                    #Origin Host
+                avp += self.originRealmAvp                                                   #Origin Realm
 
                 #Experimental Result AVP(Parent AVP for Roaming Failure)
-                avp_experimental_result = ''
-                avp_experimental_result += self.generate_vendor_avp(266, 40, 10415, '')                         #AVP Vendor ID
-                avp_experimental_result += self.generate_avp(298, 40, self.int_to_hex(5004, 4))                 #AVP Experimental-Result-Code: DIAMETER_ERROR_ROAMING_NOT_ALLOWED (5004)
+                avp_experimental_result = b''
+                avp_experimental_result += self.generate_vendor_avp(266, 40, 10415, b'')                         #AVP Vendor ID
+                avp_experimental_result += self.generate_avp(298, 40, diameterCodec.encodeUnsigned32(5004))                 #AVP Experimental-Result-Code: DIAMETER_ERROR_ROAMING_NOT_ALLOWED (5004)
                 avp += self.generate_avp(297, 40, avp_experimental_result)                                      #AVP Experimental-Result(297)
                 
-                avp += self.generate_avp(277, 40, "00000001")                                                    #Auth-Session-State
-                avp += self.generate_avp(260, 40, "000001024000000c" + format(int(16777251),"x").zfill(8) +  "0000010a4000000c000028af")      #Vendor-Specific-Application-ID (S6a)
-                response = self.generate_diameter_packet("01", "40", 318, 16777251, packet_vars['hop-by-hop-identifier'], packet_vars['end-to-end-identifier'], avp)     #Generate Diameter packet
+                avp += self.authSessionStateAvp                                                    #Auth-Session-State
+                avp += self.vendorSpecificApplicationIdAvps[16777251]      #Vendor-Specific-Application-ID (S6a)
+                response = self.generate_diameter_packet("01", "40", 318, 16777251, packet_vars.hopByHopId, packet_vars.endToEndId, avp)     #Generate Diameter packet
                 return response
             
-            self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [Answer_16777251_318] [AIA] Subscriber {imsi} passed roaming validation for {decodedPlmn}", redisClient=self.redisMessaging)
+            self.logTool.log(service='HSS', level='debug', message=lambda: f"[diameter.py] [Answer_16777251_318] [AIA] Subscriber {imsi} passed roaming validation for {decodedPlmn}", redisClient=self.redisMessaging)
             
         except Exception as e:
             self.logTool.log(service='HSS', level='error', message=f"[diameter.py] [Answer_16777251_318] [AIA] Error when validating subscriber roaming: {traceback.format_exc()}", redisClient=self.redisMessaging)
@@ -1743,16 +1602,16 @@ class Diameter:
         try:
             requested_vectors = 1
             EUTRAN_Authentication_Info = self.get_avp_data(avps, 1408)
-            self.logTool.log(service='HSS', level='debug', message=f"authInfo: {EUTRAN_Authentication_Info}", redisClient=self.redisMessaging)
+            self.logTool.log(service='HSS', level='debug', message=lambda: f"authInfo: {EUTRAN_Authentication_Info}", redisClient=self.redisMessaging)
             if len(EUTRAN_Authentication_Info) > 0:
                 EUTRAN_Authentication_Info = EUTRAN_Authentication_Info[0]
                 self.logTool.log(service='HSS', level='debug', message="AVP: Requested-EUTRAN-Authentication-Info(1408) l=44 f=VM- vnd=TGPP", redisClient=self.redisMessaging)
-                self.logTool.log(service='HSS', level='debug', message="EUTRAN_Authentication_Info is " + str(EUTRAN_Authentication_Info), redisClient=self.redisMessaging)
+                self.logTool.log(service='HSS', level='debug', message=lambda: "EUTRAN_Authentication_Info is " + str(EUTRAN_Authentication_Info), redisClient=self.redisMessaging)
                 for sub_avp in EUTRAN_Authentication_Info:
                     #If resync request
                     if sub_avp['avp_code'] == 1411:
                         self.logTool.log(service='HSS', level='debug', message="Re-Synchronization required - SQN is out of sync", redisClient=self.redisMessaging)
-                        self.redisMessaging.sendMetric(serviceName='diameter', metricName='prom_diam_auth_event_count',
+                        self.metricAggregator.sendMetric(serviceName='diameter', metricName='prom_diam_auth_event_count',
                                                         metricType='counter', metricAction='inc', 
                                                         metricValue=1.0, 
                                                         metricLabels={
@@ -1773,42 +1632,42 @@ class Diameter:
 
                     #Get number of requested vectors
                     if sub_avp['avp_code'] == 1410:
-                        self.logTool.log(service='HSS', level='debug', message="Raw value of requested vectors is " + str(sub_avp['misc_data']), redisClient=self.redisMessaging)
-                        requested_vectors = int(sub_avp['misc_data'], 16)
+                        requested_vectors = sub_avp.value
+                        self.logTool.log(service='HSS', level='debug', message=lambda: "Raw value of requested vectors is " + str(requested_vectors), redisClient=self.redisMessaging)
                         if requested_vectors >= 32:
-                            self.logTool.log(service='HSS', level='debug', message="Client has requested " + str(requested_vectors) + " vectors, limiting this to 32", redisClient=self.redisMessaging)
+                            self.logTool.log(service='HSS', level='debug', message=lambda: "Client has requested " + str(requested_vectors) + " vectors, limiting this to 32", redisClient=self.redisMessaging)
                             requested_vectors = 32
 
-            self.logTool.log(service='HSS', level='debug', message="Generating " + str(requested_vectors) + " vectors as requested", redisClient=self.redisMessaging)
-            eutranvector_complete = ''
+            self.logTool.log(service='HSS', level='debug', message=lambda: "Generating " + str(requested_vectors) + " vectors as requested", redisClient=self.redisMessaging)
+            eutranvector_complete = b''
             while requested_vectors != 0:
-                self.logTool.log(service='HSS', level='debug', message="Generating vector number " + str(requested_vectors), redisClient=self.redisMessaging)
+                self.logTool.log(service='HSS', level='debug', message=lambda: "Generating vector number " + str(requested_vectors), redisClient=self.redisMessaging)
                 plmn = self.get_avp_data(avps, 1407)[0]                                                     #Get PLMN from request
                 vector_dict = self.database.Get_Vectors_AuC(subscriber_details['auc_id'], "air", plmn=plmn)
-                eutranvector = ''                                                                           #This goes into the payload of AVP 10415 (Authentication info)
-                eutranvector += self.generate_vendor_avp(1419, "c0", 10415, self.int_to_hex(requested_vectors, 4))
-                eutranvector += self.generate_vendor_avp(1447, "c0", 10415, vector_dict['rand'])                                #And is made up of other AVPs joined together with RAND
-                eutranvector += self.generate_vendor_avp(1448, "c0", 10415, vector_dict['xres'])                                #XRes
-                eutranvector += self.generate_vendor_avp(1449, "c0", 10415, vector_dict['autn'])                                #AUTN
-                eutranvector += self.generate_vendor_avp(1450, "c0", 10415, vector_dict['kasme'])                               #And KASME
+                eutranvector = b''                                                                           #This goes into the payload of AVP 10415 (Authentication info)
+                eutranvector += self.generate_vendor_avp(1419, "c0", 10415, diameterCodec.encodeUnsigned32(requested_vectors))
+                eutranvector += self.generate_vendor_avp(1447, "c0", 10415, bytes.fromhex(vector_dict['rand']))                                #And is made up of other AVPs joined together with RAND
+                eutranvector += self.generate_vendor_avp(1448, "c0", 10415, bytes.fromhex(vector_dict['xres']))                                #XRes
+                eutranvector += self.generate_vendor_avp(1449, "c0", 10415, bytes.fromhex(vector_dict['autn']))                                #AUTN
+                eutranvector += self.generate_vendor_avp(1450, "c0", 10415, bytes.fromhex(vector_dict['kasme']))                               #And KASME
 
                 requested_vectors = requested_vectors - 1
                 eutranvector_complete += self.generate_vendor_avp(1414, "c0", 10415, eutranvector)                         #Put EUTRAN vectors in E-UTRAN-Vector AVP
 
-            avp = ''                                                                                    #Initiate empty var AVP
-            session_id = self.get_avp_data(avps, 263)[0]                                                     #Get Session-ID
+            avp = b''                                                                                    #Initiate empty var AVP
+            session_id = bytes.fromhex(self.get_avp_data(avps, 263)[0])                                                   #Get Session-ID
             avp += self.generate_avp(263, 40, session_id)                                                    #Session-ID AVP set
             avp += self.generate_vendor_avp(1413, "c0", 10415, eutranvector_complete)                                 #Authentication-Info (3GPP)                                      
-            avp += self.generate_avp(264, 40, self.OriginHost)                                                    #Origin Host
-            avp += self.generate_avp(296, 40, self.OriginRealm)                                                   #Origin Realm
-            avp += self.generate_avp(268, 40, self.int_to_hex(2001, 4))                                           #Result Code (DIAMETER_SUCCESS (2001))
-            avp += self.generate_avp(277, 40, "00000001")                                                    #Auth-Session-State
-            avp += self.generate_avp(260, 40, "0000010a4000000c000028af000001024000000c01000023")
-            #avp += self.generate_avp(260, 40, "000001024000000c" + format(int(16777251),"x").zfill(8) +  "0000010a4000000c000028af")      #Vendor-Specific-Application-ID (S6a)
+            avp += self.originHostAvp                                                    #Origin Host
+            avp += self.originRealmAvp                                                   #Origin Realm
+            avp += self.resultCodeSuccessAvp                                             #Result Code (DIAMETER_SUCCESS (2001))
+            avp += self.authSessionStateAvp                                              #Auth-Session-State
+            avp += self.generate_avp(260, 40, self.generate_avp(266, 40, diameterCodec.encodeUnsigned32(10415)) + self.generate_avp(258, 40, diameterCodec.encodeUnsigned32(16777251)))
+            #avp += self.vendorSpecificApplicationIdAvps[16777251]      #Vendor-Specific-Application-ID (S6a)
             
-            response = self.generate_diameter_packet("01", "40", 318, 16777251, packet_vars['hop-by-hop-identifier'], packet_vars['end-to-end-identifier'], avp)     #Generate Diameter packet
+            response = self.generate_diameter_packet("01", "40", 318, 16777251, packet_vars.hopByHopId, packet_vars.endToEndId, avp)     #Generate Diameter packet
             self.logTool.log(service='HSS', level='debug', message="Successfully Generated AIA", redisClient=self.redisMessaging)
-            self.logTool.log(service='HSS', level='debug', message=response, redisClient=self.redisMessaging)
+            self.logTool.log(service='HSS', level='debug', message=lambda: response.hex(), redisClient=self.redisMessaging)
             return response
         except Exception as e:
             self.logTool.log(service='HSS', level='error', message=traceback.format_exc(), redisClient=self.redisMessaging)
@@ -1817,31 +1676,11 @@ class Diameter:
     #Purge UE Answer (PUA)
     def Answer_16777251_321(self, packet_vars, avps):
         
-        imsi = self.get_avp_data(avps, 1)[0]                                                             #Get IMSI from User-Name AVP in request
-        imsi = binascii.unhexlify(imsi).decode('utf-8')
+        imsi = self.get_avp_value(avps, 1)[0]                                                            #Get IMSI from User-Name AVP in request
 
-        avp = ''
-        session_id = self.get_avp_data(avps, 263)[0]                                                     #Get Session-ID
-        avp += self.generate_avp(263, 40, session_id)                                                    #Session-ID AVP set
-        avp += self.generate_avp(268, 40, self.int_to_hex(2001, 4))                                      #Result Code (DIAMETER_SUCCESS (2001))
-        avp += self.generate_avp(260, 40, "000001024000000c" + format(int(16777251),"x").zfill(8) +  "0000010a4000000c000028af")      #Vendor-Specific-Application-ID (S6a)        
-        avp += self.generate_avp(277, 40, "00000001")                                                    #Auth-Session-State (No state maintained)
-        
-        avp += self.generate_avp(264, 40, self.OriginHost)                                                    #Origin Host
-        avp += self.generate_avp(296, 40, self.OriginRealm)                                                   #Origin Realm
-
-        #1442 - PUA-Flags
-        avp += self.generate_vendor_avp(1442, "c0", 10415, self.int_to_hex(1, 4))
-
-        #AVP: Supported-Features(628) l=36 f=V-- vnd=TGPP
-        SupportedFeatures = ''
-        SupportedFeatures += self.generate_vendor_avp(266, 40, 10415, '')                     #AVP Vendor ID
-        SupportedFeatures += self.generate_vendor_avp(629, 80, 10415, self.int_to_hex(1, 4))  #Feature-List ID
-        SupportedFeatures += self.generate_vendor_avp(630, 80, 10415, "1c000607")             #Feature-List Flags
-        avp += self.generate_vendor_avp(628, "80", 10415, SupportedFeatures)                  #Supported-Features(628) l=36 f=V-- vnd=TGPP
-
-
-        response = self.generate_diameter_packet("01", "40", 321, 16777251, packet_vars['hop-by-hop-identifier'], packet_vars['end-to-end-identifier'], avp)     #Generate Diameter packet
+        session_id = bytes.fromhex(self.get_avp_data(avps, 263)[0])                                    #Get Session-ID
+        #Result Code, Vendor-Specific-Application-ID, Auth-Session-State, Origin Host / Realm, PUA-Flags and Supported-Features are prebuilt in puaTemplate
+        response = self.renderAnswer(self.puaTemplate, packet_vars, self.generate_avp(263, 40, session_id))     #Generate Diameter packet
         
 
         self.database.Update_Serving_MME(imsi, None)
@@ -1850,30 +1689,17 @@ class Diameter:
 
     #Notify Answer (NOA)
     def Answer_16777251_323(self, packet_vars, avps):
-        avp = ''
-        session_id = self.get_avp_data(avps, 263)[0]                                                     #Get Session-ID
-        avp += self.generate_avp(263, 40, session_id)                                                    #Session-ID AVP set
-        avp += self.generate_avp(268, 40, self.int_to_hex(2001, 4))                                      #Result Code (DIAMETER_SUCCESS (2001))
-        avp += self.generate_avp(260, 40, "000001024000000c" + format(int(16777251),"x").zfill(8) +  "0000010a4000000c000028af")      #Vendor-Specific-Application-ID (S6a)        
-        avp += self.generate_avp(277, 40, "00000001")                                                    #Auth-Session-State (No state maintained)
-        
-        avp += self.generate_avp(264, 40, self.OriginHost)                                                    #Origin Host
-        avp += self.generate_avp(296, 40, self.OriginRealm)                                                   #Origin Realm
-
-        #AVP: Supported-Features(628) l=36 f=V-- vnd=TGPP
-        SupportedFeatures = ''
-        SupportedFeatures += self.generate_vendor_avp(266, 40, 10415, '')                     #AVP Vendor ID
-        SupportedFeatures += self.generate_avp(258, 40, format(int(16777251),"x").zfill(8))   #Auth-Application-ID Relay
-        avp += self.generate_vendor_avp(628, "80", 10415, SupportedFeatures)                  #Supported-Features(628) l=36 f=V-- vnd=TGPP
-        response = self.generate_diameter_packet("01", "40", 323, 16777251, packet_vars['hop-by-hop-identifier'], packet_vars['end-to-end-identifier'], avp)     #Generate Diameter packet
+        session_id = bytes.fromhex(self.get_avp_data(avps, 263)[0])                                    #Get Session-ID
+        #Result Code, Vendor-Specific-Application-ID, Auth-Session-State, Origin Host / Realm and Supported-Features are prebuilt in noaTemplate
+        response = self.renderAnswer(self.noaTemplate, packet_vars, self.generate_avp(263, 40, session_id))     #Generate Diameter packet
         self.logTool.log(service='HSS', level='debug', message="Successfully Generated NOA", redisClient=self.redisMessaging)
         return response
 
     #3GPP Gx Credit Control Answer
     def Answer_16777238_272(self, packet_vars, avps):
         try:
-            CC_Request_Type = self.get_avp_data(avps, 416)[0]
-            CC_Request_Number = self.get_avp_data(avps, 415)[0]
+            CC_Request_Type = int(self.get_avp_data(avps, 416)[0], 16)
+            CC_Request_Number = int(self.get_avp_data(avps, 415)[0], 16)
             #Called Station ID
             self.logTool.log(service='HSS', level='debug', message="[diameter.py] [Answer_16777238_272] [CCA] Attempting to find APN in CCR", redisClient=self.redisMessaging)
             apn = bytes.fromhex(self.get_avp_data(avps, 30)[0]).decode('utf-8')
@@ -1885,7 +1711,7 @@ class Diameter:
                         apn = apn.split('.')[0]
             except Exception as e:
                 apn = bytes.fromhex(self.get_avp_data(avps, 30)[0]).decode('utf-8')
-            self.logTool.log(service='HSS', level='debug', message="[diameter.py] [Answer_16777238_272] [CCA] CCR for APN " + str(apn), redisClient=self.redisMessaging)
+            self.logTool.log(service='HSS', level='debug', message=lambda: "[diameter.py] [Answer_16777238_272] [CCA] CCR for APN " + str(apn), redisClient=self.redisMessaging)
 
             OriginHost = self.get_avp_data(avps, 264)[0]                          #Get OriginHost from AVP
             OriginHost = binascii.unhexlify(OriginHost).decode('utf-8')      #Format it
@@ -1898,18 +1724,17 @@ class Diameter:
                 remote_peer = binascii.unhexlify(remote_peer).decode('utf-8')           #Format it
             except:     #If we don't have a record-route set, we'll send the response to the OriginHost
                 remote_peer = OriginHost
-            self.logTool.log(service='HSS', level='debug', message="[diameter.py] [Answer_16777238_272] [CCA] Remote Peer is " + str(remote_peer), redisClient=self.redisMessaging)
+            self.logTool.log(service='HSS', level='debug', message=lambda: "[diameter.py] [Answer_16777238_272] [CCA] Remote Peer is " + str(remote_peer), redisClient=self.redisMessaging)
             remote_peer = remote_peer + ";" + str(self.config['hss']['OriginHost'])
 
-            avp = ''                                                                                    #Initiate empty var AVP
-            session_id = self.get_avp_data(avps, 263)[0]                                                     #Get Session-ID
-            self.logTool.log(service='HSS', level='debug', message="[diameter.py] [Answer_16777238_272] [CCA] Session Id is " + str(binascii.unhexlify(session_id).decode()), redisClient=self.redisMessaging)
+            avp = b''                                                                                   #Initiate empty var AVP
+            session_id = bytes.fromhex(self.get_avp_data(avps, 263)[0])                                      #Get Session-ID
+            self.logTool.log(service='HSS', level='debug', message=lambda: "[diameter.py] [Answer_16777238_272] [CCA] Session Id is " + session_id.decode(), redisClient=self.redisMessaging)
             avp += self.generate_avp(263, 40, session_id)                                                    #Session-ID AVP set
-            avp += self.generate_avp(264, 40, self.OriginHost)                                                    #Origin Host
-            avp += self.generate_avp(296, 40, self.OriginRealm)                                                   #Origin Realm
-            avp += self.generate_avp(258, 40, "01000016")                                                    #Auth-Application-Id (3GPP Gx 16777238)
-            avp += self.generate_avp(416, 40, format(int(CC_Request_Type),"x").zfill(8))                     #CC-Request-Type
-            avp += self.generate_avp(415, 40, format(int(CC_Request_Number),"x").zfill(8))                   #CC-Request-Number
+            avp += self.originAvps                                                                           #Origin Host / Realm
+            avp += self.generate_avp(258, 40, diameterCodec.encodeUnsigned32(16777238))                      #Auth-Application-Id (3GPP Gx 16777238)
+            avp += self.generate_avp(416, 40, diameterCodec.encodeUnsigned32(CC_Request_Type))               #CC-Request-Type
+            avp += self.generate_avp(415, 40, diameterCodec.encodeUnsigned32(CC_Request_Number))             #CC-Request-Number
 
             """
             If Called-Station-ID contains 'sos', we're dealing with an emergency bearer request.
@@ -1925,41 +1750,41 @@ class Diameter:
                         # Otherwise, use a default value of 128/128kbps.
                         try:
                             sosApn = (self.database.Get_APN_by_Name(apn="sos"))
-                            AMBR = ''                                                                                   #Initiate empty var AVP for AMBR
+                            AMBR = b''                                                                                  #Initiate empty var AVP for AMBR
                             apn_ambr_ul = int(sosApn['apn_ambr_ul'])
                             apn_ambr_dl = int(sosApn['apn_ambr_dl'])
-                            AMBR += self.generate_vendor_avp(516, "c0", 10415, self.int_to_hex(apn_ambr_ul, 4))                    #Max-Requested-Bandwidth-UL
-                            AMBR += self.generate_vendor_avp(515, "c0", 10415, self.int_to_hex(apn_ambr_dl, 4))                    #Max-Requested-Bandwidth-DL
+                            AMBR += self.generate_vendor_avp(516, "c0", 10415, diameterCodec.encodeUnsigned32(apn_ambr_ul))        #Max-Requested-Bandwidth-UL
+                            AMBR += self.generate_vendor_avp(515, "c0", 10415, diameterCodec.encodeUnsigned32(apn_ambr_dl))        #Max-Requested-Bandwidth-DL
                             APN_AMBR = self.generate_vendor_avp(1435, "c0", 10415, AMBR)
 
-                            AVP_Priority_Level = self.generate_vendor_avp(1046, "80", 10415, self.int_to_hex(int(sosApn['arp_priority']), 4))
-                            AVP_Preemption_Capability = self.generate_vendor_avp(1047, "80", 10415, self.int_to_hex(int(not sosApn['arp_preemption_capability']), 4))
-                            AVP_Preemption_Vulnerability = self.generate_vendor_avp(1048, "80", 10415, self.int_to_hex(int(not sosApn['arp_preemption_vulnerability']), 4))
+                            AVP_Priority_Level = self.generate_vendor_avp(1046, "80", 10415, diameterCodec.encodeUnsigned32(int(sosApn['arp_priority'])))
+                            AVP_Preemption_Capability = self.generate_vendor_avp(1047, "80", 10415, diameterCodec.encodeUnsigned32(int(not sosApn['arp_preemption_capability'])))
+                            AVP_Preemption_Vulnerability = self.generate_vendor_avp(1048, "80", 10415, diameterCodec.encodeUnsigned32(int(not sosApn['arp_preemption_vulnerability'])))
                             AVP_ARP = self.generate_vendor_avp(1034, "80", 10415, AVP_Priority_Level + AVP_Preemption_Capability + AVP_Preemption_Vulnerability)
-                            AVP_QoS = self.generate_vendor_avp(1028, "c0", 10415, self.int_to_hex(int(sosApn['qci']), 4))
+                            AVP_QoS = self.generate_vendor_avp(1028, "c0", 10415, diameterCodec.encodeUnsigned32(int(sosApn['qci'])))
                             avp += self.generate_vendor_avp(1049, "80", 10415, AVP_QoS + AVP_ARP)
 
                         except Exception as e:
-                            AMBR = ''                                                                                   #Initiate empty var AVP for AMBR
+                            AMBR = b''                                                                                  #Initiate empty var AVP for AMBR
                             apn_ambr_ul = 128000
                             apn_ambr_dl = 128000
-                            AMBR += self.generate_vendor_avp(516, "c0", 10415, self.int_to_hex(apn_ambr_ul, 4))                    #Max-Requested-Bandwidth-UL
-                            AMBR += self.generate_vendor_avp(515, "c0", 10415, self.int_to_hex(apn_ambr_dl, 4))                    #Max-Requested-Bandwidth-DL
+                            AMBR += self.generate_vendor_avp(516, "c0", 10415, diameterCodec.encodeUnsigned32(apn_ambr_ul))        #Max-Requested-Bandwidth-UL
+                            AMBR += self.generate_vendor_avp(515, "c0", 10415, diameterCodec.encodeUnsigned32(apn_ambr_dl))        #Max-Requested-Bandwidth-DL
                             APN_AMBR = self.generate_vendor_avp(1435, "c0", 10415, AMBR)
                             
-                            AVP_Priority_Level = self.generate_vendor_avp(1046, "80", 10415, self.int_to_hex(1, 4))
-                            AVP_Preemption_Capability = self.generate_vendor_avp(1047, "80", 10415, self.int_to_hex(0, 4))          # Pre-Emption Capability Enabled
-                            AVP_Preemption_Vulnerability = self.generate_vendor_avp(1048, "80", 10415, self.int_to_hex(1, 4))       # Pre-Emption Vulnerability Disabled
+                            AVP_Priority_Level = self.generate_vendor_avp(1046, "80", 10415, diameterCodec.encodeUnsigned32(1))
+                            AVP_Preemption_Capability = self.generate_vendor_avp(1047, "80", 10415, diameterCodec.encodeUnsigned32(0))          # Pre-Emption Capability Enabled
+                            AVP_Preemption_Vulnerability = self.generate_vendor_avp(1048, "80", 10415, diameterCodec.encodeUnsigned32(1))       # Pre-Emption Vulnerability Disabled
                             AVP_ARP = self.generate_vendor_avp(1034, "80", 10415, AVP_Priority_Level + AVP_Preemption_Capability + AVP_Preemption_Vulnerability)
-                            AVP_QoS = self.generate_vendor_avp(1028, "c0", 10415, self.int_to_hex(5, 4))                            # QCI 5
+                            AVP_QoS = self.generate_vendor_avp(1028, "c0", 10415, diameterCodec.encodeUnsigned32(5))                # QCI 5
                             avp += self.generate_vendor_avp(1049, "80", 10415, AVP_QoS + AVP_ARP)
                     
-                        QoS_Information = self.generate_vendor_avp(1041, "80", 10415, self.int_to_hex(apn_ambr_ul, 4))                                                                  
-                        QoS_Information += self.generate_vendor_avp(1040, "80", 10415, self.int_to_hex(apn_ambr_dl, 4))
+                        QoS_Information = self.generate_vendor_avp(1041, "80", 10415, diameterCodec.encodeUnsigned32(apn_ambr_ul))                                                                  
+                        QoS_Information += self.generate_vendor_avp(1040, "80", 10415, diameterCodec.encodeUnsigned32(apn_ambr_dl))
                         avp += self.generate_vendor_avp(1016, "80", 10415, QoS_Information)                                         # QOS-Information
 
                         #Supported-Features(628) (Gx feature list)
-                        avp += self.generate_vendor_avp(628, "80", 10415, "0000010a4000000c000028af0000027580000010000028af000000010000027680000010000028af0000000b")
+                        avp += self.gxSupportedFeaturesAvp
 
                         """
                         Store the Emergency Subscriber
@@ -1994,7 +1819,7 @@ class Diameter:
                             accessNetworkChargingAddress = None
 
                         emergencySubscriberData = {
-                            "servingPgw": binascii.unhexlify(session_id).decode(),
+                            "servingPgw": session_id.decode(),
                             "requestTime": int(time.time()),
                             "servingPcscf": None,
                             "aarRequestTime": None,
@@ -2009,8 +1834,8 @@ class Diameter:
 
                         self.database.Update_Emergency_Subscriber(subscriberIp=ueIp, subscriberData=emergencySubscriberData, imsi=imsi, gxSessionId=emergencySubscriberData.get('servingPgw'))
 
-                        avp += self.generate_avp(268, 40, self.int_to_hex(2001, 4))                                           #Result Code (DIAMETER_SUCCESS (2001))
-                        response = self.generate_diameter_packet("01", "40", 272, 16777238, packet_vars['hop-by-hop-identifier'], packet_vars['end-to-end-identifier'], avp)     #Generate Diameter packet
+                        avp += self.resultCodeSuccessAvp                                                                      #Result Code (DIAMETER_SUCCESS (2001))
+                        response = self.generate_diameter_packet("01", "40", 272, 16777238, packet_vars.hopByHopId, packet_vars.endToEndId, avp)     #Generate Diameter packet
                         return response
                     
                     elif int(CC_Request_Type) == 3:
@@ -2050,7 +1875,7 @@ class Diameter:
                             accessNetworkChargingAddress = None
                         
                         emergencySubscriberData = {
-                            "servingPgw": binascii.unhexlify(session_id).decode(),
+                            "servingPgw": session_id.decode(),
                             "requestTime": int(time.time()),
                             "gxOriginRealm": OriginRealm,
                             "gxOriginHost": OriginHost,
@@ -2061,10 +1886,10 @@ class Diameter:
                             "accessNetworkChargingAddress": accessNetworkChargingAddress,
                         }
 
-                        self.database.Delete_Emergency_Subscriber(subscriberIp=ueIp, subscriberData=emergencySubscriberData, imsi=imsi, gxSessionId=binascii.unhexlify(session_id).decode())
+                        self.database.Delete_Emergency_Subscriber(subscriberIp=ueIp, subscriberData=emergencySubscriberData, imsi=imsi, gxSessionId=session_id.decode())
 
-                        avp += self.generate_avp(268, 40, self.int_to_hex(2001, 4))                                           #Result Code (DIAMETER_SUCCESS (2001))
-                        response = self.generate_diameter_packet("01", "40", 272, 16777238, packet_vars['hop-by-hop-identifier'], packet_vars['end-to-end-identifier'], avp)     #Generate Diameter packet
+                        avp += self.resultCodeSuccessAvp                                                                      #Result Code (DIAMETER_SUCCESS (2001))
+                        response = self.generate_diameter_packet("01", "40", 272, 16777238, packet_vars.hopByHopId, packet_vars.endToEndId, avp)     #Generate Diameter packet
                         return response
 
             except Exception as e:
@@ -2073,16 +1898,16 @@ class Diameter:
             #Get Subscriber info from Subscription ID
             for SubscriptionIdentifier in self.get_avp_data(avps, 443):
                 for UniqueSubscriptionIdentifier in SubscriptionIdentifier:
-                    self.logTool.log(service='HSS', level='debug', message="[diameter.py] [Answer_16777238_272] [CCA] Evaluating UniqueSubscriptionIdentifier AVP " + str(UniqueSubscriptionIdentifier) + " to find IMSI", redisClient=self.redisMessaging)
+                    self.logTool.log(service='HSS', level='debug', message=lambda: "[diameter.py] [Answer_16777238_272] [CCA] Evaluating UniqueSubscriptionIdentifier AVP " + str(UniqueSubscriptionIdentifier) + " to find IMSI", redisClient=self.redisMessaging)
                     if UniqueSubscriptionIdentifier['avp_code'] == 444:
                         imsi = binascii.unhexlify(UniqueSubscriptionIdentifier['misc_data']).decode('utf-8')
-                        self.logTool.log(service='HSS', level='debug', message="[diameter.py] [Answer_16777238_272] [CCA] Found IMSI " + str(imsi), redisClient=self.redisMessaging)
+                        self.logTool.log(service='HSS', level='debug', message=lambda: "[diameter.py] [Answer_16777238_272] [CCA] Found IMSI " + str(imsi), redisClient=self.redisMessaging)
 
-            self.logTool.log(service='HSS', level='debug', message="[diameter.py] [Answer_16777238_272] [CCA] SubscriptionID: " + str(self.get_avp_data(avps, 443)), redisClient=self.redisMessaging)
+            self.logTool.log(service='HSS', level='debug', message=lambda: "[diameter.py] [Answer_16777238_272] [CCA] SubscriptionID: " + str(self.get_avp_data(avps, 443)), redisClient=self.redisMessaging)
             try:
-                self.logTool.log(service='HSS', level='debug', message="[diameter.py] [Answer_16777238_272] [CCA] Getting Get_Charging_Rules for IMSI " + str(imsi) + " using APN " + str(apn) + " from database", redisClient=self.redisMessaging)                                            #Get subscriber details
+                self.logTool.log(service='HSS', level='debug', message=lambda: "[diameter.py] [Answer_16777238_272] [CCA] Getting Get_Charging_Rules for IMSI " + str(imsi) + " using APN " + str(apn) + " from database", redisClient=self.redisMessaging)                                            #Get subscriber details
                 ChargingRules = self.database.Get_Charging_Rules(imsi=imsi, apn=apn)
-                self.logTool.log(service='HSS', level='debug', message="[diameter.py] [Answer_16777238_272] [CCA] Got Charging Rules: " + str(ChargingRules), redisClient=self.redisMessaging)
+                self.logTool.log(service='HSS', level='debug', message=lambda: "[diameter.py] [Answer_16777238_272] [CCA] Got Charging Rules: " + str(ChargingRules), redisClient=self.redisMessaging)
             except Exception as E:
                 #Handle if the subscriber is not present in HSS return "DIAMETER_ERROR_USER_UNKNOWN"
                 self.logTool.log(service='HSS', level='debug', message=E, redisClient=self.redisMessaging)
@@ -2104,21 +1929,21 @@ class Diameter:
 
                 #Store PGW location into Database
                 remote_peer = remote_peer + ";" + str(self.config['hss']['OriginHost'])
-                self.database.Update_Serving_APN(imsi=imsi, apn=apn, pcrf_session_id=binascii.unhexlify(session_id).decode(), serving_pgw=OriginHost, subscriber_routing=str(ue_ip), serving_pgw_realm=OriginRealm, serving_pgw_peer=remote_peer)
+                self.database.Update_Serving_APN(imsi=imsi, apn=apn, pcrf_session_id=session_id.decode(), serving_pgw=OriginHost, subscriber_routing=str(ue_ip), serving_pgw_realm=OriginRealm, serving_pgw_peer=remote_peer)
 
                 #Supported-Features(628) (Gx feature list)
-                avp += self.generate_vendor_avp(628, "80", 10415, "0000010a4000000c000028af0000027580000010000028af000000010000027680000010000028af0000000b")
+                avp += self.gxSupportedFeaturesAvp
 
                 #Default EPS Bearer QoS (From database with fallback source CCR-I, then omission)
                 try:
                     apn_data = ChargingRules['apn_data']
                     self.logTool.log(service='HSS', level='debug', message="[diameter.py] [Answer_16777238_272] [CCA] Setting APN AMBR", redisClient=self.redisMessaging)
                     #AMBR
-                    AMBR = ''                                                                                   #Initiate empty var AVP for AMBR
+                    AMBR = b''                                                                                  #Initiate empty var AVP for AMBR
                     apn_ambr_ul = int(apn_data['apn_ambr_ul'])
                     apn_ambr_dl = int(apn_data['apn_ambr_dl'])
-                    AMBR += self.generate_vendor_avp(516, "c0", 10415, self.int_to_hex(apn_ambr_ul, 4))                    #Max-Requested-Bandwidth-UL
-                    AMBR += self.generate_vendor_avp(515, "c0", 10415, self.int_to_hex(apn_ambr_dl, 4))                    #Max-Requested-Bandwidth-DL
+                    AMBR += self.generate_vendor_avp(516, "c0", 10415, diameterCodec.encodeUnsigned32(apn_ambr_ul))        #Max-Requested-Bandwidth-UL
+                    AMBR += self.generate_vendor_avp(515, "c0", 10415, diameterCodec.encodeUnsigned32(apn_ambr_dl))        #Max-Requested-Bandwidth-DL
                     APN_AMBR = self.generate_vendor_avp(1435, "c0", 10415, AMBR)
 
                     self.logTool.log(service='HSS', level='debug', message="[diameter.py] [Answer_16777238_272] [CCA] Setting APN Allocation-Retention-Priority", redisClient=self.redisMessaging)
@@ -2128,18 +1953,18 @@ class Diameter:
                     # PRE-EMPTION_CAPABILITY_DISABLED (1)
                     # PRE-EMPTION_VULNERABILITY_ENABLED (0)
                     # PRE-EMPTION_VULNERABILITY_DISABLED (1)
-                    AVP_Priority_Level = self.generate_vendor_avp(1046, "80", 10415, self.int_to_hex(int(apn_data['arp_priority']), 4))
-                    AVP_Preemption_Capability = self.generate_vendor_avp(1047, "80", 10415, self.int_to_hex(int(not apn_data['arp_preemption_capability']), 4))
-                    AVP_Preemption_Vulnerability = self.generate_vendor_avp(1048, "80", 10415, self.int_to_hex(int(not apn_data['arp_preemption_vulnerability']), 4))
+                    AVP_Priority_Level = self.generate_vendor_avp(1046, "80", 10415, diameterCodec.encodeUnsigned32(int(apn_data['arp_priority'])))
+                    AVP_Preemption_Capability = self.generate_vendor_avp(1047, "80", 10415, diameterCodec.encodeUnsigned32(int(not apn_data['arp_preemption_capability'])))
+                    AVP_Preemption_Vulnerability = self.generate_vendor_avp(1048, "80", 10415, diameterCodec.encodeUnsigned32(int(not apn_data['arp_preemption_vulnerability'])))
                     AVP_ARP = self.generate_vendor_avp(1034, "80", 10415, AVP_Priority_Level + AVP_Preemption_Capability + AVP_Preemption_Vulnerability)
-                    AVP_QoS = self.generate_vendor_avp(1028, "c0", 10415, self.int_to_hex(int(apn_data['qci']), 4))
+                    AVP_QoS = self.generate_vendor_avp(1028, "c0", 10415, diameterCodec.encodeUnsigned32(int(apn_data['qci'])))
                     avp += self.generate_vendor_avp(1049, "80", 10415, AVP_QoS + AVP_ARP)
                 except Exception as E:
                     self.logTool.log(service='HSS', level='error', message=E, redisClient=self.redisMessaging)
                     self.logTool.log(service='HSS', level='error', message="[diameter.py] [Answer_16777238_272] [CCA] Failed to populate default_EPS_QoS from DB for sub " + str(imsi), redisClient=self.redisMessaging)
-                    default_EPS_QoS = self.get_avp_data(avps, 1049)[0][8:]
-                    if len(default_EPS_QoS) > 0:
-                        avp += self.generate_vendor_avp(1049, "80", 10415, default_EPS_QoS)
+                    default_EPS_QoS = avps.findFirst(1049)
+                    if default_EPS_QoS is not None:
+                        avp += self.generate_vendor_avp(1049, "80", 10415, default_EPS_QoS.data)
 
         
                 self.logTool.log(service='HSS', level='debug', message="[diameter.py] [Answer_16777238_272] [CCA] Creating QoS Information", redisClient=self.redisMessaging)
@@ -2148,8 +1973,8 @@ class Diameter:
                     apn_data = ChargingRules['apn_data']
                     apn_ambr_ul = int(apn_data['apn_ambr_ul'])
                     apn_ambr_dl = int(apn_data['apn_ambr_dl'])
-                    QoS_Information = self.generate_vendor_avp(1041, "80", 10415, self.int_to_hex(apn_ambr_ul, 4))                                                                  
-                    QoS_Information += self.generate_vendor_avp(1040, "80", 10415, self.int_to_hex(apn_ambr_dl, 4))
+                    QoS_Information = self.generate_vendor_avp(1041, "80", 10415, diameterCodec.encodeUnsigned32(apn_ambr_ul))                                                                  
+                    QoS_Information += self.generate_vendor_avp(1040, "80", 10415, diameterCodec.encodeUnsigned32(apn_ambr_dl))
                     self.logTool.log(service='HSS', level='debug', message="[diameter.py] [Answer_16777238_272] [CCA] Created both QoS AVPs from data from Database", redisClient=self.redisMessaging)
                     self.logTool.log(service='HSS', level='debug', message="[diameter.py] [Answer_16777238_272] [CCA] Populated QoS_Information", redisClient=self.redisMessaging)
                     avp += self.generate_vendor_avp(1016, "80", 10415, QoS_Information)
@@ -2157,17 +1982,17 @@ class Diameter:
                     self.logTool.log(service='HSS', level='error', message="[diameter.py] [Answer_16777238_272] [CCA] Failed to get QoS information dynamically for sub " + str(imsi), redisClient=self.redisMessaging)
                     self.logTool.log(service='HSS', level='error', message=E, redisClient=self.redisMessaging)
 
-                    QoS_Information = ''
+                    QoS_Information = b''
                     for AMBR_Part in self.get_avp_data(avps, 1016)[0]:
                         self.logTool.log(service='HSS', level='debug', message=AMBR_Part, redisClient=self.redisMessaging)
-                        AMBR_AVP = self.generate_vendor_avp(AMBR_Part['avp_code'], "80", 10415, AMBR_Part['misc_data'][8:])
+                        AMBR_AVP = self.generate_vendor_avp(AMBR_Part['avp_code'], "80", 10415, AMBR_Part.data)
                         QoS_Information += AMBR_AVP
                         self.logTool.log(service='HSS', level='debug', message="[diameter.py] [Answer_16777238_272] [CCA] QoS_Information added " + str(AMBR_AVP), redisClient=self.redisMessaging)
                     avp += self.generate_vendor_avp(1016, "80", 10415, QoS_Information)
                     self.logTool.log(service='HSS', level='debug', message="[diameter.py] [Answer_16777238_272] [CCA] QoS information set statically", redisClient=self.redisMessaging)
                     
                 self.logTool.log(service='HSS', level='debug', message="[diameter.py] [Answer_16777238_272] [CCA] Added to AVP List", redisClient=self.redisMessaging)
-                self.logTool.log(service='HSS', level='debug', message="[diameter.py] [Answer_16777238_272] [CCA] QoS Information: " + str(QoS_Information), redisClient=self.redisMessaging)                                                                                 
+                self.logTool.log(service='HSS', level='debug', message=lambda: "[diameter.py] [Answer_16777238_272] [CCA] QoS Information: " + str(QoS_Information), redisClient=self.redisMessaging)                                                                                 
                 
                 # If database returned an existing ChargingRule defintion add ChargingRule to CCA-I
                 # If a Charging Rule Install AVP is present, it may trigger the creation of a dedicated bearer.
@@ -2175,10 +2000,10 @@ class Diameter:
                     try:
                         self.logTool.log(service='HSS', level='debug', message=ChargingRules, redisClient=self.redisMessaging)
                         for individual_charging_rule in ChargingRules['charging_rules']:
-                            self.logTool.log(service='HSS', level='debug', message="[diameter.py] [Answer_16777238_272] [CCA] Processing Charging Rule: " + str(individual_charging_rule), redisClient=self.redisMessaging)
+                            self.logTool.log(service='HSS', level='debug', message=lambda: "[diameter.py] [Answer_16777238_272] [CCA] Processing Charging Rule: " + str(individual_charging_rule), redisClient=self.redisMessaging)
                             chargingRule = self.Charging_Rule_Generator(ChargingRules=individual_charging_rule, ue_ip=ue_ip)
                             if len(chargingRule) > 0:
-                                avp += chargingRule
+                                avp += bytes.fromhex(chargingRule)                      #Charging_Rule_Generator is shared with the hex Request builders
 
                     except Exception as E:
                         self.logTool.log(service='HSS', level='debug', message="[diameter.py] [Answer_16777238_272] [CCA] Error in populating dynamic charging rules: " + str(E), redisClient=self.redisMessaging)
@@ -2190,24 +2015,24 @@ class Diameter:
                         try:
                             self.database.Update_Serving_CSCF(imsi=imsi, serving_cscf=None)
                             self.database.Update_Proxy_CSCF(imsi=imsi, proxy_cscf=None)
-                            self.database.Update_Serving_APN(imsi=imsi, apn=apn, pcrf_session_id=str(binascii.unhexlify(session_id).decode()), serving_pgw=OriginHost, subscriber_routing='')
+                            self.database.Update_Serving_APN(imsi=imsi, apn=apn, pcrf_session_id=session_id.decode(), serving_pgw=OriginHost, subscriber_routing='')
                             self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [Answer_16777238_272] [CCA] Successfully cleared stored IMS state", redisClient=self.redisMessaging)
                         except Exception as e:
                             self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [Answer_16777238_272] [CCA] Failed to clear stored IMS state: {traceback.format_exc()}", redisClient=self.redisMessaging)
                 else:
                         try:
-                            self.database.Update_Serving_APN(imsi=imsi, apn=apn, pcrf_session_id=str(binascii.unhexlify(session_id).decode()), serving_pgw=OriginHost, subscriber_routing='')
-                            self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [Answer_16777238_272] [CCA] Successfully cleared stored state for: {apn}", redisClient=self.redisMessaging)
+                            self.database.Update_Serving_APN(imsi=imsi, apn=apn, pcrf_session_id=session_id.decode(), serving_pgw=OriginHost, subscriber_routing='')
+                            self.logTool.log(service='HSS', level='debug', message=lambda: f"[diameter.py] [Answer_16777238_272] [CCA] Successfully cleared stored state for: {apn}", redisClient=self.redisMessaging)
                         except Exception as e:
                             self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [Answer_16777238_272] [CCA] Failed to clear apn state for {apn}: {traceback.format_exc()}", redisClient=self.redisMessaging)
 
-            avp += self.generate_avp(268, 40, self.int_to_hex(2001, 4))                                           #Result Code (DIAMETER_SUCCESS (2001))
-            response = self.generate_diameter_packet("01", "40", 272, 16777238, packet_vars['hop-by-hop-identifier'], packet_vars['end-to-end-identifier'], avp)     #Generate Diameter packet
+            avp += self.resultCodeSuccessAvp                                                                      #Result Code (DIAMETER_SUCCESS (2001))
+            response = self.generate_diameter_packet("01", "40", 272, 16777238, packet_vars.hopByHopId, packet_vars.endToEndId, avp)     #Generate Diameter packet
         except Exception as e:                                             #Get subscriber details
             #Handle if the subscriber is not present in HSS return "DIAMETER_ERROR_USER_UNKNOWN"
             self.logTool.log(service='HSS', level='debug', message="[diameter.py] [Answer_16777238_272] [CCA] Subscriber " + str(imsi) + " unknown in HSS for CCR", redisClient=self.redisMessaging)
 
-            self.redisMessaging.sendMetric(serviceName='diameter', metricName='prom_diam_auth_event_count',
+            self.metricAggregator.sendMetric(serviceName='diameter', metricName='prom_diam_auth_event_count',
                                             metricType='counter', metricAction='inc', 
                                             metricValue=1.0, 
                                             metricLabels={
@@ -2220,20 +2045,19 @@ class Diameter:
                                             usePrefix=True, 
                                             prefixHostname=self.hostname, 
                                             prefixServiceName='metric')
-            avp += self.generate_avp(268, 40, self.int_to_hex(5030, 4))                                           #Result Code (DIAMETER ERROR - User Unknown)
-            response = self.generate_diameter_packet("01", "40", 272, 16777238, packet_vars['hop-by-hop-identifier'], packet_vars['end-to-end-identifier'], avp)     #Generate Diameter packet
+            avp += self.generate_avp(268, 40, diameterCodec.encodeUnsigned32(5030))                               #Result Code (DIAMETER ERROR - User Unknown)
+            response = self.generate_diameter_packet("01", "40", 272, 16777238, packet_vars.hopByHopId, packet_vars.endToEndId, avp)     #Generate Diameter packet
         return response
 
     #3GPP Cx User Authorization Answer
     def Answer_16777216_300(self, packet_vars, avps):
         
-        avp = ''                                                                                         #Initiate empty var AVP                                                                                           #Session-ID
-        session_id = self.get_avp_data(avps, 263)[0]                                                     #Get Session-ID
+        avp = b''                                                                                        #Initiate empty var AVP                                                                                           #Session-ID
+        session_id = bytes.fromhex(self.get_avp_data(avps, 263)[0])                                      #Get Session-ID
         avp += self.generate_avp(263, 40, session_id)                                                    #Set session ID to received session ID
-        avp += self.generate_avp(264, 40, self.OriginHost)                                               #Origin Host
-        avp += self.generate_avp(296, 40, self.OriginRealm)                                              #Origin Realm
-        avp += self.generate_avp(277, 40, "00000001")                                                    #Auth-Session-State (No state maintained)
-        avp += self.generate_avp(260, 40, "0000010a4000000c000028af000001024000000c01000000")            #Vendor-Specific-Application-ID for Cx
+        avp += self.originAvps                                                                           #Origin Host / Realm
+        avp += self.authSessionStateAvp                                                                  #Auth-Session-State (No state maintained)
+        avp += self.answerVendorSpecificApplicationIdAvps[16777216]                                      #Vendor-Specific-Application-ID for Cx
 
 
         OriginRealm = self.get_avp_data(avps, 296)[0]                          #Get OriginRealm from AVP
@@ -2246,21 +2070,21 @@ class Diameter:
             remote_peer = binascii.unhexlify(remote_peer).decode('utf-8')           #Format it
         except:     #If we don't have a record-route set, we'll send the response to the OriginHost
             remote_peer = OriginHost
-        self.logTool.log(service='HSS', level='debug', message="[diameter.py] [Answer_16777216_300] [UAR] Remote Peer is " + str(remote_peer), redisClient=self.redisMessaging)
+        self.logTool.log(service='HSS', level='debug', message=lambda: "[diameter.py] [Answer_16777216_300] [UAR] Remote Peer is " + str(remote_peer), redisClient=self.redisMessaging)
 
         try:
             self.logTool.log(service='HSS', level='debug', message="Checking if username present", redisClient=self.redisMessaging)
             username = self.get_avp_data(avps, 1)[0]                                                     
             username = binascii.unhexlify(username).decode('utf-8')
-            self.logTool.log(service='HSS', level='debug', message="Username AVP is present, value is " + str(username), redisClient=self.redisMessaging)
+            self.logTool.log(service='HSS', level='debug', message=lambda: "Username AVP is present, value is " + str(username), redisClient=self.redisMessaging)
             imsi = username.split('@')[0]   #Strip Domain
             domain = username.split('@')[1] #Get Domain Part
-            self.logTool.log(service='HSS', level='debug', message="Extracted imsi: " + str(imsi) + " now checking backend for this IMSI", redisClient=self.redisMessaging)
+            self.logTool.log(service='HSS', level='debug', message=lambda: "Extracted imsi: " + str(imsi) + " now checking backend for this IMSI", redisClient=self.redisMessaging)
             ims_subscriber_details = self.database.Get_IMS_Subscriber(imsi=imsi)
         except Exception as E:
             self.logTool.log(service='HSS', level='debug', message="Threw Exception: " + str(E), redisClient=self.redisMessaging)
             self.logTool.log(service='HSS', level='debug', message=f"No known MSISDN or IMSI in Answer_16777216_300()", redisClient=self.redisMessaging)
-            self.redisMessaging.sendMetric(serviceName='diameter', metricName='prom_diam_auth_event_count',
+            self.metricAggregator.sendMetric(serviceName='diameter', metricName='prom_diam_auth_event_count',
                                             metricType='counter', metricAction='inc', 
                                             metricValue=1.0, 
                                             metricLabels={
@@ -2275,11 +2099,11 @@ class Diameter:
                                             prefixServiceName='metric')
             result_code = 5001          #IMS User Unknown
             #Experimental Result AVP
-            avp_experimental_result = ''
-            avp_experimental_result += self.generate_vendor_avp(266, 40, 10415, '')                         #AVP Vendor ID
-            avp_experimental_result += self.generate_avp(298, 40, self.int_to_hex(result_code, 4))          #AVP Experimental-Result-Code
+            avp_experimental_result = b''
+            avp_experimental_result += self.generate_vendor_avp(266, 40, 10415, b'')                        #AVP Vendor ID
+            avp_experimental_result += self.generate_avp(298, 40, diameterCodec.encodeUnsigned32(result_code))          #AVP Experimental-Result-Code
             avp += self.generate_avp(297, 40, avp_experimental_result)                                      #AVP Experimental-Result(297)
-            response = self.generate_diameter_packet("01", "40", 300, 16777216, packet_vars['hop-by-hop-identifier'], packet_vars['end-to-end-identifier'], avp)     #Generate Diameter packet
+            response = self.generate_diameter_packet("01", "40", 300, 16777216, packet_vars.hopByHopId, packet_vars.endToEndId, avp)     #Generate Diameter packet
             return response
 
         #Determine SAR Type & Store
@@ -2287,57 +2111,56 @@ class Diameter:
         if user_authorization_type_avp_data:
             try:
                 User_Authorization_Type = int(user_authorization_type_avp_data[0])
-                self.logTool.log(service='HSS', level='debug', message="User_Authorization_Type is: " + str(User_Authorization_Type), redisClient=self.redisMessaging)
+                self.logTool.log(service='HSS', level='debug', message=lambda: "User_Authorization_Type is: " + str(User_Authorization_Type), redisClient=self.redisMessaging)
                 if (User_Authorization_Type == 1):
                     self.logTool.log(service='HSS', level='debug', message="This is Deregister", redisClient=self.redisMessaging)
                     self.database.Update_Serving_CSCF(imsi, serving_cscf=None)
                     #Populate S-CSCF Address
-                    avp += self.generate_vendor_avp(602, "c0", 10415, str(binascii.hexlify(str.encode(ims_subscriber_details['scscf'])),'ascii'))
-                    avp += self.generate_avp(268, 40, self.int_to_hex(2001, 4))                                 #Result Code (DIAMETER_SUCCESS (2001))
-                    response = self.generate_diameter_packet("01", "40", 300, 16777216, packet_vars['hop-by-hop-identifier'], packet_vars['end-to-end-identifier'], avp)     #Generate Diameter packet
+                    avp += self.generate_vendor_avp(602, "c0", 10415, ims_subscriber_details['scscf'].encode('utf-8'))
+                    avp += self.resultCodeSuccessAvp                                                            #Result Code (DIAMETER_SUCCESS (2001))
+                    response = self.generate_diameter_packet("01", "40", 300, 16777216, packet_vars.hopByHopId, packet_vars.endToEndId, avp)     #Generate Diameter packet
                     return response
                     
             except Exception as E:
                 self.logTool.log(service='HSS', level='debug', message="Failed to get User_Authorization_Type AVP & Update_Serving_CSCF error: " + str(E), redisClient=self.redisMessaging)
-        self.logTool.log(service='HSS', level='debug', message="Got subscriber details: " + str(ims_subscriber_details), redisClient=self.redisMessaging)
+        self.logTool.log(service='HSS', level='debug', message=lambda: "Got subscriber details: " + str(ims_subscriber_details), redisClient=self.redisMessaging)
         if ims_subscriber_details['scscf'] != None:
-            self.logTool.log(service='HSS', level='debug', message="Already has SCSCF Assigned from DB: " + str(ims_subscriber_details['scscf']), redisClient=self.redisMessaging)
-            avp += self.generate_vendor_avp(602, "c0", 10415, str(binascii.hexlify(str.encode(ims_subscriber_details['scscf'])),'ascii'))
-            experimental_avp = ''
-            experimental_avp += experimental_avp + self.generate_avp(266, 40, format(int(10415),"x").zfill(8))          #3GPP Vendor ID            
-            experimental_avp = experimental_avp + self.generate_avp(298, 40, format(int(2002),"x").zfill(8))            #DIAMETER_SUBSEQUENT_REGISTRATION (2002)
+            self.logTool.log(service='HSS', level='debug', message=lambda: "Already has SCSCF Assigned from DB: " + str(ims_subscriber_details['scscf']), redisClient=self.redisMessaging)
+            avp += self.generate_vendor_avp(602, "c0", 10415, ims_subscriber_details['scscf'].encode('utf-8'))
+            experimental_avp = b''
+            experimental_avp += experimental_avp + self.generate_avp(266, 40, diameterCodec.encodeUnsigned32(10415))    #3GPP Vendor ID            
+            experimental_avp = experimental_avp + self.generate_avp(298, 40, diameterCodec.encodeUnsigned32(2002))      #DIAMETER_SUBSEQUENT_REGISTRATION (2002)
             avp += self.generate_avp(297, 40, experimental_avp)                                                         #Expermental-Result
         else:
             self.logTool.log(service='HSS', level='debug', message="No SCSCF Assigned from DB", redisClient=self.redisMessaging)
             if 'scscf_pool' in self.config['hss']:
                 try:
                     scscf = random.choice(self.config['hss']['scscf_pool'])
-                    self.logTool.log(service='HSS', level='debug', message="Randomly picked SCSCF address " + str(scscf) + " from pool", redisClient=self.redisMessaging)
-                    avp += self.generate_vendor_avp(602, "c0", 10415, str(binascii.hexlify(str.encode(scscf)),'ascii'))
+                    self.logTool.log(service='HSS', level='debug', message=lambda: "Randomly picked SCSCF address " + str(scscf) + " from pool", redisClient=self.redisMessaging)
+                    avp += self.generate_vendor_avp(602, "c0", 10415, scscf.encode('utf-8'))
                 except Exception as E:
-                    avp += self.generate_vendor_avp(602, "c0", 10415, str(binascii.hexlify(str.encode("sip:scscf.ims.mnc" + str(self.MNC).zfill(3) + ".mcc" + str(self.MCC).zfill(3) + ".3gppnetwork.org")),'ascii'))
+                    avp += self.generate_vendor_avp(602, "c0", 10415, ("sip:scscf.ims.mnc" + str(self.MNC).zfill(3) + ".mcc" + str(self.MCC).zfill(3) + ".3gppnetwork.org").encode('utf-8'))
                     self.logTool.log(service='HSS', level='debug', message="Using generated S-CSCF Address as failed to source from list due to " + str(E), redisClient=self.redisMessaging)
             else:                        
-                avp += self.generate_vendor_avp(602, "c0", 10415, str(binascii.hexlify(str.encode("sip:scscf.ims.mnc" + str(self.MNC).zfill(3) + ".mcc" + str(self.MCC).zfill(3) + ".3gppnetwork.org")),'ascii'))
+                avp += self.generate_vendor_avp(602, "c0", 10415, ("sip:scscf.ims.mnc" + str(self.MNC).zfill(3) + ".mcc" + str(self.MCC).zfill(3) + ".3gppnetwork.org").encode('utf-8'))
                 self.logTool.log(service='HSS', level='debug', message="Using generated S-CSCF Address as none set in scscf_pool in config", redisClient=self.redisMessaging)
-            experimental_avp = ''
-            experimental_avp += experimental_avp + self.generate_avp(266, 40, format(int(10415),"x").zfill(8))          #3GPP Vendor ID            
-            experimental_avp = experimental_avp + self.generate_avp(298, 40, format(int(2001),"x").zfill(8))            #DIAMETER_FIRST_REGISTRATION (2001) 
+            experimental_avp = b''
+            experimental_avp += experimental_avp + self.generate_avp(266, 40, diameterCodec.encodeUnsigned32(10415))    #3GPP Vendor ID            
+            experimental_avp = experimental_avp + self.generate_avp(298, 40, diameterCodec.encodeUnsigned32(2001))      #DIAMETER_FIRST_REGISTRATION (2001) 
             avp += self.generate_avp(297, 40, experimental_avp)                                                         #Expermental-Result
 
-        response = self.generate_diameter_packet("01", "40", 300, 16777216, packet_vars['hop-by-hop-identifier'], packet_vars['end-to-end-identifier'], avp)     #Generate Diameter packet
+        response = self.generate_diameter_packet("01", "40", 300, 16777216, packet_vars.hopByHopId, packet_vars.endToEndId, avp)     #Generate Diameter packet
         return response
 
     #3GPP Cx Server Assignment Answer
     def Answer_16777216_301(self, packet_vars, avps):
-        avp = ''                                                                                    #Initiate empty var AVP                                                                                           #Session-ID
-        session_id = self.get_avp_data(avps, 263)[0]                                                     #Get Session-ID
+        avp = b''                                                                                   #Initiate empty var AVP                                                                                           #Session-ID
+        session_id = bytes.fromhex(self.get_avp_data(avps, 263)[0])                                      #Get Session-ID
         avp += self.generate_avp(263, 40, session_id)                                                    #Set session ID to received session ID
-        avp += self.generate_avp(264, 40, self.OriginHost)                                               #Origin Host
-        avp += self.generate_avp(296, 40, self.OriginRealm)                                              #Origin Realm
-        avp += self.generate_avp(277, 40, "00000001")                                                    #Auth-Session-State (No state maintained)
+        avp += self.originAvps                                                                           #Origin Host / Realm
+        avp += self.authSessionStateAvp                                                                  #Auth-Session-State (No state maintained)
 
-        avp += self.generate_avp(260, 40, "0000010a4000000c000028af000001024000000c01000000")            #Vendor-Specific-Application-ID for Cx
+        avp += self.answerVendorSpecificApplicationIdAvps[16777216]                                      #Vendor-Specific-Application-ID for Cx
 
         OriginHost = self.get_avp_data(avps, 264)[0]                          #Get OriginHost from AVP
         OriginHost = binascii.unhexlify(OriginHost).decode('utf-8')      #Format it
@@ -2351,13 +2174,13 @@ class Diameter:
             remote_peer = binascii.unhexlify(remote_peer).decode('utf-8')           #Format it
         except:     #If we don't have a record-route set, we'll send the response to the OriginHost
             remote_peer = OriginHost
-        self.logTool.log(service='HSS', level='debug', message="[diameter.py] [Answer_16777216_301] [SAR] Remote Peer is " + str(remote_peer), redisClient=self.redisMessaging)
+        self.logTool.log(service='HSS', level='debug', message=lambda: "[diameter.py] [Answer_16777216_301] [SAR] Remote Peer is " + str(remote_peer), redisClient=self.redisMessaging)
 
         try:
             self.logTool.log(service='HSS', level='debug', message="Checking if username present", redisClient=self.redisMessaging)
             username = self.get_avp_data(avps, 601)[0]                                                     
             ims_subscriber_details = self.Get_IMS_Subscriber_Details_from_AVP(username) 
-            self.logTool.log(service='HSS', level='debug', message="Got subscriber details: " + str(ims_subscriber_details), redisClient=self.redisMessaging)
+            self.logTool.log(service='HSS', level='debug', message=lambda: "Got subscriber details: " + str(ims_subscriber_details), redisClient=self.redisMessaging)
             imsi = ims_subscriber_details['imsi']
             domain = "ims.mnc" + str(self.MNC).zfill(3) + ".mcc" + str(self.MCC).zfill(3) + ".3gppnetwork.org"
         except Exception as E:
@@ -2365,20 +2188,20 @@ class Diameter:
             self.logTool.log(service='HSS', level='debug', message=f"No known MSISDN or IMSI in Answer_16777216_301()", redisClient=self.redisMessaging)
             result_code = 5005
             #Experimental Result AVP
-            avp_experimental_result = ''
-            avp_experimental_result += self.generate_vendor_avp(266, 40, 10415, '')                         #AVP Vendor ID
-            avp_experimental_result += self.generate_avp(298, 40, self.int_to_hex(result_code, 4))          #AVP Experimental-Result-Code
+            avp_experimental_result = b''
+            avp_experimental_result += self.generate_vendor_avp(266, 40, 10415, b'')                        #AVP Vendor ID
+            avp_experimental_result += self.generate_avp(298, 40, diameterCodec.encodeUnsigned32(result_code))          #AVP Experimental-Result-Code
             avp += self.generate_avp(297, 40, avp_experimental_result)                                      #AVP Experimental-Result(297)
-            response = self.generate_diameter_packet("01", "40", 301, 16777217, packet_vars['hop-by-hop-identifier'], packet_vars['end-to-end-identifier'], avp)     #Generate Diameter packet
+            response = self.generate_diameter_packet("01", "40", 301, 16777217, packet_vars.hopByHopId, packet_vars.endToEndId, avp)     #Generate Diameter packet
             return response
 
-        avp += self.generate_avp(1, 40, str(binascii.hexlify(str.encode(str(imsi) + '@' + str(domain))),'ascii'))
+        avp += self.generate_avp(1, 40, (str(imsi) + '@' + str(domain)).encode('utf-8'))
         #Cx-User-Data (XML)
         
         #This loads a Jinja XML template as the default iFC
         templateLoader = jinja2.FileSystemLoader(searchpath="../")
         templateEnv = jinja2.Environment(loader=templateLoader)
-        self.logTool.log(service='HSS', level='debug', message="Loading iFC from path " + str(ims_subscriber_details['ifc_path']), redisClient=self.redisMessaging)
+        self.logTool.log(service='HSS', level='debug', message=lambda: "Loading iFC from path " + str(ims_subscriber_details['ifc_path']), redisClient=self.redisMessaging)
         template = templateEnv.get_template(ims_subscriber_details['ifc_path'])
         
         #These variables are passed to the template for use
@@ -2386,7 +2209,7 @@ class Diameter:
         ims_subscriber_details['mcc'] = self.MCC.zfill(3)
 
         xmlbody = template.render(iFC_vars=ims_subscriber_details)  # this is where to put args to the template renderer
-        avp += self.generate_vendor_avp(606, "c0", 10415, str(binascii.hexlify(str.encode(xmlbody)),'ascii'))
+        avp += self.generate_vendor_avp(606, "c0", 10415, xmlbody.encode('utf-8'))
         
         #Charging Information
         #avp += self.generate_vendor_avp(618, "c0", 10415, "0000026dc000001b000028af7072695f6363665f6164647265737300")
@@ -2395,10 +2218,10 @@ class Diameter:
         #Determine SAR Type & Store
         Server_Assignment_Type_Hex = self.get_avp_data(avps, 614)[0]
         Server_Assignment_Type = self.hex_to_int(Server_Assignment_Type_Hex)
-        self.logTool.log(service='HSS', level='debug', message="Server-Assignment-Type is: " + str(Server_Assignment_Type), redisClient=self.redisMessaging)
+        self.logTool.log(service='HSS', level='debug', message=lambda: "Server-Assignment-Type is: " + str(Server_Assignment_Type), redisClient=self.redisMessaging)
         ServingCSCF = self.get_avp_data(avps, 602)[0]                          #Get OriginHost from AVP
         ServingCSCF = binascii.unhexlify(ServingCSCF).decode('utf-8')      #Format it
-        self.logTool.log(service='HSS', level='debug', message="Subscriber is served by S-CSCF " + str(ServingCSCF), redisClient=self.redisMessaging)
+        self.logTool.log(service='HSS', level='debug', message=lambda: "Subscriber is served by S-CSCF " + str(ServingCSCF), redisClient=self.redisMessaging)
         if (Server_Assignment_Type == 1) or (Server_Assignment_Type == 2):
             self.logTool.log(service='HSS', level='debug', message="SAR is Register / Re-Register", redisClient=self.redisMessaging)
             remote_peer = remote_peer + ";" + str(self.config['hss']['OriginHost'])
@@ -2407,20 +2230,19 @@ class Diameter:
             self.logTool.log(service='HSS', level='debug', message="SAR is not Register", redisClient=self.redisMessaging)
             self.database.Update_Serving_CSCF(imsi, serving_cscf=None)
 
-        avp += self.generate_avp(268, 40, self.int_to_hex(2001, 4))                                 #Result Code (DIAMETER_SUCCESS (2001))
+        avp += self.resultCodeSuccessAvp                                                            #Result Code (DIAMETER_SUCCESS (2001))
 
-        response = self.generate_diameter_packet("01", "40", 301, 16777216, packet_vars['hop-by-hop-identifier'], packet_vars['end-to-end-identifier'], avp)     #Generate Diameter packet
+        response = self.generate_diameter_packet("01", "40", 301, 16777216, packet_vars.hopByHopId, packet_vars.endToEndId, avp)     #Generate Diameter packet
         return response    
 
     #3GPP Cx Location Information Answer
     def Answer_16777216_302(self, packet_vars, avps):
-        avp = ''                                                                                    #Initiate empty var AVP                                                                                           #Session-ID
-        session_id = self.get_avp_data(avps, 263)[0]                                                     #Get Session-ID
+        avp = b''                                                                                   #Initiate empty var AVP                                                                                           #Session-ID
+        session_id = bytes.fromhex(self.get_avp_data(avps, 263)[0])                                      #Get Session-ID
         avp += self.generate_avp(263, 40, session_id)                                                    #Set session ID to received session ID
-        avp += self.generate_avp(264, 40, self.OriginHost)                                                    #Origin Host
-        avp += self.generate_avp(296, 40, self.OriginRealm)
-        avp += self.generate_avp(277, 40, "00000001")                                                    #Auth Session State
-        avp += self.generate_avp(260, 40, "0000010a4000000c000028af000001024000000c01000000")            #Vendor-Specific-Application-ID for Cx
+        avp += self.originAvps                                                                           #Origin Host / Realm
+        avp += self.authSessionStateAvp                                                                  #Auth Session State
+        avp += self.answerVendorSpecificApplicationIdAvps[16777216]                                      #Vendor-Specific-Application-ID for Cx
         
         try:
             self.logTool.log(service='HSS', level='debug', message="Checking if username present", redisClient=self.redisMessaging)
@@ -2429,25 +2251,25 @@ class Diameter:
             if ims_subscriber_details['scscf'] != None:
                 self.logTool.log(service='HSS', level='debug', message="Got SCSCF on record for Sub", redisClient=self.redisMessaging)
                 #Strip double sip prefix
-                avp += self.generate_vendor_avp(602, "c0", 10415, str(binascii.hexlify(str.encode(str(ims_subscriber_details['scscf']))),'ascii'))
+                avp += self.generate_vendor_avp(602, "c0", 10415, str(ims_subscriber_details['scscf']).encode('utf-8'))
             else:
                 self.logTool.log(service='HSS', level='debug', message="No SCSF assigned - Using SCSCF Pool", redisClient=self.redisMessaging)
                 if 'scscf_pool' in self.config['hss']:
                     try:
                         scscf = random.choice(self.config['hss']['scscf_pool'])
-                        self.logTool.log(service='HSS', level='debug', message="Randomly picked SCSCF address " + str(scscf) + " from pool", redisClient=self.redisMessaging)
-                        avp += self.generate_vendor_avp(602, "c0", 10415, str(binascii.hexlify(str.encode(scscf)),'ascii'))
+                        self.logTool.log(service='HSS', level='debug', message=lambda: "Randomly picked SCSCF address " + str(scscf) + " from pool", redisClient=self.redisMessaging)
+                        avp += self.generate_vendor_avp(602, "c0", 10415, scscf.encode('utf-8'))
                     except Exception as E:
-                        avp += self.generate_vendor_avp(602, "c0", 10415, str(binascii.hexlify(str.encode("sip:scscf.ims.mnc" + str(self.MNC).zfill(3) + ".mcc" + str(self.MCC).zfill(3) + ".3gppnetwork.org")),'ascii'))
+                        avp += self.generate_vendor_avp(602, "c0", 10415, ("sip:scscf.ims.mnc" + str(self.MNC).zfill(3) + ".mcc" + str(self.MCC).zfill(3) + ".3gppnetwork.org").encode('utf-8'))
                         self.logTool.log(service='HSS', level='debug', message="Using generated iFC as failed to source from list due to " + str(E), redisClient=self.redisMessaging)
                 else:                        
-                    avp += self.generate_vendor_avp(602, "c0", 10415, str(binascii.hexlify(str.encode("sip:scscf.ims.mnc" + str(self.MNC).zfill(3) + ".mcc" + str(self.MCC).zfill(3) + ".3gppnetwork.org")),'ascii'))
+                    avp += self.generate_vendor_avp(602, "c0", 10415, ("sip:scscf.ims.mnc" + str(self.MNC).zfill(3) + ".mcc" + str(self.MCC).zfill(3) + ".3gppnetwork.org").encode('utf-8'))
                     self.logTool.log(service='HSS', level='debug', message="Using generated iFC", redisClient=self.redisMessaging)
         except Exception as E:
             self.logTool.log(service='HSS', level='debug', message="Threw Exception: " + str(E), redisClient=self.redisMessaging)
             self.logTool.log(service='HSS', level='debug', message=f"No known MSISDN or IMSI in Answer_16777216_302()", redisClient=self.redisMessaging)
             result_code = 5001
-            self.redisMessaging.sendMetric(serviceName='diameter', metricName='prom_diam_auth_event_count',
+            self.metricAggregator.sendMetric(serviceName='diameter', metricName='prom_diam_auth_event_count',
                                             metricType='counter', metricAction='inc', 
                                             metricValue=1.0, 
                                             metricLabels={
@@ -2461,15 +2283,15 @@ class Diameter:
                                             prefixHostname=self.hostname, 
                                             prefixServiceName='metric')
             #Experimental Result AVP
-            avp_experimental_result = ''
-            avp_experimental_result += self.generate_vendor_avp(266, 40, 10415, '')                         #AVP Vendor ID
-            avp_experimental_result += self.generate_avp(298, 40, self.int_to_hex(result_code, 4))          #AVP Experimental-Result-Code
+            avp_experimental_result = b''
+            avp_experimental_result += self.generate_vendor_avp(266, 40, 10415, b'')                        #AVP Vendor ID
+            avp_experimental_result += self.generate_avp(298, 40, diameterCodec.encodeUnsigned32(result_code))          #AVP Experimental-Result-Code
             avp += self.generate_avp(297, 40, avp_experimental_result)                                      #AVP Experimental-Result(297)
-            response = self.generate_diameter_packet("01", "40", 302, 16777216, packet_vars['hop-by-hop-identifier'], packet_vars['end-to-end-identifier'], avp)     #Generate Diameter packet
+            response = self.generate_diameter_packet("01", "40", 302, 16777216, packet_vars.hopByHopId, packet_vars.endToEndId, avp)     #Generate Diameter packet
             return response
         
-        avp += self.generate_avp(268, 40, "000007d1")                                                   #DIAMETER_SUCCESS
-        response = self.generate_diameter_packet("01", "40", 302, 16777216, packet_vars['hop-by-hop-identifier'], packet_vars['end-to-end-identifier'], avp)     #Generate Diameter packet
+        avp += self.resultCodeSuccessAvp                                                                #DIAMETER_SUCCESS
+        response = self.generate_diameter_packet("01", "40", 302, 16777216, packet_vars.hopByHopId, packet_vars.endToEndId, avp)     #Generate Diameter packet
         
         return response
 
@@ -2477,28 +2299,27 @@ class Diameter:
     def Answer_16777216_303(self, packet_vars, avps):
         public_identity = self.get_avp_data(avps, 601)[0]
         public_identity = binascii.unhexlify(public_identity).decode('utf-8')
-        self.logTool.log(service='HSS', level='debug', message="Got MAR for public_identity : " + str(public_identity), redisClient=self.redisMessaging)
+        self.logTool.log(service='HSS', level='debug', message=lambda: "Got MAR for public_identity : " + str(public_identity), redisClient=self.redisMessaging)
         username = self.get_avp_data(avps, 1)[0]
         username = binascii.unhexlify(username).decode('utf-8')
         imsi = username.split('@')[0]   #Strip Domain
         domain = username.split('@')[1] #Get Domain Part
-        self.logTool.log(service='HSS', level='debug', message="Got MAR username: " + str(username), redisClient=self.redisMessaging)
+        self.logTool.log(service='HSS', level='debug', message=lambda: "Got MAR username: " + str(username), redisClient=self.redisMessaging)
         auth_scheme = ''
 
-        avp = ''                                                                                    #Initiate empty var AVP
-        session_id = self.get_avp_data(avps, 263)[0]                                                     #Get Session-ID
+        avp = b''                                                                                   #Initiate empty var AVP
+        session_id = bytes.fromhex(self.get_avp_data(avps, 263)[0])                                      #Get Session-ID
         avp += self.generate_avp(263, 40, session_id)                                                    #Set session ID to received session ID
-        avp += self.generate_avp(260, 40, "0000010a4000000c000028af000001024000000c01000000")            #Vendor-Specific-Application-ID for Cx
-        avp += self.generate_avp(277, 40, "00000001")                                                    #Auth Session State
-        avp += self.generate_avp(264, 40, self.OriginHost)                                                    #Origin Host
-        avp += self.generate_avp(296, 40, self.OriginRealm)                                                   #Origin Realm        
+        avp += self.answerVendorSpecificApplicationIdAvps[16777216]                                      #Vendor-Specific-Application-ID for Cx
+        avp += self.authSessionStateAvp                                                                  #Auth Session State
+        avp += self.originAvps                                                                           #Origin Host / Realm
 
         try:
             subscriber_details = self.database.Get_Subscriber(imsi=imsi)                                               #Get subscriber details
         except:
             #Handle if the subscriber is not present in HSS return "DIAMETER_ERROR_USER_UNKNOWN"
             self.logTool.log(service='HSS', level='debug', message="Subscriber " + str(imsi) + " unknown in HSS for MAA", redisClient=self.redisMessaging)
-            self.redisMessaging.sendMetric(serviceName='diameter', metricName='prom_diam_auth_event_count',
+            self.metricAggregator.sendMetric(serviceName='diameter', metricName='prom_diam_auth_event_count',
                                             metricType='counter', metricAction='inc', 
                                             metricValue=1.0, 
                                             metricLabels={
@@ -2511,11 +2332,11 @@ class Diameter:
                                             usePrefix=True, 
                                             prefixHostname=self.hostname, 
                                             prefixServiceName='metric')
-            experimental_result = self.generate_avp(298, 40, self.int_to_hex(5001, 4))                                           #Result Code (DIAMETER ERROR - User Unknown)
-            experimental_result = experimental_result + self.generate_vendor_avp(266, 40, 10415, "")
+            experimental_result = self.generate_avp(298, 40, diameterCodec.encodeUnsigned32(5001))                               #Result Code (DIAMETER ERROR - User Unknown)
+            experimental_result = experimental_result + self.generate_vendor_avp(266, 40, 10415, b'')
             #Experimental Result (297)
             avp += self.generate_avp(297, 40, experimental_result)
-            response = self.generate_diameter_packet("01", "40", 303, 16777216, packet_vars['hop-by-hop-identifier'], packet_vars['end-to-end-identifier'], avp)     #Generate Diameter packet
+            response = self.generate_diameter_packet("01", "40", 303, 16777216, packet_vars.hopByHopId, packet_vars.endToEndId, avp)     #Generate Diameter packet
             return response
         
         self.logTool.log(service='HSS', level='debug', message="Got subscriber data for MAA OK", redisClient=self.redisMessaging)
@@ -2532,7 +2353,7 @@ class Diameter:
                 rand = binascii.unhexlify(rand)
                 self.database.Get_Vectors_AuC(subscriber_details['auc_id'], "sqn_resync", auts=auts, rand=rand)
                 self.logTool.log(service='HSS', level='debug', message="Resynced SQN in DB", redisClient=self.redisMessaging)
-                self.redisMessaging.sendMetric(serviceName='diameter', metricName='prom_diam_auth_event_count',
+                self.metricAggregator.sendMetric(serviceName='diameter', metricName='prom_diam_auth_event_count',
                                                 metricType='counter', metricAction='inc', 
                                                 metricValue=1.0, 
                                                 metricLabels={
@@ -2546,13 +2367,13 @@ class Diameter:
                                                 prefixHostname=self.hostname, 
                                                 prefixServiceName='metric')
             if sub_avp_612['avp_code'] == 608:
-                self.logTool.log(service='HSS', level='debug', message="Auth mechansim requested: " + str(sub_avp_612['misc_data']), redisClient=self.redisMessaging)
+                self.logTool.log(service='HSS', level='debug', message=lambda: "Auth mechansim requested: " + str(sub_avp_612['misc_data']), redisClient=self.redisMessaging)
                 auth_scheme = binascii.unhexlify(sub_avp_612['misc_data']).decode('utf-8')
-                self.logTool.log(service='HSS', level='debug', message="Auth mechansim requested: " + str(auth_scheme), redisClient=self.redisMessaging)
+                self.logTool.log(service='HSS', level='debug', message=lambda: "Auth mechansim requested: " + str(auth_scheme), redisClient=self.redisMessaging)
 
-        self.logTool.log(service='HSS', level='debug', message="IMSI is " + str(imsi), redisClient=self.redisMessaging)        
-        avp += self.generate_vendor_avp(601, "c0", 10415, str(binascii.hexlify(str.encode(public_identity)),'ascii'))               #Public Identity (IMSI)
-        avp += self.generate_avp(1, 40, str(binascii.hexlify(str.encode(imsi + "@" + domain)),'ascii'))                                    #Username
+        self.logTool.log(service='HSS', level='debug', message=lambda: "IMSI is " + str(imsi), redisClient=self.redisMessaging)        
+        avp += self.generate_vendor_avp(601, "c0", 10415, public_identity.encode('utf-8'))                                          #Public Identity (IMSI)
+        avp += self.generate_avp(1, 40, (imsi + "@" + domain).encode('utf-8'))                                                             #Username
 
     
 
@@ -2560,12 +2381,12 @@ class Diameter:
         if auth_scheme == "Digest-MD5":
             self.logTool.log(service='HSS', level='debug', message="Generating MD5 Challenge", redisClient=self.redisMessaging)
             vector_dict = self.database.Get_Vectors_AuC(subscriber_details['auc_id'], "Digest-MD5", username=imsi, plmn=plmn)
-            avp_SIP_Item_Number = self.generate_vendor_avp(613, "c0", 10415, format(int(0),"x").zfill(8))
-            avp_SIP_Authentication_Scheme = self.generate_vendor_avp(608, "c0", 10415, str(binascii.hexlify(b'Digest-MD5'),'ascii'))
+            avp_SIP_Item_Number = self.generate_vendor_avp(613, "c0", 10415, diameterCodec.encodeUnsigned32(0))
+            avp_SIP_Authentication_Scheme = self.generate_vendor_avp(608, "c0", 10415, b'Digest-MD5')
             #Nonce
-            avp_SIP_Authenticate = self.generate_vendor_avp(609, "c0", 10415, str(vector_dict['nonce']))
+            avp_SIP_Authenticate = self.generate_vendor_avp(609, "c0", 10415, bytes.fromhex(str(vector_dict['nonce'])))
             #Expected Response
-            avp_SIP_Authorization = self.generate_vendor_avp(610, "c0", 10415,  str(binascii.hexlify(str.encode(vector_dict['SIP_Authenticate'])),'ascii'))
+            avp_SIP_Authorization = self.generate_vendor_avp(610, "c0", 10415,  vector_dict['SIP_Authenticate'].encode('utf-8'))
             auth_data_item = avp_SIP_Item_Number + avp_SIP_Authentication_Scheme + avp_SIP_Authenticate + avp_SIP_Authorization
         else:
             self.logTool.log(service='HSS', level='debug', message="Generating AKA-MD5 Auth Challenge", redisClient=self.redisMessaging)
@@ -2575,27 +2396,27 @@ class Diameter:
             #diameter.3GPP-SIP-Auth-Data-Items:
 
             #AVP Code: 613 3GPP-SIP-Item-Number
-            avp_SIP_Item_Number = self.generate_vendor_avp(613, "c0", 10415, format(int(0),"x").zfill(8))
+            avp_SIP_Item_Number = self.generate_vendor_avp(613, "c0", 10415, diameterCodec.encodeUnsigned32(0))
             #AVP Code: 608 3GPP-SIP-Authentication-Scheme
-            avp_SIP_Authentication_Scheme = self.generate_vendor_avp(608, "c0", 10415, str(binascii.hexlify(b'Digest-AKAv1-MD5'),'ascii'))
+            avp_SIP_Authentication_Scheme = self.generate_vendor_avp(608, "c0", 10415, b'Digest-AKAv1-MD5')
             #AVP Code: 609 3GPP-SIP-Authenticate
-            avp_SIP_Authenticate = self.generate_vendor_avp(609, "c0", 10415, str(binascii.hexlify(vector_dict['SIP_Authenticate']),'ascii'))   #RAND + AUTN
+            avp_SIP_Authenticate = self.generate_vendor_avp(609, "c0", 10415, vector_dict['SIP_Authenticate'])                                  #RAND + AUTN
             #AVP Code: 610 3GPP-SIP-Authorization
-            avp_SIP_Authorization = self.generate_vendor_avp(610, "c0", 10415, str(binascii.hexlify(vector_dict['xres']),'ascii'))  #XRES
+            avp_SIP_Authorization = self.generate_vendor_avp(610, "c0", 10415, vector_dict['xres'])                                 #XRES
             #AVP Code: 625 Confidentiality-Key
-            avp_Confidentialility_Key = self.generate_vendor_avp(625, "c0", 10415, str(binascii.hexlify(vector_dict['ck']),'ascii'))  #CK
+            avp_Confidentialility_Key = self.generate_vendor_avp(625, "c0", 10415, vector_dict['ck'])                                 #CK
             #AVP Code: 626 Integrity-Key
-            avp_Integrity_Key = self.generate_vendor_avp(626, "c0", 10415, str(binascii.hexlify(vector_dict['ik']),'ascii'))          #IK
+            avp_Integrity_Key = self.generate_vendor_avp(626, "c0", 10415, vector_dict['ik'])                                         #IK
 
             auth_data_item = avp_SIP_Item_Number + avp_SIP_Authentication_Scheme + avp_SIP_Authenticate + avp_SIP_Authorization + avp_Confidentialility_Key + avp_Integrity_Key
         avp += self.generate_vendor_avp(612, "c0", 10415, auth_data_item)    #3GPP-SIP-Auth-Data-Item
             
-        avp += self.generate_vendor_avp(607, "c0", 10415, "00000001")                                    #3GPP-SIP-Number-Auth-Items
+        avp += self.generate_vendor_avp(607, "c0", 10415, diameterCodec.encodeUnsigned32(1))             #3GPP-SIP-Number-Auth-Items
 
 
-        avp += self.generate_avp(268, 40, "000007d1")                                                   #DIAMETER_SUCCESS
+        avp += self.resultCodeSuccessAvp                                                                #DIAMETER_SUCCESS
         
-        response = self.generate_diameter_packet("01", "40", 303, 16777216, packet_vars['hop-by-hop-identifier'], packet_vars['end-to-end-identifier'], avp)     #Generate Diameter packet
+        response = self.generate_diameter_packet("01", "40", 303, 16777216, packet_vars.hopByHopId, packet_vars.endToEndId, avp)     #Generate Diameter packet
         return response
 
     #Generate a Generic error handler with Result Code as input
@@ -2612,7 +2433,7 @@ class Diameter:
         for avps_to_check in avps:                                                                  #Only include AVP 260 (Vendor-Specific-Application-ID) if inital request included it
             if avps_to_check['avp_code'] == 260:
                 concat_subavp = ''
-                for sub_avp in avps_to_check['misc_data']:
+                for sub_avp in avps_to_check['sub_avps']:
                     concat_subavp += self.generate_avp(sub_avp['avp_code'], sub_avp['avp_flags'], sub_avp['misc_data'])
                 avp += self.generate_avp(260, 40, concat_subavp)        #Vendor-Specific-Application-ID
         avp += self.generate_avp(268, 40, self.int_to_hex(result_code, 4))                                                   #Response Code
@@ -2623,37 +2444,32 @@ class Diameter:
         avp_experimental_result += self.generate_avp(298, 40, self.int_to_hex(result_code, 4))                 #AVP Experimental-Result-Code: DIAMETER_ERROR_USER_UNKNOWN (5001)
         avp += self.generate_avp(297, 40, avp_experimental_result)                                      #AVP Experimental-Result(297)
 
-        response = self.generate_diameter_packet("01", "60", int(packet_vars['command_code']), int(packet_vars['ApplicationId']), packet_vars['hop-by-hop-identifier'], packet_vars['end-to-end-identifier'], avp)     #Generate Diameter packet
+        response = self.generate_diameter_packet("01", "60", packet_vars.commandCode, packet_vars.applicationId, packet_vars.hopByHopId, packet_vars.endToEndId, avp)     #Generate Diameter packet
         return response
 
     #3GPP Cx Registration Termination Answer
     def Answer_16777216_304(self, packet_vars, avps):
-        avp = ''                                                                                    #Initiate empty var AVP                                                                                           #Session-ID
-        session_id = self.get_avp_data(avps, 263)[0]                                                     #Get Session-ID
+        avp = b''                                                                                   #Initiate empty var AVP                                                                                           #Session-ID
+        session_id = bytes.fromhex(self.get_avp_data(avps, 263)[0])                                      #Get Session-ID
         avp += self.generate_avp(263, 40, session_id)                                                    #Set session ID to received session ID
-        vendor_id = self.generate_avp(266, 40, str(binascii.hexlify('10415'),'ascii'))
-        self.logTool.log(service='HSS', level='debug', message="vendor_id avp: " + str(vendor_id), redisClient=self.redisMessaging)
-        auth_application_id = self.generate_avp(248, 40, self.int_to_hex(16777252, 8))
-        self.logTool.log(service='HSS', level='debug', message="auth_application_id: " + auth_application_id, redisClient=self.redisMessaging)
-        avp += self.generate_avp(260, 40, "0000010a4000000c000028af000001024000000c01000000")            #Vendor-Specific-Application-ID for Cx
-        avp += self.generate_avp(268, 40, "000007d1")                                                   #Result Code - DIAMETER_SUCCESS
-        avp += self.generate_avp(277, 40, "00000001")                                                    #Auth Session State        
-        avp += self.generate_avp(264, 40, self.OriginHost)                                                    #Origin Host
-        avp += self.generate_avp(296, 40, self.OriginRealm)                                             #Origin Realm
+        avp += self.answerVendorSpecificApplicationIdAvps[16777216]                                      #Vendor-Specific-Application-ID for Cx
+        avp += self.resultCodeSuccessAvp                                                                 #Result Code - DIAMETER_SUCCESS
+        avp += self.authSessionStateAvp                                                                  #Auth Session State
+        avp += self.originAvps                                                                           #Origin Host / Realm
                 #* [ Proxy-Info ]
-        proxy_host_avp = self.generate_avp(280, "40", str(binascii.hexlify(b'localdomain'),'ascii'))
-        proxy_state_avp = self.generate_avp(33, "40", "0001")
+        proxy_host_avp = self.generate_avp(280, "40", b'localdomain')
+        proxy_state_avp = self.generate_avp(33, "40", bytes.fromhex("0001"))
         avp += self.generate_avp(284, "40", proxy_host_avp + proxy_state_avp)                 #Proxy-Info  AVP ( 284 )
 
         #* [ Route-Record ]
-        avp += self.generate_avp(282, "40", str(binascii.hexlify(b'localdomain'),'ascii'))
+        avp += self.generate_avp(282, "40", b'localdomain')
         
-        response = self.generate_diameter_packet("01", "40", 304, 16777216, packet_vars['hop-by-hop-identifier'], packet_vars['end-to-end-identifier'], avp)     #Generate Diameter packet
+        response = self.generate_diameter_packet("01", "40", 304, 16777216, packet_vars.hopByHopId, packet_vars.endToEndId, avp)     #Generate Diameter packet
         return response
 
     #3GPP Sh User-Data Answer
     def Answer_16777217_306(self, packet_vars, avps):
-        avp = ''                                                                                    #Initiate empty var AVP                                                                                           #Session-ID
+        avp = b''                                                                                   #Initiate empty var AVP                                                                                           #Session-ID
 
         #Define values so we can check if they've been changed
         msisdn = None
@@ -2662,10 +2478,10 @@ class Diameter:
         username = None
         try:
             user_identity_avp = self.get_avp_data(avps, 700)[0]
-            msisdn = self.get_avp_data(user_identity_avp, 701)[0]                                                         #Get MSISDN from AVP in request
-            self.logTool.log(service='HSS', level='debug', message="Got raw MSISDN with value " + str(msisdn), redisClient=self.redisMessaging)
+            msisdn = [sub_avp['misc_data'] for sub_avp in user_identity_avp if sub_avp['avp_code'] == 701][0]             #Get MSISDN from AVP in request
+            self.logTool.log(service='HSS', level='debug', message=lambda: "Got raw MSISDN with value " + str(msisdn), redisClient=self.redisMessaging)
             msisdn = self.TBCD_decode(msisdn)
-            self.logTool.log(service='HSS', level='debug', message="Got MSISDN with value " + str(msisdn), redisClient=self.redisMessaging)
+            self.logTool.log(service='HSS', level='debug', message=lambda: "Got MSISDN with value " + str(msisdn), redisClient=self.redisMessaging)
         except:
             self.logTool.log(service='HSS', level='debug', message="No MSISDN", redisClient=self.redisMessaging)
         try:
@@ -2677,7 +2493,7 @@ class Diameter:
                 self.logTool.log(service='HSS', level='debug', message="Getting subscriber IMS info based on MSISDN", redisClient=self.redisMessaging)
                 try:
                     subscriber_ims_details = self.database.Get_IMS_Subscriber(msisdn=msisdn)
-                    self.logTool.log(service='HSS', level='debug', message="Got subscriber IMS details: " + str(subscriber_ims_details), redisClient=self.redisMessaging)
+                    self.logTool.log(service='HSS', level='debug', message=lambda: "Got subscriber IMS details: " + str(subscriber_ims_details), redisClient=self.redisMessaging)
                     self.logTool.log(service='HSS', level='debug', message="Getting subscriber info based on MSISDN", redisClient=self.redisMessaging)
                     subscriber_details = self.database.Get_Subscriber(msisdn=msisdn)
                     imsi = subscriber_details.get('imsi', None)
@@ -2686,23 +2502,23 @@ class Diameter:
                         imsUserState = 1
                     else:
                         imsUserState = 0
-                    self.logTool.log(service='HSS', level='debug', message="Got subscriber details: " + str(subscriber_details), redisClient=self.redisMessaging)
+                    self.logTool.log(service='HSS', level='debug', message=lambda: "Got subscriber details: " + str(subscriber_details), redisClient=self.redisMessaging)
                     subscriber_details = {**subscriber_details, **subscriber_ims_details, 'imsUserState': imsUserState}
-                    self.logTool.log(service='HSS', level='debug', message="Merged subscriber details: " + str(subscriber_details), redisClient=self.redisMessaging)
+                    self.logTool.log(service='HSS', level='debug', message=lambda: "Merged subscriber details: " + str(subscriber_details), redisClient=self.redisMessaging)
                 except Exception as e:
                     self.logTool.log(service='HSS', level='debug', message=f"No subscriber found for MSISDN {msisdn}", redisClient=self.redisMessaging)
                     result_code = 5001
                     #Experimental Result AVP
-                    avp_experimental_result = ''
-                    avp_experimental_result += self.generate_vendor_avp(266, 40, 10415, '')                         #AVP Vendor ID
-                    avp_experimental_result += self.generate_avp(298, 40, self.int_to_hex(result_code, 4))          #AVP Experimental-Result-Code
+                    avp_experimental_result = b''
+                    avp_experimental_result += self.generate_vendor_avp(266, 40, 10415, b'')                        #AVP Vendor ID
+                    avp_experimental_result += self.generate_avp(298, 40, diameterCodec.encodeUnsigned32(result_code))          #AVP Experimental-Result-Code
                     avp += self.generate_avp(297, 40, avp_experimental_result)                                      #AVP Experimental-Result(297)
-                    response = self.generate_diameter_packet("01", "40", 306, 16777217, packet_vars['hop-by-hop-identifier'], packet_vars['end-to-end-identifier'], avp)     #Generate Diameter packet
+                    response = self.generate_diameter_packet("01", "40", 306, 16777217, packet_vars.hopByHopId, packet_vars.endToEndId, avp)     #Generate Diameter packet
                     return response
         else:
             self.logTool.log(service='HSS', level='error', message="No MSISDN or IMSI in Sh User-Data-Answer input", redisClient=self.redisMessaging)
             if username is not None:
-                self.redisMessaging.sendMetric(serviceName='diameter', metricName='prom_diam_auth_event_count',
+                self.metricAggregator.sendMetric(serviceName='diameter', metricName='prom_diam_auth_event_count',
                                                 metricType='counter', metricAction='inc', 
                                                 metricValue=1.0, 
                                                 metricLabels={
@@ -2717,37 +2533,36 @@ class Diameter:
                                                 prefixServiceName='metric')
             result_code = 5001
             #Experimental Result AVP
-            avp_experimental_result = ''
-            avp_experimental_result += self.generate_vendor_avp(266, 40, 10415, '')                         #AVP Vendor ID
-            avp_experimental_result += self.generate_avp(298, 40, self.int_to_hex(result_code, 4))          #AVP Experimental-Result-Code
+            avp_experimental_result = b''
+            avp_experimental_result += self.generate_vendor_avp(266, 40, 10415, b'')                        #AVP Vendor ID
+            avp_experimental_result += self.generate_avp(298, 40, diameterCodec.encodeUnsigned32(result_code))          #AVP Experimental-Result-Code
             avp += self.generate_avp(297, 40, avp_experimental_result)                                      #AVP Experimental-Result(297)
-            response = self.generate_diameter_packet("01", "40", 306, 16777217, packet_vars['hop-by-hop-identifier'], packet_vars['end-to-end-identifier'], avp)     #Generate Diameter packet
+            response = self.generate_diameter_packet("01", "40", 306, 16777217, packet_vars.hopByHopId, packet_vars.endToEndId, avp)     #Generate Diameter packet
             return response
         
-        session_id = self.get_avp_data(avps, 263)[0]                                                     #Get Session-ID
+        session_id = bytes.fromhex(self.get_avp_data(avps, 263)[0])                                      #Get Session-ID
         avp += self.generate_avp(263, 40, session_id)                                                    #Set session ID to received session ID
-        avp += self.generate_avp(264, 40, self.OriginHost)                                               #Origin Host
-        avp += self.generate_avp(296, 40, self.OriginRealm)                                              #Origin Realm
-        avp += self.generate_avp(277, 40, "00000001")                                                    #Auth-Session-State (No state maintained)
+        avp += self.originAvps                                                                           #Origin Host / Realm
+        avp += self.authSessionStateAvp                                                                  #Auth-Session-State (No state maintained)
         
-        avp += self.generate_avp(260, 40, "0000010a4000000c000028af000001024000000c01000001")            #Vendor-Specific-Application-ID for Cx
+        avp += self.answerVendorSpecificApplicationIdAvps[16777217]                                      #Vendor-Specific-Application-ID for Sh
 
         #Sh-User-Data (XML)
         #This loads a Jinja XML template containing the Sh-User-Data
         sh_userdata_template = self.config['hss']['Default_Sh_UserData']
-        self.logTool.log(service='HSS', level='debug', message="Using template " + str(sh_userdata_template) + " for SH user data", redisClient=self.redisMessaging)
+        self.logTool.log(service='HSS', level='debug', message=lambda: "Using template " + str(sh_userdata_template) + " for SH user data", redisClient=self.redisMessaging)
         template = self.templateEnv.get_template(sh_userdata_template)
         #These variables are passed to the template for use
         subscriber_details['mnc'] = self.MNC.zfill(3)
         subscriber_details['mcc'] = self.MCC.zfill(3)
 
-        self.logTool.log(service='HSS', level='debug', message="Rendering template with values: " + str(subscriber_details), redisClient=self.redisMessaging)
+        self.logTool.log(service='HSS', level='debug', message=lambda: "Rendering template with values: " + str(subscriber_details), redisClient=self.redisMessaging)
         xmlbody = template.render(Sh_template_vars=subscriber_details)
-        avp += self.generate_vendor_avp(702, "c0", 10415, str(binascii.hexlify(str.encode(xmlbody)),'ascii'))
+        avp += self.generate_vendor_avp(702, "c0", 10415, xmlbody.encode('utf-8'))
         
-        avp += self.generate_avp(268, 40, "000007d1")                                                   #DIAMETER_SUCCESS
+        avp += self.resultCodeSuccessAvp                                                                #DIAMETER_SUCCESS
 
-        response = self.generate_diameter_packet("01", "40", 306, 16777217, packet_vars['hop-by-hop-identifier'], packet_vars['end-to-end-identifier'], avp)     #Generate Diameter packet
+        response = self.generate_diameter_packet("01", "40", 306, 16777217, packet_vars.hopByHopId, packet_vars.endToEndId, avp)     #Generate Diameter packet
         
         return response
 
@@ -2763,25 +2578,24 @@ class Diameter:
         sh_user_data = self.get_avp_data(avps, 702)[0]                                                        #Get IMSI from User-Name AVP in request
         sh_user_data = binascii.unhexlify(sh_user_data).decode('utf-8')
 
-        self.logTool.log(service='HSS', level='debug', message="Got Sh User data: " + str(sh_user_data), redisClient=self.redisMessaging)
+        self.logTool.log(service='HSS', level='debug', message=lambda: "Got Sh User data: " + str(sh_user_data), redisClient=self.redisMessaging)
 
         #Push updated User Data into IMS Backend
         #Start with the Current User Data
         subscriber_ims_details = self.database.Get_IMS_Subscriber(imsi=imsi)
         self.database.UpdateObj(self.database.IMS_SUBSCRIBER, {'xcap_profile': sh_user_data}, subscriber_ims_details['ims_subscriber_id'])
 
-        avp = ''                                                                                    #Initiate empty var AVP                                                                                           #Session-ID
-        session_id = self.get_avp_data(avps, 263)[0]                                                     #Get Session-ID
+        avp = b''                                                                                   #Initiate empty var AVP                                                                                           #Session-ID
+        session_id = bytes.fromhex(self.get_avp_data(avps, 263)[0])                                      #Get Session-ID
         avp += self.generate_avp(263, 40, session_id)                                                    #Set session ID to received session ID
-        avp += self.generate_avp(264, 40, self.OriginHost)                                               #Origin Host
-        avp += self.generate_avp(296, 40, self.OriginRealm)                                              #Origin Realm
-        avp += self.generate_avp(277, 40, "00000001")                                                    #Auth-Session-State (No state maintained)
+        avp += self.originAvps                                                                           #Origin Host / Realm
+        avp += self.authSessionStateAvp                                                                  #Auth-Session-State (No state maintained)
         #AVP: Vendor-Specific-Application-Id(260) l=32 f=-M-
-        VendorSpecificApplicationId = ''
-        VendorSpecificApplicationId += self.generate_vendor_avp(266, 40, 10415, '')                     #AVP Vendor ID
-        VendorSpecificApplicationId += self.generate_avp(258, 40, format(int(16777217),"x").zfill(8))   #Auth-Application-ID Sh
+        VendorSpecificApplicationId = b''
+        VendorSpecificApplicationId += self.generate_vendor_avp(266, 40, 10415, b'')                    #AVP Vendor ID
+        VendorSpecificApplicationId += self.generate_avp(258, 40, diameterCodec.encodeUnsigned32(16777217))   #Auth-Application-ID Sh
         avp += self.generate_avp(260, 40, VendorSpecificApplicationId) 
-        response = self.generate_diameter_packet("01", "40", 307, 16777217, packet_vars['hop-by-hop-identifier'], packet_vars['end-to-end-identifier'], avp)     #Generate Diameter packet
+        response = self.generate_diameter_packet("01", "40", 307, 16777217, packet_vars.hopByHopId, packet_vars.endToEndId, avp)     #Generate Diameter packet
         return response
 
     ################################
@@ -2795,14 +2609,13 @@ class Diameter:
             Generates a response to a provided AAR.
             The response is determined by whether or not the subscriber is enabled, and has a matching ims_subscriber entry.
             """
-            avp = ''
+            avp = b''
             sessionId = bytes.fromhex(self.get_avp_data(avps, 263)[0]).decode('ascii')                                          #Get Session-ID
-            avp += self.generate_avp(263, 40, self.string_to_hex(sessionId))                                                    #Set session ID to received session ID
-            avp += self.generate_avp(258, 40, format(int(16777236),"x").zfill(8))
-            avp += self.generate_avp(264, 40, self.OriginHost)                                               #Origin Host
-            avp += self.generate_avp(296, 40, self.OriginRealm)                                              #Origin Realm
+            avp += self.generate_avp(263, 40, sessionId.encode('ascii'))                                                    #Set session ID to received session ID
+            avp += self.generate_avp(258, 40, diameterCodec.encodeUnsigned32(16777236))
+            avp += self.originAvps                                                             #Origin Host / Realm
             subscriptionId = bytes.fromhex(self.get_avp_data(avps, 444)[0]).decode('ascii')
-            self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [Answer_16777236_265] [AAA] Received subscription ID: {subscriptionId}", redisClient=self.redisMessaging)
+            self.logTool.log(service='HSS', level='debug', message=lambda: f"[diameter.py] [Answer_16777236_265] [AAA] Received subscription ID: {subscriptionId}", redisClient=self.redisMessaging)
             subscriptionId = subscriptionId.replace('sip:', '')
             imsi = None
             msisdn = None
@@ -2849,7 +2662,7 @@ class Diameter:
                         subscriberId = ue.get('subscriber_id', None)
                         subscriberDetails = self.database.Get_Subscriber(subscriber_id=subscriberId)
                         imsi = subscriberDetails.get('imsi', None)
-                        self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [Answer_16777236_265] [AAA] Found IMSI {imsi} by IP: {ueIP}", redisClient=self.redisMessaging)
+                        self.logTool.log(service='HSS', level='debug', message=lambda: f"[diameter.py] [Answer_16777236_265] [AAA] Found IMSI {imsi} by IP: {ueIP}", redisClient=self.redisMessaging)
                     except Exception as e:
                         pass
             else:
@@ -2861,11 +2674,11 @@ class Diameter:
                     subscriberId = ue.get('subscriber_id', None)
                     subscriberDetails = self.database.Get_Subscriber(subscriber_id=subscriberId)
                     imsi = subscriberDetails.get('imsi', None)
-                    self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [Answer_16777236_265] [AAA] Found IMSI {imsi} by IP: {ueIP}", redisClient=self.redisMessaging)
+                    self.logTool.log(service='HSS', level='debug', message=lambda: f"[diameter.py] [Answer_16777236_265] [AAA] Found IMSI {imsi} by IP: {ueIP}", redisClient=self.redisMessaging)
                 except Exception as e:
                     pass
 
-            self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [Answer_16777236_265] [AAA] IMSI: {imsi}\nMSISDN: {msisdn}", redisClient=self.redisMessaging)
+            self.logTool.log(service='HSS', level='debug', message=lambda: f"[diameter.py] [Answer_16777236_265] [AAA] IMSI: {imsi}\nMSISDN: {msisdn}", redisClient=self.redisMessaging)
             imsEnabled = self.validateImsSubscriber(imsi=imsi, msisdn=msisdn)
 
             if imsEnabled or emergencySubscriber:
@@ -2944,13 +2757,13 @@ class Diameter:
                         # Extract the SDP for both Uplink and Downlink, to create TFTs.
                         try:
                             sdpOffer = self.get_avp_data(avps, 524)[0]
-                            self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [Answer_16777236_265] [AAA] Got SDP Offer raw: {sdpOffer}", redisClient=self.redisMessaging)
+                            self.logTool.log(service='HSS', level='debug', message=lambda: f"[diameter.py] [Answer_16777236_265] [AAA] Got SDP Offer raw: {sdpOffer}", redisClient=self.redisMessaging)
                             sdpOffer = binascii.unhexlify(sdpOffer).decode('utf-8')
-                            self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [Answer_16777236_265] [AAA] Got SDP Offer decoded: {sdpOffer}", redisClient=self.redisMessaging)
+                            self.logTool.log(service='HSS', level='debug', message=lambda: f"[diameter.py] [Answer_16777236_265] [AAA] Got SDP Offer decoded: {sdpOffer}", redisClient=self.redisMessaging)
                             sdpAnswer = self.get_avp_data(avps, 524)[1]
-                            self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [Answer_16777236_265] [AAA] Got SDP Answer raw: {sdpAnswer}", redisClient=self.redisMessaging)
+                            self.logTool.log(service='HSS', level='debug', message=lambda: f"[diameter.py] [Answer_16777236_265] [AAA] Got SDP Answer raw: {sdpAnswer}", redisClient=self.redisMessaging)
                             sdpAnswer = binascii.unhexlify(sdpAnswer).decode('utf-8')
-                            self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [Answer_16777236_265] [AAA] Got SDP Answer decoded: {sdpAnswer}", redisClient=self.redisMessaging)
+                            self.logTool.log(service='HSS', level='debug', message=lambda: f"[diameter.py] [Answer_16777236_265] [AAA] Got SDP Answer decoded: {sdpAnswer}", redisClient=self.redisMessaging)
 
                             regexIpv4 = r"IN IP4 (\d*\.\d*\.\d*\.\d*)"
                             regexIpv6 = r"IN IP6 ([0-9a-fA-F:]{3,39})"
@@ -3053,10 +2866,10 @@ class Diameter:
                                 "accessNetworkGatewayAddress": emergencySubscriberData.get('access_network_gateway_address'),
                                 "accessNetworkChargingAddress": emergencySubscriberData.get('access_network_charging_address'),
                             }
-                            self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [Answer_16777236_265] [AAA] Updating Emergency Subscriber: {updatedEmergencySubscriberData}", redisClient=self.redisMessaging)
+                            self.logTool.log(service='HSS', level='debug', message=lambda: f"[diameter.py] [Answer_16777236_265] [AAA] Updating Emergency Subscriber: {updatedEmergencySubscriberData}", redisClient=self.redisMessaging)
                             self.database.Update_Emergency_Subscriber(subscriberIp=ueIp, subscriberData=updatedEmergencySubscriberData, imsi=imsi)
 
-                        self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [Answer_16777236_265] [AAA] RAR Generated to be sent to serving PGW: {servingPgw} via peer {servingPgwPeer}", redisClient=self.redisMessaging)
+                        self.logTool.log(service='HSS', level='debug', message=lambda: f"[diameter.py] [Answer_16777236_265] [AAA] RAR Generated to be sent to serving PGW: {servingPgw} via peer {servingPgwPeer}", redisClient=self.redisMessaging)
                         reAuthAnswer = self.awaitDiameterRequestAndResponse(
                                 requestType='RAR',
                                 hostname=servingPgwPeer,
@@ -3068,42 +2881,41 @@ class Diameter:
                         )
 
                         if not len(reAuthAnswer) > 0:
-                            self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [Answer_16777236_265] [AAA] RAA Timeout: {reAuthAnswer}", redisClient=self.redisMessaging)
+                            self.logTool.log(service='HSS', level='debug', message=lambda: f"[diameter.py] [Answer_16777236_265] [AAA] RAA Timeout: {reAuthAnswer}", redisClient=self.redisMessaging)
                             assert()
                             
                         raaPacketVars, raaAvps = self.decode_diameter_packet(reAuthAnswer)
                         raaResultCode = int(self.get_avp_data(raaAvps, 268)[0], 16)
 
                         if raaResultCode == 2001:
-                            avp += self.generate_avp(268, 40, self.int_to_hex(2001, 4))
+                            avp += self.resultCodeSuccessAvp
                             self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [Answer_16777236_265] [AAA] RAA returned Successfully, authorizing request", redisClient=self.redisMessaging)
                         else:
-                            avp += self.generate_avp(268, 40, self.int_to_hex(4001, 4))
+                            avp += self.generate_avp(268, 40, diameterCodec.encodeUnsigned32(4001))
                             self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [Answer_16777236_265] [AAA] RAA returned Unauthorized, declining request", redisClient=self.redisMessaging)
 
                     except Exception as e:
                         self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [Answer_16777236_265] [AAA] Error processing RAR / RAA, Authorizing request: {traceback.format_exc()}", redisClient=self.redisMessaging)
-                        avp += self.generate_avp(268, 40, self.int_to_hex(2001, 4))
+                        avp += self.resultCodeSuccessAvp
                     
                 except Exception as e:
-                    avp += self.generate_avp(268, 40, self.int_to_hex(2001, 4))
+                    avp += self.resultCodeSuccessAvp
                     pass
             else:
                 self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [Answer_16777236_265] [AAA] Request unauthorized", redisClient=self.redisMessaging)
-                avp += self.generate_avp(268, 40, self.int_to_hex(4001, 4))
+                avp += self.generate_avp(268, 40, diameterCodec.encodeUnsigned32(4001))
 
-            response = self.generate_diameter_packet("01", "40", 265, 16777236, packet_vars['hop-by-hop-identifier'], packet_vars['end-to-end-identifier'], avp)     #Generate Diameter packet
+            response = self.generate_diameter_packet("01", "40", 265, 16777236, packet_vars.hopByHopId, packet_vars.endToEndId, avp)     #Generate Diameter packet
             return response
         except Exception as e:
             self.logTool.log(service='HSS', level='error', message=f"[diameter.py] [Answer_16777236_265] [AAA] Error generating AAA: {traceback.format_exc()}", redisClient=self.redisMessaging)
-            avp = ''
-            session_id = self.get_avp_data(avps, 263)[0]                                                     #Get Session-ID
+            avp = b''
+            session_id = bytes.fromhex(self.get_avp_data(avps, 263)[0])                                      #Get Session-ID
             avp += self.generate_avp(263, 40, session_id)                                                    #Set session ID to received session ID
-            avp += self.generate_avp(258, 40, format(int(16777236),"x").zfill(8))
-            avp += self.generate_avp(264, 40, self.OriginHost)                                               #Origin Host
-            avp += self.generate_avp(296, 40, self.OriginRealm)                                              #Origin Realm
-            avp += self.generate_avp(268, 40, self.int_to_hex(5012, 4))                                      #Result Code 5012 UNABLE_TO_COMPLY
-            response = self.generate_diameter_packet("01", "40", 265, 16777236, packet_vars['hop-by-hop-identifier'], packet_vars['end-to-end-identifier'], avp)     #Generate Diameter packet
+            avp += self.generate_avp(258, 40, diameterCodec.encodeUnsigned32(16777236))
+            avp += self.originAvps                                                             #Origin Host / Realm
+            avp += self.generate_avp(268, 40, diameterCodec.encodeUnsigned32(5012))                                      #Result Code 5012 UNABLE_TO_COMPLY
+            response = self.generate_diameter_packet("01", "40", 265, 16777236, packet_vars.hopByHopId, packet_vars.endToEndId, avp)     #Generate Diameter packet
             return response
 
     #3GPP Rx - Re Auth Answer (RAA)
@@ -3113,14 +2925,13 @@ class Diameter:
             Generates a response to a provided RAR.
             The response is determined by whether or not the subscriber is enabled, and has a matching ims_subscriber entry.
             """
-            avp = ''
-            session_id = self.get_avp_data(avps, 263)[0]                                                     #Get Session-ID
+            avp = b''
+            session_id = bytes.fromhex(self.get_avp_data(avps, 263)[0])                                      #Get Session-ID
             avp += self.generate_avp(263, 40, session_id)                                                    #Set session ID to received session ID
-            avp += self.generate_avp(258, 40, format(int(16777236),"x").zfill(8))
-            avp += self.generate_avp(264, 40, self.OriginHost)                                               #Origin Host
-            avp += self.generate_avp(296, 40, self.OriginRealm)                                              #Origin Realm
+            avp += self.generate_avp(258, 40, diameterCodec.encodeUnsigned32(16777236))
+            avp += self.originAvps                                                             #Origin Host / Realm
             subscriptionId = bytes.fromhex(self.get_avp_data(avps, 444)[0]).decode('ascii')
-            self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [Answer_16777236_258] [RAA] Received subscription ID: {subscriptionId}", redisClient=self.redisMessaging)
+            self.logTool.log(service='HSS', level='debug', message=lambda: f"[diameter.py] [Answer_16777236_258] [RAA] Received subscription ID: {subscriptionId}", redisClient=self.redisMessaging)
             subscriptionId = subscriptionId.replace('sip:', '')
             imsi = None
             msisdn = None
@@ -3145,28 +2956,27 @@ class Diameter:
             else:
                 imsi = None
                 msisdn = None
-            self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [Answer_16777236_258] [RAA] IMSI: {imsi}\nMSISDN: {msisdn}", redisClient=self.redisMessaging)
+            self.logTool.log(service='HSS', level='debug', message=lambda: f"[diameter.py] [Answer_16777236_258] [RAA] IMSI: {imsi}\nMSISDN: {msisdn}", redisClient=self.redisMessaging)
             imsEnabled = self.validateImsSubscriber(imsi=imsi, msisdn=msisdn)
 
             if imsEnabled:
                 self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [Answer_16777236_258] [RAA] Request authorized", redisClient=self.redisMessaging)
-                avp += self.generate_avp(268, 40, self.int_to_hex(2001, 4))
+                avp += self.resultCodeSuccessAvp
             else:
                 self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [Answer_16777236_258] [RAA] Request unauthorized", redisClient=self.redisMessaging)
-                avp += self.generate_avp(268, 40, self.int_to_hex(4001, 4))
+                avp += self.generate_avp(268, 40, diameterCodec.encodeUnsigned32(4001))
 
-            response = self.generate_diameter_packet("01", "40", 258, 16777236, packet_vars['hop-by-hop-identifier'], packet_vars['end-to-end-identifier'], avp)     #Generate Diameter packet
+            response = self.generate_diameter_packet("01", "40", 258, 16777236, packet_vars.hopByHopId, packet_vars.endToEndId, avp)     #Generate Diameter packet
             return response
         except Exception as e:
             self.logTool.log(service='HSS', level='error', message=f"[diameter.py] [Answer_16777236_258] [RAA] Error generating RAA: {traceback.format_exc()}", redisClient=self.redisMessaging)
-            avp = ''
-            session_id = self.get_avp_data(avps, 263)[0]                                                     #Get Session-ID
+            avp = b''
+            session_id = bytes.fromhex(self.get_avp_data(avps, 263)[0])                                      #Get Session-ID
             avp += self.generate_avp(263, 40, session_id)                                                    #Set session ID to received session ID
-            avp += self.generate_avp(258, 40, format(int(16777236),"x").zfill(8))
-            avp += self.generate_avp(264, 40, self.OriginHost)                                               #Origin Host
-            avp += self.generate_avp(296, 40, self.OriginRealm)                                              #Origin Realm
-            avp += self.generate_avp(268, 40, self.int_to_hex(5012, 4))                                      #Result Code 5012 UNABLE_TO_COMPLY
-            response = self.generate_diameter_packet("01", "40", 258, 16777236, packet_vars['hop-by-hop-identifier'], packet_vars['end-to-end-identifier'], avp)     #Generate Diameter packet
+            avp += self.generate_avp(258, 40, diameterCodec.encodeUnsigned32(16777236))
+            avp += self.originAvps                                                             #Origin Host / Realm
+            avp += self.generate_avp(268, 40, diameterCodec.encodeUnsigned32(5012))                                      #Result Code 5012 UNABLE_TO_COMPLY
+            response = self.generate_diameter_packet("01", "40", 258, 16777236, packet_vars.hopByHopId, packet_vars.endToEndId, avp)     #Generate Diameter packet
             return response
 
     #3GPP Rx - Session Termination Answer (STA)
@@ -3175,11 +2985,10 @@ class Diameter:
             """
             Triggers a Re-Auth-Request to the PGW, the returns a Session Termination Answer.
             """
-            avp = ''
+            avp = b''
             sessionId = bytes.fromhex(self.get_avp_data(avps, 263)[0]).decode('ascii')                                          #Get Session-ID
-            avp += self.generate_avp(263, 40, self.string_to_hex(sessionId))                                                    #Set session ID to received session ID
-            avp += self.generate_avp(264, 40, self.OriginHost)                                               #Origin Host
-            avp += self.generate_avp(296, 40, self.OriginRealm)                                              #Origin Realm
+            avp += self.generate_avp(263, 40, sessionId.encode('ascii'))                                                    #Set session ID to received session ID
+            avp += self.originAvps                                                             #Origin Host / Realm
             servingApn = None
             try:
                 imsSubscriber = self.database.Get_IMS_Subscriber_By_Session_Id(sessionId=sessionId)
@@ -3209,7 +3018,7 @@ class Diameter:
                 emergencySubscriberData = self.database.Get_Emergency_Subscriber(rxSessionId=sessionId)
                 if emergencySubscriberData:
                     emergencySubscriber = True
-                    self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [Answer_16777236_265] [STA] Found emergency subscriber with Rx Session: {sessionId}", redisClient=self.redisMessaging)
+                    self.logTool.log(service='HSS', level='debug', message=lambda: f"[diameter.py] [Answer_16777236_265] [STA] Found emergency subscriber with Rx Session: {sessionId}", redisClient=self.redisMessaging)
             except Exception as e:
                 self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [Answer_16777236_265] [STA] Error getting Emergency Subscriber Data: {traceback.format_exc()}", redisClient=self.redisMessaging)
                 emergencySubscriberData = None
@@ -3232,34 +3041,33 @@ class Diameter:
                 )
             
                 if not len(reAuthAnswer) > 0:
-                    self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [Answer_16777236_265] [STA] RAA Timeout: {reAuthAnswer}", redisClient=self.redisMessaging)
+                    self.logTool.log(service='HSS', level='debug', message=lambda: f"[diameter.py] [Answer_16777236_265] [STA] RAA Timeout: {reAuthAnswer}", redisClient=self.redisMessaging)
                     assert()
                 
                 raaPacketVars, raaAvps = self.decode_diameter_packet(reAuthAnswer)
                 raaResultCode = int(self.get_avp_data(raaAvps, 268)[0], 16)
 
                 if raaResultCode == 2001:
-                    avp += self.generate_avp(268, 40, self.int_to_hex(2001, 4))
+                    avp += self.resultCodeSuccessAvp
                     self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [Answer_16777236_265] [STA] RAA returned Successfully, authorizing request", redisClient=self.redisMessaging)
                 else:
-                    avp += self.generate_avp(268, 40, self.int_to_hex(5001, 4))
+                    avp += self.generate_avp(268, 40, diameterCodec.encodeUnsigned32(5001))
                     self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [Answer_16777236_265] [STA] RAA returned Unauthorized, returning Result-Code 5001", redisClient=self.redisMessaging)
 
             else:
                 self.logTool.log(service='HSS', level='info', message=f"[diameter.py] [Answer_16777236_275] [STA] Unable to find serving APN for RAR, returning Result-Code 2001", redisClient=self.redisMessaging)
 
-            avp += self.generate_avp(268, 40, self.int_to_hex(2001, 4))
-            response = self.generate_diameter_packet("01", "40", 275, 16777236, packet_vars['hop-by-hop-identifier'], packet_vars['end-to-end-identifier'], avp)     #Generate Diameter packet
+            avp += self.resultCodeSuccessAvp
+            response = self.generate_diameter_packet("01", "40", 275, 16777236, packet_vars.hopByHopId, packet_vars.endToEndId, avp)     #Generate Diameter packet
             return response
         except Exception as e:
             self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [Answer_16777236_275] [STA] Error generating STA, returning 2001", redisClient=self.redisMessaging)
-            avp = ''
-            sessionId = self.get_avp_data(avps, 263)[0]                                                       #Get Session-ID
+            avp = b''
+            sessionId = bytes.fromhex(self.get_avp_data(avps, 263)[0])                                        #Get Session-ID
             avp += self.generate_avp(263, 40, sessionId)                                                    #Set session ID to received session ID
-            avp += self.generate_avp(264, 40, self.OriginHost)                                               #Origin Host
-            avp += self.generate_avp(296, 40, self.OriginRealm)                                              #Origin Realm
-            avp += self.generate_avp(268, 40, self.int_to_hex(2001, 4))
-            response = self.generate_diameter_packet("01", "40", 275, 16777236, packet_vars['hop-by-hop-identifier'], packet_vars['end-to-end-identifier'], avp)     #Generate Diameter packet
+            avp += self.originAvps                                                             #Origin Host / Realm
+            avp += self.resultCodeSuccessAvp
+            response = self.generate_diameter_packet("01", "40", 275, 16777236, packet_vars.hopByHopId, packet_vars.endToEndId, avp)     #Generate Diameter packet
             return response
 
     #3GPP Rx - Abort Session Answer (ASA)
@@ -3269,13 +3077,12 @@ class Diameter:
             Generates a response to a provided ASR.
             Returns Result-Code 2001.
             """
-            avp = ''
-            session_id = self.get_avp_data(avps, 263)[0]                                                     #Get Session-ID
+            avp = b''
+            session_id = bytes.fromhex(self.get_avp_data(avps, 263)[0])                                      #Get Session-ID
             avp += self.generate_avp(263, 40, session_id)                                                    #Set session ID to received session ID
-            avp += self.generate_avp(264, 40, self.OriginHost)                                               #Origin Host
-            avp += self.generate_avp(296, 40, self.OriginRealm)                                              #Origin Realm
-            avp += self.generate_avp(268, 40, self.int_to_hex(2001, 4))
-            response = self.generate_diameter_packet("01", "40", 274, 16777236, packet_vars['hop-by-hop-identifier'], packet_vars['end-to-end-identifier'], avp)     #Generate Diameter packet
+            avp += self.originAvps                                                             #Origin Host / Realm
+            avp += self.resultCodeSuccessAvp
+            response = self.generate_diameter_packet("01", "40", 274, 16777236, packet_vars.hopByHopId, packet_vars.endToEndId, avp)     #Generate Diameter packet
             return response
         except Exception as e:
             self.logTool.log(service='HSS', level='error', message=f"[diameter.py] [Answer_16777236_274] [STA] Error generating STA: {traceback.format_exc()}", redisClient=self.redisMessaging)
@@ -3284,13 +3091,12 @@ class Diameter:
     # Re Auth Answer
     def Answer_16777238_258(self, packet_vars, avps):
         try:
-            avp = ''
-            session_id = self.get_avp_data(avps, 263)[0]                                                     #Get Session-ID
+            avp = b''
+            session_id = bytes.fromhex(self.get_avp_data(avps, 263)[0])                                      #Get Session-ID
             avp += self.generate_avp(263, 40, session_id)                                                    #Set session ID to received session ID
-            avp += self.generate_avp(264, 40, self.OriginHost)                                               #Origin Host
-            avp += self.generate_avp(296, 40, self.OriginRealm)                                              #Origin Realm
-            avp += self.generate_avp(268, 40, self.int_to_hex(2001, 4))
-            response = self.generate_diameter_packet("01", "40", 274, 16777236, packet_vars['hop-by-hop-identifier'], packet_vars['end-to-end-identifier'], avp)     #Generate Diameter packet
+            avp += self.originAvps                                                             #Origin Host / Realm
+            avp += self.resultCodeSuccessAvp
+            response = self.generate_diameter_packet("01", "40", 274, 16777236, packet_vars.hopByHopId, packet_vars.endToEndId, avp)     #Generate Diameter packet
             return response
         except Exception as e:
             self.logTool.log(service='HSS', level='error', message=f"[diameter.py] [Answer_16777236_274] [RAA] Error generating RAA: {traceback.format_exc()}", redisClient=self.redisMessaging)
@@ -3303,8 +3109,8 @@ class Diameter:
             imei = ''
             imsi = self.get_avp_data(avps, 1)[0]                                                            #Get IMSI from User-Name AVP in request
             imsi = binascii.unhexlify(imsi).decode('utf-8')                                                 #Convert IMSI
-            #avp += self.generate_avp(1, 40, self.string_to_hex(imsi))                                      #Username (IMSI)
-            self.logTool.log(service='HSS', level='debug', message="Got IMSI with value " + str(imsi), redisClient=self.redisMessaging)
+            #avp += self.generate_avp(1, 40, imsi.encode('utf-8'))                                      #Username (IMSI)
+            self.logTool.log(service='HSS', level='debug', message=lambda: "Got IMSI with value " + str(imsi), redisClient=self.redisMessaging)
         except Exception as e:
             self.logTool.log(service='HSS', level='debug', message="Failed to get IMSI from LCS-Routing-Info-Request", redisClient=self.redisMessaging)
             self.logTool.log(service='HSS', level='debug', message="Error was: " + str(e), redisClient=self.redisMessaging)
@@ -3312,28 +3118,27 @@ class Diameter:
         try:
             #Get IMEI
             for sub_avp in self.get_avp_data(avps, 1401)[0]:
-                self.logTool.log(service='HSS', level='debug', message="Evaluating sub_avp AVP " + str(sub_avp) + " to find IMSI", redisClient=self.redisMessaging)
+                self.logTool.log(service='HSS', level='debug', message=lambda: "Evaluating sub_avp AVP " + str(sub_avp) + " to find IMSI", redisClient=self.redisMessaging)
                 if sub_avp['avp_code'] == 1402:
                     imei = binascii.unhexlify(sub_avp['misc_data']).decode('utf-8')
-                    self.logTool.log(service='HSS', level='debug', message="Found IMEI " + str(imei), redisClient=self.redisMessaging)
+                    self.logTool.log(service='HSS', level='debug', message=lambda: "Found IMEI " + str(imei), redisClient=self.redisMessaging)
 
-            avp = ''                                                                                        #Initiate empty var AVP
-            session_id = self.get_avp_data(avps, 263)[0]                                                    #Get Session-ID
+            avp = b''                                                                                       #Initiate empty var AVP
+            session_id = bytes.fromhex(self.get_avp_data(avps, 263)[0])                                     #Get Session-ID
             avp += self.generate_avp(263, 40, session_id)                                                   #Set session ID to received session ID
-            avp += self.generate_avp(260, 40, "0000010a4000000c000028af000001024000000c01000024")           #Vendor-Specific-Application-ID for S13
-            avp += self.generate_avp(277, 40, "00000001")                                                   #Auth Session State        
-            avp += self.generate_avp(264, 40, self.OriginHost)                                              #Origin Host
-            avp += self.generate_avp(296, 40, self.OriginRealm)                                             #Origin Realm
+            avp += self.answerVendorSpecificApplicationIdAvps[16777252]                                     #Vendor-Specific-Application-ID for S13
+            avp += self.authSessionStateAvp                                                                 #Auth Session State        
+            avp += self.originAvps                                                                          #Origin Host / Realm
             #Experimental Result AVP(Response Code for Failure)
-            avp_experimental_result = ''
-            avp_experimental_result += self.generate_vendor_avp(266, 'c0', 10415, '')                         #AVP Vendor ID
-            avp_experimental_result += self.generate_avp(298, 'c0', self.int_to_hex(2001, 4))                 #AVP Experimental-Result-Code: SUCESS (2001)
-            avp += self.generate_avp(268, 40, self.int_to_hex(2001, 4))                                 #Result Code (DIAMETER_SUCCESS (2001))
+            avp_experimental_result = b''
+            avp_experimental_result += self.generate_vendor_avp(266, 'c0', 10415, b'')                        #AVP Vendor ID
+            avp_experimental_result += self.generate_avp(298, 'c0', diameterCodec.encodeUnsigned32(2001))     #AVP Experimental-Result-Code: SUCESS (2001)
+            avp += self.resultCodeSuccessAvp                                                                  #Result Code (DIAMETER_SUCCESS (2001))
 
             #Equipment-Status
             EquipmentStatus = self.database.Check_EIR(imsi=imsi, imei=imei)
-            avp += self.generate_vendor_avp(1445, 'c0', 10415, self.int_to_hex(EquipmentStatus, 4))
-            self.redisMessaging.sendMetric(serviceName='diameter', metricName='prom_diam_eir_event_count',
+            avp += self.generate_vendor_avp(1445, 'c0', 10415, diameterCodec.encodeUnsigned32(EquipmentStatus))
+            self.metricAggregator.sendMetric(serviceName='diameter', metricName='prom_diam_eir_event_count',
                                     metricType='counter', metricAction='inc', 
                                     metricValue=1.0, 
                                     metricLabels={
@@ -3347,22 +3152,21 @@ class Diameter:
             self.logTool.log(service='HSS', level='error', message=traceback.format_exc(), redisClient=self.redisMessaging)
 
 
-        response = self.generate_diameter_packet("01", "40", 324, 16777252, packet_vars['hop-by-hop-identifier'], packet_vars['end-to-end-identifier'], avp)     #Generate Diameter packet
+        response = self.generate_diameter_packet("01", "40", 324, 16777252, packet_vars.hopByHopId, packet_vars.endToEndId, avp)     #Generate Diameter packet
         return response
 
     #3GPP SLh - LCS-Routing-Info-Answer
     def Answer_16777291_8388622(self, packet_vars, avps):
-        avp = '' 
-        session_id = self.get_avp_data(avps, 263)[0]                                                    #Get Session-ID
+        avp = b''
+        session_id = bytes.fromhex(self.get_avp_data(avps, 263)[0])                                     #Get Session-ID
         avp += self.generate_avp(263, 40, session_id)                                                   #Set session    ID to received session ID
         #AVP: Vendor-Specific-Application-Id(260) l=32 f=-M-
-        VendorSpecificApplicationId = ''
-        VendorSpecificApplicationId += self.generate_vendor_avp(266, 40, 10415, '')                     #AVP Vendor ID
-        VendorSpecificApplicationId += self.generate_avp(258, 40, format(int(16777291),"x").zfill(8))   #Auth-Application-ID SLh
+        VendorSpecificApplicationId = b''
+        VendorSpecificApplicationId += self.generate_vendor_avp(266, 40, 10415, b'')                    #AVP Vendor ID
+        VendorSpecificApplicationId += self.generate_avp(258, 40, diameterCodec.encodeUnsigned32(16777291))   #Auth-Application-ID SLh
         avp += self.generate_avp(260, 40, VendorSpecificApplicationId)   
-        avp += self.generate_avp(277, 40, "00000001")                                                   #Auth Session State (NO_STATE_MAINTAINED)        
-        avp += self.generate_avp(264, 40, self.OriginHost)                                              #Origin Host
-        avp += self.generate_avp(296, 40, self.OriginRealm)                                             #Origin Realm
+        avp += self.authSessionStateAvp                                                                 #Auth Session State (NO_STATE_MAINTAINED)        
+        avp += self.originAvps                                                                          #Origin Host / Realm
 
         #Create list of valid AVPs
         present_avps = []
@@ -3379,8 +3183,8 @@ class Diameter:
             try:
                 imsi = self.get_avp_data(avps, 1)[0]                                                            #Get IMSI from User-Name AVP in request
                 imsi = binascii.unhexlify(imsi).decode('utf-8')                                                 #Convert IMSI
-                avp += self.generate_avp(1, 40, self.string_to_hex(imsi))                                       #Username (IMSI)
-                self.logTool.log(service='HSS', level='debug', message="Got IMSI with value " + str(imsi), redisClient=self.redisMessaging)
+                avp += self.generate_avp(1, 40, imsi.encode('utf-8'))                                           #Username (IMSI)
+                self.logTool.log(service='HSS', level='debug', message=lambda: "Got IMSI with value " + str(imsi), redisClient=self.redisMessaging)
             except Exception as e:
                 self.logTool.log(service='HSS', level='debug', message="Failed to get IMSI from LCS-Routing-Info-Request", redisClient=self.redisMessaging)
                 self.logTool.log(service='HSS', level='debug', message="Error was: " + str(e), redisClient=self.redisMessaging)
@@ -3388,11 +3192,11 @@ class Diameter:
             #Try and get MSISDN if present
             try:
                 msisdn = self.get_avp_data(avps, 701)[0]                                                          #Get MSISDN from AVP in request
-                self.logTool.log(service='HSS', level='debug', message="Got MSISDN with value " + str(msisdn), redisClient=self.redisMessaging)
-                avp += self.generate_vendor_avp(701, 'c0', 10415, self.get_avp_data(avps, 701)[0])                     #MSISDN
-                self.logTool.log(service='HSS', level='debug', message="Got MSISDN with encoded value " + str(msisdn), redisClient=self.redisMessaging)
+                self.logTool.log(service='HSS', level='debug', message=lambda: "Got MSISDN with value " + str(msisdn), redisClient=self.redisMessaging)
+                avp += self.generate_vendor_avp(701, 'c0', 10415, bytes.fromhex(self.get_avp_data(avps, 701)[0]))      #MSISDN
+                self.logTool.log(service='HSS', level='debug', message=lambda: "Got MSISDN with encoded value " + str(msisdn), redisClient=self.redisMessaging)
                 msisdn = self.TBCD_decode(msisdn)
-                self.logTool.log(service='HSS', level='debug', message="Got MSISDN with decoded value " + str(msisdn), redisClient=self.redisMessaging)
+                self.logTool.log(service='HSS', level='debug', message=lambda: "Got MSISDN with decoded value " + str(msisdn), redisClient=self.redisMessaging)
             except Exception as e:
                 self.logTool.log(service='HSS', level='debug', message="Failed to get MSISDN from LCS-Routing-Info-Request", redisClient=self.redisMessaging)
                 self.logTool.log(service='HSS', level='debug', message="Error was: " + str(e), redisClient=self.redisMessaging)
@@ -3403,23 +3207,23 @@ class Diameter:
             if imsi is not None:
                     self.logTool.log(service='HSS', level='debug', message="Getting subscriber location based on IMSI", redisClient=self.redisMessaging)
                     subscriber_details = self.database.Get_Subscriber(imsi=imsi)
-                    self.logTool.log(service='HSS', level='debug', message="Got subscriber_details from IMSI: " + str(subscriber_details), redisClient=self.redisMessaging)
+                    self.logTool.log(service='HSS', level='debug', message=lambda: "Got subscriber_details from IMSI: " + str(subscriber_details), redisClient=self.redisMessaging)
             elif msisdn is not None:
                     self.logTool.log(service='HSS', level='debug', message="Getting subscriber location based on MSISDN", redisClient=self.redisMessaging)
                     subscriber_details = self.database.Get_Subscriber(msisdn=msisdn)
-                    self.logTool.log(service='HSS', level='debug', message="Got subscriber_details from MSISDN: " + str(subscriber_details), redisClient=self.redisMessaging)
+                    self.logTool.log(service='HSS', level='debug', message=lambda: "Got subscriber_details from MSISDN: " + str(subscriber_details), redisClient=self.redisMessaging)
         except Exception as E:
             self.logTool.log(service='HSS', level='debug', message="No MSISDN or IMSI returned in Answer_16777291_8388622 input", redisClient=self.redisMessaging)
             self.logTool.log(service='HSS', level='debug', message="Error is " + str(E), redisClient=self.redisMessaging)
             self.logTool.log(service='HSS', level='debug', message="Responding with DIAMETER_ERROR_USER_UNKNOWN", redisClient=self.redisMessaging)
-            avp += self.generate_avp(268, 40, self.int_to_hex(5030, 4))
-            response = self.generate_diameter_packet("01", "40", 8388622, 16777291, packet_vars['hop-by-hop-identifier'], packet_vars['end-to-end-identifier'], avp)     #Generate Diameter packet
+            avp += self.generate_avp(268, 40, diameterCodec.encodeUnsigned32(5030))
+            response = self.generate_diameter_packet("01", "40", 8388622, 16777291, packet_vars.hopByHopId, packet_vars.endToEndId, avp)     #Generate Diameter packet
             self.logTool.log(service='HSS', level='debug', message="Diameter user unknown - Sending ULA with DIAMETER_ERROR_USER_UNKNOWN", redisClient=self.redisMessaging)
             return response
 
 
         
-        self.logTool.log(service='HSS', level='debug', message="Got subscriber_details for subscriber: " + str(subscriber_details), redisClient=self.redisMessaging)
+        self.logTool.log(service='HSS', level='debug', message=lambda: "Got subscriber_details for subscriber: " + str(subscriber_details), redisClient=self.redisMessaging)
 
         
         if subscriber_details['serving_mme'] == None:
@@ -3430,28 +3234,28 @@ class Diameter:
             #This result code shall be sent by the HSS to indicate that the location of the targeted user is not known at this time to
             #satisfy the requested operation. 
 
-            avp_experimental_result = ''
-            avp_experimental_result += self.generate_vendor_avp(266, 40, 10415, '')                         #AVP Vendor ID
-            avp_experimental_result += self.generate_avp(298, 40, self.int_to_hex(result_code, 4))          #AVP Experimental-Result-Code
+            avp_experimental_result = b''
+            avp_experimental_result += self.generate_vendor_avp(266, 40, 10415, b'')                        #AVP Vendor ID
+            avp_experimental_result += self.generate_avp(298, 40, diameterCodec.encodeUnsigned32(result_code))          #AVP Experimental-Result-Code
             avp += self.generate_avp(297, 40, avp_experimental_result)                                      #AVP Experimental-Result(297)
             
-            response = self.generate_diameter_packet("01", "40", 8388622, 16777291, packet_vars['hop-by-hop-identifier'], packet_vars['end-to-end-identifier'], avp)     #Generate Diameter packet
+            response = self.generate_diameter_packet("01", "40", 8388622, 16777291, packet_vars.hopByHopId, packet_vars.endToEndId, avp)     #Generate Diameter packet
             return response
 
 
 
         #Serving Node AVP
-        avp_serving_node = ''
-        avp_serving_node += self.generate_vendor_avp(2402, "c0", 10415, self.string_to_hex(subscriber_details['serving_mme']))            #MME-Name
-        avp_serving_node += self.generate_vendor_avp(2408, "c0", 10415, self.OriginRealm)                                   #MME-Realm
-        avp_serving_node += self.generate_vendor_avp(2405, "c0", 10415, self.ip_to_hex(self.config['hss']['bind_ip'][0]))                        #GMLC-Address
+        avp_serving_node = b''
+        avp_serving_node += self.generate_vendor_avp(2402, "c0", 10415, subscriber_details['serving_mme'].encode('utf-8'))                #MME-Name
+        avp_serving_node += self.generate_vendor_avp(2408, "c0", 10415, self.OriginRealmBytes)                              #MME-Realm
+        avp_serving_node += self.generate_vendor_avp(2405, "c0", 10415, diameterCodec.encodeAddress(self.config['hss']['bind_ip'][0]))           #GMLC-Address
         avp += self.generate_vendor_avp(2401, "c0", 10415, avp_serving_node)                                                #Serving-Node  AVP
 
         #Set Result-Code
         result_code = 2001                                                                                                  #Diameter Success
-        avp += self.generate_avp(268, 40, self.int_to_hex(result_code, 4))                                                  #Result Code - DIAMETER_SUCCESS
+        avp += self.generate_avp(268, 40, diameterCodec.encodeUnsigned32(result_code))                                      #Result Code - DIAMETER_SUCCESS
 
-        response = self.generate_diameter_packet("01", "40", 8388622, 16777291, packet_vars['hop-by-hop-identifier'], packet_vars['end-to-end-identifier'], avp)     #Generate Diameter packet
+        response = self.generate_diameter_packet("01", "40", 8388622, 16777291, packet_vars.hopByHopId, packet_vars.endToEndId, avp)     #Generate Diameter packet
         return response
         
     #### Diameter Requests ####
@@ -3626,7 +3430,7 @@ class Diameter:
 
         try:
             subscriber_details = self.database.Get_Subscriber(imsi=imsi)                                               #Get subscriber details
-            self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [Request_16777251_319] [ISD] Got subscriber data: {subscriber_details}", redisClient=self.redisMessaging)
+            self.logTool.log(service='HSS', level='debug', message=lambda: f"[diameter.py] [Request_16777251_319] [ISD] Got subscriber data: {subscriber_details}", redisClient=self.redisMessaging)
 
         except ValueError as e:
             self.logTool.log(service='HSS', level='debug', message="[diameter.py] [Request_16777251_319] [ISD]failed to get data backfrom database for imsi " + str(imsi), redisClient=self.redisMessaging)
@@ -3752,26 +3556,26 @@ class Diameter:
 
         #If MSISDN is present include it in Subscription Data
         if 'msisdn' in subscriber_details:
-            self.logTool.log(service='HSS', level='debug', message="MSISDN is " + str(subscriber_details['msisdn']) + " - adding in IDR", redisClient=self.redisMessaging)
+            self.logTool.log(service='HSS', level='debug', message=lambda: "MSISDN is " + str(subscriber_details['msisdn']) + " - adding in IDR", redisClient=self.redisMessaging)
             msisdn_avp = self.generate_vendor_avp(701, 'c0', 10415, self.string_to_hex(str(subscriber_details['msisdn'])))                     #MSISDN
             self.logTool.log(service='HSS', level='debug', message=msisdn_avp, redisClient=self.redisMessaging)
             subscription_data += msisdn_avp
 
         if 'RAT_freq_priorityID' in subscriber_details:
-            self.logTool.log(service='HSS', level='debug', message="RAT_freq_priorityID is " + str(subscriber_details['RAT_freq_priorityID']) + " - Adding in IDR", redisClient=self.redisMessaging)
+            self.logTool.log(service='HSS', level='debug', message=lambda: "RAT_freq_priorityID is " + str(subscriber_details['RAT_freq_priorityID']) + " - Adding in IDR", redisClient=self.redisMessaging)
             rat_freq_priorityID = self.generate_vendor_avp(1440, "C0", 10415, self.int_to_hex(int(subscriber_details['RAT_freq_priorityID']), 4))                              #RAT-Frequency-Selection-Priority ID
             self.logTool.log(service='HSS', level='debug', message=rat_freq_priorityID, redisClient=self.redisMessaging)
             subscription_data += rat_freq_priorityID
 
         if '3gpp-charging-characteristics' in subscriber_details:
-            self.logTool.log(service='HSS', level='debug', message="3gpp-charging-characteristics " + str(subscriber_details['3gpp-charging-characteristics']) + " - Adding in IDR", redisClient=self.redisMessaging)
+            self.logTool.log(service='HSS', level='debug', message=lambda: "3gpp-charging-characteristics " + str(subscriber_details['3gpp-charging-characteristics']) + " - Adding in IDR", redisClient=self.redisMessaging)
             _3gpp_charging_characteristics = self.generate_vendor_avp(13, "80", 10415, self.string_to_hex(str(subscriber_details['3gpp-charging-characteristics'])))
             subscription_data += _3gpp_charging_characteristics
             self.logTool.log(service='HSS', level='debug', message=_3gpp_charging_characteristics, redisClient=self.redisMessaging)
 
             
         if 'APN_OI_replacement' in subscriber_details:
-            self.logTool.log(service='HSS', level='debug', message="APN_OI_replacement " + str(subscriber_details['APN_OI_replacement']) + " - Adding in IDR", redisClient=self.redisMessaging)
+            self.logTool.log(service='HSS', level='debug', message=lambda: "APN_OI_replacement " + str(subscriber_details['APN_OI_replacement']) + " - Adding in IDR", redisClient=self.redisMessaging)
             subscription_data += self.generate_vendor_avp(1427, "C0", 10415, self.string_to_hex(str(subscriber_details['APN_OI_replacement'])))
 
         avp += self.generate_vendor_avp(1400, "c0", 10415, subscription_data)                            #Subscription-Data
@@ -4052,12 +3856,12 @@ class Diameter:
         #Setup Charging Rule
         self.logTool.log(service='HSS', level='debug', message=chargingRules, redisClient=self.redisMessaging)
         if chargingRules is not None and ueIp is not None:
-            self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [Request_16777238_258] [RAR] Charging Rules: {chargingRules}", redisClient=self.redisMessaging)
+            self.logTool.log(service='HSS', level='debug', message=lambda: f"[diameter.py] [Request_16777238_258] [RAR] Charging Rules: {chargingRules}", redisClient=self.redisMessaging)
             avp += self.Charging_Rule_Generator(ChargingRules=chargingRules, ue_ip=ueIp)
             self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [Request_16777238_258] [RAR] Generated Charging Rules", redisClient=self.redisMessaging)
         elif chargingRuleName is not None and chargingRuleAction == 'remove':
             avp += self.Charging_Rule_Generator(action=chargingRuleAction, chargingRuleName=chargingRuleName)
-            self.logTool.log(service='HSS', level='debug', message=f"[diameter.py] [Request_16777238_258] [RAR] Removing Charging Rule: {chargingRuleName}", redisClient=self.redisMessaging)
+            self.logTool.log(service='HSS', level='debug', message=lambda: f"[diameter.py] [Request_16777238_258] [RAR] Removing Charging Rule: {chargingRuleName}", redisClient=self.redisMessaging)
 
         avp += self.generate_avp(264, 40, self.OriginHost)                                               #Origin Host
         avp += self.generate_avp(296, 40, self.OriginRealm)                                              #Origin Realm
@@ -4150,12 +3954,12 @@ class Diameter:
 
         self.logTool.log(service='HSS', level='debug', message="Getting subscriber IMS info based on MSISDN", redisClient=self.redisMessaging)
         subscriber_ims_details = self.database.Get_IMS_Subscriber(msisdn=msisdn)
-        self.logTool.log(service='HSS', level='debug', message="Got subscriber IMS details: " + str(subscriber_ims_details), redisClient=self.redisMessaging)
+        self.logTool.log(service='HSS', level='debug', message=lambda: "Got subscriber IMS details: " + str(subscriber_ims_details), redisClient=self.redisMessaging)
         self.logTool.log(service='HSS', level='debug', message="Getting subscriber info based on MSISDN", redisClient=self.redisMessaging)
         subscriber_details = self.database.Get_Subscriber(msisdn=msisdn)
-        self.logTool.log(service='HSS', level='debug', message="Got subscriber details: " + str(subscriber_details), redisClient=self.redisMessaging)
+        self.logTool.log(service='HSS', level='debug', message=lambda: "Got subscriber details: " + str(subscriber_details), redisClient=self.redisMessaging)
         subscriber_details = {**subscriber_details, **subscriber_ims_details}
-        self.logTool.log(service='HSS', level='debug', message="Merged subscriber details: " + str(subscriber_details), redisClient=self.redisMessaging)
+        self.logTool.log(service='HSS', level='debug', message=lambda: "Merged subscriber details: " + str(subscriber_details), redisClient=self.redisMessaging)
 
         avp += self.generate_avp(1, 40, str(binascii.hexlify(str.encode(subscriber_details['imsi'])),'ascii'))                 #Username AVP
 
@@ -4164,13 +3968,13 @@ class Diameter:
         templateLoader = jinja2.FileSystemLoader(searchpath="./")
         templateEnv = jinja2.Environment(loader=templateLoader)
         sh_userdata_template = self.config['hss']['Default_Sh_UserData']
-        self.logTool.log(service='HSS', level='debug', message="Using template " + str(sh_userdata_template) + " for SH user data", redisClient=self.redisMessaging)
+        self.logTool.log(service='HSS', level='debug', message=lambda: "Using template " + str(sh_userdata_template) + " for SH user data", redisClient=self.redisMessaging)
         template = templateEnv.get_template(sh_userdata_template)
         #These variables are passed to the template for use
         subscriber_details['mnc'] = self.MNC.zfill(3)
         subscriber_details['mcc'] = self.MCC.zfill(3)
 
-        self.logTool.log(service='HSS', level='debug', message="Rendering template with values: " + str(subscriber_details), redisClient=self.redisMessaging)
+        self.logTool.log(service='HSS', level='debug', message=lambda: "Rendering template with values: " + str(subscriber_details), redisClient=self.redisMessaging)
         xmlbody = template.render(Sh_template_vars=subscriber_details)  # this is where to put args to the template renderer
         avp += self.generate_vendor_avp(702, "c0", 10415, str(binascii.hexlify(str.encode(xmlbody)),'ascii'))
         
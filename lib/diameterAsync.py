@@ -1,9 +1,10 @@
 #Diameter Packet Decoder / Encoder & Tools
 import math
 import asyncio
-import yaml
+import yaml, json
 import socket
 from messagingAsync import RedisMessagingAsync
+import diameterCodec
 
 
 class DiameterAsync:
@@ -44,6 +45,22 @@ class DiameterAsync:
         self.logTool = logTool
         self.hostname = socket.gethostname()
 
+        self.mnc = self.config.get('hss', {}).get('MNC', '999')
+        self.mcc = self.config.get('hss', {}).get('MCC', '999')
+        self.originRealm = self.config.get('hss', {}).get('OriginRealm', f'mnc{self.mnc}.mcc{self.mcc}.3gppnetwork.org')
+        self.originHost = self.config.get('hss', {}).get('OriginHost', f'hss01')
+        self.productName = self.config.get('hss', {}).get('ProductName', f'PyHSS')
+        self.originAvps = diameterCodec.encodeAvp(264, 0x40, self.originHost.encode('utf-8')) + diameterCodec.encodeAvp(296, 0x40, self.originRealm.encode('utf-8'))
+        resultCodeSuccessAvp = diameterCodec.encodeAvp(268, 0x40, diameterCodec.encodeUnsigned32(2001))
+        capabilitiesAvps = diameterCodec.encodeCapabilitiesAvps(str(self.productName).encode('utf-8'), self.config.get('hss', {}).get('bind_ip', ['0.0.0.0']))
+        #Base protocol answer templates, matching those built by diameter.py, so CER / DWR / DPR can be answered without a round trip to hssService
+        self.ceaTemplate = diameterCodec.AnswerTemplate(0x00, 257, 0, leadingAvps=resultCodeSuccessAvp + self.originAvps, trailingAvps=capabilitiesAvps)
+        self.dwaTemplate = diameterCodec.AnswerTemplate(0x00, 280, 0, leadingAvps=resultCodeSuccessAvp + self.originAvps)
+        self.dpaTemplate = diameterCodec.AnswerTemplate(0x00, 282, 0, leadingAvps=self.originAvps + resultCodeSuccessAvp)
+        self.tooBusyResultCodeAvp = diameterCodec.encodeAvp(268, 0x40, diameterCodec.encodeUnsigned32(3004))
+        #OC-Supported-Features, advertising the loss abatement algorithm (OLR_DEFAULT_ALGO)
+        self.ocSupportedFeaturesAvp = diameterCodec.encodeAvp(621, 0x00, diameterCodec.encodeAvp(622, 0x00, diameterCodec.encodeUnsigned64(1)))
+
     #Generates rounding for calculating padding
     async def myRound(self, n, base=4):
         if(n > 0):
@@ -53,180 +70,58 @@ class DiameterAsync:
         else:
             return 4
 
-    async def roundUpToMultiple(self, n, multiple):
-        return ((n + multiple - 1) // multiple) * multiple
-
     async def getAvpData(self, avps, avp_code):
-        #Loops through list of dicts generated by the packet decoder, and returns the data for a specific AVP code in list (May be more than one AVP with same code but different data)
+        #Looks up the AVP index built by the packet decoder, and returns the data for a specific AVP code in list (May be more than one AVP with same code but different data)
         misc_data = []
-        for keys in avps:
-            if keys['avp_code'] == avp_code:
-                misc_data.append(keys['misc_data'])
+        for avp in avps.find(avp_code):
+            misc_data.append(avp['misc_data'])
         return misc_data
 
-    async def validateSingleAvp(self, data) -> bool:
-        """
-        Attempts to validate a single hex string diameter AVP as being an AVP.
-        """
-        try:
-            avpCode = int(data[0:8], 16)
-            # The next byte contains the AVP Flags
-            avpFlags = data[8:10]
-            # The next 3 bytes contain the AVP Length
-            avpLength = int(data[10:16], 16)
-            if avpFlags not in ['80', '40', '20', '00', 'c0']:
-                #print(f"[AVP VALIDATION] Failed to validate due to invalid Flag: {data}")
-                return False
-            if int(len(data[16:]) / 2) < ((avpLength - 8)):
-                #print(f"[AVP VALIDATION] Failed to validate due to invalid length: {data}")
-                return False
-            return True
-        except Exception as e:
-            return False
-
+    async def getAvpValue(self, avps, avp_code):
+        #Same lookup as getAvpData, but returns values decoded by their dictionary type (str, int, bytes or sub-AVPs)
+        return [avp.value for avp in avps.find(avp_code)]
 
     async def decodeDiameterPacket(self, data):
         """
         Handles decoding of a full diameter packet.
+        Returns the packet vars dictionary and a list of top level DiameterAvp objects.
         """
-        packet_vars = {}
-        avps = []
-
-        if type(data) is bytes:
-            data = data.hex()
-        # One byte is 2 hex characters
-        # First Byte is the Diameter Packet Version
-        packet_vars['packet_version'] = data[0:2]
-        # Next 3 Bytes are the length of the entire Diameter packet
-        packet_vars['length'] = int(data[2:8], 16)
-        # Next Byte is the Diameter Flags
-        packet_vars['flags'] = data[8:10]
-        packet_vars['flags_bin'] = bin(int(data[8:10], 16))[2:].zfill(8)
-        # Next 3 Bytes are the Diameter Command Code
-        packet_vars['command_code'] = int(data[10:16], 16)
-        # Next 4 Bytes are the Application Id
-        packet_vars['ApplicationId'] = int(data[16:24], 16)
-        # Next 4 Bytes are the Hop By Hop Identifier
-        packet_vars['hop-by-hop-identifier'] = data[24:32]
-        # Next 4 Bytes are the End to End Identifier
-        packet_vars['end-to-end-identifier'] = data[32:40]
-
-        #We're enforcing correct length, and calculate the end byte based on the length of the remaining AVPs and the known 'length' packet var.
-
-        lengthOfDiameterVars = int(len(data[:40]) / 2)
-        #print(f"Length of Diameter Vars (Bytes): {lengthOfDiameterVars}")
-
-        #Length of all AVPs, in bytes
-        avpLength = int(packet_vars['length'] - lengthOfDiameterVars)
-        #print(f"avpLength (bytes): {avpLength}")
-        avpCharLength = int((avpLength * 2))
-        #print(f"avpCharLength (chars): {avpCharLength}")
-        #print(f"Total Data Length (bytes) {len(data) / 2}")
-        remaining_avps = data[40:]
-
-        #print(remaining_avps)
-
-        avps = await self.decodeAvpPacket(remaining_avps)
-        #print(f"Got Back: {avps}")
-
-        return packet_vars, avps
+        if type(data) is str:
+            data = bytes.fromhex(data)
+        return diameterCodec.decodeDiameterPacket(data)
 
     async def decodeAvpPacket(self, data):
         """
-        Returns a list of decoded AVP Packet dictionaries.
+        Returns a list of decoded DiameterAvp objects from a block of AVPs, supplied as bytes or a hex string.
         """
-        processed_avps = []
-        # Initialize a failsafe counter, to prevent packets that pass validation but aren't AVPs from causing an infinite loop
-        failsafeCounter = 0
+        if type(data) is str:
+            data = bytes.fromhex(data)
+        buffer = memoryview(data)
+        return diameterCodec.decodeAvps(buffer, 0, len(buffer))
 
-        # If the avp data is 8 bytes (16 chars) or less, it's invalid.
-        if len(data) < 16:
-            return []
-
-        # Keep processing AVPs until they're all dealt with
-        while len(data) > 16:
-            try:
-                failsafeCounter += 1
-
-                if failsafeCounter > 100:
-                    break
-                avp_vars = {}
-                #print(f"AVP Data: {data}")
-                # The first 4 bytes contains the AVP code
-                avp_vars['avp_code'] = int(data[0:8], 16)
-                # The next byte contains the AVP Flags
-                avp_vars['avp_flags'] = data[8:10]
-                # The next 3 bytes contains the AVP Length
-                avp_vars['avp_length'] = int(data[10:16], 16)
-                #print(f"Individual AVP Length: {avp_vars['avp_length']}")
-                # The remaining bytes (until the end, defined by avp_length) is the AVP payload.
-                # Padding is excluded from avp_length. It's calculated separately, and unknown by the AVP itself.
-                # We calculate the avp payload length (in bytes) by subtracting 8, because the avp headers are always 8 bytes long. 
-                # The result is then multiplied by 2 to give us chars.
-                avpPayloadLength = int((avp_vars['avp_length'])*2)
-                #print(f"AVP Payload Length (Chars): {avpPayloadLength}")
-
-                # Work out our vendor id and add the payload itself (misc_data)
-                if avp_vars['avp_code'] == 266:
-                    avp_vars['vendor_id'] = int(data[16:24], 16)
-                    avp_vars['misc_data'] = data[16:avpPayloadLength]
-                else:
-                    avp_vars['vendor_id'] = ''
-                    avp_vars['misc_data'] = data[16:avpPayloadLength]
-
-                # Rounds up the length to the nearest multiple of 4, which we can differential against the avp length to give us the padding length (if required)
-                avp_padded_length = int((await(self.roundUpToMultiple(avp_vars['avp_length'], 4))))
-                # avp_padded_length = (avp_vars['avp_length'] + 3) // 4 * 4 
-                avpPaddingLength = ((avp_padded_length - avp_vars['avp_length']) * 2)
-                #print(f"AVP Padding length (Chars): {avpPaddingLength}")
-
-                avp_vars['sub_avps'] = []
-
-                # Check if the payload data contains sub or grouped AVPs inside
-                payloadContainsSubAvps = await(self.validateSingleAvp(avp_vars['misc_data']))
-
-                if payloadContainsSubAvps:
-                    # If the payload contains sub or grouped AVPs, assign misc_data to sub_avps to start working through them
-                    sub_avp_data = avp_vars['misc_data']
-
-                while payloadContainsSubAvps:
-                    failsafeCounter += 1
-
-                    if failsafeCounter > 100:
-                        break
-                    sub_avp = {}
-                    sub_avp['avp_code'] = int(sub_avp_data[0:8], 16)
-                    sub_avp['avp_flags'] = sub_avp_data[8:10]
-                    sub_avp['avp_length'] = int(sub_avp_data[10:16], 16)
-                    sub_avpPayloadLength = int((sub_avp['avp_length'])*2)
-
-                    if sub_avp['avp_code'] == 266:
-                        sub_avp['vendor_id'] = int(sub_avp_data[16:24], 16)
-                        sub_avp['misc_data'] = sub_avp_data[16:sub_avpPayloadLength]
-                    else:
-                        sub_avp['vendor_id'] = ''
-                        sub_avp['misc_data'] = sub_avp_data[16:sub_avpPayloadLength]
-
-                    avp_vars['sub_avps'].append(sub_avp)
-
-                    #print(f"Sub Avp Data before trimming: {sub_avp_data}")
-                    #print(f"Sub Avp payload length: {sub_avpPayloadLength}")
-                    sub_avp_data = sub_avp_data[sub_avpPayloadLength:]
-                    avp_vars['misc_data'] = avp_vars['misc_data'][sub_avpPayloadLength:]
-                    #print(f"Sub Avp Data after trimming: {sub_avp_data}")
-                    payloadContainsSubAvps = await(self.validateSingleAvp(sub_avp_data))
-                
-                if avpPaddingLength > 0:
-                    processed_avps.append(avp_vars)
-                    data = data[avpPayloadLength+avpPaddingLength:]
-                else:
-                    processed_avps.append(avp_vars)
-                    data = data[avpPayloadLength:]
-            except Exception as e:
-                #print(f"EXCEPTION: {e}")
-                continue
+    async def generateOverloadAvps(self, sequenceNumber: int, reductionPercentage: int, validityDuration: int) -> bytes:
+        """
+        Generates the RFC 7683 OC-Supported-Features and OC-OLR AVPs for a host report.
+        A reductionPercentage of 0 tells reacting nodes that any previous overload report has ended.
+        """
+        ocOlr = diameterCodec.encodeAvp(624, 0x00, diameterCodec.encodeUnsigned64(sequenceNumber))           #OC-Sequence-Number
+        ocOlr += diameterCodec.encodeAvp(626, 0x00, diameterCodec.encodeUnsigned32(0))                       #OC-Report-Type (HOST_REPORT)
+        ocOlr += diameterCodec.encodeAvp(627, 0x00, diameterCodec.encodeUnsigned32(reductionPercentage))     #OC-Reduction-Percentage
+        ocOlr += diameterCodec.encodeAvp(625, 0x00, diameterCodec.encodeUnsigned32(validityDuration))        #OC-Validity-Duration
+        return self.ocSupportedFeaturesAvp + diameterCodec.encodeAvp(623, 0x00, ocOlr)
 
-        return processed_avps
+    async def generateTooBusyAnswer(self, packetVars, avps, overloadAvps: bytes=b'') -> bytes:
+        """
+        Generates a DIAMETER_TOO_BUSY (3004) answer to a request, used when shedding load.
+        Protocol errors are answered with the Error bit set, echoing the Session-Id if the request had one.
+        """
+        answerAvps = b''
+        sessionId = avps.findFirst(263)
+        if sessionId is not None:
+            answerAvps += diameterCodec.encodeAvp(263, 0x40, sessionId.data)
+        answerAvps += self.originAvps + self.tooBusyResultCodeAvp + overloadAvps
+        answerFlags = 0x20 | (packetVars.flags & 0x40)
+        return diameterCodec.encodeDiameterPacket(answerFlags, packetVars.commandCode, packetVars.applicationId, packetVars.hopByHopId, packetVars.endToEndId, answerAvps)
 
     async def getPeerType(self, originHost: str) -> str:
             try:
@@ -247,11 +142,12 @@ class DiameterAsync:
                 if peerType not in peerTypes:
                     return []
                 filteredConnectedPeers = []
-                activePeers = await(self.redisMessaging.getValue(key="ActiveDiameterPeers", usePrefix=True, prefixHostname=self.hostname, prefixServiceName='diameter'))
+                activePeers = await(self.redisMessaging.getAllHashValues(key="ActiveDiameterPeerTable", usePrefix=True, prefixHostname=self.hostname, prefixServiceName='diameter'))
 
                 for key, value in activePeers.items():
-                    if activePeers.get(key, {}).get('peerType', '') == 'pgw' and activePeers.get(key, {}).get('connectionStatus', '') == 'connected':
-                        filteredConnectedPeers.append(activePeers.get(key, {}))
+                    peer = json.loads(value)
+                    if peer.get('peerType', '') == peerType and peer.get('connectionStatus', '') == 'connected':
+                        filteredConnectedPeers.append(peer)
                 
                 return filteredConnectedPeers
 
@@ -267,9 +163,9 @@ class DiameterAsync:
         
         for diameterApplication in self.diameterCommandList:
             try:
-                assert(packet_vars["command_code"] == diameterApplication["commandCode"])
-                assert(packet_vars["ApplicationId"] == diameterApplication["applicationId"])
-                if packet_vars["flags_bin"][0:1] == "1":
+                assert(packet_vars.commandCode == diameterApplication["commandCode"])
+                assert(packet_vars.applicationId == diameterApplication["applicationId"])
+                if packet_vars.isRequest:
                     response['inbound'] = diameterApplication["requestAcronym"]
                     response['outbound'] = diameterApplication["responseAcronym"]
                 else:
@@ -285,13 +181,13 @@ class DiameterAsync:
         response = ''
 
         # Drop packet if it's a response packet:
-        if packet_vars["flags_bin"][0:1] == "0":
+        if not packet_vars.isRequest:
             return
         
         for diameterApplication in self.diameterCommandList:
             try:
-                assert(packet_vars["command_code"] == diameterApplication["commandCode"])
-                assert(packet_vars["ApplicationId"] == diameterApplication["applicationId"])
+                assert(packet_vars.commandCode == diameterApplication["commandCode"])
+                assert(packet_vars.applicationId == diameterApplication["applicationId"])
                 if 'flags' in diameterApplication:
                     assert(str(packet_vars["flags"]) == str(diameterApplication["flags"]))
                 response = diameterApplication["responseMethod"](packet_vars, avps)
@@ -300,17 +196,17 @@ class DiameterAsync:
         
         return response
     
-    async def Answer_257(self):
-        pass
+    async def Answer_257(self, packet_vars, avps) -> bytes:
+        return self.ceaTemplate.render(packet_vars.hopByHopId, packet_vars.endToEndId, diameterCodec.encodeOriginStateIncrement(avps))
 
     async def Answer_16777238_272(self):
         pass
 
-    async def Answer_280(self):
-        pass
+    async def Answer_280(self, packet_vars, avps) -> bytes:
+        return self.dwaTemplate.render(packet_vars.hopByHopId, packet_vars.endToEndId, diameterCodec.encodeOriginStateIncrement(avps))
 
-    async def Answer_282(self):
-        pass
+    async def Answer_282(self, packet_vars, avps) -> bytes:
+        return self.dpaTemplate.render(packet_vars.hopByHopId, packet_vars.endToEndId)
 
     async def Answer_16777251_318(self):
         pass
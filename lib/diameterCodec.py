@@ -0,0 +1,652 @@
+#Diameter Binary Codec
+#Byte-native primitives for building Diameter messages, shared by diameter.py and diameterAsync.py.
+#Everything in this module works on bytes, hex conversion is left to the callers that still need it.
+import struct
+import socket
+import zlib
+import diameterDictionary
+
+# AVP Header: AVP Code (4) | AVP Flags (1) + AVP Length (3)
+avpHeaderStruct = struct.Struct('!II')
+# Vendor AVP Header: AVP Code (4) | AVP Flags (1) + AVP Length (3) | Vendor-Id (4)
+vendorAvpHeaderStruct = struct.Struct('!III')
+# Diameter Header: Version (1) + Message Length (3) | Command Flags (1) + Command Code (3) | Application-Id (4) | Hop-by-Hop Identifier (4) | End-to-End Identifier (4)
+diameterHeaderStruct = struct.Struct('!III4s4s')
+unsigned32Struct = struct.Struct('!I')
+unsigned64Struct = struct.Struct('!Q')
+integer32Struct = struct.Struct('!i')
+integer64Struct = struct.Struct('!q')
+# Redis Envelope Header: Envelope Version (1) | Client Address Length (1) | Client Port (2) | Received Timestamp (8) | Queued Timestamp (8)
+envelopeHeaderStruct = struct.Struct('!BBHdd')
+
+DIAMETER_HEADER_LENGTH = diameterHeaderStruct.size
+AVP_HEADER_LENGTH = avpHeaderStruct.size
+VENDOR_AVP_HEADER_LENGTH = vendorAvpHeaderStruct.size
+ENVELOPE_HEADER_LENGTH = envelopeHeaderStruct.size
+ENVELOPE_VERSION = 2
+#Session based applications (Ro, Rx, Gx), where only the first request of a session is guaranteed to identify the subscriber
+SESSION_APPLICATION_IDS = frozenset((4, 16777236, 16777238))
+
+# Padding for every possible remainder, so we never have to build it at runtime.
+avpPadding = (b'', b'\x00\x00\x00', b'\x00\x00', b'\x00')
+
+# Cache of legacy flag representations ("c0", 40, "80") to their integer values.
+legacyFlagsCache = {}
+
+
+def legacyFlags(flags) -> int:
+    """
+    Converts the hex-digit flag notation used throughout diameter.py ("c0", "80", 40) into an integer.
+    """
+    try:
+        return legacyFlagsCache[flags]
+    except KeyError:
+        flagsInt = int(str(flags), 16)
+        legacyFlagsCache[flags] = flagsInt
+        return flagsInt
+
+
+def encodeAvp(avpCode: int, avpFlags: int, avpData: bytes) -> bytes:
+    """
+    Encodes a single AVP, including any required padding.
+    """
+    avpLength = AVP_HEADER_LENGTH + len(avpData)
+    return avpHeaderStruct.pack(avpCode, (avpFlags << 24) | avpLength) + avpData + avpPadding[avpLength & 3]
+
+
+def encodeVendorAvp(avpCode: int, avpFlags: int, vendorId: int, avpData: bytes) -> bytes:
+    """
+    Encodes a single AVP with a Vendor-Id field, including any required padding.
+    The Vendor-Specific bit is not set implicitly, it must be present in avpFlags.
+    """
+    avpLength = VENDOR_AVP_HEADER_LENGTH + len(avpData)
+    return vendorAvpHeaderStruct.pack(avpCode, (avpFlags << 24) | avpLength, vendorId) + avpData + avpPadding[avpLength & 3]
+
+
+def encodeDiameterPacket(commandFlags: int, commandCode: int, applicationId: int, hopByHopId: bytes, endToEndId: bytes, avps: bytes, version: int=1) -> bytes:
+    """
+    Encodes a full Diameter message from an already encoded AVP block.
+    The message length is known up front, so the header is only ever packed once.
+    """
+    messageLength = DIAMETER_HEADER_LENGTH + len(avps)
+    return diameterHeaderStruct.pack((version << 24) | messageLength, (commandFlags << 24) | commandCode, applicationId, hopByHopId, endToEndId) + avps
+
+
+def encodeUnsigned32(value: int) -> bytes:
+    return unsigned32Struct.pack(value)
+
+
+def encodeUnsigned64(value: int) -> bytes:
+    return unsigned64Struct.pack(value)
+
+
+def encodeAddress(ipAddress: str) -> bytes:
+    """
+    Encodes an IPv4 or IPv6 address as a Diameter Address (2 byte Address Family, followed by the address).
+    """
+    if ':' in ipAddress:
+        return b'\x00\x02' + socket.inet_pton(socket.AF_INET6, ipAddress)
+    return b'\x00\x01' + socket.inet_aton(ipAddress)
+
+
+def decodeAddress(avpData: bytes) -> str:
+    """
+    Decodes a Diameter Address into its string form, falling back to hex for address families other than IPv4 / IPv6.
+    """
+    if avpData[:2] == b'\x00\x01' and len(avpData) == 6:
+        return socket.inet_ntop(socket.AF_INET, avpData[2:])
+    if avpData[:2] == b'\x00\x02' and len(avpData) == 18:
+        return socket.inet_ntop(socket.AF_INET6, avpData[2:])
+    return avpData.hex()
+
+
+# Decoders and encoders for each of the non-grouped types in diameterDictionary
+valueDecoders = {
+    diameterDictionary.UNSIGNED32: lambda avpData: unsigned32Struct.unpack(avpData)[0],
+    diameterDictionary.ENUMERATED: lambda avpData: integer32Struct.unpack(avpData)[0],
+    diameterDictionary.TIME: lambda avpData: unsigned32Struct.unpack(avpData)[0],
+    diameterDictionary.INTEGER32: lambda avpData: integer32Struct.unpack(avpData)[0],
+    diameterDictionary.UNSIGNED64: lambda avpData: unsigned64Struct.unpack(avpData)[0],
+    diameterDictionary.INTEGER64: lambda avpData: integer64Struct.unpack(avpData)[0],
+    diameterDictionary.OCTETSTRING: bytes,
+    diameterDictionary.UTF8STRING: lambda avpData: avpData.decode('utf-8'),
+    diameterDictionary.DIAMETERIDENTITY: lambda avpData: avpData.decode('utf-8'),
+    diameterDictionary.DIAMETERURI: lambda avpData: avpData.decode('utf-8'),
+    diameterDictionary.ADDRESS: decodeAddress,
+}
+
+valueEncoders = {
+    diameterDictionary.UNSIGNED32: unsigned32Struct.pack,
+    diameterDictionary.ENUMERATED: integer32Struct.pack,
+    diameterDictionary.TIME: unsigned32Struct.pack,
+    diameterDictionary.INTEGER32: integer32Struct.pack,
+    diameterDictionary.UNSIGNED64: unsigned64Struct.pack,
+    diameterDictionary.INTEGER64: integer64Struct.pack,
+    diameterDictionary.OCTETSTRING: bytes,
+    diameterDictionary.UTF8STRING: lambda value: value.encode('utf-8'),
+    diameterDictionary.DIAMETERIDENTITY: lambda value: value.encode('utf-8'),
+    diameterDictionary.DIAMETERURI: lambda value: value.encode('utf-8'),
+    diameterDictionary.ADDRESS: encodeAddress,
+}
+
+
+def lookupAvp(avpCode: int, vendorId: int=None):
+    """
+    Returns the (name, type) dictionary entry for an AVP, or None if the AVP is not in diameterDictionary.
+    """
+    return diameterDictionary.avpDictionary.get((vendorId or 0, avpCode))
+
+
+def encodeValue(avpType: str, value) -> bytes:
+    """
+    Encodes a typed value as an AVP payload.
+    Grouped values are expected to be an already encoded block of sub-AVPs.
+    """
+    if avpType == diameterDictionary.GROUPED:
+        return bytes(value)
+    return valueEncoders[avpType](value)
+
+
+def encodeTypedAvp(avpName: str, value, avpFlags: int=None) -> bytes:
+    """
+    Encodes an AVP by its dictionary name, taking the AVP code, Vendor-Id and payload encoding from diameterDictionary.
+    Unless avpFlags is given, the Mandatory bit is set, along with the Vendor-Specific bit for vendor AVPs.
+    """
+    vendorId, avpCode = diameterDictionary.avpCodesByName[avpName]
+    avpData = encodeValue(diameterDictionary.avpDictionary[(vendorId, avpCode)][1], value)
+    if vendorId:
+        return encodeVendorAvp(avpCode, 0xc0 if avpFlags is None else avpFlags, vendorId, avpData)
+    return encodeAvp(avpCode, 0x40 if avpFlags is None else avpFlags, avpData)
+
+
+def encodeVendorSpecificApplicationId(applicationId: int, vendorId: int=10415) -> bytes:
+    """
+    Encodes a Vendor-Specific-Application-Id grouped AVP, holding an Auth-Application-Id and Vendor-Id.
+    """
+    return encodeAvp(260, 0x40, encodeAvp(258, 0x40, unsigned32Struct.pack(applicationId)) + encodeAvp(266, 0x40, unsigned32Struct.pack(vendorId)))
+
+
+# Applications advertised in the Capabilities Exchange Answer: S6a, Cx, S13, SLh, Sh, Rx, Gx
+capabilitiesApplicationIds = (16777251, 16777216, 16777252, 16777291, 16777217, 16777236, 16777238)
+
+
+def encodeCapabilitiesAvps(productName: bytes, hostIpAddresses: list) -> bytes:
+    """
+    Encodes the static AVPs of a Capabilities Exchange Answer, following the Origin-Host, Origin-Realm and Result-Code.
+    """
+    supportedVendor3gppAvp = encodeAvp(265, 0x40, unsigned32Struct.pack(10415))                          #Supported-Vendor-ID (3GPP)
+    capabilitiesAvps = b''.join(encodeAvp(257, 0x40, encodeAddress(hostIpAddress)) for hostIpAddress in hostIpAddresses)   #Host-IP-Address
+    capabilitiesAvps += encodeAvp(266, 0x40, unsigned32Struct.pack(0))                                   #Vendor-Id
+    capabilitiesAvps += encodeAvp(269, 0x00, productName)                                               #Product-Name
+    capabilitiesAvps += encodeAvp(267, 0x40, unsigned32Struct.pack(10201))                               #Firmware-Revision
+    for applicationId in capabilitiesApplicationIds:
+        capabilitiesAvps += supportedVendor3gppAvp + encodeVendorSpecificApplicationId(applicationId)
+    capabilitiesAvps += encodeAvp(258, 0x40, unsigned32Struct.pack(16777238))                            #Auth-Application-ID - Diameter Gx
+    capabilitiesAvps += encodeAvp(258, 0x40, unsigned32Struct.pack(10))                                  #Auth-Application-ID - Diameter CER
+    capabilitiesAvps += encodeAvp(265, 0x40, unsigned32Struct.pack(5535))                                #Supported-Vendor-ID (3GGP v2)
+    capabilitiesAvps += supportedVendor3gppAvp
+    capabilitiesAvps += encodeAvp(265, 0x40, unsigned32Struct.pack(13019))                               #Supported-Vendor-ID 13019 (ETSI)
+    return capabilitiesAvps
+
+
+def encodeOriginStateIncrement(avps) -> bytes:
+    """
+    Encodes the Origin-State-Id for a CEA or DWA, incremented from the request, or returns nothing if the request had no Origin-State-Id.
+    """
+    originState = avps.findFirst(278)
+    if originState is None:
+        return b''
+    return encodeAvp(278, 0x40, unsigned32Struct.pack((int.from_bytes(originState.data, 'big') + 1) & 0xFFFFFFFF))
+
+
+def appendAvpsToPacket(packet: bytes, avps: bytes) -> bytes:
+    """
+    Appends an encoded AVP block to an already encoded Diameter message, updating the Message Length in the header.
+    """
+    versionAndLength = unsigned32Struct.unpack_from(packet, 0)[0]
+    return unsigned32Struct.pack((versionAndLength & 0xFF000000) | ((versionAndLength & 0xFFFFFF) + len(avps))) + packet[4:] + avps
+
+
+def identifierToBytes(identifier) -> bytes:
+    """
+    Returns a Hop-by-Hop or End-to-End identifier as bytes, accepting either bytes or a hex string.
+    """
+    if isinstance(identifier, str):
+        return bytes.fromhex(identifier)
+    return bytes(identifier)
+
+
+class AnswerTemplate:
+    """
+    A pre-encoded answer, where everything except the Hop-by-Hop / End-to-End Identifiers and an optional block of variable AVPs is built once.
+    The variable AVPs are placed between the leading and trailing static AVP blocks.
+    """
+
+    def __init__(self, commandFlags: int, commandCode: int, applicationId: int, leadingAvps: bytes=b'', trailingAvps: bytes=b'', version: int=1):
+        self.version = version
+        self.commandHeader = diameterHeaderStruct.pack(0, (commandFlags << 24) | commandCode, applicationId, b'\x00' * 4, b'\x00' * 4)[4:12]
+        self.leadingAvps = leadingAvps
+        self.trailingAvps = trailingAvps
+        self.fixedLength = DIAMETER_HEADER_LENGTH + len(leadingAvps) + len(trailingAvps)
+
+    def render(self, hopByHopId: bytes, endToEndId: bytes, variableAvps: bytes=b'') -> bytes:
+        """
+        Returns the full answer as bytes, with the identifiers and any variable AVPs patched in.
+        """
+        return b''.join((
+            unsigned32Struct.pack((self.version << 24) | (self.fixedLength + len(variableAvps))),
+            self.commandHeader,
+            hopByHopId,
+            endToEndId,
+            self.leadingAvps,
+            variableAvps,
+            self.trailingAvps,
+        ))
+
+
+class DiameterHeader:
+    """
+    A decoded Diameter header, holding the header fields as integers and the identifiers as bytes.
+    Supports dictionary style access to the keys produced by the original hex decoder (packet_version, length, flags, flags_bin, command_code, ApplicationId, hop-by-hop-identifier, end-to-end-identifier).
+    """
+
+    __slots__ = ('version', 'length', 'flags', 'commandCode', 'applicationId', 'hopByHopId', 'endToEndId')
+    legacyKeys = ('packet_version', 'length', 'flags', 'flags_bin', 'command_code', 'ApplicationId', 'hop-by-hop-identifier', 'end-to-end-identifier')
+
+    def __init__(self, version: int, length: int, flags: int, commandCode: int, applicationId: int, hopByHopId: bytes, endToEndId: bytes):
+        self.version = version
+        self.length = length
+        self.flags = flags
+        self.commandCode = commandCode
+        self.applicationId = applicationId
+        self.hopByHopId = hopByHopId
+        self.endToEndId = endToEndId
+
+    @property
+    def isRequest(self) -> bool:
+        return bool(self.flags & 0x80)
+
+    def __getitem__(self, key):
+        if key == 'command_code':
+            return self.commandCode
+        if key == 'ApplicationId':
+            return self.applicationId
+        if key == 'hop-by-hop-identifier':
+            return self.hopByHopId.hex()
+        if key == 'end-to-end-identifier':
+            return self.endToEndId.hex()
+        if key == 'flags':
+            return format(self.flags, '02x')
+        if key == 'flags_bin':
+            return format(self.flags, '08b')
+        if key == 'length':
+            return self.length
+        if key == 'packet_version':
+            return format(self.version, '02x')
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key) -> bool:
+        return key in self.legacyKeys
+
+    def keys(self):
+        return self.legacyKeys
+
+    def __repr__(self) -> str:
+        return f"DiameterHeader(version={self.version}, length={self.length}, flags={self.flags:#04x}, commandCode={self.commandCode}, applicationId={self.applicationId}, hopByHopId={self.hopByHopId.hex()}, endToEndId={self.endToEndId.hex()})"
+
+
+class DiameterAvp:
+    """
+    A single decoded AVP, backed by a memoryview of the received message.
+    The payload and any grouped sub-AVPs are only materialised when first accessed.
+    AVPs found in diameterDictionary also expose their name and a typed value.
+    Supports dictionary style access to the keys produced by the original hex decoder (avp_code, avp_flags, avp_length, vendor_id, misc_data, sub_avps).
+    """
+
+    __slots__ = ('buffer', 'code', 'flags', 'length', 'vendorId', 'dataStart', 'dataEnd', '_data', '_children', '_childrenDecoded')
+    legacyKeys = ('avp_code', 'avp_flags', 'avp_length', 'vendor_id', 'misc_data', 'sub_avps')
+
+    def __init__(self, buffer: memoryview, code: int, flags: int, length: int, vendorId, dataStart: int, dataEnd: int):
+        self.buffer = buffer
+        self.code = code
+        self.flags = flags
+        self.length = length
+        self.vendorId = vendorId
+        self.dataStart = dataStart
+        self.dataEnd = dataEnd
+        self._data = None
+        self._children = None
+        self._childrenDecoded = False
+
+    @property
+    def data(self) -> bytes:
+        """
+        The AVP payload as bytes, excluding the header and any padding.
+        """
+        if self._data is None:
+            self._data = self.buffer[self.dataStart:self.dataEnd].tobytes()
+        return self._data
+
+    @property
+    def definition(self):
+        """
+        The (name, type) entry for this AVP in diameterDictionary, or None for unknown AVPs.
+        """
+        return diameterDictionary.avpDictionary.get((self.vendorId or 0, self.code))
+
+    @property
+    def name(self):
+        definition = self.definition
+        return None if definition is None else definition[0]
+
+    @property
+    def children(self):
+        """
+        The direct sub-AVPs of a grouped AVP, or None if the AVP is not grouped.
+        Known AVPs are decided by their dictionary type, unknown AVPs are grouped only if their payload is exactly tiled by AVP headers.
+        """
+        if not self._childrenDecoded:
+            definition = self.definition
+            if definition is None:
+                self._children = decodeGroupedAvps(self.buffer, self.dataStart, self.dataEnd)
+            elif definition[1] == diameterDictionary.GROUPED:
+                self._children = decodeAvps(self.buffer, self.dataStart, self.dataEnd)
+            self._childrenDecoded = True
+        return self._children
+
+    @property
+    def value(self):
+        """
+        The payload decoded according to the dictionary type, the sub-AVPs for grouped AVPs, or the raw bytes for unknown AVPs.
+        """
+        definition = self.definition
+        if definition is None:
+            return self.data
+        if definition[1] == diameterDictionary.GROUPED:
+            return self.children
+        return valueDecoders[definition[1]](self.data)
+
+    @property
+    def isGrouped(self) -> bool:
+        return self.children is not None
+
+    def descendants(self) -> list:
+        """
+        Returns every AVP nested below this one, depth first, in the order they appear on the wire.
+        """
+        flattened = []
+        stack = [iter(self.children or ())]
+        while stack:
+            child = next(stack[-1], None)
+            if child is None:
+                stack.pop()
+                continue
+            flattened.append(child)
+            if child.children:
+                stack.append(iter(child.children))
+        return flattened
+
+    def __getitem__(self, key):
+        if key == 'avp_code':
+            return self.code
+        if key == 'misc_data':
+            return '' if self.isGrouped else self.data.hex()
+        if key == 'sub_avps':
+            return self.descendants()
+        if key == 'avp_flags':
+            return format(self.flags, '02x')
+        if key == 'vendor_id':
+            return '' if self.vendorId is None else self.vendorId
+        if key == 'avp_length':
+            return self.length
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key) -> bool:
+        return key in self.legacyKeys
+
+    def keys(self):
+        return self.legacyKeys
+
+    def __repr__(self) -> str:
+        if self.isGrouped:
+            return f"DiameterAvp(code={self.code}, flags={self.flags:#04x}, vendorId={self.vendorId}, children={self.children})"
+        return f"DiameterAvp(code={self.code}, flags={self.flags:#04x}, vendorId={self.vendorId}, data={self.data.hex()})"
+
+
+class DiameterAvpList(list):
+    """
+    A list of sibling AVPs, carrying an index of every AVP at or below this level.
+    The index is keyed by AVP code and by (Vendor-Id, AVP code), and is built once, on the first lookup.
+    """
+
+    __slots__ = ('_codeIndex', '_vendorCodeIndex')
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self._codeIndex = None
+        self._vendorCodeIndex = None
+
+    def buildIndex(self):
+        codeIndex = {}
+        vendorCodeIndex = {}
+        # Depth first, so each index entry lists AVPs in the order they appear on the wire
+        stack = [iter(self)]
+        while stack:
+            avp = next(stack[-1], None)
+            if avp is None:
+                stack.pop()
+                continue
+            codeIndex.setdefault(avp.code, []).append(avp)
+            vendorCodeIndex.setdefault((avp.vendorId, avp.code), []).append(avp)
+            if avp.children:
+                stack.append(iter(avp.children))
+        self._codeIndex = codeIndex
+        self._vendorCodeIndex = vendorCodeIndex
+
+    def find(self, avpCode: int, vendorId: int=None) -> list:
+        """
+        Returns every AVP matching the AVP code (and Vendor-Id, if given), including AVPs nested inside grouped AVPs.
+        """
+        if self._codeIndex is None:
+            self.buildIndex()
+        if vendorId is None:
+            return self._codeIndex.get(avpCode, [])
+        return self._vendorCodeIndex.get((vendorId, avpCode), [])
+
+    def findFirst(self, avpCode: int, vendorId: int=None):
+        """
+        Returns the first AVP matching the AVP code (and Vendor-Id, if given), or None.
+        """
+        matches = self.find(avpCode, vendorId)
+        return matches[0] if matches else None
+
+
+def decodeAvps(buffer: memoryview, start: int, end: int) -> 'DiameterAvpList':
+    """
+    Walks the AVP headers between start and end, returning a DiameterAvpList of DiameterAvp objects.
+    Decoding stops at the first malformed AVP, anything decoded up to that point is still returned.
+    """
+    avps = DiameterAvpList()
+    offset = start
+    while offset + AVP_HEADER_LENGTH <= end:
+        avpCode, flagsAndLength = avpHeaderStruct.unpack_from(buffer, offset)
+        avpFlags = flagsAndLength >> 24
+        avpLength = flagsAndLength & 0xFFFFFF
+        if avpFlags & 0x80:
+            headerLength = VENDOR_AVP_HEADER_LENGTH
+            if avpLength < headerLength or offset + avpLength > end:
+                break
+            vendorId = unsigned32Struct.unpack_from(buffer, offset + AVP_HEADER_LENGTH)[0]
+        else:
+            headerLength = AVP_HEADER_LENGTH
+            if avpLength < headerLength or offset + avpLength > end:
+                break
+            vendorId = None
+        avps.append(DiameterAvp(buffer, avpCode, avpFlags, avpLength, vendorId, offset + headerLength, offset + avpLength))
+        offset += (avpLength + 3) & ~3
+    return avps
+
+
+def decodeGroupedAvps(buffer: memoryview, start: int, end: int):
+    """
+    Decodes a payload as a sequence of sub-AVPs, if the AVP headers inside it exactly tile the payload.
+    Returns None if the payload is not a grouped AVP.
+    """
+    if end - start < AVP_HEADER_LENGTH:
+        return None
+    avps = DiameterAvpList()
+    offset = start
+    while offset < end:
+        if offset + AVP_HEADER_LENGTH > end:
+            return None
+        avpCode, flagsAndLength = avpHeaderStruct.unpack_from(buffer, offset)
+        avpFlags = flagsAndLength >> 24
+        avpLength = flagsAndLength & 0xFFFFFF
+        # Reserved flag bits must be zero
+        if avpFlags & 0x1F:
+            return None
+        if avpFlags & 0x80:
+            headerLength = VENDOR_AVP_HEADER_LENGTH
+            if avpLength < headerLength or offset + avpLength > end:
+                return None
+            vendorId = unsigned32Struct.unpack_from(buffer, offset + AVP_HEADER_LENGTH)[0]
+        else:
+            headerLength = AVP_HEADER_LENGTH
+            if avpLength < headerLength or offset + avpLength > end:
+                return None
+            vendorId = None
+        avps.append(DiameterAvp(buffer, avpCode, avpFlags, avpLength, vendorId, offset + headerLength, offset + avpLength))
+        if offset + avpLength == end:
+            break
+        offset += (avpLength + 3) & ~3
+    return avps
+
+
+class DiameterStreamFramer:
+    """
+    Splits a Diameter byte stream into whole messages, using the 24 bit Message Length in each Diameter header.
+    Partial messages are held until the rest arrives, and reads carrying several messages are split into individual messages.
+    """
+
+    __slots__ = ('buffer',)
+
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def feed(self, data: bytes) -> list:
+        """
+        Adds newly received data to the stream, and returns a list of any complete messages as bytes.
+        Raises ValueError if the stream does not start with a valid Diameter header, as the connection can no longer be framed.
+        """
+        if self.buffer:
+            self.buffer += data
+            data = self.buffer
+        messages = []
+        offset = 0
+        dataLength = len(data)
+        with memoryview(data) as view:
+            while dataLength - offset >= 4:
+                versionAndLength = unsigned32Struct.unpack_from(view, offset)[0]
+                messageLength = versionAndLength & 0xFFFFFF
+                if versionAndLength >> 24 != 1 or messageLength < DIAMETER_HEADER_LENGTH:
+                    raise ValueError(f"Invalid Diameter header at stream offset {offset} (version {versionAndLength >> 24}, length {messageLength})")
+                if dataLength - offset < messageLength:
+                    break
+                messages.append(view[offset:offset + messageLength].tobytes())
+                offset += messageLength
+        if data is self.buffer:
+            del self.buffer[:offset]
+        elif offset < dataLength:
+            self.buffer = bytearray(data[offset:])
+        return messages
+
+
+def decodeDiameterPacket(data) -> tuple:
+    """
+    Decodes a full Diameter message from bytes, returning a DiameterHeader and a list of top level DiameterAvp objects.
+    """
+    buffer = memoryview(data)
+    versionAndLength, flagsAndCommandCode, applicationId, hopByHopId, endToEndId = diameterHeaderStruct.unpack_from(buffer, 0)
+    messageLength = versionAndLength & 0xFFFFFF
+    header = DiameterHeader(versionAndLength >> 24, messageLength, flagsAndCommandCode >> 24, flagsAndCommandCode & 0xFFFFFF, applicationId, hopByHopId, endToEndId)
+    avps = decodeAvps(buffer, DIAMETER_HEADER_LENGTH, min(messageLength, len(buffer)))
+    return header, avps
+
+
+def encodeEnvelope(diameterPacket: bytes, clientAddress: str='', clientPort: int=0, receivedTimestamp: float=0.0, queuedTimestamp: float=0.0) -> bytes:
+    """
+    Wraps a Diameter message for the diameter-inbound and diameter-outbound Redis queues.
+    The envelope is a fixed header carrying the client port, the time (in epoch seconds) the message was received and the time it was queued to Redis,
+    followed by the client address and the raw Diameter message.
+    A receivedTimestamp of 0 marks a message which isn't an answer to an inbound request.
+    """
+    clientAddress = clientAddress.encode('ascii')
+    return envelopeHeaderStruct.pack(ENVELOPE_VERSION, len(clientAddress), int(clientPort), receivedTimestamp, queuedTimestamp) + clientAddress + diameterPacket
+
+
+def decodeEnvelope(envelope: bytes) -> tuple:
+    """
+    Unwraps a message from the diameter-inbound or diameter-outbound Redis queues.
+    Returns a tuple of (diameterPacket, clientAddress, clientPort, receivedTimestamp).
+    Raises ValueError if the envelope version is unknown.
+    """
+    version, addressLength, clientPort, receivedTimestamp, queuedTimestamp = envelopeHeaderStruct.unpack_from(envelope, 0)
+    if version != ENVELOPE_VERSION:
+        raise ValueError(f"Unknown envelope version {version}")
+    packetOffset = ENVELOPE_HEADER_LENGTH + addressLength
+    return bytes(envelope[packetOffset:]), bytes(envelope[ENVELOPE_HEADER_LENGTH:packetOffset]).decode('ascii'), clientPort, receivedTimestamp
+
+
+def getEnvelopeQueuedTimestamp(envelope: bytes) -> float:
+    """
+    Returns the time (in epoch seconds) an enveloped message was queued to Redis, or 0 if it wasn't recorded.
+    """
+    return envelopeHeaderStruct.unpack_from(envelope, 0)[4]
+
+
+def getSubscriberKey(data: bytes) -> bytes:
+    """
+    Returns the key used to keep the Diameter messages of a subscriber, or a session, in order.
+    For session based applications (Ro, Rx, Gx) this is the Session-Id, as CCR-U / CCR-T usually carry no Subscription-Id.
+    Otherwise it's the IMSI from the User-Name, otherwise the Session-Id, otherwise b''.
+    The User-Name is the bare IMSI in S6a, but IMSI@realm in Cx, so any sip: prefix and @domain are removed
+    to keep the S6a and Cx requests of a subscriber (eg. AIR and MAR, which both update the SQN) together.
+    """
+    header, avps = decodeDiameterPacket(data)
+    sessionBased = header.applicationId in SESSION_APPLICATION_IDS
+    sessionId = None
+    for avp in avps:
+        if avp.vendorId is not None:
+            continue
+        if avp.code == 263 and sessionId is None:
+            if sessionBased:
+                return avp.data
+            sessionId = avp.data
+        elif avp.code == 1 and not sessionBased:
+            userName = avp.data
+            if userName[:4].lower() == b'sip:':
+                userName = userName[4:]
+            return userName.split(b'@', 1)[0]
+    return sessionId or b''
+
+
+def getSubscriberShard(data: bytes, shardCount: int) -> int:
+    """
+    Returns the shard (0 to shardCount - 1) of a Diameter message, from a hash of its getSubscriberKey.
+    Uses crc32 rather than hash(), so every process maps a subscriber to the same shard.
+    """
+    if shardCount <= 1:
+        return 0
+    return zlib.crc32(getSubscriberKey(data)) % shardCount
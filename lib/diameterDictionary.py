@@ -0,0 +1,354 @@
+#Diameter AVP Dictionary
+#AVP definitions for the base protocol and the interfaces PyHSS serves (S6a, S13, Cx, Sh, Gx, Rx, SLh).
+#Keyed by (Vendor-Id, AVP Code), AVPs without a Vendor-Id use Vendor-Id 0.
+
+GROUPED = 'Grouped'
+UNSIGNED32 = 'Unsigned32'
+UNSIGNED64 = 'Unsigned64'
+INTEGER32 = 'Integer32'
+INTEGER64 = 'Integer64'
+ENUMERATED = 'Enumerated'
+TIME = 'Time'
+OCTETSTRING = 'OctetString'
+UTF8STRING = 'UTF8String'
+DIAMETERIDENTITY = 'DiameterIdentity'
+DIAMETERURI = 'DiameterURI'
+ADDRESS = 'Address'
+
+VENDOR_3GPP = 10415
+
+avpDictionary = {
+    # Base Protocol (RFC 6733)
+    (0, 1): ('User-Name', UTF8STRING),
+    (0, 25): ('Class', OCTETSTRING),
+    (0, 27): ('Session-Timeout', UNSIGNED32),
+    (0, 33): ('Proxy-State', OCTETSTRING),
+    (0, 55): ('Event-Timestamp', TIME),
+    (0, 257): ('Host-IP-Address', ADDRESS),
+    (0, 258): ('Auth-Application-Id', UNSIGNED32),
+    (0, 259): ('Acct-Application-Id', UNSIGNED32),
+    (0, 260): ('Vendor-Specific-Application-Id', GROUPED),
+    (0, 261): ('Redirect-Host-Usage', ENUMERATED),
+    (0, 262): ('Redirect-Max-Cache-Time', UNSIGNED32),
+    (0, 263): ('Session-Id', UTF8STRING),
+    (0, 264): ('Origin-Host', DIAMETERIDENTITY),
+    (0, 265): ('Supported-Vendor-Id', UNSIGNED32),
+    (0, 266): ('Vendor-Id', UNSIGNED32),
+    (0, 267): ('Firmware-Revision', UNSIGNED32),
+    (0, 268): ('Result-Code', UNSIGNED32),
+    (0, 269): ('Product-Name', UTF8STRING),
+    (0, 270): ('Session-Binding', UNSIGNED32),
+    (0, 271): ('Session-Server-Failover', ENUMERATED),
+    (0, 272): ('Multi-Round-Time-Out', UNSIGNED32),
+    (0, 273): ('Disconnect-Cause', ENUMERATED),
+    (0, 274): ('Auth-Request-Type', ENUMERATED),
+    (0, 276): ('Auth-Grace-Period', UNSIGNED32),
+    (0, 277): ('Auth-Session-State', ENUMERATED),
+    (0, 278): ('Origin-State-Id', UNSIGNED32),
+    (0, 279): ('Failed-AVP', GROUPED),
+    (0, 280): ('Proxy-Host', DIAMETERIDENTITY),
+    (0, 281): ('Error-Message', UTF8STRING),
+    (0, 282): ('Route-Record', DIAMETERIDENTITY),
+    (0, 283): ('Destination-Realm', DIAMETERIDENTITY),
+    (0, 284): ('Proxy-Info', GROUPED),
+    (0, 285): ('Re-Auth-Request-Type', ENUMERATED),
+    (0, 287): ('Accounting-Sub-Session-Id', UNSIGNED64),
+    (0, 291): ('Authorization-Lifetime', UNSIGNED32),
+    (0, 292): ('Redirect-Host', DIAMETERURI),
+    (0, 293): ('Destination-Host', DIAMETERIDENTITY),
+    (0, 294): ('Error-Reporting-Host', DIAMETERIDENTITY),
+    (0, 295): ('Termination-Cause', ENUMERATED),
+    (0, 296): ('Origin-Realm', DIAMETERIDENTITY),
+    (0, 297): ('Experimental-Result', GROUPED),
+    (0, 298): ('Experimental-Result-Code', UNSIGNED32),
+    (0, 299): ('Inband-Security-Id', UNSIGNED32),
+
+    # Digest (RFC 4740), used on Cx
+    (0, 104): ('Digest-Realm', UTF8STRING),
+    (0, 110): ('Digest-QoP', UTF8STRING),
+    (0, 111): ('Digest-Algorithm', UTF8STRING),
+    (0, 121): ('Digest-HA1', UTF8STRING),
+
+    # NASREQ / Credit Control (RFC 7155, RFC 4006), used on Gx and Rx
+    (0, 8): ('Framed-IP-Address', OCTETSTRING),
+    (0, 30): ('Called-Station-Id', UTF8STRING),
+    (0, 97): ('Framed-IPv6-Prefix', OCTETSTRING),
+    (0, 412): ('CC-Input-Octets', UNSIGNED64),
+    (0, 414): ('CC-Output-Octets', UNSIGNED64),
+    (0, 415): ('CC-Request-Number', UNSIGNED32),
+    (0, 416): ('CC-Request-Type', ENUMERATED),
+    (0, 420): ('CC-Time', UNSIGNED32),
+    (0, 421): ('CC-Total-Octets', UNSIGNED64),
+    (0, 431): ('Granted-Service-Unit', GROUPED),
+    (0, 432): ('Rating-Group', UNSIGNED32),
+    (0, 437): ('Requested-Service-Unit', GROUPED),
+    (0, 439): ('Service-Identifier', UNSIGNED32),
+    (0, 443): ('Subscription-Id', GROUPED),
+    (0, 444): ('Subscription-Id-Data', UTF8STRING),
+    (0, 446): ('Used-Service-Unit', GROUPED),
+    (0, 450): ('Subscription-Id-Type', ENUMERATED),
+    (0, 455): ('Multiple-Services-Indicator', ENUMERATED),
+    (0, 456): ('Multiple-Services-Credit-Control', GROUPED),
+    (0, 458): ('User-Equipment-Info', GROUPED),
+    (0, 459): ('User-Equipment-Info-Type', ENUMERATED),
+    (0, 460): ('User-Equipment-Info-Value', OCTETSTRING),
+
+    # Mobile IPv6 (RFC 5447, RFC 5778), used on S6a and Gx
+    (0, 334): ('MIP-Home-Agent-Address', ADDRESS),
+    (0, 348): ('MIP-Home-Agent-Host', GROUPED),
+    (0, 486): ('MIP6-Agent-Info', GROUPED),
+    (0, 493): ('Service-Selection', UTF8STRING),
+
+    # Diameter Overload Indication Conveyance (RFC 7683)
+    (0, 621): ('OC-Supported-Features', GROUPED),
+    (0, 622): ('OC-Feature-Vector', UNSIGNED64),
+    (0, 623): ('OC-OLR', GROUPED),
+    (0, 624): ('OC-Sequence-Number', UNSIGNED64),
+    (0, 625): ('OC-Validity-Duration', UNSIGNED32),
+    (0, 626): ('OC-Report-Type', ENUMERATED),
+    (0, 627): ('OC-Reduction-Percentage', UNSIGNED32),
+
+    # 3GPP Common (TS 29.061, TS 29.229)
+    (VENDOR_3GPP, 2): ('3GPP-Charging-Id', UNSIGNED32),
+    (VENDOR_3GPP, 13): ('3GPP-Charging-Characteristics', UTF8STRING),
+    (VENDOR_3GPP, 18): ('3GPP-SGSN-MCC-MNC', UTF8STRING),
+    (VENDOR_3GPP, 21): ('3GPP-RAT-Type', OCTETSTRING),
+    (VENDOR_3GPP, 22): ('3GPP-User-Location-Info', OCTETSTRING),
+    (VENDOR_3GPP, 23): ('3GPP-MS-TimeZone', OCTETSTRING),
+    (VENDOR_3GPP, 628): ('Supported-Features', GROUPED),
+    (VENDOR_3GPP, 629): ('Feature-List-ID', UNSIGNED32),
+    (VENDOR_3GPP, 630): ('Feature-List', UNSIGNED32),
+    (VENDOR_3GPP, 848): ('Served-Party-IP-Address', ADDRESS),
+
+    # Cx (TS 29.229)
+    (VENDOR_3GPP, 600): ('Visited-Network-Identifier', OCTETSTRING),
+    (VENDOR_3GPP, 601): ('Public-Identity', UTF8STRING),
+    (VENDOR_3GPP, 602): ('Server-Name', UTF8STRING),
+    (VENDOR_3GPP, 603): ('Server-Capabilities', GROUPED),
+    (VENDOR_3GPP, 604): ('Mandatory-Capability', UNSIGNED32),
+    (VENDOR_3GPP, 605): ('Optional-Capability', UNSIGNED32),
+    (VENDOR_3GPP, 606): ('User-Data', OCTETSTRING),
+    (VENDOR_3GPP, 607): ('SIP-Number-Auth-Items', UNSIGNED32),
+    (VENDOR_3GPP, 608): ('SIP-Authentication-Scheme', UTF8STRING),
+    (VENDOR_3GPP, 609): ('SIP-Authenticate', OCTETSTRING),
+    (VENDOR_3GPP, 610): ('SIP-Authorization', OCTETSTRING),
+    (VENDOR_3GPP, 611): ('SIP-Authentication-Context', OCTETSTRING),
+    (VENDOR_3GPP, 612): ('SIP-Auth-Data-Item', GROUPED),
+    (VENDOR_3GPP, 613): ('SIP-Item-Number', UNSIGNED32),
+    (VENDOR_3GPP, 614): ('Server-Assignment-Type', ENUMERATED),
+    (VENDOR_3GPP, 615): ('Deregistration-Reason', GROUPED),
+    (VENDOR_3GPP, 616): ('Reason-Code', ENUMERATED),
+    (VENDOR_3GPP, 617): ('Reason-Info', UTF8STRING),
+    (VENDOR_3GPP, 618): ('Charging-Information', GROUPED),
+    (VENDOR_3GPP, 619): ('Primary-Event-Charging-Function-Name', DIAMETERURI),
+    (VENDOR_3GPP, 620): ('Secondary-Event-Charging-Function-Name', DIAMETERURI),
+    (VENDOR_3GPP, 621): ('Primary-Charging-Collection-Function-Name', DIAMETERURI),
+    (VENDOR_3GPP, 622): ('Secondary-Charging-Collection-Function-Name', DIAMETERURI),
+    (VENDOR_3GPP, 623): ('User-Authorization-Type', ENUMERATED),
+    (VENDOR_3GPP, 624): ('User-Data-Already-Available', ENUMERATED),
+    (VENDOR_3GPP, 625): ('Confidentiality-Key', OCTETSTRING),
+    (VENDOR_3GPP, 626): ('Integrity-Key', OCTETSTRING),
+    (VENDOR_3GPP, 631): ('Supported-Applications', GROUPED),
+    (VENDOR_3GPP, 632): ('Associated-Identities', GROUPED),
+    (VENDOR_3GPP, 633): ('Originating-Request', ENUMERATED),
+    (VENDOR_3GPP, 634): ('Wildcarded-Public-Identity', UTF8STRING),
+    (VENDOR_3GPP, 635): ('SIP-Digest-Authenticate', GROUPED),
+    (VENDOR_3GPP, 636): ('Wildcarded-IMPU', UTF8STRING),
+    (VENDOR_3GPP, 637): ('UAR-Flags', UNSIGNED32),
+    (VENDOR_3GPP, 638): ('Loose-Route-Indication', ENUMERATED),
+    (VENDOR_3GPP, 639): ('SCSCF-Restoration-Info', GROUPED),
+    (VENDOR_3GPP, 640): ('Path', OCTETSTRING),
+    (VENDOR_3GPP, 641): ('Contact', OCTETSTRING),
+    (VENDOR_3GPP, 642): ('Subscription-Info', GROUPED),
+    (VENDOR_3GPP, 643): ('Call-ID-SIP-Header', OCTETSTRING),
+    (VENDOR_3GPP, 644): ('From-SIP-Header', OCTETSTRING),
+    (VENDOR_3GPP, 645): ('To-SIP-Header', OCTETSTRING),
+    (VENDOR_3GPP, 646): ('Record-Route', OCTETSTRING),
+    (VENDOR_3GPP, 647): ('Associated-Registered-Identities', GROUPED),
+    (VENDOR_3GPP, 648): ('Multiple-Registration-Indication', ENUMERATED),
+    (VENDOR_3GPP, 649): ('Restoration-Info', GROUPED),
+
+    # Sh (TS 29.329)
+    (VENDOR_3GPP, 700): ('User-Identity', GROUPED),
+    (VENDOR_3GPP, 701): ('MSISDN', OCTETSTRING),
+    (VENDOR_3GPP, 702): ('Sh-User-Data', OCTETSTRING),
+    (VENDOR_3GPP, 703): ('Data-Reference', ENUMERATED),
+    (VENDOR_3GPP, 704): ('Service-Indication', OCTETSTRING),
+    (VENDOR_3GPP, 705): ('Subs-Req-Type', ENUMERATED),
+    (VENDOR_3GPP, 706): ('Requested-Domain', ENUMERATED),
+    (VENDOR_3GPP, 707): ('Current-Location', ENUMERATED),
+    (VENDOR_3GPP, 708): ('Identity-Set', ENUMERATED),
+    (VENDOR_3GPP, 709): ('Expiry-Time', TIME),
+    (VENDOR_3GPP, 710): ('Send-Data-Indication', ENUMERATED),
+    (VENDOR_3GPP, 711): ('DSAI-Tag', OCTETSTRING),
+
+    # Rx (TS 29.214)
+    (VENDOR_3GPP, 500): ('Abort-Cause', ENUMERATED),
+    (VENDOR_3GPP, 501): ('Access-Network-Charging-Address', ADDRESS),
+    (VENDOR_3GPP, 502): ('Access-Network-Charging-Identifier', GROUPED),
+    (VENDOR_3GPP, 503): ('Access-Network-Charging-Identifier-Value', OCTETSTRING),
+    (VENDOR_3GPP, 504): ('AF-Application-Identifier', OCTETSTRING),
+    (VENDOR_3GPP, 505): ('AF-Charging-Identifier', OCTETSTRING),
+    (VENDOR_3GPP, 506): ('Authorization-Token', OCTETSTRING),
+    (VENDOR_3GPP, 507): ('Flow-Description', OCTETSTRING),
+    (VENDOR_3GPP, 508): ('Flow-Grouping', GROUPED),
+    (VENDOR_3GPP, 509): ('Flow-Number', UNSIGNED32),
+    (VENDOR_3GPP, 510): ('Flows', GROUPED),
+    (VENDOR_3GPP, 511): ('Flow-Status', ENUMERATED),
+    (VENDOR_3GPP, 512): ('Flow-Usage', ENUMERATED),
+    (VENDOR_3GPP, 513): ('Specific-Action', ENUMERATED),
+    (VENDOR_3GPP, 515): ('Max-Requested-Bandwidth-DL', UNSIGNED32),
+    (VENDOR_3GPP, 516): ('Max-Requested-Bandwidth-UL', UNSIGNED32),
+    (VENDOR_3GPP, 517): ('Media-Component-Description', GROUPED),
+    (VENDOR_3GPP, 518): ('Media-Component-Number', UNSIGNED32),
+    (VENDOR_3GPP, 519): ('Media-Sub-Component', GROUPED),
+    (VENDOR_3GPP, 520): ('Media-Type', ENUMERATED),
+    (VENDOR_3GPP, 521): ('RR-Bandwidth', UNSIGNED32),
+    (VENDOR_3GPP, 522): ('RS-Bandwidth', UNSIGNED32),
+    (VENDOR_3GPP, 523): ('SIP-Forking-Indication', ENUMERATED),
+    (VENDOR_3GPP, 524): ('Codec-Data', OCTETSTRING),
+    (VENDOR_3GPP, 525): ('Service-URN', OCTETSTRING),
+    (VENDOR_3GPP, 527): ('Service-Info-Status', ENUMERATED),
+    (VENDOR_3GPP, 533): ('Rx-Request-Type', ENUMERATED),
+
+    # Gx (TS 29.212)
+    (VENDOR_3GPP, 1000): ('Bearer-Usage', ENUMERATED),
+    (VENDOR_3GPP, 1001): ('Charging-Rule-Install', GROUPED),
+    (VENDOR_3GPP, 1002): ('Charging-Rule-Remove', GROUPED),
+    (VENDOR_3GPP, 1003): ('Charging-Rule-Definition', GROUPED),
+    (VENDOR_3GPP, 1004): ('Charging-Rule-Base-Name', UTF8STRING),
+    (VENDOR_3GPP, 1005): ('Charging-Rule-Name', OCTETSTRING),
+    (VENDOR_3GPP, 1006): ('Event-Trigger', ENUMERATED),
+    (VENDOR_3GPP, 1007): ('Metering-Method', ENUMERATED),
+    (VENDOR_3GPP, 1008): ('Offline', ENUMERATED),
+    (VENDOR_3GPP, 1009): ('Online', ENUMERATED),
+    (VENDOR_3GPP, 1010): ('Precedence', UNSIGNED32),
+    (VENDOR_3GPP, 1016): ('QoS-Information', GROUPED),
+    (VENDOR_3GPP, 1018): ('Charging-Rule-Report', GROUPED),
+    (VENDOR_3GPP, 1019): ('PCC-Rule-Status', ENUMERATED),
+    (VENDOR_3GPP, 1020): ('Bearer-Identifier', OCTETSTRING),
+    (VENDOR_3GPP, 1021): ('Bearer-Operation', ENUMERATED),
+    (VENDOR_3GPP, 1022): ('Access-Network-Charging-Identifier-Gx', GROUPED),
+    (VENDOR_3GPP, 1023): ('Bearer-Control-Mode', ENUMERATED),
+    (VENDOR_3GPP, 1024): ('Network-Request-Support', ENUMERATED),
+    (VENDOR_3GPP, 1025): ('Guaranteed-Bitrate-DL', UNSIGNED32),
+    (VENDOR_3GPP, 1026): ('Guaranteed-Bitrate-UL', UNSIGNED32),
+    (VENDOR_3GPP, 1027): ('IP-CAN-Type', ENUMERATED),
+    (VENDOR_3GPP, 1028): ('QoS-Class-Identifier', ENUMERATED),
+    (VENDOR_3GPP, 1032): ('RAT-Type', ENUMERATED),
+    (VENDOR_3GPP, 1034): ('Allocation-Retention-Priority', GROUPED),
+    (VENDOR_3GPP, 1040): ('APN-Aggregate-Max-Bitrate-DL', UNSIGNED32),
+    (VENDOR_3GPP, 1041): ('APN-Aggregate-Max-Bitrate-UL', UNSIGNED32),
+    (VENDOR_3GPP, 1045): ('Session-Release-Cause', ENUMERATED),
+    (VENDOR_3GPP, 1046): ('Priority-Level', UNSIGNED32),
+    (VENDOR_3GPP, 1047): ('Pre-emption-Capability', ENUMERATED),
+    (VENDOR_3GPP, 1048): ('Pre-emption-Vulnerability', ENUMERATED),
+    (VENDOR_3GPP, 1049): ('Default-EPS-Bearer-QoS', GROUPED),
+    (VENDOR_3GPP, 1050): ('AN-GW-Address', ADDRESS),
+    (VENDOR_3GPP, 1055): ('Packet-Filter-Content', OCTETSTRING),
+    (VENDOR_3GPP, 1056): ('Packet-Filter-Identifier', OCTETSTRING),
+    (VENDOR_3GPP, 1057): ('Packet-Filter-Information', GROUPED),
+    (VENDOR_3GPP, 1058): ('Flow-Information', GROUPED),
+    (VENDOR_3GPP, 1059): ('Packet-Filter-Operation', ENUMERATED),
+    (VENDOR_3GPP, 1066): ('Monitoring-Key', OCTETSTRING),
+    (VENDOR_3GPP, 1067): ('Usage-Monitoring-Information', GROUPED),
+    (VENDOR_3GPP, 1068): ('Usage-Monitoring-Level', ENUMERATED),
+    (VENDOR_3GPP, 1069): ('Usage-Monitoring-Report', ENUMERATED),
+    (VENDOR_3GPP, 1070): ('Usage-Monitoring-Support', ENUMERATED),
+    (VENDOR_3GPP, 1080): ('Flow-Direction', ENUMERATED),
+
+    # S6a / S6d (TS 29.272)
+    (VENDOR_3GPP, 1400): ('Subscription-Data', GROUPED),
+    (VENDOR_3GPP, 1401): ('Terminal-Information', GROUPED),
+    (VENDOR_3GPP, 1402): ('IMEI', UTF8STRING),
+    (VENDOR_3GPP, 1403): ('Software-Version', UTF8STRING),
+    (VENDOR_3GPP, 1404): ('QoS-Subscribed', OCTETSTRING),
+    (VENDOR_3GPP, 1405): ('ULR-Flags', UNSIGNED32),
+    (VENDOR_3GPP, 1406): ('ULA-Flags', UNSIGNED32),
+    (VENDOR_3GPP, 1407): ('Visited-PLMN-Id', OCTETSTRING),
+    (VENDOR_3GPP, 1408): ('Requested-EUTRAN-Authentication-Info', GROUPED),
+    (VENDOR_3GPP, 1409): ('Requested-UTRAN-GERAN-Authentication-Info', GROUPED),
+    (VENDOR_3GPP, 1410): ('Number-Of-Requested-Vectors', UNSIGNED32),
+    (VENDOR_3GPP, 1411): ('Re-Synchronization-Info', OCTETSTRING),
+    (VENDOR_3GPP, 1412): ('Immediate-Response-Preferred', UNSIGNED32),
+    (VENDOR_3GPP, 1413): ('Authentication-Info', GROUPED),
+    (VENDOR_3GPP, 1414): ('E-UTRAN-Vector', GROUPED),
+    (VENDOR_3GPP, 1415): ('UTRAN-Vector', GROUPED),
+    (VENDOR_3GPP, 1416): ('GERAN-Vector', GROUPED),
+    (VENDOR_3GPP, 1417): ('Network-Access-Mode', ENUMERATED),
+    (VENDOR_3GPP, 1418): ('HPLMN-ODB', UNSIGNED32),
+    (VENDOR_3GPP, 1419): ('Item-Number', UNSIGNED32),
+    (VENDOR_3GPP, 1420): ('Cancellation-Type', ENUMERATED),
+    (VENDOR_3GPP, 1421): ('DSR-Flags', UNSIGNED32),
+    (VENDOR_3GPP, 1422): ('DSA-Flags', UNSIGNED32),
+    (VENDOR_3GPP, 1423): ('Context-Identifier', UNSIGNED32),
+    (VENDOR_3GPP, 1424): ('Subscriber-Status', ENUMERATED),
+    (VENDOR_3GPP, 1425): ('Operator-Determined-Barring', UNSIGNED32),
+    (VENDOR_3GPP, 1426): ('Access-Restriction-Data', UNSIGNED32),
+    (VENDOR_3GPP, 1427): ('APN-OI-Replacement', UTF8STRING),
+    (VENDOR_3GPP, 1428): ('All-APN-Configurations-Included-Indicator', ENUMERATED),
+    (VENDOR_3GPP, 1429): ('APN-Configuration-Profile', GROUPED),
+    (VENDOR_3GPP, 1430): ('APN-Configuration', GROUPED),
+    (VENDOR_3GPP, 1431): ('EPS-Subscribed-QoS-Profile', GROUPED),
+    (VENDOR_3GPP, 1432): ('VPLMN-Dynamic-Address-Allowed', ENUMERATED),
+    (VENDOR_3GPP, 1433): ('STN-SR', OCTETSTRING),
+    (VENDOR_3GPP, 1434): ('Alert-Reason', ENUMERATED),
+    (VENDOR_3GPP, 1435): ('AMBR', GROUPED),
+    (VENDOR_3GPP, 1436): ('CSG-Subscription-Data', GROUPED),
+    (VENDOR_3GPP, 1437): ('CSG-Id', UNSIGNED32),
+    (VENDOR_3GPP, 1438): ('PDN-GW-Allocation-Type', ENUMERATED),
+    (VENDOR_3GPP, 1439): ('Expiration-Date', TIME),
+    (VENDOR_3GPP, 1440): ('RAT-Frequency-Selection-Priority-ID', UNSIGNED32),
+    (VENDOR_3GPP, 1441): ('IDA-Flags', UNSIGNED32),
+    (VENDOR_3GPP, 1442): ('PUA-Flags', UNSIGNED32),
+    (VENDOR_3GPP, 1443): ('NOR-Flags', UNSIGNED32),
+    (VENDOR_3GPP, 1444): ('User-Id', UTF8STRING),
+    (VENDOR_3GPP, 1445): ('Equipment-Status', ENUMERATED),
+    (VENDOR_3GPP, 1446): ('Regional-Subscription-Zone-Code', OCTETSTRING),
+    (VENDOR_3GPP, 1447): ('RAND', OCTETSTRING),
+    (VENDOR_3GPP, 1448): ('XRES', OCTETSTRING),
+    (VENDOR_3GPP, 1449): ('AUTN', OCTETSTRING),
+    (VENDOR_3GPP, 1450): ('KASME', OCTETSTRING),
+    (VENDOR_3GPP, 1456): ('PDN-Type', ENUMERATED),
+    (VENDOR_3GPP, 1457): ('Roaming-Restricted-Due-To-Unsupported-Feature', ENUMERATED),
+    (VENDOR_3GPP, 1458): ('Trace-Data', GROUPED),
+    (VENDOR_3GPP, 1489): ('SGSN-Number', OCTETSTRING),
+    (VENDOR_3GPP, 1490): ('IDR-Flags', UNSIGNED32),
+    (VENDOR_3GPP, 1619): ('Subscribed-Periodic-RAU-TAU-Timer', UNSIGNED32),
+    (VENDOR_3GPP, 1638): ('CLR-Flags', UNSIGNED32),
+    (VENDOR_3GPP, 1681): ('Non-IP-PDN-Type-Indicator', ENUMERATED),
+    (VENDOR_3GPP, 1682): ('Non-IP-Data-Delivery-Mechanism', UNSIGNED32),
+    (VENDOR_3GPP, 1684): ('SCEF-Realm', DIAMETERIDENTITY),
+    (VENDOR_3GPP, 1686): ('Preferred-Data-Mode', UNSIGNED32),
+    (VENDOR_3GPP, 1697): ('RDS-Indicator', ENUMERATED),
+    (VENDOR_3GPP, 3125): ('SCEF-ID', DIAMETERIDENTITY),
+
+    # SLh (TS 29.173)
+    (VENDOR_3GPP, 2400): ('LMSI', OCTETSTRING),
+    (VENDOR_3GPP, 2401): ('Serving-Node', GROUPED),
+    (VENDOR_3GPP, 2402): ('MME-Name', DIAMETERIDENTITY),
+    (VENDOR_3GPP, 2403): ('MSC-Number', OCTETSTRING),
+    (VENDOR_3GPP, 2404): ('LCS-Capabilities-Sets', UNSIGNED32),
+    (VENDOR_3GPP, 2405): ('GMLC-Address', ADDRESS),
+    (VENDOR_3GPP, 2406): ('Additional-Serving-Node', GROUPED),
+    (VENDOR_3GPP, 2407): ('PPR-Address', ADDRESS),
+    (VENDOR_3GPP, 2408): ('MME-Realm', DIAMETERIDENTITY),
+    (VENDOR_3GPP, 2409): ('SGSN-Name', DIAMETERIDENTITY),
+    (VENDOR_3GPP, 2410): ('SGSN-Realm', DIAMETERIDENTITY),
+}
+
+#Reverse lookup, from AVP name to (Vendor-Id, AVP Code)
+avpCodesByName = {avpName: avpKey for avpKey, (avpName, avpType) in avpDictionary.items()}
+
+#Interface names, keyed by Application-Id
+applicationDictionary = {
+    0: 'Base',
+    4: 'Ro',
+    16777216: 'Cx',
+    16777217: 'Sh',
+    16777236: 'Rx',
+    16777238: 'Gx',
+    16777251: 'S6a',
+    16777252: 'S13',
+    16777291: 'SLh',
+}
@@ -0,0 +1,147 @@
+#Fair Queue
+#An asyncio queue holding a sub-queue per flow (eg. per Diameter peer), served by weighted deficit round robin.
+import asyncio
+from collections import deque
+
+
+class FairQueue:
+    """
+    An asyncio queue holding a separate sub-queue for each flow, served by deficit round robin.
+    Each time a backlogged flow reaches the head of the round, its deficit grows by its weight, and it may dequeue one item per whole unit of deficit.
+    Flows are therefore served in proportion to their weights, however many items any single flow has queued.
+    Implements the parts of the asyncio.Queue interface used by diameterService, with put and put_nowait taking the flow key and weight.
+    """
+
+    def __init__(self, maxsize: int=0):
+        self.maxsize = maxsize
+        self.size = 0
+        self.flowQueues = {}
+        self.flowWeights = {}
+        self.flowDeficits = {}
+        #Backlogged flows, in round robin order
+        self.activeFlows = deque()
+        self.getters = deque()
+        self.putters = deque()
+
+    def qsize(self) -> int:
+        return self.size
+
+    def empty(self) -> bool:
+        return self.size == 0
+
+    def full(self) -> bool:
+        return 0 < self.maxsize <= self.size
+
+    def flowSize(self, flowKey) -> int:
+        """
+        Returns the number of items queued for a given flow.
+        """
+        flowQueue = self.flowQueues.get(flowKey, None)
+        return len(flowQueue) if flowQueue is not None else 0
+
+    def flowSizes(self) -> dict:
+        """
+        Returns the number of items queued for each backlogged flow.
+        """
+        return {flowKey: len(self.flowQueues[flowKey]) for flowKey in self.activeFlows}
+
+    def put_nowait(self, item, flowKey, weight: float=1.0):
+        """
+        Queues an item for a given flow, raising asyncio.QueueFull if the queue is full.
+        The weight is updated on every put, so a flow's weight can change once more is known about it (eg. its peer type).
+        """
+        if self.full():
+            raise asyncio.QueueFull
+        flowQueue = self.flowQueues.get(flowKey, None)
+        if flowQueue is None:
+            flowQueue = self.flowQueues[flowKey] = deque()
+            self.flowDeficits[flowKey] = 0.0
+            self.activeFlows.append(flowKey)
+        self.flowWeights[flowKey] = max(float(weight), 0.01)
+        flowQueue.append(item)
+        self.size += 1
+        self.wakeNext(self.getters)
+
+    async def put(self, item, flowKey, weight: float=1.0):
+        """
+        Queues an item for a given flow, waiting until there is room if the queue is full.
+        """
+        while self.full():
+            putter = asyncio.get_running_loop().create_future()
+            self.putters.append(putter)
+            try:
+                await(putter)
+            except:
+                putter.cancel()
+                try:
+                    self.putters.remove(putter)
+                except ValueError:
+                    pass
+                #If this putter was woken for room it won't use, pass the wakeup on
+                if not self.full() and not putter.cancelled():
+                    self.wakeNext(self.putters)
+                raise
+        self.put_nowait(item, flowKey, weight)
+
+    def wakeNext(self, waiters: deque):
+        """
+        Wakes the first of the given getters or putters that is still waiting.
+        """
+        while waiters:
+            waiter = waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                break
+
+    def get_nowait(self):
+        """
+        Removes and returns the next item, by deficit round robin across backlogged flows.
+        Raises asyncio.QueueEmpty if there are no items queued.
+        """
+        if self.size == 0:
+            raise asyncio.QueueEmpty
+        activeFlows = self.activeFlows
+        flowDeficits = self.flowDeficits
+        while True:
+            flowKey = activeFlows[0]
+            if flowDeficits[flowKey] < 1:
+                flowDeficits[flowKey] += self.flowWeights[flowKey]
+                if flowDeficits[flowKey] < 1:
+                    #Flows weighted below 1 build up deficit over several rounds
+                    activeFlows.rotate(-1)
+                    continue
+            flowDeficits[flowKey] -= 1
+            flowQueue = self.flowQueues[flowKey]
+            item = flowQueue.popleft()
+            self.size -= 1
+            self.wakeNext(self.putters)
+            if not flowQueue:
+                #A flow leaving the round forfeits its remaining deficit
+                activeFlows.popleft()
+                del self.flowQueues[flowKey]
+                del self.flowDeficits[flowKey]
+                del self.flowWeights[flowKey]
+            elif flowDeficits[flowKey] < 1:
+                activeFlows.rotate(-1)
+            return item
+
+    async def get(self):
+        """
+        Removes and returns the next item, waiting until one is available.
+        """
+        while self.size == 0:
+            getter = asyncio.get_running_loop().create_future()
+            self.getters.append(getter)
+            try:
+                await(getter)
+            except:
+                getter.cancel()
+                try:
+                    self.getters.remove(getter)
+                except ValueError:
+                    pass
+                #If this getter was woken for an item it won't take, pass the wakeup on
+                if self.size > 0 and not getter.cancelled():
+                    self.wakeNext(self.getters)
+                raise
+        return self.get_nowait()
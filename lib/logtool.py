@@ -1,7 +1,7 @@
 import logging
 import logging.handlers as handlers
-import os, sys, time
-import socket
+import os, sys, time, json
+import socket, threading, collections, atexit
 from datetime import datetime
 sys.path.append(os.path.realpath('../'))
 import asyncio
@@ -23,6 +23,10 @@ class TimestampFilter (logging.Filter):
 class LogTool:
     """
     Reusable logging class, providing both asynchronous and synchronous logging functions.
+    Messages may be given as a callable returning the message, which is only called if the message's level is enabled,
+    so expensive debug messages (eg. dumps of whole packets or subscriber records) cost nothing at production log levels.
+    Log messages are buffered in memory and shipped to redis (and printed, if enabled) in batches by a background thread, so logging doesn't wait on redis.
+    If the buffer (logging.log_buffer_size) is full, messages are dropped and counted in prom_log_dropped_count. A buffer size of 0 sends each message immediately.
     """
     def __init__(self, config: dict):
         self.logLevels = {
@@ -34,6 +38,9 @@ class LogTool:
         'NOTSET': {'verbosity': 6, 'logging':  logging.NOTSET},
         }
         self.logLevel = config.get('logging', {}).get('level', 'INFO')
+        self.logLevelVerbosity = self.logLevels.get(self.logLevel.upper(), {}).get('verbosity', 4)
+        #Whether each level is logged, keyed by the level string as given by the caller
+        self.enabledLevels = {}
 
         self.redisUseUnixSocket = config.get('redis', {}).get('useUnixSocket', False)
         self.redisUnixSocketPath = config.get('redis', {}).get('unixSocketPath', '/var/run/redis/redis-server.sock')
@@ -43,37 +50,150 @@ class LogTool:
         self.redisMessagingAsync = RedisMessagingAsync(host=self.redisHost, port=self.redisPort, useUnixSocket=self.redisUseUnixSocket, unixSocketPath=self.redisUnixSocketPath)
         self.redisMessaging = RedisMessaging(host=self.redisHost, port=self.redisPort, useUnixSocket=self.redisUseUnixSocket, unixSocketPath=self.redisUnixSocketPath)
         self.hostname = socket.gethostname()
-    
-    async def logAsync(self, service: str, level: str, message: str, redisClient=None) -> bool:
+
+        self.logToConsole = config.get('logging', {}).get('log_to_console', True)
+        self.logBufferSize = int(config.get('logging', {}).get('log_buffer_size', 10000))
+        self.logBatchSize = int(config.get('logging', {}).get('log_batch_size', 500))
+        self.logBuffer = collections.deque()
+        self.droppedLogMessages = 0
+        self.reportedDroppedLogMessages = 0
+        self.resetLogShipper()
+        #The shipper thread doesn't survive a fork, so forked processes (eg. hssService workers) start their own
+        os.register_at_fork(after_in_child=self.resetLogShipper)
+        atexit.register(self.flushLogMessages)
+
+    def resetLogShipper(self):
+        """
+        Clears the log shipper state, so the next buffered message starts a new shipper thread.
+        Messages inherited from a parent process are discarded, as the parent ships them itself.
+        """
+        self.logShipper = None
+        self.logShipperLock = threading.Lock()
+        self.logBufferEvent = threading.Event()
+        self.logBuffer.clear()
+
+    def startLogShipper(self):
+        """
+        Starts the background thread shipping buffered log messages, if it isn't running yet.
+        """
+        with self.logShipperLock:
+            if self.logShipper is None:
+                self.logShipper = threading.Thread(target=self.shipLogMessages, name='logShipper', daemon=True)
+                self.logShipper.start()
+
+    def bufferLogMessage(self, service: str, level: str, message) -> bool:
+        """
+        Adds a log message to the buffer, returning False if the buffer is full and the message was dropped.
+        """
+        if self.logShipper is None:
+            self.startLogShipper()
+        if len(self.logBuffer) >= self.logBufferSize:
+            #Messages are dropped from any thread logging, so the count is kept under the lock
+            with self.logShipperLock:
+                self.droppedLogMessages += 1
+            return False
+        self.logBuffer.append((service.lower(), level, time.time(), message))
+        if not self.logBufferEvent.is_set():
+            self.logBufferEvent.set()
+        return True
+
+    def flushLogMessages(self):
         """
-        Tests loglevel, prints to console and queues a log message to an asynchronous redis messaging client.
+        Prints and ships all buffered log messages to redis, in batches of up to logging.log_batch_size messages.
         """
+        while self.logBuffer:
+            logBatch = []
+            while self.logBuffer and len(logBatch) < self.logBatchSize:
+                try:
+                    logBatch.append(self.logBuffer.popleft())
+                except IndexError:
+                    break
+            if self.logToConsole:
+                sys.stdout.write(''.join(f"[{self.formatTimestamp(timestamp)}] [{level.upper()}] {message}\n" for service, level, timestamp, message in logBatch))
+                sys.stdout.flush()
+            logMessages = [json.dumps({"message": message, "service": service, "level": level, "timestamp": timestamp}, default=str) for service, level, timestamp, message in logBatch]
+            self.redisMessaging.sendLogMessages(logMessages=logMessages, logExpiry=60, usePrefix=True, prefixHostname=self.hostname, prefixServiceName='log')
+
+        #Flushes can run in the shipper thread and the caller at once, so each drop is claimed under the lock and reported once
+        with self.logShipperLock:
+            droppedLogMessages = self.droppedLogMessages - self.reportedDroppedLogMessages
+            self.reportedDroppedLogMessages += droppedLogMessages
+        if droppedLogMessages > 0:
+            print(f"[LogTool] Warning - Log buffer full, dropped {droppedLogMessages} log message(s).")
+            self.redisMessaging.sendMetric(serviceName='log', metricName='prom_log_dropped_count',
+                                            metricType='counter', metricAction='inc',
+                                            metricValue=float(droppedLogMessages), metricHelp='Number of log messages dropped due to a full log buffer',
+                                            metricExpiry=60,
+                                            usePrefix=True,
+                                            prefixHostname=self.hostname,
+                                            prefixServiceName='metric')
+
+    def shipLogMessages(self):
+        """
+        Runs in the log shipper thread, shipping buffered log messages whenever any are added.
+        """
+        while True:
+            try:
+                self.logBufferEvent.wait()
+                self.logBufferEvent.clear()
+                self.flushLogMessages()
+            except Exception as e:
+                print(f"[LogTool] Error shipping log messages: {e}")
+                time.sleep(1)
+
+    def formatTimestamp(self, timestamp: float) -> str:
+        """
+        Formats a log message timestamp for the console.
+        """
+        return datetime.fromtimestamp(timestamp).strftime("%m/%d/%Y %H:%M:%S %Z").strip()
+
+    def isEnabledFor(self, level: str) -> bool:
+        """
+        Returns True if messages of the given level are logged.
+        """
+        enabled = self.enabledLevels.get(level)
+        if enabled is None:
+            enabled = self.enabledLevels[level] = self.logLevels.get(level.upper(), {}).get('verbosity', 4) <= self.logLevelVerbosity
+        return enabled
+
+    async def logAsync(self, service: str, level: str, message, redisClient=None) -> bool:
+        """
+        Tests loglevel, then buffers a log message for the log shipper.
+        If buffering is disabled, prints to console and queues the log message to an asynchronous redis messaging client instead.
+        message may be a string, or a callable returning the message.
+        """
+        if not self.isEnabledFor(level):
+            return False
+        if callable(message):
+            message = message()
+        if self.logBufferSize > 0:
+            return self.bufferLogMessage(service, level, message)
         if redisClient == None:
             redisClient = self.redisMessagingAsync
-        configLogLevelVerbosity = self.logLevels.get(self.logLevel.upper(), {}).get('verbosity', 4)
-        messageLogLevelVerbosity = self.logLevels.get(level.upper(), {}).get('verbosity', 4)
-        if not messageLogLevelVerbosity <= configLogLevelVerbosity:
-            return False
         timestamp = time.time()
-        dateTimeString = datetime.fromtimestamp(timestamp).strftime("%m/%d/%Y %H:%M:%S %Z").strip()
-        print(f"[{dateTimeString}] [{level.upper()}] {message}")
+        if self.logToConsole:
+            print(f"[{self.formatTimestamp(timestamp)}] [{level.upper()}] {message}")
         await(redisClient.sendLogMessage(serviceName=service.lower(), logLevel=level, logTimestamp=timestamp, message=message, logExpiry=60, usePrefix=True, prefixHostname=self.hostname, prefixServiceName='log'))
         return True
     
-    def log(self, service: str, level: str, message: str, redisClient=None) -> bool:
+    def log(self, service: str, level: str, message, redisClient=None) -> bool:
         """
-        Tests loglevel, prints to console and queues a log message to a synchronous redis messaging client.
+        Tests loglevel, then buffers a log message for the log shipper.
+        If buffering is disabled, prints to console and queues the log message to a synchronous redis messaging client instead.
+        message may be a string, or a callable returning the message.
         """
+        if not self.isEnabledFor(level):
+            return False
+        if callable(message):
+            message = message()
+        if self.logBufferSize > 0:
+            return self.bufferLogMessage(service, level, message)
         if redisClient == None:
             redisClient = self.redisMessaging
-        configLogLevelVerbosity = self.logLevels.get(self.logLevel.upper(), {}).get('verbosity', 4)
-        messageLogLevelVerbosity = self.logLevels.get(level.upper(), {}).get('verbosity', 4)
-        if not messageLogLevelVerbosity <= configLogLevelVerbosity:
-            return False
         timestamp = time.time()
-        dateTimeString = datetime.fromtimestamp(timestamp).strftime("%m/%d/%Y %H:%M:%S %Z").strip()
-        print(f"[{dateTimeString}] [{level.upper()}] {message}")
-        redisClient.sendLogMessage(serviceName=service.lower(), logLevel=level, logTimestamp=timestamp, message=message, logExpiry=60, usePrefix=True, prefixHostname=self.hostname, prefixServiceName='diameter')
+        if self.logToConsole:
+            print(f"[{self.formatTimestamp(timestamp)}] [{level.upper()}] {message}")
+        redisClient.sendLogMessage(serviceName=service.lower(), logLevel=level, logTimestamp=timestamp, message=message, logExpiry=60, usePrefix=True, prefixHostname=self.hostname, prefixServiceName='log')
         return True
 
     def setupFileLogger(self, loggerName: str, logFilePath: str):
@@ -1,5 +1,5 @@
 from redis import Redis
-import time, json, uuid, traceback
+import time, json, uuid, traceback, threading
 
 class RedisMessaging:
     """
@@ -36,6 +36,23 @@ class RedisMessaging:
         except Exception as e:
             return ''
 
+    def sendShardedBulkMessage(self, queueMessages: dict, queueExpiry: int=None, usePrefix: bool=False, prefixHostname: str='unknown', prefixServiceName: str='common') -> str:
+        """
+        Stores lists of messages in several Queues (Keys) with a single redis pipeline, keeping the order of the messages in each list.
+        queueMessages is a dict of Queue name to a list of messages.
+        """
+        try:
+            redisPipe = self.redisClient.pipeline(transaction=False)
+            for queue, messageList in queueMessages.items():
+                queue = self.handlePrefix(key=queue, usePrefix=usePrefix, prefixHostname=prefixHostname, prefixServiceName=prefixServiceName)
+                redisPipe.rpush(queue, *messageList)
+                if queueExpiry is not None:
+                    redisPipe.expire(queue, queueExpiry)
+            redisPipe.execute()
+            return f'Messages stored in {len(queueMessages)} queues successfully.'
+        except Exception as e:
+            return ''
+
     def sendMetric(self, serviceName: str, metricName: str, metricType: str, metricAction: str, metricValue: float, metricHelp: str='', metricLabels: list=[], metricTimestamp: int=time.time_ns(), metricExpiry: int=None, usePrefix: bool=False, prefixHostname: str='unknown', prefixServiceName: str='common') -> str:
         """
         Stores a prometheus metric in a format readable by the metric service.
@@ -65,6 +82,41 @@ class RedisMessaging:
         except Exception as e:
             return ''
     
+    def sendMetrics(self, metricList: list, metricTimestamp: int=None, metricExpiry: int=None, usePrefix: bool=False, prefixHostname: str='unknown', prefixServiceName: str='common') -> str:
+        """
+        Stores several prometheus metrics as a single message readable by the metric service.
+        metricList is a list of dicts holding the serviceName, metricName, metricType, metricAction, metricValue and optionally metricHelp, metricLabels, metricBuckets and metricBucketCounts arguments of each metric.
+        """
+        if not metricList:
+            return ''
+        if metricTimestamp is None:
+            metricTimestamp = time.time_ns()
+        prometheusMetricBody = json.dumps([{
+        'serviceName': metric['serviceName'],
+        'timestamp': metricTimestamp,
+        'NAME': metric['metricName'],
+        'TYPE': metric['metricType'],
+        'HELP': metric.get('metricHelp', ''),
+        'LABELS': metric.get('metricLabels', []),
+        'ACTION': metric['metricAction'],
+        'VALUE': float(metric['metricValue']),
+        **({'BUCKETS': metric['metricBuckets']} if 'metricBuckets' in metric else {}),
+        **({'BUCKET_COUNTS': metric['metricBucketCounts']} if 'metricBucketCounts' in metric else {}),
+        } for metric in metricList
+        ])
+
+        queue = self.handlePrefix(key='metric', usePrefix=usePrefix, prefixHostname=prefixHostname, prefixServiceName=prefixServiceName)
+
+        try:
+            redisPipe = self.redisClient.pipeline(transaction=False)
+            redisPipe.rpush(queue, prometheusMetricBody)
+            if metricExpiry is not None:
+                redisPipe.expire(queue, metricExpiry)
+            redisPipe.execute()
+            return f'Succesfully stored {len(metricList)} metrics'
+        except Exception as e:
+            return ''
+
     def sendLogMessage(self, serviceName: str, logLevel: str, logTimestamp: int, message: str, logExpiry: int=None, usePrefix: bool=False, prefixHostname: str='unknown', prefixServiceName: str='common') -> str:
         """
         Stores a message in a given Queue (Key).
@@ -79,6 +131,21 @@ class RedisMessaging:
         except Exception as e:
             return ''
 
+    def sendLogMessages(self, logMessages: list, logExpiry: int=None, usePrefix: bool=False, prefixHostname: str='unknown', prefixServiceName: str='common') -> str:
+        """
+        Stores a list of log messages, already serialized as by sendLogMessage, with a single redis pipeline.
+        """
+        try:
+            queue = self.handlePrefix(key='log', usePrefix=usePrefix, prefixHostname=prefixHostname, prefixServiceName=prefixServiceName)
+            redisPipe = self.redisClient.pipeline(transaction=False)
+            redisPipe.rpush(queue, *logMessages)
+            if logExpiry is not None:
+                redisPipe.expire(queue, logExpiry)
+            redisPipe.execute()
+            return f'{len(logMessages)} log messages stored in {queue} successfully.'
+        except Exception as e:
+            return ''
+
     def getMessage(self, queue: str, usePrefix: bool=False, prefixHostname: str='unknown', prefixServiceName: str='common') -> str:
         """
         Gets the oldest message from a given Queue (Key), while removing it from the key as well. Deletes the key if the last message is being removed.
@@ -130,13 +197,15 @@ class RedisMessaging:
         except Exception as e:
             return ''
 
-    def awaitBulkMessage(self, key: str, count: int=100, usePrefix: bool=False, prefixHostname: str='unknown', prefixServiceName: str='common'):
+    def awaitBulkMessage(self, key: str, count: int=100, timeout: float=0, direction: str='RIGHT', usePrefix: bool=False, prefixHostname: str='unknown', prefixServiceName: str='common'):
         """
         Blocks until one or more messages are received at the given key, then returns the amount of messages specified by count.
+        If timeout (in seconds) is non-zero, returns None if no messages are received in that time.
+        Messages are popped from the end of the list given by direction, use 'LEFT' to receive messages in the order they were queued.
         """
         try:
             key = self.handlePrefix(key=key, usePrefix=usePrefix, prefixHostname=prefixHostname, prefixServiceName=prefixServiceName)
-            message =  self.redisClient.blmpop(0, 1, key, direction='RIGHT', count=count)
+            message =  self.redisClient.blmpop(timeout, 1, key, direction=direction, count=count)
             return message
         except Exception as e:
             print(traceback.format_exc())
@@ -180,9 +249,10 @@ class RedisMessaging:
         except Exception as e:
             return ''
 
-    def getList(self, key: str, usePrefix: bool=False, prefixHostname: str='unknown', prefixServiceName: str='common') -> list:
+    def getList(self, key: str, decode: bool=True, usePrefix: bool=False, prefixHostname: str='unknown', prefixServiceName: str='common') -> list:
         """
         Gets the list stored under a given key.
+        Set decode to False to get the raw bytes of each entry, for binary messages.
         """
         try:
             key = self.handlePrefix(key=key, usePrefix=usePrefix, prefixHostname=prefixHostname, prefixServiceName=prefixServiceName)
@@ -190,10 +260,105 @@ class RedisMessaging:
             if allResults is None:
                 result = []
             else:
+                if not decode:
+                    return allResults
                 return [result.decode() for result in allResults]
         except Exception as e:
             return []
 
+    def setHashValues(self, key: str, values: dict, keyExpiry: int=None, usePrefix: bool=False, prefixHostname: str='unknown', prefixServiceName: str='common') -> str:
+        """
+        Stores one or more fields in the hash under a given key and sets an expiry (in seconds) on the key if provided.
+        """
+        try:
+            key = self.handlePrefix(key=key, usePrefix=usePrefix, prefixHostname=prefixHostname, prefixServiceName=prefixServiceName)
+            redisPipe = self.redisClient.pipeline()
+            redisPipe.hset(key, mapping=values)
+            if keyExpiry is not None:
+                redisPipe.expire(key, keyExpiry)
+            redisPipe.execute()
+            return f'{len(values)} fields stored in {key} successfully.'
+        except Exception as e:
+            return ''
+
+    def getHashValue(self, key: str, field: str, usePrefix: bool=False, prefixHostname: str='unknown', prefixServiceName: str='common') -> str:
+        """
+        Gets the value of a single field in the hash under a given key.
+        """
+        try:
+            key = self.handlePrefix(key=key, usePrefix=usePrefix, prefixHostname=prefixHostname, prefixServiceName=prefixServiceName)
+            value = self.redisClient.hget(key, field)
+            if value is None:
+                return ''
+            return value.decode()
+        except Exception as e:
+            return ''
+
+    def getAllHashValues(self, key: str, usePrefix: bool=False, prefixHostname: str='unknown', prefixServiceName: str='common') -> dict:
+        """
+        Gets every field and value in the hash under a given key, as a dict of strings.
+        """
+        try:
+            key = self.handlePrefix(key=key, usePrefix=usePrefix, prefixHostname=prefixHostname, prefixServiceName=prefixServiceName)
+            allFields = self.redisClient.hgetall(key)
+            return {field.decode(): value.decode() for field, value in allFields.items()}
+        except Exception as e:
+            return {}
+
+    def deleteHashValues(self, key: str, fields: list, usePrefix: bool=False, prefixHostname: str='unknown', prefixServiceName: str='common') -> bool:
+        """
+        Deletes the given fields from the hash under a given key.
+        """
+        try:
+            key = self.handlePrefix(key=key, usePrefix=usePrefix, prefixHostname=prefixHostname, prefixServiceName=prefixServiceName)
+            self.redisClient.hdel(key, *fields)
+            return True
+        except Exception as e:
+            return False
+
+    def publishMessage(self, channel: str, message: str, usePrefix: bool=False, prefixHostname: str='unknown', prefixServiceName: str='common') -> bool:
+        """
+        Publishes a message to a given pub/sub channel.
+        """
+        try:
+            channel = self.handlePrefix(key=channel, usePrefix=usePrefix, prefixHostname=prefixHostname, prefixServiceName=prefixServiceName)
+            self.redisClient.publish(channel, message)
+            return True
+        except Exception as e:
+            return False
+
+    def subscribeToChannel(self, channel: str, messageHandler, subscribeHandler=None, usePrefix: bool=False, prefixHostname: str='unknown', prefixServiceName: str='common') -> threading.Thread:
+        """
+        Subscribes to a given pub/sub channel in a background thread, calling messageHandler with each message received.
+        Pub/sub messages sent while disconnected are lost, so subscribeHandler (if provided) is called after every (re)subscription
+        to let the caller resynchronise its state.
+        """
+        channel = self.handlePrefix(key=channel, usePrefix=usePrefix, prefixHostname=prefixHostname, prefixServiceName=prefixServiceName)
+
+        def listenToChannel():
+            while True:
+                pubSub = self.redisClient.pubsub(ignore_subscribe_messages=True)
+                try:
+                    pubSub.subscribe(channel)
+                    if subscribeHandler is not None:
+                        subscribeHandler()
+                    for message in pubSub.listen():
+                        try:
+                            messageHandler(message['data'].decode())
+                        except Exception as e:
+                            continue
+                except Exception as e:
+                    time.sleep(1)
+                finally:
+                    try:
+                        pubSub.close()
+                    except Exception as e:
+                        pass
+
+        subscriberThread = threading.Thread(target=listenToChannel, name=f"subscriber-{channel}", daemon=True)
+        subscriberThread.start()
+        return subscriberThread
+
     def RedisHGetAll(self, key: str, usePrefix: bool=False, prefixHostname: str='unknown', prefixServiceName: str='common'):
         """
         Wrapper for Redis HGETALL
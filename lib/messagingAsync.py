@@ -60,6 +60,23 @@ class RedisMessagingAsync:
         except Exception as e:
             return ''
 
+    async def sendShardedBulkMessage(self, queueMessages: dict, queueExpiry: int=None, usePrefix: bool=False, prefixHostname: str='unknown', prefixServiceName: str='common') -> str:
+        """
+        Stores lists of messages in several Queues (Keys) with a single redis pipeline, keeping the order of the messages in each list.
+        queueMessages is a dict of Queue name to a list of messages.
+        """
+        try:
+            async with self.redisClient.pipeline(transaction=False) as redisPipe:
+                for queue, messageList in queueMessages.items():
+                    queue = await(self.handlePrefix(key=queue, usePrefix=usePrefix, prefixHostname=prefixHostname, prefixServiceName=prefixServiceName))
+                    redisPipe.rpush(queue, *messageList)
+                    if queueExpiry is not None:
+                        redisPipe.expire(queue, queueExpiry)
+                await(redisPipe.execute())
+            return f'Messages stored in {len(queueMessages)} queues successfully.'
+        except Exception as e:
+            return ''
+
     async def sendMetric(self, serviceName: str, metricName: str, metricType: str, metricAction: str, metricValue: float, metricHelp: str='', metricLabels: list=[], metricTimestamp: int=time.time_ns(), metricExpiry: int=None, usePrefix: bool=False, prefixHostname: str='unknown', prefixServiceName: str='common') -> str:
         """
         Stores a prometheus metric in a format readable by the metric service, asynchronously.
@@ -92,6 +109,41 @@ class RedisMessagingAsync:
         except Exception as e:
             return ''
 
+    async def sendMetrics(self, metricList: list, metricTimestamp: int=None, metricExpiry: int=None, usePrefix: bool=False, prefixHostname: str='unknown', prefixServiceName: str='common') -> str:
+        """
+        Stores several prometheus metrics as a single message readable by the metric service, asynchronously.
+        metricList is a list of dicts holding the serviceName, metricName, metricType, metricAction, metricValue and optionally metricHelp, metricLabels, metricBuckets and metricBucketCounts arguments of each metric.
+        """
+        if not metricList:
+            return ''
+        if metricTimestamp is None:
+            metricTimestamp = time.time_ns()
+        prometheusMetricBody = json.dumps([{
+        'serviceName': metric['serviceName'],
+        'timestamp': metricTimestamp,
+        'NAME': metric['metricName'],
+        'TYPE': metric['metricType'],
+        'HELP': metric.get('metricHelp', ''),
+        'LABELS': metric.get('metricLabels', []),
+        'ACTION': metric['metricAction'],
+        'VALUE': float(metric['metricValue']),
+        **({'BUCKETS': metric['metricBuckets']} if 'metricBuckets' in metric else {}),
+        **({'BUCKET_COUNTS': metric['metricBucketCounts']} if 'metricBucketCounts' in metric else {}),
+        } for metric in metricList
+        ])
+
+        queue = await(self.handlePrefix(key='metric', usePrefix=usePrefix, prefixHostname=prefixHostname, prefixServiceName=prefixServiceName))
+
+        try:
+            async with self.redisClient.pipeline(transaction=False) as redisPipe:
+                redisPipe.rpush(queue, prometheusMetricBody)
+                if metricExpiry is not None:
+                    redisPipe.expire(queue, metricExpiry)
+                await(redisPipe.execute())
+            return f'Succesfully stored {len(metricList)} metrics'
+        except Exception as e:
+            return ''
+
     async def sendLogMessage(self, serviceName: str, logLevel: str, logTimestamp: int, message: str, logExpiry: int=None, usePrefix: bool=False, prefixHostname: str='unknown', prefixServiceName: str='common') -> str:
         """
         Stores a log message in a given Queue (Key) asynchronously and sets an expiry (in seconds) if provided.
@@ -170,13 +222,15 @@ class RedisMessagingAsync:
         except Exception as e:
             return ''
 
-    async def awaitBulkMessage(self, key: str, count: int=100, usePrefix: bool=False, prefixHostname: str='unknown', prefixServiceName: str='common'):
+    async def awaitBulkMessage(self, key: str, count: int=100, direction: str='RIGHT', timeout: float=0, usePrefix: bool=False, prefixHostname: str='unknown', prefixServiceName: str='common'):
         """
-        Asynchronously blocks until one or more messages are received at the given key, then returns the amount of messages specified by count.
+        Asynchronously blocks until one or more messages are received at the given key, then returns up to the amount of messages specified by count.
+        Messages are popped from the end of the list given by direction, use 'LEFT' to receive messages in the order they were queued.
+        If timeout (in seconds) is non-zero, returns None if no messages are received in that time.
         """
         try:
             key = await(self.handlePrefix(key=key, usePrefix=usePrefix, prefixHostname=prefixHostname, prefixServiceName=prefixServiceName))
-            message = await(self.redisClient.blmpop(0, 1, key, direction='RIGHT', count=count))
+            message = await(self.redisClient.blmpop(timeout, 1, key, direction=direction, count=count))
             return message
         except Exception as e:
             print(traceback.format_exc())
@@ -222,6 +276,67 @@ class RedisMessagingAsync:
         except Exception as e:
             return ''
 
+    async def setHashValues(self, key: str, values: dict, keyExpiry: int=None, usePrefix: bool=False, prefixHostname: str='unknown', prefixServiceName: str='common') -> str:
+        """
+        Stores one or more fields in the hash under a given key asynchronously and sets an expiry (in seconds) on the key if provided.
+        """
+        try:
+            key = await(self.handlePrefix(key=key, usePrefix=usePrefix, prefixHostname=prefixHostname, prefixServiceName=prefixServiceName))
+            async with self.redisClient.pipeline(transaction=True) as redisPipe:
+                await redisPipe.hset(key, mapping=values)
+                if keyExpiry is not None:
+                    await redisPipe.expire(key, keyExpiry)
+                await redisPipe.execute()
+            return f'{len(values)} fields stored in {key} successfully.'
+        except Exception as e:
+            return ''
+
+    async def getHashValue(self, key: str, field: str, usePrefix: bool=False, prefixHostname: str='unknown', prefixServiceName: str='common') -> str:
+        """
+        Gets the value of a single field in the hash under a given key asynchronously.
+        """
+        try:
+            key = await(self.handlePrefix(key=key, usePrefix=usePrefix, prefixHostname=prefixHostname, prefixServiceName=prefixServiceName))
+            value = await(self.redisClient.hget(key, field))
+            if value is None:
+                return ''
+            return value.decode()
+        except Exception as e:
+            return ''
+
+    async def getAllHashValues(self, key: str, usePrefix: bool=False, prefixHostname: str='unknown', prefixServiceName: str='common') -> dict:
+        """
+        Gets every field and value in the hash under a given key asynchronously, as a dict of strings.
+        """
+        try:
+            key = await(self.handlePrefix(key=key, usePrefix=usePrefix, prefixHostname=prefixHostname, prefixServiceName=prefixServiceName))
+            allFields = await(self.redisClient.hgetall(key))
+            return {field.decode(): value.decode() for field, value in allFields.items()}
+        except Exception as e:
+            return {}
+
+    async def deleteHashValues(self, key: str, fields: list, usePrefix: bool=False, prefixHostname: str='unknown', prefixServiceName: str='common') -> bool:
+        """
+        Deletes the given fields from the hash under a given key asynchronously.
+        """
+        try:
+            key = await(self.handlePrefix(key=key, usePrefix=usePrefix, prefixHostname=prefixHostname, prefixServiceName=prefixServiceName))
+            await(self.redisClient.hdel(key, *fields))
+            return True
+        except Exception as e:
+            return False
+
+    async def publishMessage(self, channel: str, message: str, usePrefix: bool=False, prefixHostname: str='unknown', prefixServiceName: str='common') -> bool:
+        """
+        Publishes a message to a given pub/sub channel asynchronously.
+        """
+        try:
+            channel = await(self.handlePrefix(key=channel, usePrefix=usePrefix, prefixHostname=prefixHostname, prefixServiceName=prefixServiceName))
+            await(self.redisClient.publish(channel, message))
+            return True
+        except Exception as e:
+            return False
+
     async def closeConnection(self) -> bool:
         await self.redisClient.close()
         return True
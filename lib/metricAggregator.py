@@ -0,0 +1,123 @@
+#Metric Aggregator
+#Aggregates prometheus metrics in-process, and periodically sends the accumulated changes to metricService as a single message.
+import os, time, threading, atexit, bisect
+
+#The prometheus_client default histogram buckets, used when a histogram metric doesn't specify its own
+DEFAULT_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0]
+
+
+class MetricAggregator:
+    """
+    Drop-in replacement for RedisMessaging.sendMetric and sendMetrics on hot paths.
+    Counter and gauge increments are summed, the last value set on a gauge is kept, and histogram observations are counted into buckets.
+    Every flushInterval seconds, a background thread sends one entry per metric and label set that changed, so metric traffic follows
+    the number of label sets in use rather than the request rate.
+    Safe to call from multiple threads.
+    """
+
+    def __init__(self, redisMessaging, hostname: str, flushInterval: float=1.0):
+        self.redisMessaging = redisMessaging
+        self.hostname = hostname
+        self.flushInterval = flushInterval
+        #Pending changes, keyed by (metricName, labels, action)
+        self.pendingMetrics = {}
+        self.metricLock = threading.Lock()
+        self.metricFlusher = None
+        #The flusher thread doesn't survive a fork, so forked processes start their own
+        os.register_at_fork(after_in_child=self.resetMetricFlusher)
+        atexit.register(self.flushMetrics)
+
+    def resetMetricFlusher(self):
+        """
+        Discards changes inherited from a parent process, which the parent flushes itself, so the next metric starts a new flusher thread.
+        """
+        self.metricFlusher = None
+        self.metricLock = threading.Lock()
+        self.pendingMetrics = {}
+
+    def startMetricFlusher(self):
+        """
+        Starts the background thread flushing pending changes, if it isn't running yet.
+        """
+        with self.metricLock:
+            if self.metricFlusher is None:
+                self.metricFlusher = threading.Thread(target=self.flushMetricsPeriodically, name='metricFlusher', daemon=True)
+                self.metricFlusher.start()
+
+    def sendMetric(self, serviceName: str, metricName: str, metricType: str, metricAction: str, metricValue: float, metricHelp: str='', metricLabels: list=[], metricBuckets: list=None, **kwargs) -> str:
+        """
+        Adds a metric to the pending changes, with the same arguments as RedisMessaging.sendMetric.
+        Expiry and prefix arguments are accepted for compatibility, and replaced by those of the aggregator when flushed.
+        """
+        if not isinstance(metricValue, (int, float)):
+            return 'Invalid Argument: metricValue must be a digit'
+        if self.metricFlusher is None:
+            self.startMetricFlusher()
+        metricValue = float(metricValue)
+        metricAction = metricAction.lower()
+        labelKey = tuple(metricLabels.items()) if isinstance(metricLabels, dict) else ()
+        #Increments and decrements of the same metric and label set combine into a single change
+        actionKey = 'inc' if metricAction == 'dec' else metricAction
+        metricKey = (metricName, labelKey, actionKey)
+        with self.metricLock:
+            pendingMetric = self.pendingMetrics.get(metricKey)
+            if pendingMetric is None:
+                pendingMetric = self.pendingMetrics[metricKey] = {'serviceName': serviceName, 'metricName': metricName, 'metricType': metricType,
+                                                                    'metricAction': actionKey, 'metricValue': 0.0, 'metricHelp': metricHelp, 'metricLabels': metricLabels}
+                if actionKey == 'observe':
+                    pendingMetric['metricBuckets'] = list(metricBuckets or DEFAULT_BUCKETS)
+                    #The last bucket counts observations above every bound (+Inf)
+                    pendingMetric['metricBucketCounts'] = [0] * (len(pendingMetric['metricBuckets']) + 1)
+            if actionKey == 'observe':
+                pendingMetric['metricValue'] += metricValue
+                pendingMetric['metricBucketCounts'][bisect.bisect_left(pendingMetric['metricBuckets'], metricValue)] += 1
+            elif actionKey == 'set':
+                pendingMetric['metricValue'] = metricValue
+            else:
+                pendingMetric['metricValue'] += -metricValue if metricAction == 'dec' else metricValue
+        return f'Aggregated metric called: {metricName}'
+
+    def sendMetrics(self, metricList: list, **kwargs) -> str:
+        """
+        Adds several metrics to the pending changes, with the same arguments as RedisMessaging.sendMetrics.
+        """
+        for metric in metricList:
+            self.sendMetric(**metric)
+        return f'Aggregated {len(metricList)} metrics'
+
+    def getPendingMetrics(self) -> list:
+        """
+        Removes and returns the pending changes, in the form taken by RedisMessaging.sendMetrics.
+        """
+        with self.metricLock:
+            pendingMetrics = self.pendingMetrics
+            self.pendingMetrics = {}
+        metricList = []
+        for pendingMetric in pendingMetrics.values():
+            if pendingMetric['metricAction'] == 'observe':
+                pendingMetric['metricAction'] = 'observe_buckets'
+            elif pendingMetric['metricAction'] == 'inc' and pendingMetric['metricValue'] < 0:
+                pendingMetric['metricAction'] = 'dec'
+                pendingMetric['metricValue'] = -pendingMetric['metricValue']
+            metricList.append(pendingMetric)
+        return metricList
+
+    def flushMetrics(self) -> str:
+        """
+        Sends the pending changes to metricService, as a single message.
+        """
+        metricList = self.getPendingMetrics()
+        if not metricList:
+            return ''
+        return self.redisMessaging.sendMetrics(metricList=metricList, metricExpiry=60, usePrefix=True, prefixHostname=self.hostname, prefixServiceName='metric')
+
+    def flushMetricsPeriodically(self):
+        """
+        Runs in the flusher thread, flushing pending changes every flushInterval seconds.
+        """
+        while True:
+            time.sleep(self.flushInterval)
+            try:
+                self.flushMetrics()
+            except Exception as e:
+                print(f"[MetricAggregator] Error flushing metrics: {e}")
@@ -1302,7 +1302,7 @@ class PyHSS_OAM_Peers(Resource):
     def get(self):
         '''Get active Diameter Peers'''
         try:
-            diameterPeers = json.loads(redisMessaging.getValue("ActiveDiameterPeers", usePrefix=True, prefixHostname=originHostname, prefixServiceName='diameter'))
+            diameterPeers = {peerKey: json.loads(peer) for peerKey, peer in redisMessaging.getAllHashValues("ActiveDiameterPeerTable", usePrefix=True, prefixHostname=originHostname, prefixServiceName='diameter').items()}
             return diameterPeers, 200
         except Exception as E:
             logTool.log(service='API', level='error', message=f"[API] An error occurred: {traceback.format_exc()}", redisClient=redisMessaging)
@@ -1,11 +1,17 @@
 import asyncio
+import multiprocessing, multiprocessing.connection
 import sys, os, json
-import time, yaml, uuid
+import time, yaml, uuid, random
 from datetime import datetime
 import sctp, socket
 sys.path.append(os.path.realpath('../lib'))
+from messaging import RedisMessaging
 from messagingAsync import RedisMessagingAsync
+from metricAggregator import MetricAggregator
 from diameterAsync import DiameterAsync
+from diameterCodec import DiameterStreamFramer, appendAvpsToPacket, encodeEnvelope, decodeEnvelope, getEnvelopeQueuedTimestamp, getSubscriberShard
+import latencyTrace
+from fairQueue import FairQueue
 from banners import Banners
 from logtool import LogTool
 import traceback
@@ -15,9 +21,10 @@ class DiameterService:
     PyHSS Diameter Service
     A class for handling diameter inbounds and replies on Port 3868, via TCP.
     Functions in this class are high-performance, please edit with care. Last profiled October 6th, 2023.
+    When hss.diameter_service_processes is greater than 1, that many worker processes share the listening port via SO_REUSEPORT.
     """
 
-    def __init__(self):
+    def __init__(self, workerIndex: int=0):
         try:
             with open("../config.yaml", "r") as self.configFile:
                 self.config = yaml.safe_load(self.configFile)
@@ -36,14 +43,47 @@ class DiameterService:
         self.banners = Banners()
         self.logTool = LogTool(config=self.config)
         self.diameterLibrary = DiameterAsync(logTool=self.logTool)
+        #Base protocol requests answered directly by diameterService, keyed by Command Code
+        self.baseAnswerMethods = {257: self.diameterLibrary.Answer_257, 280: self.diameterLibrary.Answer_280, 282: self.diameterLibrary.Answer_282}
         self.activePeers = {}
         self.diameterRequestTimeout = int(self.config.get('hss', {}).get('diameter_request_timeout', 10))
         self.benchmarking = self.config.get('benchmarking', {}).get('enabled', False)
         self.benchmarkingInterval = self.config.get('benchmarking', {}).get('reporting_interval', 3600)
+        self.latencyTracing = self.config.get('benchmarking', {}).get('latency_tracing', False)
         self.diameterRequests = 0
         self.diameterResponses = 0
-        self.workerPoolSize = int(self.config.get('hss', {}).get('diameter_service_workers', 10))
+        #More than one inbound worker coroutine may reorder a subscriber's requests, as each sends its own batches to redis
+        self.workerPoolSize = int(self.config.get('hss', {}).get('diameter_service_workers', 1))
+        #Inbound messages are sharded by subscriber across one diameter-inbound-{n} queue per hssService worker process
+        self.inboundShardCount = max(int(self.config.get('hss', {}).get('hss_service_processes', 1)), 1)
+        self.inboundQueueNames = [f"diameter-inbound-{inboundShard}" for inboundShard in range(self.inboundShardCount)]
+        self.readBufferSize = int(self.config.get('hss', {}).get('diameter_read_buffer_size', 262144))
+        self.outboundBatchSize = int(self.config.get('hss', {}).get('diameter_outbound_batch_size', 100))
+        self.workerCount = int(self.config.get('hss', {}).get('diameter_service_processes', 1))
+        self.workerIndex = workerIndex
+        self.inboundQueueSize = int(self.config.get('hss', {}).get('diameter_inbound_queue_size', 1024))
+        self.inboundBatchMaxLatency = float(self.config.get('hss', {}).get('diameter_inbound_batch_max_latency', 0.005))
+        self.inboundBatchMaxSize = int(self.config.get('hss', {}).get('diameter_inbound_batch_max_size', 500))
+        self.peerWeights = {str(peerType).lower(): float(weight) for peerType, weight in (self.config.get('hss', {}).get('peer_weights', {}) or {}).items()}
+        self.overloadControlEnabled = self.config.get('hss', {}).get('overload_control', {}).get('enabled', True)
+        self.overloadQueueThreshold = float(self.config.get('hss', {}).get('overload_control', {}).get('queue_threshold', 80))
+        self.overloadLatencyThreshold = float(self.config.get('hss', {}).get('overload_control', {}).get('latency_threshold', 2))
+        self.overloadValidityDuration = int(self.config.get('hss', {}).get('overload_control', {}).get('validity_duration', 30))
+        self.overloadReductionPercentage = 0
+        #OC-Sequence-Number must keep increasing across restarts, so start from the current time
+        self.overloadSequenceNumber = int(time.time())
+        self.overloadAvps = b''
+        self.doicPeers = set()
+        self.hssLatency = 0.0
+        self.hssLatencyTimestamp = 0.0
+        self.shedRequests = 0
+        self.staleRequests = 0
         self.hostname = socket.gethostname()
+        #Synchronous redis client, used outside the event loop (eg. by the worker supervisor)
+        self.redisMessaging = RedisMessaging(host=self.redisHost, port=self.redisPort, useUnixSocket=self.redisUseUnixSocket, unixSocketPath=self.redisUnixSocketPath)
+        #Latency observations are summed locally and flushed from a background thread, so it uses the synchronous redis client
+        self.metricAggregator = MetricAggregator(redisMessaging=self.redisMessaging,
+                                                 hostname=self.hostname, flushInterval=float(self.config.get('prometheus', {}).get('metric_flush_interval', 1)))
     
     async def validateDiameterInbound(self, clientAddress: str, clientPort: str, inboundData) -> bool:
         """
@@ -51,12 +91,15 @@ class DiameterService:
         """
         try:
             packetVars, avps = await(self.diameterLibrary.decodeDiameterPacket(inboundData))
-            originHost = (await(self.diameterLibrary.getAvpData(avps, 264)))[0]
-            originHost = bytes.fromhex(originHost).decode("utf-8")
+            originHost = (await(self.diameterLibrary.getAvpValue(avps, 264)))[0]
             peerType = await(self.diameterLibrary.getPeerType(originHost))
-            self.activePeers[f"{clientAddress}-{clientPort}"].update({'diameterHostname': originHost,
-                                                                      'peerType': (peerType if peerType != None else 'Unknown'),
-                                                                     })
+            peer = self.activePeers[f"{clientAddress}-{clientPort}"]
+            peerType = (peerType if peerType != None else 'Unknown')
+            if peer.get('diameterHostname', '') != originHost or peer.get('peerType', '') != peerType:
+                peer.update({'diameterHostname': originHost,
+                             'peerType': peerType,
+                            })
+                await(self.publishActiveDiameterPeer(f"{clientAddress}-{clientPort}"))
             return True
         except Exception as e:
             await(self.logTool.logAsync(service='Diameter', level='warning', message=f"[Diameter] [validateDiameterInbound] Exception: {e}\n{traceback.format_exc()}"))
@@ -65,9 +108,11 @@ class DiameterService:
 
     async def handleActiveDiameterPeers(self):
         """
-        Prunes stale entries from self.activePeers, and
-        keeps the ActiveDiameterPeers key in Redis current.
+        Prunes stale entries from self.activePeers, and periodically rewrites this worker's peers
+        to keep the ActiveDiameterPeerTable key in Redis from expiring.
+        Changes to individual peers are written as they happen, by self.publishActiveDiameterPeer.
         """
+        lastPeerRefresh = time.time()
         while True:
             try:
                 if not len(self.activePeers) > 0:
@@ -84,12 +129,15 @@ class DiameterService:
                             stalePeers.append(key)
                 
                 if len(stalePeers) > 0:
-                    await(self.logTool.logAsync(service='Diameter', level='debug', message=f"[Diameter] [handleActiveDiameterPeers] Pruning disconnected peers: {stalePeers}"))
+                    await(self.logTool.logAsync(service='Diameter', level='debug', message=lambda: f"[Diameter] [handleActiveDiameterPeers] Pruning disconnected peers: {stalePeers}"))
                     for key in stalePeers:
                         del self.activePeers[key]
+                        await(self.publishActiveDiameterPeer(key))
                     await(self.logActivePeers())
 
-                await(self.redisPeerMessaging.setValue(key='ActiveDiameterPeers', value=json.dumps(self.activePeers), keyExpiry=86400, usePrefix=True, prefixHostname=self.hostname, prefixServiceName='diameter'))
+                if time.time() - lastPeerRefresh > 60 and len(self.activePeers) > 0:
+                    await(self.redisPeerMessaging.setHashValues(key='ActiveDiameterPeerTable', values={key: json.dumps(connection) for key, connection in self.activePeers.items()}, keyExpiry=86400, usePrefix=True, prefixHostname=self.hostname, prefixServiceName='diameter'))
+                    lastPeerRefresh = time.time()
 
                 await(asyncio.sleep(1))
             except Exception as e:
@@ -97,6 +145,66 @@ class DiameterService:
                 await(asyncio.sleep(1))
                 continue
 
+    async def publishActiveDiameterPeer(self, peerKey: str):
+        """
+        Writes a single peer to its field in the ActiveDiameterPeerTable hash in Redis, or removes the field if the peer has been pruned,
+        then notifies consumers holding a local copy of the table via the ActiveDiameterPeerUpdates channel.
+        Each worker process only writes the fields for its own connections. A pruned peer is left alone if it has since
+        reconnected to another worker.
+        """
+        peer = self.activePeers.get(peerKey, None)
+        if peer is None:
+            sharedPeer = await(self.redisPeerMessaging.getHashValue(key='ActiveDiameterPeerTable', field=peerKey, usePrefix=True, prefixHostname=self.hostname, prefixServiceName='diameter'))
+            if sharedPeer and json.loads(sharedPeer).get('diameterServiceWorker', self.workerIndex) != self.workerIndex:
+                return
+            await(self.redisPeerMessaging.deleteHashValues(key='ActiveDiameterPeerTable', fields=[peerKey], usePrefix=True, prefixHostname=self.hostname, prefixServiceName='diameter'))
+        else:
+            await(self.redisPeerMessaging.setHashValues(key='ActiveDiameterPeerTable', values={peerKey: json.dumps(peer)}, keyExpiry=86400, usePrefix=True, prefixHostname=self.hostname, prefixServiceName='diameter'))
+        await(self.redisPeerMessaging.publishMessage(channel='ActiveDiameterPeerUpdates', message=json.dumps({'peerKey': peerKey, 'peer': peer}), usePrefix=True, prefixHostname=self.hostname, prefixServiceName='diameter'))
+
+    def getWorkerPeerKeys(self, sharedPeers: dict, workerIndex: int) -> list:
+        """
+        Returns the fields of the ActiveDiameterPeerTable written by the given worker, or every field when running as a single process.
+        """
+        if self.workerCount <= 1:
+            return list(sharedPeers.keys())
+        workerPeerKeys = []
+        for peerKey, sharedPeer in sharedPeers.items():
+            try:
+                if json.loads(sharedPeer).get('diameterServiceWorker', 0) == workerIndex:
+                    workerPeerKeys.append(peerKey)
+            except Exception as e:
+                workerPeerKeys.append(peerKey)
+        return workerPeerKeys
+
+    def clearWorkerPeers(self, workerIndex: int):
+        """
+        Removes the peers written to the ActiveDiameterPeerTable by an earlier process for the given worker, whose connections no longer exist,
+        and notifies consumers via the ActiveDiameterPeerUpdates channel.
+        Used by startWorkers before restarting a worker.
+        """
+        sharedPeers = self.redisMessaging.getAllHashValues(key='ActiveDiameterPeerTable', usePrefix=True, prefixHostname=self.hostname, prefixServiceName='diameter')
+        workerPeerKeys = self.getWorkerPeerKeys(sharedPeers, workerIndex)
+        if not workerPeerKeys:
+            return
+        self.redisMessaging.deleteHashValues(key='ActiveDiameterPeerTable', fields=workerPeerKeys, usePrefix=True, prefixHostname=self.hostname, prefixServiceName='diameter')
+        for peerKey in workerPeerKeys:
+            self.redisMessaging.publishMessage(channel='ActiveDiameterPeerUpdates', message=json.dumps({'peerKey': peerKey, 'peer': None}), usePrefix=True, prefixHostname=self.hostname, prefixServiceName='diameter')
+        self.logTool.log(service='Diameter', level='info', message=f"[Diameter] [clearWorkerPeers] Removed {len(workerPeerKeys)} peer(s) left by worker {workerIndex}")
+
+    async def clearWorkerPeersAsync(self, workerIndex: int):
+        """
+        Asynchronous version of clearWorkerPeers, used by each worker on startup.
+        """
+        sharedPeers = await(self.redisPeerMessaging.getAllHashValues(key='ActiveDiameterPeerTable', usePrefix=True, prefixHostname=self.hostname, prefixServiceName='diameter'))
+        workerPeerKeys = self.getWorkerPeerKeys(sharedPeers, workerIndex)
+        if not workerPeerKeys:
+            return
+        await(self.redisPeerMessaging.deleteHashValues(key='ActiveDiameterPeerTable', fields=workerPeerKeys, usePrefix=True, prefixHostname=self.hostname, prefixServiceName='diameter'))
+        for peerKey in workerPeerKeys:
+            await(self.redisPeerMessaging.publishMessage(channel='ActiveDiameterPeerUpdates', message=json.dumps({'peerKey': peerKey, 'peer': None}), usePrefix=True, prefixHostname=self.hostname, prefixServiceName='diameter'))
+        await(self.logTool.logAsync(service='Diameter', level='info', message=f"[Diameter] [clearWorkerPeersAsync] Removed {len(workerPeerKeys)} peer(s) left by worker {workerIndex}"))
+
     async def logActivePeers(self):
         """
         Logs the number of active connections on a rolling basis.
@@ -167,63 +275,250 @@ class DiameterService:
             self.diameterResponses = 0
             await(asyncio.sleep(benchmarkInterval))
 
-    async def readInboundData(self, reader, clientAddress: str, clientPort: str, socketTimeout: int, coroutineUuid: str) -> bool:
+    async def handleInboundQueueMetrics(self):
+        """
+        Reports the depth of each peer's inbound sub-queue, and the number of stale and shed requests, every second.
+        Peers whose sub-queue has emptied since the last report are reported once more, as 0.
+        """
+        reportedPeers = set()
+        while True:
+            try:
+                peerQueueDepths = self.sharedQueue.flowSizes()
+                for peerKey in reportedPeers - peerQueueDepths.keys():
+                    peerQueueDepths[peerKey] = 0
+                for peerKey, queueDepth in peerQueueDepths.items():
+                    await(self.redisMetricMessaging.sendMetric(serviceName='diameter', metricName='prom_diam_inbound_queue_depth_host',
+                            metricType='gauge', metricAction='set',
+                            metricLabels={
+                            "host": self.activePeers.get(peerKey, {}).get('diameterHostname', '') or peerKey},
+                            metricValue=float(queueDepth), metricHelp='Number of Diameter Requests waiting in the inbound queue per Host',
+                            metricExpiry=60,
+                            usePrefix=True,
+                            prefixHostname=self.hostname,
+                            prefixServiceName='metric'))
+                reportedPeers = {peerKey for peerKey, queueDepth in peerQueueDepths.items() if queueDepth > 0}
+                if self.staleRequests > 0:
+                    await(self.logTool.logAsync(service='Diameter', level='warning', message=f"[Diameter] [handleInboundQueueMetrics] Discarded {self.staleRequests} request(s) older than {self.diameterRequestTimeout} seconds in the last second"))
+                    await(self.redisMetricMessaging.sendMetric(serviceName='diameter', metricName='prom_diam_stale_request_count',
+                            metricType='counter', metricAction='inc',
+                            metricValue=float(self.staleRequests), metricHelp='Number of Diameter Requests discarded after exceeding diameter_request_timeout',
+                            metricExpiry=60,
+                            usePrefix=True,
+                            prefixHostname=self.hostname,
+                            prefixServiceName='metric'))
+                    self.staleRequests = 0
+                if self.shedRequests > 0:
+                    await(self.logTool.logAsync(service='Diameter', level='warning', message=f"[Diameter] [handleInboundQueueMetrics] Answered {self.shedRequests} request(s) with DIAMETER_TOO_BUSY in the last second"))
+                    await(self.redisMetricMessaging.sendMetric(serviceName='diameter', metricName='prom_diam_overload_shed_count',
+                            metricType='counter', metricAction='inc',
+                            metricValue=float(self.shedRequests), metricHelp='Number of Diameter Requests answered with DIAMETER_TOO_BUSY',
+                            metricExpiry=60,
+                            usePrefix=True,
+                            prefixHostname=self.hostname,
+                            prefixServiceName='metric'))
+                    self.shedRequests = 0
+                await(asyncio.sleep(1))
+            except Exception as e:
+                await(self.logTool.logAsync(service='Diameter', level='warning', message=f"[Diameter] [handleInboundQueueMetrics] Exception: {e}\n{traceback.format_exc()}"))
+                await(asyncio.sleep(1))
+                continue
+
+    async def handleOverloadControl(self):
+        """
+        Recalculates the RFC 7683 overload reduction percentage every second, from the inbound queue depth and the time hssService is taking to answer.
+        The OC-OLR sent to peers is rebuilt, with a new OC-Sequence-Number, whenever the reduction percentage changes.
+        """
+        while True:
+            try:
+                queueReduction = 0
+                #An unbounded queue (diameter_inbound_queue_size: 0) never fills, so only latency reduces load
+                queueDepth = 100 * self.sharedQueue.qsize() / self.sharedQueue.maxsize if self.sharedQueue.maxsize > 0 else 0
+                if queueDepth > self.overloadQueueThreshold:
+                    queueReduction = 100 * (queueDepth - self.overloadQueueThreshold) / (100 - self.overloadQueueThreshold)
+
+                #If no answers have been seen in the last second, hssService has either caught up or all traffic is being shed, so let the latency recover
+                if time.time() - self.hssLatencyTimestamp > 1:
+                    self.hssLatency = self.hssLatency / 2
+                latencyReduction = 0
+                if self.hssLatency > self.overloadLatencyThreshold:
+                    latencyReduction = 100 * (self.hssLatency - self.overloadLatencyThreshold) / self.overloadLatencyThreshold
+
+                reductionPercentage = int(min(100, max(queueReduction, latencyReduction)))
+                if reductionPercentage != self.overloadReductionPercentage or not self.overloadAvps:
+                    self.overloadSequenceNumber += 1
+                    self.overloadAvps = await(self.diameterLibrary.generateOverloadAvps(sequenceNumber=self.overloadSequenceNumber, reductionPercentage=reductionPercentage, validityDuration=self.overloadValidityDuration))
+                    if reductionPercentage != self.overloadReductionPercentage:
+                        await(self.logTool.logAsync(service='Diameter', level='warning', message=f"[Diameter] [handleOverloadControl] Overload reduction changed from {self.overloadReductionPercentage}% to {reductionPercentage}% (Queue depth: {round(queueDepth, 1)}%, hssService latency: {round(self.hssLatency, 3)}s)"))
+                        await(self.redisMetricMessaging.sendMetric(serviceName='diameter', metricName='prom_diam_overload_reduction_percentage',
+                                metricType='gauge', metricAction='set',
+                                metricValue=float(reductionPercentage), metricHelp='Diameter overload reduction percentage requested from peers',
+                                metricExpiry=60,
+                                usePrefix=True,
+                                prefixHostname=self.hostname,
+                                prefixServiceName='metric'))
+                    self.overloadReductionPercentage = reductionPercentage
+
+
+                await(asyncio.sleep(1))
+            except Exception as e:
+                await(self.logTool.logAsync(service='Diameter', level='warning', message=f"[Diameter] [handleOverloadControl] Exception: {e}\n{traceback.format_exc()}"))
+                await(asyncio.sleep(1))
+                continue
+
+    async def shedInboundMessage(self, inboundMessage: bytes, writer, clientConnection: str) -> bool:
+        """
+        Decides whether to shed an inbound request, answering it directly with DIAMETER_TOO_BUSY (3004) if so.
+        Requests are always shed when the inbound queue is full, even with overload control disabled.
+        Otherwise, when overload control is enabled, a share of requests matching the overload reduction percentage is shed.
+        Answers and base protocol (Application 0) messages are never shed. Also records which peers support DOIC.
+        """
+        if not inboundMessage[4] & 0x80 or inboundMessage[8:12] == b'\x00\x00\x00\x00':
+            return False
+
+        if self.overloadControlEnabled:
+            #Check for an OC-Supported-Features AVP, the byte search avoids decoding every request from peers that don't support DOIC
+            if clientConnection not in self.doicPeers and b'\x00\x00\x02\x6d' in inboundMessage:
+                packetVars, avps = await(self.diameterLibrary.decodeDiameterPacket(inboundMessage))
+                if any(avp.code == 621 and avp.vendorId is None for avp in avps):
+                    self.doicPeers.add(clientConnection)
+            reductionPercentage = 100 if self.sharedQueue.full() else self.overloadReductionPercentage
+        else:
+            reductionPercentage = 100 if self.sharedQueue.full() else 0
+        if reductionPercentage == 0 or (reductionPercentage < 100 and random.random() * 100 >= reductionPercentage):
+            return False
+
+        packetVars, avps = await(self.diameterLibrary.decodeDiameterPacket(inboundMessage))
+        overloadAvps = self.overloadAvps if clientConnection in self.doicPeers else b''
+        writer.write(await(self.diameterLibrary.generateTooBusyAnswer(packetVars, avps, overloadAvps)))
+        self.shedRequests += 1
+        return True
+
+    async def answerBaseRequest(self, inboundMessage: bytes, writer, clientAddress: str, clientPort: str, coroutineUuid: str) -> bool:
         """
-        Reads incoming data from a connected client. Data is sent to a shared memory-based queue, to be polled and processed by a worker coroutine.
-        Terminates the connection if the client disconnects, the queue fills or another exception occurs.
+        Answers a Capabilities Exchange, Device Watchdog or Disconnect Peer request directly, without a round trip through redis and hssService.
+        Keeps watchdog latency independent of subscriber traffic load. Returns False if the message isn't a base protocol request handled here.
         """
-        await(self.logTool.logAsync(service='Diameter', level='debug', message=f"[Diameter] [readInboundData] [{coroutineUuid}] New connection from {clientAddress} on port {clientPort}"))
+        if inboundMessage[8:12] != b'\x00\x00\x00\x00' or not inboundMessage[4] & 0x80:
+            return False
+        answerMethod = self.baseAnswerMethods.get(int.from_bytes(inboundMessage[5:8], 'big'), None)
+        if answerMethod is None:
+            return False
+
+        if len(self.activePeers.get(f'{clientAddress}-{clientPort}', {}).get('peerType', '')) == 0:
+            if await(self.validateDiameterInbound(clientAddress, clientPort, inboundMessage)):
+                await(self.logTool.logAsync(service='Diameter', level='info', message=f"[Diameter] [answerBaseRequest] [{coroutineUuid}] Validated peer: {clientAddress} on port {clientPort}"))
+
+        packetVars, avps = await(self.diameterLibrary.decodeDiameterPacket(inboundMessage))
+        writer.write(await(answerMethod(packetVars, avps)))
+        await(self.logTool.logAsync(service='Diameter', level='debug', message=lambda: f"[Diameter] [answerBaseRequest] [{coroutineUuid}] Answered command code {packetVars.commandCode} from {clientAddress} on port {clientPort}"))
+        if self.benchmarking:
+            self.diameterRequests += 1
+            self.diameterResponses += 1
+        return True
+
+    async def readInboundData(self, reader, writer, clientAddress: str, clientPort: str, socketTimeout: int, coroutineUuid: str) -> bool:
+        """
+        Reads incoming data from a connected client, and frames it into individual Diameter messages using the length in each Diameter header.
+        CER, DWR and DPR are answered directly, every other message is sent to the peer's sub-queue in a shared memory-based queue, to be polled and processed by a worker coroutine.
+        Sub-queues are served by deficit round robin, weighted by peer type (hss.peer_weights), so a bursting peer can't starve the others.
+        Requests are shed and answered directly with DIAMETER_TOO_BUSY when the queue is full, or under overload control.
+        Answers and base protocol messages are never shed, so when the queue is full, reading from the client waits until there is room.
+        Terminates the connection if the client disconnects, the stream can't be framed or another exception occurs.
+        """
+        await(self.logTool.logAsync(service='Diameter', level='debug', message=lambda: f"[Diameter] [readInboundData] [{coroutineUuid}] New connection from {clientAddress} on port {clientPort}"))
         clientConnection = f"{clientAddress}-{clientPort}"
+        diameterFramer = DiameterStreamFramer()
         while True:
             try:
 
-                inboundData = await(asyncio.wait_for(reader.read(8192), timeout=socketTimeout))
+                inboundData = await(asyncio.wait_for(reader.read(self.readBufferSize), timeout=socketTimeout))
 
                 if reader.at_eof():
                     return False
 
                 if len(inboundData) > 0:
-                    self.sharedQueue.put_nowait({"diameter-inbound": inboundData, "inbound-received-timestamp": time.time(), "clientAddress": clientAddress, "clientPort": clientPort})
+                    receivedTimestamp = time.time()
+                    for inboundMessage in diameterFramer.feed(inboundData):
+                        if await(self.answerBaseRequest(inboundMessage, writer, clientAddress, clientPort, coroutineUuid)):
+                            continue
+                        if await(self.shedInboundMessage(inboundMessage, writer, clientConnection)):
+                            continue
+                        peerWeight = self.peerWeights.get(self.activePeers.get(clientConnection, {}).get('peerType', '').lower(), 1)
+                        await(self.sharedQueue.put({"diameter-inbound": inboundMessage, "inbound-received-timestamp": receivedTimestamp, "clientAddress": clientAddress, "clientPort": clientPort}, clientConnection, peerWeight))
 
             except Exception as e:
                 await(self.logTool.logAsync(service='Diameter', level='info', message=f"[Diameter] [readInboundData] [{coroutineUuid}] Socket Exception for {clientAddress} on port {clientPort}, closing connection.\n{e}"))
                 return False
 
+    async def encodeInboundMessage(self, inboundData: dict, coroutineUuid: str) -> bytes:
+        """
+        Validates the peer of a message taken from the memory queue, and returns the message wrapped for redis.
+        Returns None if the message should be discarded, including requests which waited longer than hss.diameter_request_timeout.
+        """
+        inboundBinary = inboundData.get('diameter-inbound', b'')
+        clientAddress = inboundData.get('clientAddress', '')
+        clientPort = inboundData.get('clientPort', '')
+        receivedTimestamp = inboundData.get('inbound-received-timestamp', 0.0)
+
+        if inboundBinary[4] & 0x80 and time.time() - receivedTimestamp > self.diameterRequestTimeout:
+            self.staleRequests += 1
+            return None
+
+        if len(self.activePeers.get(f'{clientAddress}-{clientPort}', {}).get('peerType', '')) == 0:
+            if not await(self.validateDiameterInbound(clientAddress, clientPort, inboundBinary)):
+                await(self.logTool.logAsync(service='Diameter', level='warning', message=f"[Diameter] [inboundDataWorker] [{coroutineUuid}] Invalid Diameter Inbound, discarding data."))
+                return None
+            else:
+                await(self.logTool.logAsync(service='Diameter', level='info', message=f"[Diameter] [inboundDataWorker] [{coroutineUuid}] Validated peer: {clientAddress} on port {clientPort}"))
+
+        if self.logTool.isEnabledFor('debug'):
+            await(self.logTool.logAsync(service='Diameter', level='debug', message=f"[Diameter] [inboundDataWorker] [{coroutineUuid}] Queueing to redis: {inboundData}"))
+        if self.benchmarking:
+            self.diameterRequests += 1
+        return encodeEnvelope(inboundBinary, clientAddress, clientPort, receivedTimestamp, time.time())
+
     async def inboundDataWorker(self, coroutineUuid: str) -> bool:
         """
-        Collects messages from the memory queue, performs peer validation and fires off to redis every 0.1 seconds.
+        Collects messages from the memory queue, performs peer validation and fires off to redis in batches.
+        Each message goes to the diameter-inbound-{n} shard for its subscriber, so each subscriber's requests are processed in order by a single hssService worker.
+        A batch is sent once it reaches the target batch size, or once its first message has waited self.inboundBatchMaxLatency seconds.
+        The target batch size is the number of messages expected to arrive within self.inboundBatchMaxLatency, based on a moving average of the arrival rate,
+        or the backlog in the memory queue if larger. At low load this is a single message, which is sent immediately.
         """
-        batchInterval = 0.1
-        inboundQueueName = f"diameter-inbound"
+        targetBatchSize = 1
+        arrivalRate = 0.0
+        lastBatchTime = time.time()
         while True:
             try:
-                nextSendTime = time.time() + batchInterval
-                messageList = []
-                while time.time() < nextSendTime:
-                    try:
-                        inboundData = await(asyncio.wait_for(self.sharedQueue.get(), timeout=nextSendTime - time.time()))
-                        inboundHex = inboundData.get('diameter-inbound', '').hex()
-                        inboundData['diameter-inbound'] = inboundHex
-                        clientAddress = inboundData.get('clientAddress', '')
-                        clientPort = inboundData.get('clientPort', '')
-
-                        if len(self.activePeers.get(f'{clientAddress}-{clientPort}', {}).get('peerType', '')) == 0:
-                            if not await(self.validateDiameterInbound(clientAddress, clientPort, inboundHex)):
-                                await(self.logTool.logAsync(service='Diameter', level='warning', message=f"[Diameter] [inboundDataWorker] [{coroutineUuid}] Invalid Diameter Inbound, discarding data."))
-                                continue
-                            else:
-                                await(self.logTool.logAsync(service='Diameter', level='info', message=f"[Diameter] [inboundDataWorker] [{coroutineUuid}] Validated peer: {clientAddress} on port {clientPort}"))
-
-                        await(self.logTool.logAsync(service='Diameter', level='debug', message=f"[Diameter] [inboundDataWorker] [{coroutineUuid}] Queueing to redis: {inboundData}"))
-                        messageList.append(json.dumps(inboundData))
-                        if self.benchmarking:
-                            self.diameterRequests += 1
-                    except asyncio.TimeoutError:
+                queueMessages = {}
+                batchSize = 0
+                inboundData = await(self.sharedQueue.get())
+                batchDeadline = time.time() + self.inboundBatchMaxLatency
+                while True:
+                    inboundEnvelope = await(self.encodeInboundMessage(inboundData, coroutineUuid))
+                    if inboundEnvelope is not None:
+                        inboundShard = getSubscriberShard(inboundData.get('diameter-inbound'), self.inboundShardCount)
+                        queueMessages.setdefault(self.inboundQueueNames[inboundShard], []).append(inboundEnvelope)
+                        batchSize += 1
+                    if batchSize >= targetBatchSize:
                         break
-
-                if messageList:
-                    await self.redisReaderMessaging.sendBulkMessage(queue=inboundQueueName, messageList=messageList, queueExpiry=self.diameterRequestTimeout, usePrefix=True, prefixHostname=self.hostname, prefixServiceName='diameter')
-                    messageList = []
+                    try:
+                        inboundData = self.sharedQueue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        try:
+                            inboundData = await(asyncio.wait_for(self.sharedQueue.get(), timeout=max(batchDeadline - time.time(), 0)))
+                        except asyncio.TimeoutError:
+                            break
+
+                if queueMessages:
+                    await self.redisReaderMessaging.sendShardedBulkMessage(queueMessages=queueMessages, queueExpiry=self.diameterRequestTimeout, usePrefix=True, prefixHostname=self.hostname, prefixServiceName='diameter')
+
+                #Exponentially weighted moving average of the arrival rate seen by this worker, in messages per second.
+                #Any backlog left in the memory queue means batches are too small to keep up, so the target covers it as well.
+                batchTime = time.time()
+                arrivalRate += 0.2 * ((batchSize / max(batchTime - lastBatchTime, 0.000001)) - arrivalRate)
+                lastBatchTime = batchTime
+                targetBatchSize = min(max(int(arrivalRate * self.inboundBatchMaxLatency), self.sharedQueue.qsize(), 1), self.inboundBatchMaxSize)
 
             except Exception as e:
                 await(self.logTool.logAsync(service='Diameter', level='info', message=f"[Diameter] [inboundDataWorker] [{coroutineUuid}] Exception for inboundDataWorker, continuing.\n{e}"))
@@ -231,20 +526,49 @@ class DiameterService:
 
     async def writeOutboundData(self, writer, clientAddress: str, clientPort: str, socketTimeout: int, coroutineUuid: str) -> bool:
         """
-        Waits for a message to be received from Redis, then sends to the connected client.
+        Waits for one or more messages to be received from Redis, then sends them to the connected client.
+        Every answer queued for the client is popped at once, and written with a single write and drain.
+        Answers to peers supporting DOIC carry the current OC-Supported-Features and OC-OLR.
         """
-        await(self.logTool.logAsync(service='Diameter', level='debug', message=f"[Diameter] [writeOutboundData] [{coroutineUuid}] writeOutboundData with host {clientAddress} on port {clientPort}"))
+        clientConnection = f"{clientAddress}-{clientPort}"
+        await(self.logTool.logAsync(service='Diameter', level='debug', message=lambda: f"[Diameter] [writeOutboundData] [{coroutineUuid}] writeOutboundData with host {clientAddress} on port {clientPort}"))
         while not writer.transport.is_closing():
             try:
-                await(self.logTool.logAsync(service='Diameter', level='debug', message=f"[Diameter] [writeOutboundData] [{coroutineUuid}] Waiting for messages for host {clientAddress} on port {clientPort}"))
-                pendingOutboundMessage = json.loads((await(self.redisWriterMessaging.awaitMessage(key=f"diameter-outbound-{clientAddress}-{clientPort}", usePrefix=True, prefixHostname=self.hostname, prefixServiceName='diameter')))[1])
-                diameterOutboundBinary = bytes.fromhex(pendingOutboundMessage.get('diameter-outbound', ''))
-                await(self.logTool.logAsync(service='Diameter', level='debug', message=f"[Diameter] [writeOutboundData] [{coroutineUuid}] Sending: {diameterOutboundBinary.hex()} to to {clientAddress} on {clientPort}."))
-
-                writer.write(diameterOutboundBinary)
+                if self.logTool.isEnabledFor('debug'):
+                    await(self.logTool.logAsync(service='Diameter', level='debug', message=f"[Diameter] [writeOutboundData] [{coroutineUuid}] Waiting for messages for host {clientAddress} on port {clientPort}"))
+                pendingOutboundMessages = await(self.redisWriterMessaging.awaitBulkMessage(key=f"diameter-outbound-{clientAddress}-{clientPort}", count=self.outboundBatchSize, direction='LEFT', usePrefix=True, prefixHostname=self.hostname, prefixServiceName='diameter'))
+                #A redis error isn't a reason to drop the peer, but returns immediately, so back off before retrying
+                if not pendingOutboundMessages:
+                    await(asyncio.sleep(0.1))
+                    continue
+                pendingOutboundMessages = pendingOutboundMessages[1]
+                diameterOutboundBinaries = []
+                tracedAnswers = []
+                for pendingOutboundMessage in pendingOutboundMessages:
+                    diameterOutboundBinary, _, _, inboundTimestamp = decodeEnvelope(pendingOutboundMessage)
+                    if inboundTimestamp > 0:
+                        if self.latencyTracing:
+                            tracedAnswers.append((diameterOutboundBinary, inboundTimestamp, getEnvelopeQueuedTimestamp(pendingOutboundMessage)))
+                        #Exponentially weighted moving average of the time hssService takes to answer
+                        self.hssLatency += 0.2 * ((time.time() - inboundTimestamp) - self.hssLatency)
+                        self.hssLatencyTimestamp = time.time()
+                    if self.overloadControlEnabled and clientConnection in self.doicPeers and not diameterOutboundBinary[4] & 0x80:
+                        diameterOutboundBinary = appendAvpsToPacket(diameterOutboundBinary, self.overloadAvps)
+                    diameterOutboundBinaries.append(diameterOutboundBinary)
+                if self.logTool.isEnabledFor('debug'):
+                    await(self.logTool.logAsync(service='Diameter', level='debug', message=f"[Diameter] [writeOutboundData] [{coroutineUuid}] Sending {len(diameterOutboundBinaries)} message(s) to {clientAddress} on {clientPort}: {[diameterOutboundBinary.hex() for diameterOutboundBinary in diameterOutboundBinaries]}"))
+
+                writer.writelines(diameterOutboundBinaries)
                 await(writer.drain())
+                if tracedAnswers:
+                    writtenTimestamp = time.time()
+                    latencyObservations = []
+                    for diameterOutboundBinary, inboundTimestamp, queuedTimestamp in tracedAnswers:
+                        latencyObservations.append(latencyTrace.latencyMetric(diameterOutboundBinary, 'outbound_queue', writtenTimestamp - queuedTimestamp))
+                        latencyObservations.append(latencyTrace.latencyMetric(diameterOutboundBinary, 'total', writtenTimestamp - inboundTimestamp))
+                    self.metricAggregator.sendMetrics(metricList=latencyObservations)
                 if self.benchmarking:
-                    self.diameterResponses += 1
+                    self.diameterResponses += len(diameterOutboundBinaries)
             except Exception as e:
                 await(self.logTool.logAsync(service='Diameter', level='info', message=f"[Diameter] [writeOutboundData] [{coroutineUuid}] Connection closed for {clientAddress} on port {clientPort}, closing writer."))
                 return False
@@ -281,10 +605,12 @@ class DiameterService:
                                                                     "ipAddress":clientAddress,
                                                                     "port": clientPort,
                                                                     "connectionStatus": 'connected',
+                                                                    "diameterServiceWorker": self.workerIndex,
                                                                     })
+            await(self.publishActiveDiameterPeer(f"{clientAddress}-{clientPort}"))
             await(self.logActivePeers())
 
-            readTask = asyncio.create_task(self.readInboundData(reader=reader, clientAddress=clientAddress, clientPort=clientPort, socketTimeout=self.socketTimeout, coroutineUuid=coroutineUuid))
+            readTask = asyncio.create_task(self.readInboundData(reader=reader, writer=writer, clientAddress=clientAddress, clientPort=clientPort, socketTimeout=self.socketTimeout, coroutineUuid=coroutineUuid))
             writeTask = asyncio.create_task(self.writeOutboundData(writer=writer, clientAddress=clientAddress, clientPort=clientPort, socketTimeout=self.socketTimeout, coroutineUuid=coroutineUuid))
 
             completeTasks, pendingTasks =  await(asyncio.wait([readTask, writeTask], return_when=asyncio.FIRST_COMPLETED))
@@ -298,10 +624,12 @@ class DiameterService:
       
             writer.close()
             await(writer.wait_closed())
+            self.doicPeers.discard(f"{clientAddress}-{clientPort}")
             self.activePeers[f"{clientAddress}-{clientPort}"].update({
                                                                     "connectionStatus": 'disconnected',
                                                                     "disconnectTimestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
                                                                     })
+            await(self.publishActiveDiameterPeer(f"{clientAddress}-{clientPort}"))
             await(self.logTool.logAsync(service='Diameter', level='info', message=f"[Diameter] [handleConnection] [{coroutineUuid}] Connection closed for {clientAddress} on port {clientPort}."))
             await(self.logActivePeers())
             return
@@ -316,7 +644,10 @@ class DiameterService:
         Also create a single instance of self.handleActiveDiameterPeers and self.logProcessedMessages.
         """
 
-        self.sharedQueue = asyncio.Queue(maxsize=1024)
+        #Peers written by an earlier process for this worker belong to connections which no longer exist
+        await(self.clearWorkerPeersAsync(self.workerIndex))
+
+        self.sharedQueue = FairQueue(maxsize=self.inboundQueueSize)
 
         for i in range(self.workerPoolSize):
             asyncio.create_task(self.inboundDataWorker(coroutineUuid=f'inboundDataWorker-{i}'))
@@ -332,12 +663,19 @@ class DiameterService:
 
         self.socketTimeout = int(self.config.get('hss', {}).get('client_socket_timeout', 300))
 
+        reusePort = self.workerCount > 1
+
         if type.upper() == 'TCP':
-            server = await(asyncio.start_server(self.handleConnection, host, port))
+            server = await(asyncio.start_server(self.handleConnection, host, port, reuse_port=reusePort))
         elif type.upper() == 'SCTP':
             self.sctpSocket = sctp.sctpsocket_tcp(socket.AF_INET)
             self.sctpSocket.setblocking(False)
             self.sctpSocket.events.clear()
+            if reusePort:
+                try:
+                    self.sctpSocket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+                except Exception as e:
+                    await(self.logTool.logAsync(service='Diameter', level='warning', message=f"[Diameter] [startServer] [Worker {self.workerIndex}] SO_REUSEPORT is not supported for SCTP on this host: {e}"))
             self.sctpSocket.bind((host, port))
             self.sctpRtoInfo = self.sctpSocket.get_rtoinfo()
             self.sctpRtoMin = self.config.get('hss', {}).get('sctp', {}).get('rtoMin', 500)
@@ -353,21 +691,52 @@ class DiameterService:
                                 "rtoMax": self.sctpRtoInfo.max
                                 }
             self.sctpSocket.listen()
-            await(self.logTool.logAsync(service='Diameter', level='debug', message=f"[Diameter] [startServer] SCTP Parameters: {sctpInitParameters}"))
+            await(self.logTool.logAsync(service='Diameter', level='debug', message=lambda: f"[Diameter] [startServer] SCTP Parameters: {sctpInitParameters}"))
 
             server = await(asyncio.start_server(self.handleConnection, sock=self.sctpSocket))
         else:
             return False
         servingAddresses = ', '.join(str(sock.getsockname()) for sock in server.sockets)
-        await(self.logTool.logAsync(service='Diameter', level='info', message=f"{self.banners.diameterService()}\n[Diameter] Serving on {servingAddresses}"))
+        await(self.logTool.logAsync(service='Diameter', level='info', message=f"{self.banners.diameterService()}\n[Diameter] [Worker {self.workerIndex}] Serving on {servingAddresses}"))
         handleActiveDiameterPeerTask = asyncio.create_task(self.handleActiveDiameterPeers())
+        if self.overloadControlEnabled:
+            handleOverloadControlTask = asyncio.create_task(self.handleOverloadControl())
+        handleInboundQueueMetricsTask = asyncio.create_task(self.handleInboundQueueMetrics())
         if self.benchmarking:
             logProcessedMessagesTask = asyncio.create_task(self.logProcessedMessages())
 
         async with server:
             await(server.serve_forever())
 
+    def startWorkers(self):
+        """
+        Starts self.workerCount diameterService worker processes, each with its own event loop, and restarts any worker that exits,
+        once the peers it left in the ActiveDiameterPeerTable have been removed.
+        """
+        workers = {}
+        while True:
+            for workerIndex in range(self.workerCount):
+                worker = workers.get(workerIndex)
+                if worker is not None and worker.is_alive():
+                    continue
+                if worker is not None:
+                    self.logTool.log(service='Diameter', level='warning', message=f"[Diameter] [startWorkers] Worker {workerIndex} exited with code {worker.exitcode}, restarting.")
+                    self.clearWorkerPeers(workerIndex)
+                worker = multiprocessing.Process(target=runDiameterService, args=(workerIndex,), name=f"diameterService-{workerIndex}")
+                worker.start()
+                workers[workerIndex] = worker
+            multiprocessing.connection.wait([worker.sentinel for worker in workers.values()])
+            time.sleep(1)
+
+
+def runDiameterService(workerIndex: int=0):
+    diameterService = DiameterService(workerIndex=workerIndex)
+    asyncio.run(diameterService.startServer())
+
 
 if __name__ == '__main__':
     diameterService = DiameterService()
-    asyncio.run(diameterService.startServer())
\ No newline at end of file
+    if diameterService.workerCount > 1:
+        diameterService.startWorkers()
+    else:
+        asyncio.run(diameterService.startServer())
\ No newline at end of file
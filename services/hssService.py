@@ -1,13 +1,24 @@
-import os, sys, json, yaml, time, traceback, socket
+import os, sys, yaml, time, traceback, socket, signal
+import multiprocessing, multiprocessing.connection
+import asyncio, concurrent.futures
 sys.path.append(os.path.realpath('../lib'))
 from messaging import RedisMessaging
+from messagingAsync import RedisMessagingAsync
+from metricAggregator import MetricAggregator
 from diameter import Diameter
+from diameterCodec import encodeEnvelope, decodeEnvelope, getEnvelopeQueuedTimestamp, getSubscriberKey
+import latencyTrace
 from banners import Banners
 from logtool import LogTool
 
 class HssService:
+    """
+    PyHSS HSS Service
+    Processes inbound Diameter messages from a diameter-inbound-{n} queue, and queues the answers for diameterService.
+    When hss.hss_service_processes is greater than 1, a supervisor runs that many worker processes, each consuming the shard matching its worker index.
+    """
     
-    def __init__(self):
+    def __init__(self, workerIndex: int=0):
 
         try:
             with open("../config.yaml", "r") as self.configFile:
@@ -28,114 +39,363 @@ class HssService:
         self.originHost = self.config.get('hss', {}).get('OriginHost', f'hss01')
         self.productName = self.config.get('hss', {}).get('ProductName', f'PyHSS')
         self.logTool.log(service='HSS', level='info', message=f"{self.banners.hssService()}", redisClient=self.redisMessaging)
-        self.diameterLibrary = Diameter(logTool=self.logTool, originHost=self.originHost, originRealm=self.originRealm, productName=self.productName, mcc=self.mcc, mnc=self.mnc)
-        self.benchmarking = self.config.get('hss').get('enable_benchmarking', False)
         self.hostname = socket.gethostname()
+        #Per-request metrics are summed locally, and flushed to metricService every prometheus.metric_flush_interval seconds
+        self.metricAggregator = MetricAggregator(redisMessaging=self.redisMessaging, hostname=self.hostname, flushInterval=float(self.config.get('prometheus', {}).get('metric_flush_interval', 1)))
+        self.diameterLibrary = Diameter(logTool=self.logTool, originHost=self.originHost, originRealm=self.originRealm, productName=self.productName, mcc=self.mcc, mnc=self.mnc, metricAggregator=self.metricAggregator)
+        self.benchmarking = self.config.get('hss').get('enable_benchmarking', False)
+        self.diameterRequestTimeout = float(self.config.get('hss', {}).get('diameter_request_timeout', 10))
+        self.workerCount = int(self.config.get('hss', {}).get('hss_service_processes', 1))
+        self.workerIndex = workerIndex
+        #Each worker consumes its own shard of inbound messages, so each subscriber's requests are processed in order
+        self.inboundQueueName = f"diameter-inbound-{workerIndex}"
+        self.workerHealthTimeout = float(self.config.get('hss', {}).get('hss_service_health_timeout', 60))
+        self.workerShutdownTimeout = float(self.config.get('hss', {}).get('hss_service_shutdown_timeout', 10))
+        self.asyncEnabled = self.config.get('hss', {}).get('hss_service_async', False)
+        self.asyncConcurrency = int(self.config.get('hss', {}).get('hss_service_async_concurrency', 16))
+        self.latencyTracing = self.config.get('benchmarking', {}).get('latency_tracing', False)
+        self.running = True
+        #Shared with the supervisor when running as a worker process, and set to the time of each pass through handleQueue
+        self.heartbeat = None
+
+    def stop(self, signalNumber=None, frame=None):
+        """
+        Signal handler asking handleQueue to exit once it has finished processing its current batch.
+        """
+        self.running = False
+
+    def processInboundMessage(self, inboundBinary: bytes, inboundHost: str, inboundPort: int, inboundTimestamp: float, outboundMessages: dict=None, queuedTimestamp: float=0.0, dequeuedTimestamp: float=0.0) -> bool:
+        """
+        Generates the answer to a single inbound diameter message, and queues it for the peer that sent the message.
+        If outboundMessages is provided, the answer is added to the list for its outbound queue instead, to be sent later with sendOutboundMessages.
+        queuedTimestamp and dequeuedTimestamp are the times the message was pushed to and popped from redis, used for latency tracing.
+        Returns False if no answer was generated.
+        """
+        if self.benchmarking:
+            startTime = time.perf_counter()
+
+        inboundPeer = self.diameterLibrary.getActivePeers().get(f"{inboundHost}-{inboundPort}", {})
+        inboundPeerHostname = inboundPeer.get('diameterHostname', '')
+
+        try:
+            if inboundPeerHostname:
+                self.metricAggregator.sendMetric(serviceName='diameter', metricName='prom_diam_request_count_host',
+                            metricType='gauge', metricAction='inc',
+                            metricLabels={
+                            "host": inboundPeerHostname},
+                            metricValue=float(1), metricHelp='Number of Diameter Requests Recieved per Host',
+                            metricExpiry=60,
+                            usePrefix=True, 
+                            prefixHostname=self.hostname, 
+                            prefixServiceName='metric')
+
+        except Exception as e:
+            self.logTool.log(service='HSS', level='error', message=f"[HSS] [processInboundMessage] Error updating prom_diam_request_count_host: {traceback.format_exc()}", redisClient=self.redisMessaging)
+            pass
+
+        try:
+            if self.latencyTracing:
+                handlerStartTimestamp = time.time()
+                handlerStartTime = time.perf_counter()
+                latencyTrace.startTrace()
+            packetVars, avps = self.diameterLibrary.decode_diameter_packet(inboundBinary)
+            diameterOutbound = self.diameterLibrary.generateDiameterResponse(packetVars=packetVars, avps=avps)
+            if self.latencyTracing:
+                handlerTime = time.perf_counter() - handlerStartTime
+                handlerStages = latencyTrace.stopTrace()
+
+            if diameterOutbound == None:
+                return False
+            if not len(diameterOutbound) > 0:
+                return False
+
+            diameterMessageTypeDict = self.diameterLibrary.getDiameterMessageType(packetVars=packetVars)
+
+            if diameterMessageTypeDict == None:
+                return False
+            if not len(diameterMessageTypeDict) > 0:
+                return False
+
+            diameterMessageTypeInbound = diameterMessageTypeDict.get('inbound', '')
+            diameterMessageTypeOutbound = diameterMessageTypeDict.get('outbound', '')
+        except Exception as e:
+            self.logTool.log(service='HSS', level='warning', message=f"[HSS] [processInboundMessage] Failed to generate diameter outbound: {e}", redisClient=self.redisMessaging)
+            return False
+
+        self.logTool.log(service='HSS', level='debug', message=lambda: f"[HSS] [processInboundMessage] [{diameterMessageTypeInbound}] Inbound Diameter Inbound: {inboundBinary.hex()}", redisClient=self.redisMessaging)
+
+        outboundQueue = f"diameter-outbound-{inboundHost}-{inboundPort}"
+        encodeStartTime = time.perf_counter()
+        outboundMessage = encodeEnvelope(diameterOutbound, receivedTimestamp=inboundTimestamp, queuedTimestamp=time.time())
+        if self.latencyTracing:
+            latencyStages = {'handler': handlerTime, 'database': handlerStages.get('database', 0.0), 'crypto': handlerStages.get('crypto', 0.0), 'encode': time.perf_counter() - encodeStartTime}
+            if queuedTimestamp > 0 and dequeuedTimestamp > 0:
+                latencyStages['inbound_queue'] = queuedTimestamp - inboundTimestamp
+                latencyStages['redis_queue'] = dequeuedTimestamp - queuedTimestamp
+                latencyStages['dispatch'] = handlerStartTimestamp - dequeuedTimestamp
+            self.metricAggregator.sendMetrics(metricList=[latencyTrace.latencyMetric(inboundBinary, stage, seconds) for stage, seconds in latencyStages.items()])
+
+        self.logTool.log(service='HSS', level='debug', message=lambda: f"[HSS] [processInboundMessage] [{diameterMessageTypeOutbound}] Generated Diameter Outbound: {diameterOutbound}", redisClient=self.redisMessaging)
+        self.logTool.log(service='HSS', level='debug', message=lambda: f"[HSS] [processInboundMessage] [{diameterMessageTypeOutbound}] Outbound Diameter Outbound Queue: {outboundQueue}", redisClient=self.redisMessaging)
+        self.logTool.log(service='HSS', level='debug', message=lambda: f"[HSS] [processInboundMessage] [{diameterMessageTypeOutbound}] Outbound Diameter Outbound: {outboundMessage.hex()}", redisClient=self.redisMessaging)
+
+        if outboundMessages is None:
+            self.redisMessaging.sendMessage(queue=outboundQueue, message=outboundMessage, queueExpiry=60, usePrefix=True, prefixHostname=self.hostname, prefixServiceName='diameter')
+        else:
+            outboundMessages.setdefault(outboundQueue, []).append(outboundMessage)
+        if self.benchmarking:
+            self.logTool.log(service='HSS', level='info', message=f"[HSS] [processInboundMessage] [{diameterMessageTypeInbound}] Time taken to process request: {round(((time.perf_counter() - startTime)*1000), 3)} ms", redisClient=self.redisMessaging)
+
+        try:
+            if inboundPeerHostname:
+                self.metricAggregator.sendMetric(serviceName='diameter', metricName='prom_diam_response_count_host',
+                            metricType='gauge', metricAction='inc',
+                            metricLabels={
+                            "host": inboundPeerHostname},
+                            metricValue=float(1), metricHelp='Number of Diameter Responses Sent per Host',
+                            metricExpiry=60,
+                            usePrefix=True, 
+                            prefixHostname=self.hostname, 
+                            prefixServiceName='metric')
+
+        except Exception as e:
+            self.logTool.log(service='HSS', level='error', message=f"[HSS] [processInboundMessage] Error updating prom_diam_response_count_host: {traceback.format_exc()}", redisClient=self.redisMessaging)
+            pass
+        return True
+
+    def sendOutboundMessages(self, outboundMessages: dict):
+        """
+        Sends answers collected by processInboundMessage to their outbound queues, in a single redis round trip.
+        """
+        if not outboundMessages:
+            return
+        self.redisMessaging.sendShardedBulkMessage(queueMessages=outboundMessages, queueExpiry=60, usePrefix=True, prefixHostname=self.hostname, prefixServiceName='diameter')
+
+    def isStaleRequest(self, inboundBinary: bytes, inboundTimestamp: float) -> bool:
+        """
+        Returns True for requests received more than hss.diameter_request_timeout seconds ago, which the peer will already have retried or given up on.
+        """
+        return bool(inboundBinary[4] & 0x80) and inboundTimestamp > 0 and time.time() - inboundTimestamp > self.diameterRequestTimeout
+
+    def reportStaleRequests(self, staleRequests: int):
+        """
+        Logs and counts requests discarded by isStaleRequest.
+        """
+        self.logTool.log(service='HSS', level='warning', message=f"[HSS] [reportStaleRequests] Discarded {staleRequests} request(s) older than {self.diameterRequestTimeout} seconds", redisClient=self.redisMessaging)
+        self.metricAggregator.sendMetric(serviceName='diameter', metricName='prom_diam_stale_request_count',
+                    metricType='counter', metricAction='inc',
+                    metricValue=float(staleRequests), metricHelp='Number of Diameter Requests discarded after exceeding diameter_request_timeout',
+                    metricExpiry=60,
+                    usePrefix=True, 
+                    prefixHostname=self.hostname, 
+                    prefixServiceName='metric')
 
     def handleQueue(self):
         """
         Gets and parses inbound diameter requests, processes them and queues the response.
+        The answers to each batch of requests are sent together once the batch has been processed.
+        Requests received more than hss.diameter_request_timeout seconds ago are discarded unprocessed, as the peer will already have retried or given up.
         """
-        while True:
+        while self.running:
             try:
-                if self.benchmarking:
-                    startTime = time.perf_counter()
+                if self.heartbeat is not None:
+                    self.heartbeat.value = time.time()
 
-                inboundMessageList = self.redisMessaging.awaitBulkMessage(key='diameter-inbound', usePrefix=True, prefixHostname=self.hostname, prefixServiceName='diameter')
+                #Wake at least once a second, to keep the heartbeat current and notice shutdown requests while idle
+                inboundMessageList = self.redisMessaging.awaitBulkMessage(key=self.inboundQueueName, timeout=1, direction='LEFT', usePrefix=True, prefixHostname=self.hostname, prefixServiceName='diameter')
 
                 if inboundMessageList == None:
                     continue
-                for inboundMessage in inboundMessageList[1]:
-                    self.logTool.log(service='HSS', level='debug', message=f"[HSS] [handleQueue] Message: {inboundMessage}", redisClient=self.redisMessaging)
+                dequeuedTimestamp = time.time()
+                staleRequests = 0
+                outboundMessages = {}
+                try:
+                    for inboundMessage in inboundMessageList[1]:
+                        if self.logTool.isEnabledFor('debug'):
+                            self.logTool.log(service='HSS', level='debug', message=f"[HSS] [handleQueue] Message: {inboundMessage.hex()}", redisClient=self.redisMessaging)
 
-                    inboundMessage = json.loads(inboundMessage.decode('ascii'))
-                    inboundBinary = bytes.fromhex(inboundMessage.get('diameter-inbound', None))
+                        inboundBinary, inboundHost, inboundPort, inboundTimestamp = decodeEnvelope(inboundMessage)
 
-                    if inboundBinary == None:
-                        continue
-                    inboundHost = inboundMessage.get('clientAddress', None)
-                    inboundPort = inboundMessage.get('clientPort', None)
-                    inboundTimestamp = inboundMessage.get('inbound-received-timestamp', None)
-
-                    try:
-                        diameterPeers = json.loads(self.redisMessaging.getValue("ActiveDiameterPeers", usePrefix=True, prefixHostname=self.hostname, prefixServiceName='diameter'))
-
-                        for diameterPeer in diameterPeers:
-                            if diameterPeers[diameterPeer].get('ipAddress', '') == inboundHost and diameterPeers[diameterPeer].get('port', '') == inboundPort:
-                                self.redisMessaging.sendMetric(serviceName='diameter', metricName='prom_diam_request_count_host',
-                                            metricType='gauge', metricAction='inc',
-                                            metricLabels={
-                                            "host": diameterPeers[diameterPeer]['diameterHostname']},
-                                            metricValue=float(1), metricHelp='Number of Diameter Requests Recieved per Host',
-                                            metricExpiry=60,
-                                            usePrefix=True, 
-                                            prefixHostname=self.hostname, 
-                                            prefixServiceName='metric')
-
-                    except Exception as e:
-                        self.logTool.log(service='HSS', level='error', message=f"[HSS] [handleQueue] Error updating prom_diam_request_count_host: {traceback.format_exc()}", redisClient=self.redisMessaging)
-                        pass
-
-                    try:
-                        diameterOutbound = self.diameterLibrary.generateDiameterResponse(binaryData=inboundBinary)
-
-                        if diameterOutbound == None:
-                            continue
-                        if not len(diameterOutbound) > 0:
+                        if not inboundBinary:
                             continue
 
-                        diameterMessageTypeDict = self.diameterLibrary.getDiameterMessageType(binaryData=inboundBinary)
-                        
-                        if diameterMessageTypeDict == None:
-                            continue
-                        if not len(diameterMessageTypeDict) > 0:
+                        if self.isStaleRequest(inboundBinary, inboundTimestamp):
+                            staleRequests += 1
                             continue
 
-                        diameterMessageTypeInbound = diameterMessageTypeDict.get('inbound', '')
-                        diameterMessageTypeOutbound = diameterMessageTypeDict.get('outbound', '')
-                    except Exception as e:
-                        self.logTool.log(service='HSS', level='warning', message=f"[HSS] [handleQueue] Failed to generate diameter outbound: {e}", redisClient=self.redisMessaging)
-                        continue
+                        self.processInboundMessage(inboundBinary, inboundHost, inboundPort, inboundTimestamp, outboundMessages=outboundMessages, queuedTimestamp=getEnvelopeQueuedTimestamp(inboundMessage), dequeuedTimestamp=dequeuedTimestamp)
+                finally:
+                    #Answers already generated are still sent if a later message in the batch raises
+                    self.sendOutboundMessages(outboundMessages)
+
+                if staleRequests > 0:
+                    self.reportStaleRequests(staleRequests)
+
+            except Exception as e:
+                self.logTool.log(service='HSS', level='error', message=f"[HSS] [handleQueue] Exception: {traceback.format_exc()}", redisClient=self.redisMessaging)
+                continue
 
-                    self.logTool.log(service='HSS', level='debug', message=f"[HSS] [handleQueue] [{diameterMessageTypeInbound}] Inbound Diameter Inbound: {inboundMessage}", redisClient=self.redisMessaging)
-                    
-                    outboundQueue = f"diameter-outbound-{inboundHost}-{inboundPort}"
-                    outboundMessage = json.dumps({"diameter-outbound": diameterOutbound, "inbound-received-timestamp": inboundTimestamp})
+    async def processInboundMessageAsync(self, inboundBinary: bytes, inboundHost: str, inboundPort: int, inboundTimestamp: float, queuedTimestamp: float=0.0, dequeuedTimestamp: float=0.0, previousTask: asyncio.Task=None) -> dict:
+        """
+        Runs processInboundMessage on the thread pool, once any earlier message for the same subscriber (previousTask) has been processed.
+        Returns the answer as a dict of outbound queue to messages, for handleQueueAsync to send.
+        """
+        if previousTask is not None:
+            await(asyncio.wait([previousTask]))
+        outboundMessages = {}
+        await(asyncio.get_running_loop().run_in_executor(None, self.processInboundMessage, inboundBinary, inboundHost, inboundPort, inboundTimestamp, outboundMessages, queuedTimestamp, dequeuedTimestamp))
+        return outboundMessages
 
-                    self.logTool.log(service='HSS', level='debug', message=f"[HSS] [handleQueue] [{diameterMessageTypeOutbound}] Generated Diameter Outbound: {diameterOutbound}", redisClient=self.redisMessaging)
-                    self.logTool.log(service='HSS', level='debug', message=f"[HSS] [handleQueue] [{diameterMessageTypeOutbound}] Outbound Diameter Outbound Queue: {outboundQueue}", redisClient=self.redisMessaging)
-                    self.logTool.log(service='HSS', level='debug', message=f"[HSS] [handleQueue] [{diameterMessageTypeOutbound}] Outbound Diameter Outbound: {outboundMessage}", redisClient=self.redisMessaging)
+    async def handleQueueAsync(self):
+        """
+        Asynchronous equivalent of handleQueue, enabled by hss.hss_service_async.
+        Up to hss.hss_service_async_concurrency messages are processed at once on a thread pool, so database and redis round trips for different subscribers overlap.
+        Messages with the same getSubscriberKey (the subscriber, or the session for Gx / Rx / Ro) are chained, and processed one at a time in the order they were received.
+        Answers completing while a send is in progress are sent together in the next one, so redis round trips don't grow with the answer rate.
+        """
+        loop = asyncio.get_running_loop()
+        loop.set_default_executor(concurrent.futures.ThreadPoolExecutor(max_workers=self.asyncConcurrency, thread_name_prefix='hssService'))
+        redisMessagingAsync = RedisMessagingAsync(host=self.redisHost, port=self.redisPort, useUnixSocket=self.redisUseUnixSocket, unixSocketPath=self.redisUnixSocketPath)
+        inFlightMessages = asyncio.Semaphore(self.asyncConcurrency)
+        #The most recent task for each subscriber or session with messages in flight
+        subscriberTasks = {}
+        pendingOutboundMessages = {}
+        sendTasks = set()
 
-                    self.redisMessaging.sendMessage(queue=outboundQueue, message=outboundMessage, queueExpiry=60, usePrefix=True, prefixHostname=self.hostname, prefixServiceName='diameter')
-                    if self.benchmarking:
-                        self.logTool.log(service='HSS', level='info', message=f"[HSS] [handleQueue] [{diameterMessageTypeInbound}] Time taken to process request: {round(((time.perf_counter() - startTime)*1000), 3)} ms", redisClient=self.redisMessaging)
+        async def sendPendingOutboundMessages():
+            while pendingOutboundMessages:
+                outboundMessages = dict(pendingOutboundMessages)
+                pendingOutboundMessages.clear()
+                await(redisMessagingAsync.sendShardedBulkMessage(queueMessages=outboundMessages, queueExpiry=60, usePrefix=True, prefixHostname=self.hostname, prefixServiceName='diameter'))
 
-                    try:
-                        diameterPeers = json.loads(self.redisMessaging.getValue("ActiveDiameterPeers", usePrefix=True, prefixHostname=self.hostname, prefixServiceName='diameter'))
+        def releaseMessage(task: asyncio.Task, subscriberKey: bytes):
+            inFlightMessages.release()
+            if subscriberTasks.get(subscriberKey) is task:
+                del subscriberTasks[subscriberKey]
+            if task.cancelled():
+                return
+            processException = task.exception()
+            if processException is not None:
+                #Retrieving the exception silences asyncio's own report, so log it the same way handleQueue does
+                self.logTool.log(service='HSS', level='error', message=f"[HSS] [handleQueueAsync] Exception: {''.join(traceback.format_exception(type(processException), processException, processException.__traceback__))}", redisClient=self.redisMessaging)
+                return
+            for outboundQueue, messageList in task.result().items():
+                pendingOutboundMessages.setdefault(outboundQueue, []).extend(messageList)
+            #A single send task drains pendingOutboundMessages, picking up answers that complete while it is waiting on redis
+            if pendingOutboundMessages and not sendTasks:
+                sendTask = asyncio.create_task(sendPendingOutboundMessages())
+                sendTasks.add(sendTask)
+                sendTask.add_done_callback(sendTasks.discard)
 
-                        for diameterPeer in diameterPeers:
-                            if diameterPeers[diameterPeer].get('ipAddress', '') == inboundHost and diameterPeers[diameterPeer].get('port', '') == inboundPort:
-                                self.redisMessaging.sendMetric(serviceName='diameter', metricName='prom_diam_response_count_host',
-                                            metricType='gauge', metricAction='inc',
-                                            metricLabels={
-                                            "host": diameterPeers[diameterPeer]['diameterHostname']},
-                                            metricValue=float(1), metricHelp='Number of Diameter Responses Sent per Host',
-                                            metricExpiry=60,
-                                            usePrefix=True, 
-                                            prefixHostname=self.hostname, 
-                                            prefixServiceName='metric')
+        while self.running:
+            try:
+                if self.heartbeat is not None:
+                    self.heartbeat.value = time.time()
 
-                    except Exception as e:
-                        self.logTool.log(service='HSS', level='error', message=f"[HSS] [handleQueue] Error updating prom_diam_response_count_host: {traceback.format_exc()}", redisClient=self.redisMessaging)
-                        pass
+                inboundMessageList = await(redisMessagingAsync.awaitBulkMessage(key=self.inboundQueueName, timeout=1, direction='LEFT', usePrefix=True, prefixHostname=self.hostname, prefixServiceName='diameter'))
 
+                if not inboundMessageList:
+                    continue
+                dequeuedTimestamp = time.time()
+                staleRequests = 0
+                for inboundMessage in inboundMessageList[1]:
+                    inboundBinary, inboundHost, inboundPort, inboundTimestamp = decodeEnvelope(inboundMessage)
+
+                    if not inboundBinary:
+                        continue
+
+                    if self.isStaleRequest(inboundBinary, inboundTimestamp):
+                        staleRequests += 1
+                        continue
+
+                    await(inFlightMessages.acquire())
+                    subscriberKey = getSubscriberKey(inboundBinary)
+                    processTask = asyncio.create_task(self.processInboundMessageAsync(inboundBinary, inboundHost, inboundPort, inboundTimestamp, queuedTimestamp=getEnvelopeQueuedTimestamp(inboundMessage), dequeuedTimestamp=dequeuedTimestamp, previousTask=subscriberTasks.get(subscriberKey)))
+                    subscriberTasks[subscriberKey] = processTask
+                    processTask.add_done_callback(lambda task, subscriberKey=subscriberKey: releaseMessage(task, subscriberKey))
+
+                if staleRequests > 0:
+                    await(loop.run_in_executor(None, self.reportStaleRequests, staleRequests))
 
             except Exception as e:
-                self.logTool.log(service='HSS', level='error', message=f"[HSS] [handleQueue] Exception: {traceback.format_exc()}", redisClient=self.redisMessaging)
+                self.logTool.log(service='HSS', level='error', message=f"[HSS] [handleQueueAsync] Exception: {traceback.format_exc()}", redisClient=self.redisMessaging)
                 continue
-            
+
+        #Let messages already in flight finish, and their answers be sent, before exiting
+        if subscriberTasks:
+            await(asyncio.wait(list(subscriberTasks.values())))
+        if sendTasks:
+            await(asyncio.wait(list(sendTasks)))
+
+    def run(self):
+        """
+        Processes inbound messages until stopped, with handleQueueAsync if hss.hss_service_async is enabled, otherwise handleQueue.
+        """
+        if self.asyncEnabled:
+            asyncio.run(self.handleQueueAsync())
+        else:
+            self.handleQueue()
+
+
+    def startWorkers(self):
+        """
+        Runs self.workerCount hssService worker processes, each consuming its own diameter-inbound-{n} shard, until SIGTERM or SIGINT is received.
+        Workers that exit are restarted, as are workers whose heartbeat is older than hss.hss_service_health_timeout seconds (eg. stuck on a database call).
+        On shutdown, each worker finishes its current batch and exits, and is killed if it hasn't within hss.hss_service_shutdown_timeout seconds.
+        """
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        #Database connections opened by the supervisor must not be shared with the workers it forks
+        self.diameterLibrary.database.engine.dispose()
+        workers = {}
+        heartbeats = {}
+        while self.running:
+            for workerIndex in range(self.workerCount):
+                worker = workers.get(workerIndex)
+                if worker is not None and worker.is_alive():
+                    lastHeartbeat = heartbeats[workerIndex].value
+                    #Heartbeats are only checked once a worker has started handling the queue, as startup time varies (eg. loading the TAC database)
+                    if lastHeartbeat == 0 or time.time() - lastHeartbeat < self.workerHealthTimeout:
+                        continue
+                    self.logTool.log(service='HSS', level='error', message=f"[HSS] [startWorkers] Worker {workerIndex} last responded {round(time.time() - lastHeartbeat, 1)} seconds ago, restarting.", redisClient=self.redisMessaging)
+                    worker.kill()
+                    worker.join()
+                elif worker is not None:
+                    self.logTool.log(service='HSS', level='warning', message=f"[HSS] [startWorkers] Worker {workerIndex} exited with code {worker.exitcode}, restarting.", redisClient=self.redisMessaging)
+                heartbeats[workerIndex] = multiprocessing.Value('d', 0.0, lock=False)
+                worker = multiprocessing.Process(target=runHssService, args=(workerIndex, heartbeats[workerIndex]), name=f"hssService-{workerIndex}")
+                worker.start()
+                workers[workerIndex] = worker
+            multiprocessing.connection.wait([worker.sentinel for worker in workers.values()], timeout=1)
+
+        self.logTool.log(service='HSS', level='info', message=f"[HSS] [startWorkers] Stopping {len(workers)} worker(s).", redisClient=self.redisMessaging)
+        for worker in workers.values():
+            worker.terminate()
+        shutdownDeadline = time.time() + self.workerShutdownTimeout
+        for workerIndex, worker in workers.items():
+            worker.join(max(shutdownDeadline - time.time(), 0))
+            if worker.is_alive():
+                self.logTool.log(service='HSS', level='warning', message=f"[HSS] [startWorkers] Worker {workerIndex} did not stop within {self.workerShutdownTimeout} seconds, killing.", redisClient=self.redisMessaging)
+                worker.kill()
+                worker.join()
+
+
+def runHssService(workerIndex: int=0, heartbeat=None):
+    #Shutdown is coordinated by the supervisor, which forwards SIGINT to workers as SIGTERM
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    hssService = HssService(workerIndex=workerIndex)
+    signal.signal(signal.SIGTERM, hssService.stop)
+    hssService.heartbeat = heartbeat
+    hssService.run()
+    #Worker processes exit without running atexit handlers, so ship any buffered log messages and metrics first
+    hssService.metricAggregator.flushMetrics()
+    hssService.logTool.flushLogMessages()
 
 
 if __name__ == '__main__':
     hssService = HssService()
-    hssService.handleQueue()
\ No newline at end of file
+    if hssService.workerCount > 1:
+        hssService.startWorkers()
+    else:
+        signal.signal(signal.SIGTERM, hssService.stop)
+        hssService.run()
@@ -3,6 +3,8 @@ import sys, os, json
 import time, json, yaml
 import socket
 from prometheus_client import make_wsgi_app, start_http_server, Counter, Gauge, Summary, Histogram, CollectorRegistry
+from prometheus_client.core import HistogramMetricFamily
+from prometheus_client.utils import floatToGoString
 from werkzeug.middleware.dispatcher import DispatcherMiddleware
 from flask import Flask
 import threading
@@ -11,6 +13,51 @@ from messaging import RedisMessaging
 from banners import Banners
 from logtool import LogTool
 
+class BucketedHistogram:
+    """
+    Custom collector for histograms that are observed as bucket counts (eg. by MetricAggregator) rather than as individual values.
+    Holds the cumulative count of each bucket and the sum for each label set, and exports them as a HistogramMetricFamily when scraped.
+    """
+
+    def __init__(self, name: str, documentation: str, labelNames: list, buckets: list):
+        self.name = name
+        self.documentation = documentation
+        self.labelNames = list(labelNames)
+        self.buckets = [float(bucket) for bucket in buckets]
+        self.bucketCounts = {}
+        self.lock = threading.Lock()
+
+    def observeBuckets(self, labelValues: list, buckets: list, bucketCounts: list, observedSum: float) -> bool:
+        """
+        Adds the count for each bucket (including +Inf) and the sum of the observed values for a label set.
+        Returns False if the buckets don't match the buckets of the histogram.
+        """
+        if [float(bucket) for bucket in buckets] != self.buckets or len(bucketCounts) != len(self.buckets) + 1:
+            return False
+        labelValues = tuple(str(labelValue) for labelValue in labelValues)
+        with self.lock:
+            cumulativeCounts, cumulativeSum = self.bucketCounts.get(labelValues, ([0] * len(bucketCounts), 0.0))
+            self.bucketCounts[labelValues] = ([cumulativeCount + int(bucketCount) for cumulativeCount, bucketCount in zip(cumulativeCounts, bucketCounts)], cumulativeSum + observedSum)
+        return True
+
+    def describe(self):
+        return [HistogramMetricFamily(self.name, self.documentation, labels=self.labelNames)]
+
+    def collect(self):
+        histogram = HistogramMetricFamily(self.name, self.documentation, labels=self.labelNames)
+        with self.lock:
+            bucketCounts = dict(self.bucketCounts)
+        bucketBounds = [floatToGoString(bucket) for bucket in self.buckets] + ['+Inf']
+        for labelValues, (counts, observedSum) in bucketCounts.items():
+            cumulativeCount = 0
+            histogramBuckets = []
+            for bucketBound, bucketCount in zip(bucketBounds, counts):
+                cumulativeCount += bucketCount
+                histogramBuckets.append((bucketBound, cumulativeCount))
+            histogram.add_metric(list(labelValues), histogramBuckets, observedSum)
+        return [histogram]
+
+
 class MetricService:
 
     def __init__(self, redisHost: str='127.0.0.1', redisPort: int=6379):
@@ -25,6 +72,7 @@ class MetricService:
         self.banners = Banners()
         self.logTool = LogTool(config=self.config)
         self.registry = CollectorRegistry(auto_describe=True)
+        self.bucketedHistograms = {}
         self.logTool.log(service='Metric', level='info', message=f"{self.banners.metricService()}", redisClient=self.redisMessaging)
         self.hostname = socket.gethostname()
     
@@ -33,16 +81,16 @@ class MetricService:
         Collects queued metrics from redis, and exposes them using prometheus_client.
         """
         try:
-            actions = {'inc': 'inc', 'dec': 'dec', 'set':'set'}
+            actions = {'inc': 'inc', 'dec': 'dec', 'set':'set', 'observe': 'observe'}
             prometheusTypes = {'counter': Counter, 'gauge': Gauge, 'histogram': Histogram, 'summary': Summary}
 
             metric = self.redisMessaging.awaitMessage(key='metric', usePrefix=True, prefixHostname=self.hostname, prefixServiceName='metric')[1]
 
-            self.logTool.log(service='Metric', level='debug', message=f"[Metric] [handleMetrics] Received Metric: {metric}", redisClient=self.redisMessaging)
+            self.logTool.log(service='Metric', level='debug', message=lambda: f"[Metric] [handleMetrics] Received Metric: {metric}", redisClient=self.redisMessaging)
             prometheusJsonList = json.loads(metric)
 
             for prometheusJson in prometheusJsonList:
-                self.logTool.log(service='Metric', level='debug', message=f"[Metric] [handleMetrics] {prometheusJson}", redisClient=self.redisMessaging)
+                self.logTool.log(service='Metric', level='debug', message=lambda: f"[Metric] [handleMetrics] {prometheusJson}", redisClient=self.redisMessaging)
                 if not all(key in prometheusJson for key in ('NAME', 'TYPE', 'ACTION', 'VALUE')):
                     raise ValueError('All fields are not available for parsing')
                 counterName = prometheusJson['NAME']
@@ -51,13 +99,20 @@ class MetricService:
                 counterValue = float(prometheusJson['VALUE'])
                 counterHelp = prometheusJson.get('HELP', '')
                 counterLabels = prometheusJson.get('LABELS', {})
+                counterOptions = {}
+                #Histograms may specify their buckets, which are fixed once the histogram is created
+                if counterType is Histogram and 'BUCKETS' in prometheusJson:
+                    counterOptions['buckets'] = prometheusJson['BUCKETS']
 
                 if isinstance(counterLabels, list):
                             counterLabels = dict()
 
-                if counterType is not None:
+                if counterAction == 'observe_buckets' and counterType is Histogram:
+                    if not self.observeBuckets(counterName, counterHelp, counterLabels, prometheusJson.get('BUCKETS', []), prometheusJson.get('BUCKET_COUNTS', []), counterValue):
+                        self.logTool.log(service='Metric', level='warn', message=f"[Metric] [handleMetrics] Buckets or labels don't match histogram '{counterName}', or the name is used by another metric, skipping.", redisClient=self.redisMessaging)
+                elif counterType is not None:
                     try:
-                        counterRecord = counterType(counterName, counterHelp, labelnames=counterLabels.keys(), registry=self.registry)
+                        counterRecord = counterType(counterName, counterHelp, labelnames=counterLabels.keys(), registry=self.registry, **counterOptions)
                         if counterLabels:
                             counterRecord = counterRecord.labels(*counterLabels.values())
                     except ValueError as e:
@@ -79,6 +134,23 @@ class MetricService:
             self.logTool.log(service='Metric', level='error', message=f"[Metric] [handleMetrics] Unable to parse message: {metric}, due to {e}. Skipping.", redisClient=self.redisMessaging)
             return
 
+    def observeBuckets(self, counterName: str, counterHelp: str, counterLabels: dict, buckets: list, bucketCounts: list, observedSum: float) -> bool:
+        """
+        Adds observations already counted into buckets (eg. by MetricAggregator) to a histogram, given its buckets, the count for each bucket (including +Inf) and the sum of the observed values.
+        The histogram is created as a BucketedHistogram, with the buckets of the first update it receives.
+        Returns False if the buckets or label names don't match the histogram, or the name is already used by another metric.
+        """
+        bucketedHistogram = self.bucketedHistograms.get(counterName)
+        if bucketedHistogram is None:
+            bucketedHistogram = BucketedHistogram(counterName, counterHelp, counterLabels.keys(), buckets)
+            try:
+                self.registry.register(bucketedHistogram)
+            except ValueError:
+                return False
+            self.bucketedHistograms[counterName] = bucketedHistogram
+        if list(counterLabels.keys()) != bucketedHistogram.labelNames:
+            return False
+        return bucketedHistogram.observeBuckets(counterLabels.values(), buckets, bucketCounts, observedSum)
 
     def getMetrics(self):
         while True:
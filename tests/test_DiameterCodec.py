@@ -0,0 +1,274 @@
+import unittest
+import os
+import sys
+import zlib
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), '../lib'))
+import diameterCodec
+
+
+class DiameterCodec_Tests(unittest.TestCase):
+    Diameter_DWR = b'\x01\x00\x00P\x80\x00\x01\x18\x00\x00\x00\x00x\xb7\x96\x8du\xb2+\xf3\x00\x00\x01\x08@\x00\x00\rhss01\x00\x00\x00\x00\x00\x01(@\x00\x00)epc.mnc001.mcc001.3gppnetwork.org\x00\x00\x00'
+    Diameter_AIR = b"\x01\x00\x01\x14\xc0\x00\x01>\x01\x00\x00#0\xd0hym\x19i\xc8\x00\x00\x01\x07@\x00\x00'6873733031;3076d64228;1;app_s6a\x00\x00\x00\x01\x15@\x00\x00\x0c\x00\x00\x00\x01\x00\x00\x01\x08@\x00\x00\rhss01\x00\x00\x00\x00\x00\x01(@\x00\x00)epc.mnc001.mcc001.3gppnetwork.org\x00\x00\x00\x00\x00\x01\x1b@\x00\x00\x1cnickvsnetworking.com\x00\x00\x00\x01@\x00\x00\x17505931111111116\x00\x00\x00\x05\x80\xc0\x00\x00,\x00\x00(\xaf\x00\x00\x05\x82\xc0\x00\x00\x10\x00\x00(\xaf\x00\x00\x00\x01\x00\x00\x05\x84\xc0\x00\x00\x10\x00\x00(\xaf\x00\x00\x00\x01\x00\x00\x05\x7f\xc0\x00\x00\x0f\x00\x00(\xaf\x05\xf59\x00\x00\x00\x01\x04@\x00\x00 \x00\x00\x01\n@\x00\x00\x0c\x00\x00(\xaf\x00\x00\x01\x02@\x00\x00\x0c\x01\x00\x00#"
+
+    def test_A_Encode_Avp_Padding(self):
+        #Origin-Host "hss01" is 5 bytes, so the 13 byte AVP is padded out to 16 bytes
+        avp = diameterCodec.encodeAvp(264, 0x40, b'hss01')
+        self.assertEqual(avp, b'\x00\x00\x01\x08@\x00\x00\rhss01\x00\x00\x00')
+        self.assertEqual(len(avp) % 4, 0)
+
+    def test_B_Encode_Avp_No_Padding(self):
+        avp = diameterCodec.encodeAvp(268, 0x40, diameterCodec.encodeUnsigned32(2001))
+        self.assertEqual(avp.hex(), "0000010c4000000c000007d1")
+
+    def test_C_Encode_Vendor_Avp(self):
+        avp = diameterCodec.encodeVendorAvp(1406, 0xc0, 10415, diameterCodec.encodeUnsigned32(1))
+        self.assertEqual(avp.hex(), "0000057ec0000010000028af00000001")
+
+    def test_D_Encode_Grouped_Avp(self):
+        #Vendor-Specific-Application-Id (S6a), as sent in the sample CER
+        vendorSpecificApplicationId = diameterCodec.encodeAvp(260, 0x40,
+            diameterCodec.encodeAvp(258, 0x40, diameterCodec.encodeUnsigned32(16777251))
+            + diameterCodec.encodeAvp(266, 0x40, diameterCodec.encodeUnsigned32(10415)))
+        self.assertEqual(vendorSpecificApplicationId.hex(), "0000010440000020000001024000000c010000230000010a4000000c000028af")
+
+    def test_E_Encode_Diameter_Packet(self):
+        #Rebuild the sample DWR from its AVPs and compare against the captured packet
+        dwr = self.__class__.Diameter_DWR
+        avps = diameterCodec.encodeAvp(264, 0x40, b'hss01') + diameterCodec.encodeAvp(296, 0x40, b'epc.mnc001.mcc001.3gppnetwork.org')
+        packet = diameterCodec.encodeDiameterPacket(0x80, 280, 0, dwr[12:16], dwr[16:20], avps)
+        self.assertEqual(packet, dwr)
+
+    def test_F_Legacy_Flags(self):
+        self.assertEqual(diameterCodec.legacyFlags(40), 0x40)
+        self.assertEqual(diameterCodec.legacyFlags("c0"), 0xc0)
+        self.assertEqual(diameterCodec.legacyFlags("C0"), 0xc0)
+        self.assertEqual(diameterCodec.legacyFlags("00"), 0)
+
+    def test_G_Encode_Address(self):
+        self.assertEqual(diameterCodec.encodeAddress("127.0.0.1").hex(), "00017f000001")
+        self.assertEqual(diameterCodec.encodeAddress("::1").hex(), "0002" + "00" * 15 + "01")
+
+    def test_H_Identifier_To_Bytes(self):
+        self.assertEqual(diameterCodec.identifierToBytes("78b7968d"), b'x\xb7\x96\x8d')
+        self.assertEqual(diameterCodec.identifierToBytes(b'x\xb7\x96\x8d'), b'x\xb7\x96\x8d')
+
+    def test_I_Decode_Diameter_Packet(self):
+        packetVars, avps = diameterCodec.decodeDiameterPacket(self.__class__.Diameter_AIR)
+        self.assertEqual(packetVars['command_code'], 318)
+        self.assertEqual(packetVars['ApplicationId'], 16777251)
+        self.assertEqual(packetVars['flags'], 'c0')
+        self.assertEqual(packetVars['hop-by-hop-identifier'], '30d06879')
+        self.assertEqual([avp['avp_code'] for avp in avps], [263, 277, 264, 296, 283, 1, 1408, 1407, 260])
+        self.assertEqual(avps[5].data, b'505931111111116')
+        self.assertEqual(avps[5]['misc_data'], b'505931111111116'.hex())
+
+    def test_J_Decode_Grouped_Avp(self):
+        packetVars, avps = diameterCodec.decodeDiameterPacket(self.__class__.Diameter_AIR)
+        requestedEutranAuthInfo = avps[6]
+        self.assertEqual(requestedEutranAuthInfo.vendorId, 10415)
+        self.assertTrue(requestedEutranAuthInfo.isGrouped)
+        self.assertEqual(requestedEutranAuthInfo['misc_data'], '')
+        self.assertEqual([avp.code for avp in requestedEutranAuthInfo.children], [1410, 1412])
+        self.assertEqual(requestedEutranAuthInfo.children[0].data, diameterCodec.encodeUnsigned32(1))
+        #Visited-PLMN-Id is a plain OctetString
+        self.assertFalse(avps[7].isGrouped)
+
+    def test_K_Decode_Nested_Grouped_Avp(self):
+        innerGroup = diameterCodec.encodeVendorAvp(1435, 0xc0, 10415,
+            diameterCodec.encodeVendorAvp(516, 0xc0, 10415, diameterCodec.encodeUnsigned32(1024))
+            + diameterCodec.encodeVendorAvp(515, 0xc0, 10415, diameterCodec.encodeUnsigned32(2048)))
+        outerGroup = diameterCodec.encodeVendorAvp(1400, 0xc0, 10415, diameterCodec.encodeVendorAvp(1424, 0xc0, 10415, diameterCodec.encodeUnsigned32(0)) + innerGroup)
+        packet = diameterCodec.encodeDiameterPacket(0x40, 316, 16777251, b'\x00\x00\x00\x01', b'\x00\x00\x00\x02', outerGroup)
+        packetVars, avps = diameterCodec.decodeDiameterPacket(packet)
+        self.assertEqual(len(avps), 1)
+        self.assertEqual([avp.code for avp in avps[0].children], [1424, 1435])
+        self.assertEqual([avp['avp_code'] for avp in avps[0]['sub_avps']], [1424, 1435, 516, 515])
+
+    def test_L_Decode_Large_Message(self):
+        #The previous decoder gave up after 100 AVPs
+        avpBlock = b''.join(diameterCodec.encodeAvp(282, 0x40, f"route{index}.localdomain".encode()) for index in range(500))
+        packet = diameterCodec.encodeDiameterPacket(0x80, 280, 0, b'\x00\x00\x00\x01', b'\x00\x00\x00\x02', avpBlock)
+        packetVars, avps = diameterCodec.decodeDiameterPacket(packet)
+        self.assertEqual(packetVars['length'], len(packet))
+        self.assertEqual(len(avps), 500)
+        self.assertEqual(avps[-1].data, b'route499.localdomain')
+
+    def test_M_Decode_Truncated_Message(self):
+        packet = self.__class__.Diameter_DWR[:-20]
+        packetVars, avps = diameterCodec.decodeDiameterPacket(packet)
+        self.assertEqual([avp.code for avp in avps], [264])
+
+    def test_N_Avp_Index(self):
+        packetVars, avps = diameterCodec.decodeDiameterPacket(self.__class__.Diameter_AIR)
+        self.assertEqual(avps.findFirst(1).data, b'505931111111116')
+        #Nested AVPs are indexed alongside top level AVPs
+        self.assertEqual(avps.findFirst(1410).data, diameterCodec.encodeUnsigned32(1))
+        self.assertEqual(len(avps.find(1410, vendorId=10415)), 1)
+        self.assertEqual(avps.find(1410, vendorId=0), [])
+        self.assertEqual(avps.find(12345), [])
+        self.assertIsNone(avps.findFirst(12345))
+        #Grouped AVPs carry their own index
+        self.assertEqual(avps.findFirst(1408).children.findFirst(1412).vendorId, 10415)
+
+    def test_O_Avp_Index_Order(self):
+        avpBlock = diameterCodec.encodeAvp(282, 0x40, b'first') \
+            + diameterCodec.encodeAvp(260, 0x40, diameterCodec.encodeAvp(282, 0x40, b'second')) \
+            + diameterCodec.encodeAvp(282, 0x40, b'third')
+        packet = diameterCodec.encodeDiameterPacket(0x80, 280, 0, b'\x00\x00\x00\x01', b'\x00\x00\x00\x02', avpBlock)
+        packetVars, avps = diameterCodec.decodeDiameterPacket(packet)
+        self.assertEqual([avp.data for avp in avps.find(282)], [b'first', b'second', b'third'])
+
+    def test_P_Answer_Template(self):
+        originAvps = diameterCodec.encodeAvp(264, 0x40, b'hss01') + diameterCodec.encodeAvp(296, 0x40, b'epc.mnc001.mcc001.3gppnetwork.org')
+        resultCodeAvp = diameterCodec.encodeAvp(268, 0x40, diameterCodec.encodeUnsigned32(2001))
+        originStateAvp = diameterCodec.encodeAvp(278, 0x40, diameterCodec.encodeUnsigned32(8))
+        template = diameterCodec.AnswerTemplate(0x00, 280, 0, leadingAvps=resultCodeAvp + originAvps)
+        hopByHopId, endToEndId = b'\x00\x00\x00\x01', b'\x00\x00\x00\x02'
+        self.assertEqual(template.render(hopByHopId, endToEndId), diameterCodec.encodeDiameterPacket(0x00, 280, 0, hopByHopId, endToEndId, resultCodeAvp + originAvps))
+        self.assertEqual(template.render(hopByHopId, endToEndId, originStateAvp), diameterCodec.encodeDiameterPacket(0x00, 280, 0, hopByHopId, endToEndId, resultCodeAvp + originAvps + originStateAvp))
+        template = diameterCodec.AnswerTemplate(0x40, 321, 16777251, trailingAvps=resultCodeAvp)
+        packetVars, avps = diameterCodec.decodeDiameterPacket(template.render(hopByHopId, endToEndId, originAvps))
+        self.assertEqual(packetVars['length'], diameterCodec.DIAMETER_HEADER_LENGTH + len(originAvps) + len(resultCodeAvp))
+        self.assertEqual(packetVars['ApplicationId'], 16777251)
+        self.assertEqual([avp.code for avp in avps], [264, 296, 268])
+
+    def test_Q_Typed_Values(self):
+        packetVars, avps = diameterCodec.decodeDiameterPacket(self.__class__.Diameter_AIR)
+        self.assertEqual(avps.findFirst(1).value, '505931111111116')
+        self.assertEqual(avps.findFirst(264).value, 'hss01')
+        self.assertEqual(avps.findFirst(277).value, 1)
+        self.assertEqual(avps.findFirst(1410).value, 1)
+        self.assertEqual(avps.findFirst(1407).value, b'\x05\xf59')
+        self.assertEqual(avps.findFirst(1408).name, 'Requested-EUTRAN-Authentication-Info')
+        self.assertEqual([avp.code for avp in avps.findFirst(1408).value], [1410, 1412])
+
+    def test_R_Dictionary_Grouped_Decision(self):
+        #A Session-Id that happens to look like an AVP header is still decoded as a UTF8String
+        lookalike = diameterCodec.encodeAvp(1, 0x40, b'imsi')
+        packet = diameterCodec.encodeDiameterPacket(0x80, 280, 0, b'\x00\x00\x00\x01', b'\x00\x00\x00\x02', diameterCodec.encodeAvp(263, 0x40, lookalike))
+        packetVars, avps = diameterCodec.decodeDiameterPacket(packet)
+        self.assertFalse(avps[0].isGrouped)
+        self.assertEqual(avps[0]['misc_data'], lookalike.hex())
+        #Unknown AVPs fall back to checking whether the payload is a sequence of AVPs
+        packet = diameterCodec.encodeDiameterPacket(0x80, 280, 0, b'\x00\x00\x00\x01', b'\x00\x00\x00\x02', diameterCodec.encodeVendorAvp(9999, 0x80, 12345, lookalike))
+        packetVars, avps = diameterCodec.decodeDiameterPacket(packet)
+        self.assertIsNone(avps[0].name)
+        self.assertTrue(avps[0].isGrouped)
+        self.assertEqual(avps[0].value, lookalike)
+
+    def test_S_Encode_Typed_Avp(self):
+        self.assertEqual(diameterCodec.encodeTypedAvp('Result-Code', 2001), diameterCodec.encodeAvp(268, 0x40, diameterCodec.encodeUnsigned32(2001)))
+        self.assertEqual(diameterCodec.encodeTypedAvp('Origin-Host', 'hss01'), diameterCodec.encodeAvp(264, 0x40, b'hss01'))
+        self.assertEqual(diameterCodec.encodeTypedAvp('ULA-Flags', 1).hex(), "0000057ec0000010000028af00000001")
+        self.assertEqual(diameterCodec.encodeTypedAvp('Host-IP-Address', '127.0.0.1'), diameterCodec.encodeAvp(257, 0x40, diameterCodec.encodeAddress('127.0.0.1')))
+        self.assertEqual(diameterCodec.encodeTypedAvp('Feature-List-ID', 1, avpFlags=0x80).hex(), "00000275800000100000" + "28af00000001")
+        #Round trip through the decoder
+        avpBlock = diameterCodec.encodeTypedAvp('Host-IP-Address', '::1') + diameterCodec.encodeTypedAvp('Subscription-Data', diameterCodec.encodeTypedAvp('Subscriber-Status', 0) + diameterCodec.encodeTypedAvp('Network-Access-Mode', 2))
+        packet = diameterCodec.encodeDiameterPacket(0x80, 319, 16777251, b'\x00\x00\x00\x01', b'\x00\x00\x00\x02', avpBlock)
+        packetVars, avps = diameterCodec.decodeDiameterPacket(packet)
+        self.assertEqual(avps[0].value, '::1')
+        self.assertEqual([(avp.name, avp.value) for avp in avps[1].value], [('Subscriber-Status', 0), ('Network-Access-Mode', 2)])
+
+    def test_T_Diameter_Header(self):
+        header, avps = diameterCodec.decodeDiameterPacket(self.__class__.Diameter_AIR)
+        self.assertIsInstance(header, diameterCodec.DiameterHeader)
+        self.assertTrue(header.isRequest)
+        self.assertEqual(header.flags, 0xc0)
+        self.assertEqual(header.hopByHopId, b'0\xd0hy')
+        self.assertEqual(header['flags_bin'], '11000000')
+        self.assertEqual(header['packet_version'], '01')
+        self.assertEqual(header['end-to-end-identifier'], header.endToEndId.hex())
+        self.assertEqual(header.get('missing', 'default'), 'default')
+        with self.assertRaises(KeyError):
+            header['missing']
+        header, avps = diameterCodec.decodeDiameterPacket(self.__class__.Diameter_DWR)
+        self.assertTrue(header.isRequest)
+        self.assertEqual(header['flags'], '80')
+
+    def test_U_Slotted_Objects(self):
+        #Decoded objects carry no per-instance __dict__
+        header, avps = diameterCodec.decodeDiameterPacket(self.__class__.Diameter_AIR)
+        for decoded in (header, avps, avps[0], avps.findFirst(1408).children):
+            self.assertFalse(hasattr(decoded, '__dict__'))
+        with self.assertRaises(AttributeError):
+            avps[0].unexpected = True
+
+    def test_V_Stream_Framer_Coalesced(self):
+        framer = diameterCodec.DiameterStreamFramer()
+        stream = self.__class__.Diameter_DWR + self.__class__.Diameter_AIR + self.__class__.Diameter_DWR
+        self.assertEqual(framer.feed(stream), [self.__class__.Diameter_DWR, self.__class__.Diameter_AIR, self.__class__.Diameter_DWR])
+        self.assertEqual(len(framer.buffer), 0)
+
+    def test_W_Stream_Framer_Split(self):
+        framer = diameterCodec.DiameterStreamFramer()
+        stream = self.__class__.Diameter_AIR + self.__class__.Diameter_DWR
+        messages = []
+        #Feed the stream in uneven chunks, including a split inside the first header
+        for chunkStart, chunkEnd in ((0, 3), (3, 100), (100, 290), (290, len(stream))):
+            messages += framer.feed(stream[chunkStart:chunkEnd])
+        self.assertEqual(messages, [self.__class__.Diameter_AIR, self.__class__.Diameter_DWR])
+        self.assertEqual(framer.feed(self.__class__.Diameter_DWR[:30]), [])
+        self.assertEqual(framer.feed(self.__class__.Diameter_DWR[30:]), [self.__class__.Diameter_DWR])
+
+    def test_X_Stream_Framer_Invalid(self):
+        framer = diameterCodec.DiameterStreamFramer()
+        with self.assertRaises(ValueError):
+            framer.feed(b'GET / HTTP/1.1\r\n\r\n')
+        framer = diameterCodec.DiameterStreamFramer()
+        with self.assertRaises(ValueError):
+            framer.feed(b'\x01\x00\x00\x04' + b'\x00' * 16)
+
+    def test_Y_Append_Avps_To_Packet(self):
+        #OC-Supported-Features, as appended to answers for peers supporting DOIC
+        ocSupportedFeatures = diameterCodec.encodeAvp(621, 0x00, diameterCodec.encodeAvp(622, 0x00, diameterCodec.encodeUnsigned64(1)))
+        packet = diameterCodec.appendAvpsToPacket(self.__class__.Diameter_DWR, ocSupportedFeatures)
+        self.assertEqual(packet, self.__class__.Diameter_DWR[:1] + (len(self.__class__.Diameter_DWR) + len(ocSupportedFeatures)).to_bytes(3, 'big') + self.__class__.Diameter_DWR[4:] + ocSupportedFeatures)
+        header, avps = diameterCodec.decodeDiameterPacket(packet)
+        self.assertEqual(header.length, len(packet))
+        self.assertEqual([avp.code for avp in avps], [264, 296, 621])
+        self.assertEqual(avps[-1].children[0].value, 1)
+
+    def test_Z_Envelope(self):
+        envelope = diameterCodec.encodeEnvelope(self.__class__.Diameter_AIR, '2001:db8::1', 3868, 1700000000.25)
+        self.assertEqual(len(envelope), diameterCodec.ENVELOPE_HEADER_LENGTH + len('2001:db8::1') + len(self.__class__.Diameter_AIR))
+        self.assertEqual(diameterCodec.decodeEnvelope(envelope), (self.__class__.Diameter_AIR, '2001:db8::1', 3868, 1700000000.25))
+        #Outbound messages carry no client, and requests generated by PyHSS carry no received timestamp
+        self.assertEqual(diameterCodec.decodeEnvelope(diameterCodec.encodeEnvelope(self.__class__.Diameter_DWR)), (self.__class__.Diameter_DWR, '', 0, 0.0))
+        with self.assertRaises(ValueError):
+            diameterCodec.decodeEnvelope(b'\x01' + envelope[1:])
+        self.assertEqual(diameterCodec.getEnvelopeQueuedTimestamp(envelope), 0.0)
+        envelope = diameterCodec.encodeEnvelope(self.__class__.Diameter_AIR, '10.0.0.1', 3868, 1700000000.25, 1700000000.5)
+        self.assertEqual(diameterCodec.decodeEnvelope(envelope)[3], 1700000000.25)
+        self.assertEqual(diameterCodec.getEnvelopeQueuedTimestamp(envelope), 1700000000.5)
+
+    def test_ZA_Subscriber_Shard(self):
+        imsi = b'505931111111116'
+        self.assertEqual(diameterCodec.getSubscriberKey(self.__class__.Diameter_AIR), imsi)
+        self.assertEqual(diameterCodec.getSubscriberShard(self.__class__.Diameter_AIR, 1), 0)
+        self.assertEqual(diameterCodec.getSubscriberShard(self.__class__.Diameter_AIR, 16), zlib.crc32(imsi) % 16)
+        #Gx requests are sharded on the Session-Id, which unlike the Subscription-Id is carried by every request of the session
+        sessionId = diameterCodec.encodeAvp(263, 0x40, b'pgw;1;2')
+        subscriptionId = diameterCodec.encodeAvp(443, 0x40, diameterCodec.encodeAvp(450, 0x40, diameterCodec.encodeUnsigned32(1)) + diameterCodec.encodeAvp(444, 0x40, imsi))
+        ccrShards = set()
+        for requestType, requestAvps in [(1, subscriptionId), (2, b''), (3, b'')]:
+            ccr = diameterCodec.encodeDiameterPacket(0x80, 272, 16777238, requestType.to_bytes(4, 'big'), b'\x00\x00\x00\x01',
+                                                     sessionId + diameterCodec.encodeAvp(416, 0x40, diameterCodec.encodeUnsigned32(requestType)) + requestAvps)
+            self.assertEqual(diameterCodec.getSubscriberKey(ccr), b'pgw;1;2')
+            ccrShards.add(diameterCodec.getSubscriberShard(ccr, 16))
+        self.assertEqual(ccrShards, {zlib.crc32(b'pgw;1;2') % 16})
+        #Otherwise, without a User-Name the Session-Id is used
+        self.assertEqual(diameterCodec.getSubscriberShard(self.__class__.Diameter_DWR, 16), 0)
+        rsr = diameterCodec.encodeDiameterPacket(0x80, 321, 16777251, b'\x00\x00\x00\x01', b'\x00\x00\x00\x01', diameterCodec.encodeAvp(263, 0x40, b'hss;1;2'))
+        self.assertEqual(diameterCodec.getSubscriberShard(rsr, 16), zlib.crc32(b'hss;1;2') % 16)
+        raa = diameterCodec.encodeDiameterPacket(0x00, 258, 16777238, b'\x00\x00\x00\x01', b'\x00\x00\x00\x01', diameterCodec.encodeAvp(263, 0x40, b'pcrf;1;2'))
+        self.assertEqual(diameterCodec.getSubscriberShard(raa, 16), zlib.crc32(b'pcrf;1;2') % 16)
+        #A Cx User-Name carries the realm, but the request goes to the same shard as the subscriber's S6a requests
+        for userName in [imsi + b'@nickvsnetworking.com', b'sip:' + imsi + b'@nickvsnetworking.com']:
+            mar = diameterCodec.encodeDiameterPacket(0xc0, 303, 16777216, b'\x00\x00\x00\x01', b'\x00\x00\x00\x01',
+                                                     diameterCodec.encodeAvp(263, 0x40, b'scscf;1;2') + diameterCodec.encodeAvp(1, 0x40, userName)
+                                                     + diameterCodec.encodeVendorAvp(601, 0xc0, 10415, b'sip:' + imsi + b'@nickvsnetworking.com'))
+            self.assertEqual(diameterCodec.getSubscriberKey(mar), imsi)
+            self.assertEqual(diameterCodec.getSubscriberShard(mar, 16), diameterCodec.getSubscriberShard(self.__class__.Diameter_AIR, 16))
+
+if __name__ == '__main__':
+    unittest.main()
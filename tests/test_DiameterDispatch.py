@@ -0,0 +1,126 @@
+import unittest
+import itertools
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), '../lib'))
+#Modules under lib read ../config.yaml relative to the working directory when imported
+os.chdir(os.path.join(os.path.dirname(os.path.realpath(__file__)), '../services'))
+import diameter
+import diameterCodec
+
+
+class DiameterDispatch_Tests(unittest.TestCase):
+
+    class LogToolStub:
+        def log(self, service, level, message, redisClient=None):
+            return True
+
+    class MetricAggregatorStub:
+        def sendMetric(self, **kwargs):
+            pass
+
+    class DatabaseStub:
+        def __init__(self, **kwargs):
+            pass
+
+    class SubscriberDatabaseStub:
+        subscriber = {'imsi': '001010000000001', 'msisdn': '12345', 'scscf': 'sip:scscf.ims.example.org', 'serving_mme': None}
+
+        def Get_IMS_Subscriber(self, imsi=None, msisdn=None):
+            if imsi not in (None, self.subscriber['imsi']) or msisdn not in (None, self.subscriber['msisdn']):
+                raise ValueError("Subscriber not found")
+            return dict(self.subscriber)
+
+        def Get_Subscriber(self, imsi=None, msisdn=None):
+            return dict(self.subscriber)
+
+        def Get_Charging_Rules(self, imsi, apn):
+            return None
+
+        def Update_Serving_APN(self, **kwargs):
+            pass
+
+    def getDiameter(self) -> diameter.Diameter:
+        #The database isn't used for dispatching, so the MySQL connection is replaced
+        originalDatabase = diameter.Database
+        diameter.Database = self.DatabaseStub
+        try:
+            return diameter.Diameter(self.LogToolStub(), redisMessaging=object(), metricAggregator=self.MetricAggregatorStub())
+        finally:
+            diameter.Database = originalDatabase
+
+    def getLegacyResponseMethod(self, diameterInstance: diameter.Diameter, packetVars):
+        """
+        Matches a request the way generateDiameterResponse did before the dispatch table, by scanning diameterResponseList.
+        """
+        for diameterApplication in diameterInstance.diameterResponseList:
+            try:
+                assert(packetVars["command_code"] == diameterApplication["commandCode"])
+                assert(packetVars["ApplicationId"] == diameterApplication["applicationId"])
+                if 'flags' in diameterApplication:
+                    assert(str(packetVars["flags"]) == str(diameterApplication["flags"]))
+                return diameterApplication["responseMethod"]
+            except Exception as e:
+                continue
+        return None
+
+    def test_A_Dispatch_Table(self):
+        diameterInstance = self.getDiameter()
+        calledMethods = []
+        for diameterApplication in diameterInstance.diameterResponseList:
+            #Each handler is replaced with one recording the application it was dispatched to
+            diameterApplication["responseMethod"] = lambda packetVars, avps, diameterApplication=diameterApplication: calledMethods.append(diameterApplication["responseMethod"]) or b''
+        self.assertEqual(len(diameterInstance.diameterDispatchTable), 2 * len(diameterInstance.diameterResponseList))
+
+        applicationIds = {diameterApplication["applicationId"] for diameterApplication in diameterInstance.diameterResponseList} | {4}
+        commandCodes = {diameterApplication["commandCode"] for diameterApplication in diameterInstance.diameterResponseList} | {271}
+        #Every known and unknown pair, with and without the proxiable flag, routes to the same handler as the list scan
+        for applicationId, commandCode, flags in itertools.product(applicationIds, commandCodes, (0x80, 0xc0)):
+            originHost = diameterCodec.encodeAvp(264, 0x40, b'mme01')
+            packetVars, avps = diameterInstance.decode_diameter_packet(diameterCodec.encodeDiameterPacket(flags, commandCode, applicationId, b'\x00\x00\x00\x01', b'\x00\x00\x00\x01', originHost))
+            calledMethods.clear()
+            diameterInstance.generateDiameterResponse(packetVars=packetVars, avps=avps)
+            legacyResponseMethod = self.getLegacyResponseMethod(diameterInstance, packetVars)
+            self.assertEqual(calledMethods, [legacyResponseMethod] if legacyResponseMethod else [], (applicationId, commandCode, flags))
+
+        #Answers are never dispatched to a handler
+        packetVars, avps = diameterInstance.decode_diameter_packet(diameterCodec.encodeDiameterPacket(0x40, 316, 16777251, b'\x00\x00\x00\x01', b'\x00\x00\x00\x01', b''))
+        calledMethods.clear()
+        diameterInstance.generateDiameterResponse(packetVars=packetVars, avps=avps)
+        self.assertEqual(calledMethods, [])
+
+    def test_B_Answer_Avps(self):
+        diameterInstance = self.getDiameter()
+        diameterInstance.database = self.SubscriberDatabaseStub()
+        requestAvps = diameterCodec.encodeAvp(263, 0x40, b'peer01;1;2') + diameterCodec.encodeAvp(264, 0x40, b'peer01') + diameterCodec.encodeAvp(296, 0x40, b'example.org')
+
+        def answer(commandCode, applicationId, avps):
+            response = diameterInstance.generateDiameterResponse(diameterCodec.encodeDiameterPacket(0xc0, commandCode, applicationId, b'\x00\x00\x00\x01', b'\x00\x00\x00\x02', requestAvps + avps))
+            self.assertIsInstance(response, bytes)
+            packetVars, avps = diameterCodec.decodeDiameterPacket(response)
+            self.assertEqual((packetVars.commandCode, packetVars.applicationId), (commandCode, applicationId))
+            self.assertEqual(avps.findFirst(263).data, b'peer01;1;2')
+            self.assertEqual(avps.findFirst(264).data, diameterInstance.OriginHostBytes)
+            return avps
+
+        #Gx CCA-T echoes the request type and number
+        ccaAvps = answer(272, 16777238, diameterCodec.encodeAvp(416, 0x40, diameterCodec.encodeUnsigned32(3)) + diameterCodec.encodeAvp(415, 0x40, diameterCodec.encodeUnsigned32(12))
+                         + diameterCodec.encodeAvp(30, 0x40, b'internet') + diameterCodec.encodeAvp(443, 0x40, diameterCodec.encodeAvp(450, 0x40, diameterCodec.encodeUnsigned32(1)) + diameterCodec.encodeAvp(444, 0x40, b'001010000000001')))
+        self.assertEqual([ccaAvps.findFirst(code).data for code in (258, 416, 415, 268)], [diameterCodec.encodeUnsigned32(value) for value in (16777238, 3, 12, 2001)])
+
+        #Cx UAA carries the assigned S-CSCF, or an Experimental-Result for unknown users
+        uaaAvps = answer(300, 16777216, diameterCodec.encodeAvp(1, 0x40, b'001010000000001@ims.example.org'))
+        self.assertEqual(uaaAvps.findFirst(602).data, b'sip:scscf.ims.example.org')
+        self.assertEqual(uaaAvps.findFirst(298).data, diameterCodec.encodeUnsigned32(2002))
+        self.assertEqual(uaaAvps.findFirst(258).data, diameterCodec.encodeUnsigned32(16777216))
+        uaaAvps = answer(300, 16777216, diameterCodec.encodeAvp(1, 0x40, b'001019999999999@ims.example.org'))
+        self.assertEqual(uaaAvps.findFirst(298).data, diameterCodec.encodeUnsigned32(5001))
+
+        #Sh UDA finds the subscriber from the MSISDN nested in User-Identity
+        udaAvps = answer(306, 16777217, diameterCodec.encodeVendorAvp(700, 0xc0, 10415, diameterCodec.encodeVendorAvp(701, 0xc0, 10415, bytes.fromhex('2143f5'))))
+        self.assertEqual(udaAvps.findFirst(268).data, diameterCodec.encodeUnsigned32(2001))
+        self.assertIn(b'<MSISDN>12345</MSISDN>', udaAvps.findFirst(702).data)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,406 @@
+import unittest
+import asyncio
+import json
+import threading
+import socket
+import types
+import time
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), '../lib'))
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), '../services'))
+#Modules under lib read ../config.yaml relative to the working directory when imported
+os.chdir(os.path.join(os.path.dirname(os.path.realpath(__file__)), '../services'))
+import diameterService
+import diameter
+import diameterCodec
+from fairQueue import FairQueue
+
+
+class DiameterService_Tests(unittest.TestCase):
+
+    class LogToolStub:
+        def __init__(self):
+            self.logMessages = []
+
+        async def logAsync(self, service, level, message, redisClient=None):
+            self.logMessages.append((level, message() if callable(message) else message))
+            return True
+
+        def log(self, service, level, message, redisClient=None):
+            self.logMessages.append((level, message() if callable(message) else message))
+            return True
+
+        def isEnabledFor(self, level):
+            return False
+
+    class RedisMessagingAsyncStub:
+        def __init__(self, bulkMessages, writer):
+            self.bulkMessages = bulkMessages
+            self.writer = writer
+
+        async def awaitBulkMessage(self, **kwargs):
+            if self.bulkMessages:
+                return self.bulkMessages.pop(0)
+            self.writer.transport.closing = True
+            return None
+
+    class TransportStub:
+        def __init__(self):
+            self.closing = False
+
+        def is_closing(self):
+            return self.closing
+
+    class WriterStub:
+        def __init__(self):
+            self.transport = DiameterService_Tests.TransportStub()
+            self.writes = []
+            self.drains = 0
+
+        def write(self, data):
+            self.writes.append([data])
+
+        def writelines(self, data):
+            self.writes.append(list(data))
+
+        async def drain(self):
+            self.drains += 1
+
+    class ReaderStub:
+        def __init__(self, chunks):
+            self.chunks = chunks
+            self.eof = False
+
+        async def read(self, size):
+            if self.chunks:
+                return self.chunks.pop(0)
+            self.eof = True
+            return b''
+
+        def at_eof(self):
+            return self.eof
+
+    class PeerStoreStub:
+        """
+        Holds the ActiveDiameterPeerTable hash and ActiveDiameterPeerUpdates channel in memory, with the async interface used by diameterService
+        and the sync interface used by the Diameter library.
+        """
+        def __init__(self):
+            self.peerTable = {}
+            self.subscribers = []
+            self.operations = []
+
+        async def setHashValues(self, key, values, **kwargs):
+            self.operations.append('hset')
+            self.peerTable.update(values)
+
+        async def getHashValue(self, key, field, **kwargs):
+            return self.peerTable.get(field, '')
+
+        async def deleteHashValues(self, key, fields, **kwargs):
+            self.operations.append('hdel')
+            for field in fields:
+                self.peerTable.pop(field, None)
+
+        async def publishMessage(self, channel, message, **kwargs):
+            self.operations.append('publish')
+            for messageHandler in self.subscribers:
+                messageHandler(message)
+
+        def getAllHashValues(self, key, **kwargs):
+            return dict(self.peerTable)
+
+        def subscribeToChannel(self, channel, messageHandler, subscribeHandler=None, **kwargs):
+            self.subscribers.append(messageHandler)
+
+    def getDiameterService(self) -> diameterService.DiameterService:
+        service = diameterService.DiameterService()
+        service.logTool = self.LogToolStub()
+        service.latencyTracing = False
+        service.benchmarking = False
+        return service
+
+    def getAnswer(self, hopByHopId: int) -> bytes:
+        return diameterCodec.encodeDiameterPacket(0x40, 316, 16777251, hopByHopId.to_bytes(4, 'big'), b'\x00\x00\x00\x01', diameterCodec.encodeAvp(268, 0x40, diameterCodec.encodeUnsigned32(2001)))
+
+    def test_A_Batched_Writes(self):
+        service = self.getDiameterService()
+        writer = self.WriterStub()
+        answers = [self.getAnswer(hopByHopId) for hopByHopId in range(3)]
+        #A redis error returns an empty result, which must not drop the peer
+        service.redisWriterMessaging = self.RedisMessagingAsyncStub(['', ('diameter-outbound-10.0.0.1-3868', [diameterCodec.encodeEnvelope(answer) for answer in answers[:2]]),
+                                                                     None, ('diameter-outbound-10.0.0.1-3868', [diameterCodec.encodeEnvelope(answers[2])])], writer)
+        self.assertIsNone(asyncio.run(service.writeOutboundData(writer, '10.0.0.1', 3868, 10, 'test')))
+        #Each batch popped from redis is written with a single writelines and drain
+        self.assertEqual(writer.writes, [answers[:2], answers[2:]])
+        self.assertEqual(writer.drains, 2)
+
+    def test_B_Overload_Avps(self):
+        service = self.getDiameterService()
+        writer = self.WriterStub()
+        answer = self.getAnswer(1)
+        service.overloadControlEnabled = True
+        service.doicPeers = {'10.0.0.1-3868'}
+        service.overloadAvps = diameterCodec.encodeAvp(621, 0x00, diameterCodec.encodeAvp(622, 0x00, b'\x00' * 8))
+        service.redisWriterMessaging = self.RedisMessagingAsyncStub([('diameter-outbound-10.0.0.1-3868', [diameterCodec.encodeEnvelope(answer, receivedTimestamp=time.time())])], writer)
+        asyncio.run(service.writeOutboundData(writer, '10.0.0.1', 3868, 10, 'test'))
+        #Answers to DOIC peers carry the current overload report
+        header, avps = diameterCodec.decodeDiameterPacket(writer.writes[0][0])
+        self.assertEqual([avp.code for avp in avps], [268, 621])
+        self.assertEqual(header.length, len(answer) + len(service.overloadAvps))
+
+    def test_C_Full_Queue(self):
+        service = self.getDiameterService()
+        service.overloadControlEnabled = False
+        service.sharedQueue = FairQueue(maxsize=1)
+        service.sharedQueue.put_nowait({}, 'queued')
+        service.activePeers['10.0.0.1-3868'] = {'peerType': 'mme'}
+        request = diameterCodec.encodeDiameterPacket(0xc0, 318, 16777251, b'\x00\x00\x00\x01', b'\x00\x00\x00\x01', diameterCodec.encodeAvp(263, 0x40, b'mme;1;1'))
+        answer = self.getAnswer(2)
+        reader = self.ReaderStub([request + answer])
+        writer = self.WriterStub()
+
+        async def readWithConsumer():
+            readTask = asyncio.create_task(service.readInboundData(reader, writer, '10.0.0.1', 3868, 10, 'test'))
+            await(asyncio.sleep(0.05))
+            #The answer waits for room in the queue, instead of the connection being closed
+            self.assertFalse(readTask.done())
+            service.sharedQueue.get_nowait()
+            return await(readTask)
+
+        #The connection is only closed once the peer disconnects
+        self.assertFalse(asyncio.run(readWithConsumer()))
+        self.assertNotIn('closing connection', str(service.logTool.logMessages))
+        #The request was shed with DIAMETER_TOO_BUSY, even with overload control disabled
+        header, avps = diameterCodec.decodeDiameterPacket(writer.writes[0][0])
+        self.assertEqual((header.commandCode, header.isRequest), (318, False))
+        self.assertIn(diameterCodec.encodeUnsigned32(3004), [avp.data for avp in avps if avp.code == 268])
+        self.assertEqual(service.shedRequests, 1)
+        self.assertEqual(service.sharedQueue.get_nowait()['diameter-inbound'], answer)
+
+    def test_D_Unbounded_Queue_Overload(self):
+        service = self.getDiameterService()
+        service.sharedQueue = FairQueue(maxsize=0)
+        service.sharedQueue.put_nowait({}, 'queued')
+
+        async def runOverloadControl():
+            with self.assertRaises(asyncio.TimeoutError):
+                await(asyncio.wait_for(service.handleOverloadControl(), timeout=0.1))
+
+        asyncio.run(runOverloadControl())
+        #An unbounded queue contributes no reduction, rather than raising ZeroDivisionError
+        self.assertEqual(service.logTool.logMessages, [])
+        self.assertEqual(service.overloadReductionPercentage, 0)
+        self.assertNotEqual(service.overloadAvps, b'')
+
+    def test_E_Active_Peer_Updates(self):
+        service = self.getDiameterService()
+        peerStore = self.PeerStoreStub()
+        service.redisPeerMessaging = peerStore
+        service.activePeers = {'10.0.0.1-3868': {'ipAddress': '10.0.0.1', 'port': 3868, 'connectionStatus': 'connected', 'diameterHostname': 'mme01', 'peerType': 'mme'}}
+        asyncio.run(service.publishActiveDiameterPeer('10.0.0.1-3868'))
+
+        diameterLibrary = diameter.Diameter.__new__(diameter.Diameter)
+        diameterLibrary.redisMessaging = peerStore
+        diameterLibrary.hostname = 'hss01'
+        diameterLibrary.logTool = self.LogToolStub()
+        diameterLibrary.activePeers = None
+        diameterLibrary.activePeersLock = threading.Lock()
+        self.assertEqual(diameterLibrary.getActivePeers()['10.0.0.1-3868']['diameterHostname'], 'mme01')
+
+        #Each change is written to the hash before it is published, and picked up by the subscriber's local copy
+        cachedPeers = diameterLibrary.getActivePeers()
+        service.activePeers['10.0.0.2-3868'] = {'ipAddress': '10.0.0.2', 'port': 3868, 'connectionStatus': 'connected', 'diameterHostname': 'pgw01', 'peerType': 'pgw'}
+        asyncio.run(service.publishActiveDiameterPeer('10.0.0.2-3868'))
+        self.assertEqual(diameterLibrary.getPeerByHostname('pgw01')['ipAddress'], '10.0.0.2')
+        self.assertNotIn('10.0.0.2-3868', cachedPeers)
+        del service.activePeers['10.0.0.1-3868']
+        asyncio.run(service.publishActiveDiameterPeer('10.0.0.1-3868'))
+        self.assertEqual(list(diameterLibrary.getActivePeers().keys()), ['10.0.0.2-3868'])
+        self.assertEqual(list(peerStore.peerTable.keys()), ['10.0.0.2-3868'])
+        self.assertEqual(peerStore.operations, ['hset', 'publish', 'hset', 'publish', 'hdel', 'publish'])
+        #The subscription was only made once
+        self.assertEqual(len(peerStore.subscribers), 1)
+
+    def test_F_Stale_Requests(self):
+        service = self.getDiameterService()
+        service.activePeers['10.0.0.1-3868'] = {'peerType': 'mme'}
+        request = diameterCodec.encodeDiameterPacket(0xc0, 318, 16777251, b'\x00\x00\x00\x01', b'\x00\x00\x00\x01', diameterCodec.encodeAvp(263, 0x40, b'mme;1;1'))
+        answer = self.getAnswer(2)
+        inboundData = lambda diameterBinary, receivedTimestamp: {'diameter-inbound': diameterBinary, 'clientAddress': '10.0.0.1', 'clientPort': 3868, 'inbound-received-timestamp': receivedTimestamp}
+        #Requests which waited in the memory queue past diameter_request_timeout are discarded and counted, while answers are always forwarded
+        self.assertIsNone(asyncio.run(service.encodeInboundMessage(inboundData(request, time.time() - 60), 'test')))
+        self.assertIsNotNone(asyncio.run(service.encodeInboundMessage(inboundData(answer, time.time() - 60), 'test')))
+        self.assertEqual(diameterCodec.decodeEnvelope(asyncio.run(service.encodeInboundMessage(inboundData(request, time.time()), 'test')))[0], request)
+        self.assertEqual(service.staleRequests, 1)
+
+    def test_G_Shared_Port(self):
+        services = [self.getDiameterService() for workerIndex in range(2)]
+        for workerIndex, service in enumerate(services):
+            service.workerCount = 2
+            service.workerIndex = workerIndex
+            service.overloadControlEnabled = False
+        unusedSocket = socket.socket()
+        unusedSocket.bind(('127.0.0.1', 0))
+        port = unusedSocket.getsockname()[1]
+        unusedSocket.close()
+
+        async def startServers():
+            serverTasks = [asyncio.create_task(service.startServer(host='127.0.0.1', port=port, type='TCP')) for service in services]
+            await(asyncio.sleep(0.2))
+            serverErrors = [serverTask.exception() if serverTask.done() else None for serverTask in serverTasks]
+            for serverTask in serverTasks:
+                serverTask.cancel()
+            await(asyncio.gather(*serverTasks, return_exceptions=True))
+            return serverErrors
+
+        #With more than one worker process, every worker listens on the same port via SO_REUSEPORT
+        self.assertEqual(asyncio.run(startServers()), [None, None])
+        for workerIndex, service in enumerate(services):
+            self.assertIn(f"[Worker {workerIndex}] Serving on ('127.0.0.1', {port})", service.logTool.logMessages[-1][1])
+
+    def test_H_Worker_Restart(self):
+        service = self.getDiameterService()
+        service.workerCount = 2
+        workers = []
+
+        class StopSupervisor(Exception):
+            pass
+
+        def createProcess(target, args, name):
+            workers.append(types.SimpleNamespace(target=target, args=args, name=name, alive=False, exitcode=None, sentinel=None))
+            workers[-1].start = lambda worker=workers[-1]: setattr(worker, 'alive', True)
+            workers[-1].is_alive = lambda worker=workers[-1]: worker.alive
+            return workers[-1]
+
+        def waitForWorkers(sentinels):
+            if len(workers) > 2:
+                raise StopSupervisor()
+            workers[1].alive = False
+            workers[1].exitcode = -9
+
+        clearedWorkers = []
+        service.clearWorkerPeers = clearedWorkers.append
+        originalMultiprocessing = diameterService.multiprocessing
+        diameterService.multiprocessing = types.SimpleNamespace(Process=createProcess, connection=types.SimpleNamespace(wait=waitForWorkers))
+        try:
+            with self.assertRaises(StopSupervisor):
+                service.startWorkers()
+        finally:
+            diameterService.multiprocessing = originalMultiprocessing
+
+        #Only the worker that exited is started again, with the same index so it rejoins the shared port
+        self.assertEqual([(worker.target, worker.args, worker.name) for worker in workers],
+                         [(diameterService.runDiameterService, (0,), 'diameterService-0'), (diameterService.runDiameterService, (1,), 'diameterService-1'),
+                          (diameterService.runDiameterService, (1,), 'diameterService-1')])
+        self.assertEqual(service.logTool.logMessages, [('warning', "[Diameter] [startWorkers] Worker 1 exited with code -9, restarting.")])
+        #The peers of the exited worker are removed before it is restarted
+        self.assertEqual(clearedWorkers, [1])
+
+    def test_I_Adaptive_Batching(self):
+        service = self.getDiameterService()
+        service.sharedQueue = FairQueue(maxsize=100)
+        service.inboundBatchMaxLatency = 0.5
+        service.inboundBatchMaxSize = 20
+        service.activePeers['10.0.0.1-3868'] = {'peerType': 'mme'}
+        sentBatches = []
+
+        class RedisMessagingAsyncStub:
+            async def sendShardedBulkMessage(self, queueMessages, **kwargs):
+                sentBatches.append((time.time(), sum(len(queueMessage) for queueMessage in queueMessages.values())))
+
+        service.redisReaderMessaging = RedisMessagingAsyncStub()
+
+        def putRequest(requestIndex: int):
+            request = diameterCodec.encodeDiameterPacket(0xc0, 318, 16777251, requestIndex.to_bytes(4, 'big'), b'\x00\x00\x00\x01', diameterCodec.encodeAvp(263, 0x40, f'mme;1;{requestIndex}'.encode()))
+            service.sharedQueue.put_nowait({'diameter-inbound': request, 'clientAddress': '10.0.0.1', 'clientPort': 3868, 'inbound-received-timestamp': time.time()}, '10.0.0.1-3868')
+
+        async def runWorker():
+            workerTask = asyncio.create_task(service.inboundDataWorker('test'))
+            putRequest(0)
+            putTime = time.time()
+            await(asyncio.sleep(0.1))
+            #At low load a message is sent on its own, without waiting for a batch to fill
+            self.assertEqual(len(sentBatches), 1)
+            self.assertLess(sentBatches[0][0] - putTime, service.inboundBatchMaxLatency)
+            for requestIndex in range(1, 51):
+                putRequest(requestIndex)
+            while sum(batchSize for batchTime, batchSize in sentBatches) < 51:
+                await(asyncio.sleep(0.05))
+            workerTask.cancel()
+
+        asyncio.run(asyncio.wait_for(runWorker(), timeout=5))
+        #A backlog grows the batches, up to diameter_inbound_batch_max_size
+        batchSizes = [batchSize for batchTime, batchSize in sentBatches]
+        self.assertLessEqual(max(batchSizes), service.inboundBatchMaxSize)
+        self.assertLessEqual(len(batchSizes), 6)
+
+    def test_J_Clear_Worker_Peers(self):
+        service = self.getDiameterService()
+        peerStore = self.PeerStoreStub()
+        getPeer = lambda ipAddress, workerIndex, diameterHostname: json.dumps({'ipAddress': ipAddress, 'port': 3868, 'connectionStatus': 'connected', 'diameterHostname': diameterHostname, 'peerType': 'mme', 'diameterServiceWorker': workerIndex})
+        diameterLibrary = diameter.Diameter.__new__(diameter.Diameter)
+        diameterLibrary.redisMessaging = peerStore
+        diameterLibrary.hostname = 'hss01'
+        diameterLibrary.logTool = self.LogToolStub()
+        diameterLibrary.activePeers = None
+        diameterLibrary.activePeersLock = threading.Lock()
+
+        async def getAllHashValues(**kwargs):
+            return peerStore.getAllHashValues(**kwargs)
+
+        #Entries left by a crashed worker are removed before it is restarted, leaving other workers' peers alone
+        peerStore.peerTable = {'10.0.0.1-3868': getPeer('10.0.0.1', 0, 'mme01'), '10.0.0.2-3868': getPeer('10.0.0.2', 1, 'mme01')}
+        self.assertEqual(diameterLibrary.getPeerByHostname('mme01')['ipAddress'], '10.0.0.1')
+        service.workerCount = 2
+        service.redisMessaging = types.SimpleNamespace(getAllHashValues=peerStore.getAllHashValues,
+                                                       deleteHashValues=lambda **kwargs: asyncio.run(peerStore.deleteHashValues(**kwargs)),
+                                                       publishMessage=lambda **kwargs: asyncio.run(peerStore.publishMessage(**kwargs)))
+        service.clearWorkerPeers(0)
+        self.assertEqual(list(peerStore.peerTable.keys()), ['10.0.0.2-3868'])
+        self.assertEqual(diameterLibrary.getPeerByHostname('mme01')['ipAddress'], '10.0.0.2')
+
+        #A single process owns every entry, so all of them are removed when it starts
+        peerStore.peerTable['10.0.0.3-3868'] = getPeer('10.0.0.3', 0, 'mme02')
+        asyncio.run(peerStore.publishMessage(channel='ActiveDiameterPeerUpdates', message=json.dumps({'peerKey': '10.0.0.3-3868', 'peer': json.loads(peerStore.peerTable['10.0.0.3-3868'])})))
+        service.workerCount = 1
+        service.redisPeerMessaging = types.SimpleNamespace(getAllHashValues=getAllHashValues, deleteHashValues=peerStore.deleteHashValues, publishMessage=peerStore.publishMessage)
+        asyncio.run(service.clearWorkerPeersAsync(0))
+        self.assertEqual(peerStore.peerTable, {})
+        self.assertEqual(diameterLibrary.getActivePeers(), {})
+        self.assertIsNone(diameterLibrary.getPeerByHostname('mme01'))
+
+    def test_K_Base_Answers(self):
+        service = self.getDiameterService()
+        service.redisPeerMessaging = self.PeerStoreStub()
+        service.sharedQueue = FairQueue(maxsize=10)
+        #The Diameter library used by hssService, with the same config, generates the reference answers
+        hssConfig = service.config.get('hss', {})
+        mnc, mcc = hssConfig.get('MNC', '999'), hssConfig.get('MCC', '999')
+        originalDatabase = diameter.Database
+        diameter.Database = lambda **kwargs: None
+        try:
+            diameterLibrary = diameter.Diameter(self.LogToolStub(), originHost=hssConfig.get('OriginHost', 'hss01'), originRealm=hssConfig.get('OriginRealm', f'mnc{mnc}.mcc{mcc}.3gppnetwork.org'),
+                                                productName=hssConfig.get('ProductName', 'PyHSS'), mcc=mcc, mnc=mnc, redisMessaging=self.PeerStoreStub(), metricAggregator=types.SimpleNamespace(sendMetric=lambda **kwargs: None))
+        finally:
+            diameter.Database = originalDatabase
+
+        originAvps = diameterCodec.encodeAvp(264, 0x40, b'mme01.epc.mnc001.mcc001.3gppnetwork.org') + diameterCodec.encodeAvp(296, 0x40, b'epc.mnc001.mcc001.3gppnetwork.org')
+        cer = diameterCodec.encodeDiameterPacket(0x80, 257, 0, b'\x00\x00\x00\x01', b'\x00\x00\x00\x01', originAvps + diameterCodec.encodeAvp(257, 0x40, diameterCodec.encodeAddress('10.0.0.1'))
+                                                 + diameterCodec.encodeAvp(266, 0x40, diameterCodec.encodeUnsigned32(10415)) + diameterCodec.encodeAvp(269, 0x00, b'mme')
+                                                 + diameterCodec.encodeAvp(278, 0x40, diameterCodec.encodeUnsigned32(5)) + diameterCodec.encodeAvp(258, 0x40, diameterCodec.encodeUnsigned32(16777251)))
+        dwr = diameterCodec.encodeDiameterPacket(0x80, 280, 0, b'\x00\x00\x00\x02', b'\x00\x00\x00\x02', originAvps + diameterCodec.encodeAvp(278, 0x40, diameterCodec.encodeUnsigned32(5)))
+        dpr = diameterCodec.encodeDiameterPacket(0x80, 282, 0, b'\x00\x00\x00\x03', b'\x00\x00\x00\x03', originAvps + diameterCodec.encodeAvp(273, 0x40, diameterCodec.encodeUnsigned32(0)))
+        reader = self.ReaderStub([cer + dwr, dpr])
+        writer = self.WriterStub()
+        asyncio.run(service.readInboundData(reader, writer, '10.0.0.1', 3868, 10, 'test'))
+
+        #CER, DWR and DPR are answered locally, byte for byte as hssService would answer them, and never queued for hssService
+        self.assertEqual([data for write in writer.writes for data in write], [diameterLibrary.generateDiameterResponse(request) for request in (cer, dwr, dpr)])
+        self.assertEqual([diameterCodec.decodeDiameterPacket(write[0])[0].commandCode for write in writer.writes], [257, 280, 282])
+        self.assertEqual(service.sharedQueue.qsize(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
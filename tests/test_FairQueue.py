@@ -0,0 +1,75 @@
+import unittest
+import asyncio
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), '../lib'))
+from fairQueue import FairQueue
+
+
+class FairQueue_Tests(unittest.TestCase):
+
+    def test_A_Round_Robin(self):
+        fairQueue = FairQueue()
+        for i in range(5):
+            fairQueue.put_nowait(('mme', i), 'mme')
+        fairQueue.put_nowait(('pcscf', 0), 'pcscf')
+        fairQueue.put_nowait(('pcscf', 1), 'pcscf')
+        #A backlogged flow can't hold back a flow queued after it
+        self.assertEqual([fairQueue.get_nowait() for i in range(7)], [('mme', 0), ('pcscf', 0), ('mme', 1), ('pcscf', 1), ('mme', 2), ('mme', 3), ('mme', 4)])
+        self.assertTrue(fairQueue.empty())
+        with self.assertRaises(asyncio.QueueEmpty):
+            fairQueue.get_nowait()
+
+    def test_B_Weights(self):
+        fairQueue = FairQueue()
+        for i in range(100):
+            fairQueue.put_nowait('mme', 'mme', weight=1)
+            fairQueue.put_nowait('pcscf', 'pcscf', weight=4)
+            fairQueue.put_nowait('ocs', 'ocs', weight=0.5)
+        served = [fairQueue.get_nowait() for i in range(55)]
+        self.assertEqual((served.count('pcscf'), served.count('mme'), served.count('ocs')), (40, 10, 5))
+        self.assertEqual(fairQueue.flowSizes(), {'mme': 90, 'pcscf': 60, 'ocs': 95})
+
+    def test_C_Maxsize(self):
+        fairQueue = FairQueue(maxsize=2)
+        fairQueue.put_nowait(1, 'a')
+        fairQueue.put_nowait(2, 'b')
+        self.assertTrue(fairQueue.full())
+        with self.assertRaises(asyncio.QueueFull):
+            fairQueue.put_nowait(3, 'c')
+        self.assertEqual(fairQueue.flowSize('a'), 1)
+        self.assertEqual(fairQueue.flowSize('c'), 0)
+
+    def test_D_Async_Get(self):
+        async def consume():
+            fairQueue = FairQueue()
+            getTask = asyncio.create_task(fairQueue.get())
+            with self.assertRaises(asyncio.TimeoutError):
+                await(asyncio.wait_for(fairQueue.get(), timeout=0.01))
+            fairQueue.put_nowait('dwr', 'peer')
+            return await(getTask), fairQueue.qsize()
+        self.assertEqual(asyncio.run(consume()), ('dwr', 0))
+
+    def test_E_Async_Put(self):
+        async def produce():
+            fairQueue = FairQueue(maxsize=1)
+            fairQueue.put_nowait('ccr', 'pgw')
+            #A full queue holds the put back until an item is taken, rather than raising
+            putTask = asyncio.create_task(fairQueue.put('cca', 'pgw'))
+            with self.assertRaises(asyncio.TimeoutError):
+                await(asyncio.wait_for(asyncio.shield(putTask), timeout=0.01))
+            self.assertEqual(fairQueue.get_nowait(), 'ccr')
+            await(putTask)
+            return fairQueue.get_nowait(), fairQueue.qsize()
+        self.assertEqual(asyncio.run(produce()), ('cca', 0))
+        #An unbounded queue never waits
+        async def produceUnbounded():
+            fairQueue = FairQueue()
+            for i in range(100):
+                await(fairQueue.put(i, 'mme'))
+            return fairQueue.qsize()
+        self.assertEqual(asyncio.run(produceUnbounded()), 100)
+
+
+if __name__ == '__main__':
+    unittest.main()
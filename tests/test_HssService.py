@@ -0,0 +1,252 @@
+import unittest
+import asyncio
+import threading
+import signal
+import types
+import time
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), '../lib'))
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), '../services'))
+#Modules under lib read ../config.yaml relative to the working directory when imported
+os.chdir(os.path.join(os.path.dirname(os.path.realpath(__file__)), '../services'))
+import hssService
+import diameterCodec
+
+
+class HssService_Tests(unittest.TestCase):
+
+    class LogToolStub:
+        def __init__(self):
+            self.logMessages = []
+
+        def log(self, service, level, message, redisClient=None):
+            self.logMessages.append((level, message() if callable(message) else message))
+            return True
+
+        def isEnabledFor(self, level):
+            return False
+
+    class MetricAggregatorStub:
+        def __init__(self):
+            self.metrics = []
+
+        def sendMetric(self, **kwargs):
+            self.metrics.append(kwargs)
+
+    class RedisMessagingAsyncStub:
+        def __init__(self, inboundBatches, hssService, **kwargs):
+            self.inboundBatches = inboundBatches
+            self.hssService = hssService
+            self.sentMessages = []
+
+        async def awaitBulkMessage(self, **kwargs):
+            if self.inboundBatches:
+                return ('diameter-inbound-0', self.inboundBatches.pop(0))
+            self.hssService.running = False
+            return None
+
+        async def sendShardedBulkMessage(self, queueMessages, **kwargs):
+            self.sentMessages.append(queueMessages)
+
+    class RedisMessagingStub:
+        def __init__(self, inboundBatches, hssService):
+            self.inboundBatches = inboundBatches
+            self.hssService = hssService
+            self.sentMessages = []
+
+        def awaitBulkMessage(self, **kwargs):
+            if self.inboundBatches:
+                return ('diameter-inbound-0', self.inboundBatches.pop(0))
+            self.hssService.running = False
+            return None
+
+        def sendShardedBulkMessage(self, queueMessages, **kwargs):
+            self.sentMessages.append(queueMessages)
+
+    class ProcessStub:
+        def __init__(self, target, args, name):
+            self.target = target
+            self.args = args
+            self.name = name
+            self.alive = False
+            self.exitcode = None
+            self.sentinel = None
+            self.events = []
+
+        def start(self):
+            self.alive = True
+            self.events.append('start')
+
+        def is_alive(self):
+            return self.alive
+
+        def terminate(self):
+            self.alive = False
+            self.events.append('terminate')
+
+        def kill(self):
+            self.alive = False
+            self.events.append('kill')
+
+        def join(self, timeout=None):
+            self.events.append('join')
+
+    def getHssService(self) -> hssService.HssService:
+        service = hssService.HssService.__new__(hssService.HssService)
+        service.running = True
+        service.heartbeat = None
+        service.asyncConcurrency = 4
+        service.diameterRequestTimeout = 10
+        service.redisHost, service.redisPort, service.redisUseUnixSocket, service.redisUnixSocketPath = 'localhost', 6379, False, ''
+        service.redisMessaging = None
+        service.hostname = 'hss01'
+        service.inboundQueueName = 'diameter-inbound-0'
+        service.logTool = self.LogToolStub()
+        service.metricAggregator = self.MetricAggregatorStub()
+        return service
+
+    def getCreditControlRequest(self, sessionId: bytes, requestType: int, imsi: bytes=None) -> bytes:
+        requestAvps = diameterCodec.encodeAvp(263, 0x40, sessionId) + diameterCodec.encodeAvp(416, 0x40, diameterCodec.encodeUnsigned32(requestType))
+        if imsi is not None:
+            #Usually only carried by the CCR-I
+            requestAvps += diameterCodec.encodeAvp(443, 0x40, diameterCodec.encodeAvp(450, 0x40, diameterCodec.encodeUnsigned32(1)) + diameterCodec.encodeAvp(444, 0x40, imsi))
+        return diameterCodec.encodeDiameterPacket(0x80, 272, 16777238, requestType.to_bytes(4, 'big'), b'\x00\x00\x00\x01', requestAvps)
+
+    def test_A_Async_Subscriber_Order(self):
+        service = self.getHssService()
+        ccrInitial = self.getCreditControlRequest(b'pgw;1;1', 1, imsi=b'001010000000001')
+        ccrTermination = self.getCreditControlRequest(b'pgw;1;1', 3)
+        ccrOther = self.getCreditControlRequest(b'pgw;1;2', 1)
+        processDelays = {ccrInitial: 0.2, ccrTermination: 0, ccrOther: 0}
+        processEvents = []
+
+        def processInboundMessage(inboundBinary, inboundHost, inboundPort, inboundTimestamp, outboundMessages, queuedTimestamp, dequeuedTimestamp):
+            processEvents.append(('start', inboundBinary))
+            time.sleep(processDelays[inboundBinary])
+            processEvents.append(('finish', inboundBinary))
+            outboundMessages.setdefault(f'diameter-outbound-{inboundHost}-{inboundPort}', []).append(inboundBinary)
+            return True
+
+        service.processInboundMessage = processInboundMessage
+        inboundBatches = [[diameterCodec.encodeEnvelope(diameterBinary, '10.0.0.1', 3868, time.time()) for diameterBinary in (ccrInitial, ccrTermination, ccrOther)]]
+        redisMessagingAsync = self.RedisMessagingAsyncStub(inboundBatches, service)
+        originalRedisMessagingAsync = hssService.RedisMessagingAsync
+        hssService.RedisMessagingAsync = lambda **kwargs: redisMessagingAsync
+        try:
+            asyncio.run(service.handleQueueAsync())
+        finally:
+            hssService.RedisMessagingAsync = originalRedisMessagingAsync
+
+        #The CCR-T waits for the CCR-I of its session, while another session isn't held back
+        self.assertLess(processEvents.index(('finish', ccrInitial)), processEvents.index(('start', ccrTermination)))
+        self.assertLess(processEvents.index(('finish', ccrOther)), processEvents.index(('finish', ccrInitial)))
+        sentAnswers = [answer for queueMessages in redisMessagingAsync.sentMessages for answer in queueMessages['diameter-outbound-10.0.0.1-3868']]
+        self.assertEqual(sentAnswers, [ccrOther, ccrInitial, ccrTermination])
+        #asyncio.run shuts down the thread pool once the queue handler returns
+        self.assertEqual([thread.name for thread in threading.enumerate() if thread.name.startswith('hssService')], [])
+
+    def test_B_Stale_Requests(self):
+        service = self.getHssService()
+        freshRequest = self.getCreditControlRequest(b'pgw;1;1', 1)
+        staleRequest = self.getCreditControlRequest(b'pgw;1;2', 1)
+        staleAnswer = diameterCodec.encodeDiameterPacket(0x00, 258, 16777238, b'\x00\x00\x00\x01', b'\x00\x00\x00\x01', diameterCodec.encodeAvp(263, 0x40, b'pgw;1;3'))
+        processedMessages = []
+        service.processInboundMessage = lambda inboundBinary, *args, **kwargs: processedMessages.append(inboundBinary)
+        service.redisMessaging = self.RedisMessagingStub([[diameterCodec.encodeEnvelope(freshRequest, '10.0.0.1', 3868, time.time()),
+                                                           diameterCodec.encodeEnvelope(staleRequest, '10.0.0.1', 3868, time.time() - 60),
+                                                           diameterCodec.encodeEnvelope(staleAnswer, '10.0.0.1', 3868, time.time() - 60)]], service)
+        service.handleQueue()
+        #Requests older than diameter_request_timeout are skipped and counted, while answers are always processed
+        self.assertEqual(processedMessages, [freshRequest, staleAnswer])
+        self.assertEqual([(metric['metricName'], metric['metricValue']) for metric in service.metricAggregator.metrics], [('prom_diam_stale_request_count', 1.0)])
+
+    def test_C_Send_On_Exception(self):
+        service = self.getHssService()
+        firstRequest = self.getCreditControlRequest(b'pgw;1;1', 1)
+        failingRequest = self.getCreditControlRequest(b'pgw;1;2', 1)
+
+        def processInboundMessage(inboundBinary, inboundHost, inboundPort, inboundTimestamp, outboundMessages, queuedTimestamp, dequeuedTimestamp):
+            if inboundBinary == failingRequest:
+                raise ValueError('Database unavailable')
+            outboundMessages.setdefault(f'diameter-outbound-{inboundHost}-{inboundPort}', []).append(inboundBinary)
+            return True
+
+        service.processInboundMessage = processInboundMessage
+        service.redisMessaging = self.RedisMessagingStub([[diameterCodec.encodeEnvelope(diameterBinary, '10.0.0.1', 3868, time.time()) for diameterBinary in (firstRequest, failingRequest)]], service)
+        service.handleQueue()
+        #The answer generated before the exception is still sent, and the exception is logged rather than stopping the worker
+        self.assertEqual(service.redisMessaging.sentMessages, [{'diameter-outbound-10.0.0.1-3868': [firstRequest]}])
+        self.assertIn('Database unavailable', str([message for level, message in service.logTool.logMessages if level == 'error']))
+
+    def test_D_Worker_Restart(self):
+        service = self.getHssService()
+        service.workerCount = 2
+        service.workerHealthTimeout = 30
+        service.workerShutdownTimeout = 1
+        service.diameterLibrary = types.SimpleNamespace(database=types.SimpleNamespace(engine=types.SimpleNamespace(dispose=lambda: None)))
+        workers = []
+
+        def createProcess(target, args, name):
+            workers.append(self.ProcessStub(target, args, name))
+            return workers[-1]
+
+        def waitForWorkers(sentinels, timeout=None):
+            if len(workers) == 2:
+                #Worker 0 exits, and worker 1 stops updating its heartbeat
+                workers[0].alive = False
+                workers[0].exitcode = 1
+                workers[1].args[1].value = time.time() - 60
+            else:
+                service.running = False
+
+        originalMultiprocessing = hssService.multiprocessing
+        originalSignalHandlers = {signalNumber: signal.getsignal(signalNumber) for signalNumber in (signal.SIGTERM, signal.SIGINT)}
+        hssService.multiprocessing = types.SimpleNamespace(Process=createProcess, Value=originalMultiprocessing.Value, connection=types.SimpleNamespace(wait=waitForWorkers))
+        try:
+            service.startWorkers()
+        finally:
+            hssService.multiprocessing = originalMultiprocessing
+            for signalNumber, signalHandler in originalSignalHandlers.items():
+                signal.signal(signalNumber, signalHandler)
+
+        #Both the exited worker and the unresponsive one are replaced, and every worker is stopped on shutdown
+        self.assertEqual({worker.target for worker in workers}, {hssService.runHssService})
+        self.assertEqual([(worker.name, worker.args[0]) for worker in workers], [('hssService-0', 0), ('hssService-1', 1), ('hssService-0', 0), ('hssService-1', 1)])
+        self.assertEqual(workers[0].events, ['start'])
+        self.assertEqual(workers[1].events, ['start', 'kill', 'join'])
+        self.assertEqual([worker.events for worker in workers[2:]], [['start', 'terminate', 'join']] * 2)
+        #Each worker gets a fresh heartbeat, so a restarted worker isn't judged on its predecessor's
+        self.assertEqual([worker.args[1].value for worker in workers[2:]], [0.0, 0.0])
+        self.assertEqual([level for level, message in service.logTool.logMessages], ['warning', 'error', 'info'])
+
+    def test_E_Async_Send_On_Exception(self):
+        service = self.getHssService()
+        firstRequest = self.getCreditControlRequest(b'pgw;1;1', 1)
+        failingRequest = self.getCreditControlRequest(b'pgw;1;2', 1)
+
+        def processInboundMessage(inboundBinary, inboundHost, inboundPort, inboundTimestamp, outboundMessages, queuedTimestamp, dequeuedTimestamp):
+            if inboundBinary == failingRequest:
+                raise ValueError('Database unavailable')
+            outboundMessages.setdefault(f'diameter-outbound-{inboundHost}-{inboundPort}', []).append(inboundBinary)
+            return True
+
+        service.processInboundMessage = processInboundMessage
+        redisMessagingAsync = self.RedisMessagingAsyncStub([[diameterCodec.encodeEnvelope(diameterBinary, '10.0.0.1', 3868, time.time()) for diameterBinary in (firstRequest, failingRequest)]], service)
+        originalRedisMessagingAsync = hssService.RedisMessagingAsync
+        hssService.RedisMessagingAsync = lambda **kwargs: redisMessagingAsync
+        try:
+            asyncio.run(service.handleQueueAsync())
+        finally:
+            hssService.RedisMessagingAsync = originalRedisMessagingAsync
+
+        #The other answer is still sent, and the exception is logged with its traceback rather than silently dropped
+        self.assertEqual(redisMessagingAsync.sentMessages, [{'diameter-outbound-10.0.0.1-3868': [firstRequest]}])
+        errorMessages = [message for level, message in service.logTool.logMessages if level == 'error']
+        self.assertEqual(len(errorMessages), 1)
+        self.assertIn('Traceback', errorMessages[0])
+        self.assertIn('ValueError: Database unavailable', errorMessages[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+import threading
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), '../lib'))
+import latencyTrace
+
+
+class LatencyTrace_Tests(unittest.TestCase):
+
+    def test_A_Stage_Times(self):
+        latencyTrace.startTrace()
+        latencyTrace.addStageTime('database', 0.25)
+        latencyTrace.addStageTime('database', 0.5)
+        with latencyTrace.traceStage('crypto'):
+            pass
+        stages = latencyTrace.stopTrace()
+        self.assertEqual(stages['database'], 0.75)
+        self.assertGreaterEqual(stages['crypto'], 0)
+        #Stage times recorded outside a trace are ignored
+        latencyTrace.addStageTime('database', 1)
+        self.assertEqual(latencyTrace.stopTrace(), {})
+
+    def test_B_Threads(self):
+        @latencyTrace.traceStage('crypto')
+        def generateVector():
+            latencyTrace.addStageTime('database', 1)
+
+        threadStages = {}
+        def runTrace(threadIndex):
+            latencyTrace.startTrace()
+            for i in range(threadIndex + 1):
+                generateVector()
+            threadStages[threadIndex] = latencyTrace.stopTrace()
+
+        threads = [threading.Thread(target=runTrace, args=(threadIndex,)) for threadIndex in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        #Each thread only sees the stage times recorded on it
+        self.assertEqual({threadIndex: stages['database'] for threadIndex, stages in threadStages.items()}, {0: 1, 1: 2, 2: 3, 3: 4})
+        self.assertTrue(all('crypto' in stages for stages in threadStages.values()))
+
+    def test_C_Latency_Metric(self):
+        #S6a Authentication Information Request header
+        diameterHeader = bytes.fromhex('010000c0c000013e01000023000000010000000a')
+        metric = latencyTrace.latencyMetric(diameterHeader, 'handler', 0.0125)
+        self.assertEqual(metric['metricLabels'], {'interface': 'S6a', 'command_code': '318', 'stage': 'handler'})
+        self.assertEqual((metric['metricType'], metric['metricAction'], metric['metricValue']), ('histogram', 'observe', 0.0125))
+        self.assertEqual(metric['metricBuckets'], latencyTrace.LATENCY_BUCKETS)
+        #Unknown interfaces are labelled by Application-Id, and clock skew between services can't produce a negative latency
+        metric = latencyTrace.latencyMetric(diameterHeader[:8] + (1234).to_bytes(4, 'big'), 'total', -0.001)
+        self.assertEqual((metric['metricLabels']['interface'], metric['metricValue']), ('1234', 0.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
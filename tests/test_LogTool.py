@@ -0,0 +1,93 @@
+import unittest
+import os
+import sys
+import json
+import threading
+import time
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), '../lib'))
+from logtool import LogTool
+
+
+class LogTool_Tests(unittest.TestCase):
+
+    class RedisMessagingStub:
+        def __init__(self):
+            self.logMessages = []
+            self.metrics = []
+            self.sendAllowed = threading.Event()
+            self.sendAllowed.set()
+
+        def sendLogMessages(self, logMessages, **kwargs):
+            self.sendAllowed.wait()
+            self.logMessages.extend(json.loads(logMessage) for logMessage in logMessages)
+
+        def sendMetric(self, **kwargs):
+            self.metrics.append(kwargs)
+
+    def test_A_Is_Enabled_For(self):
+        logTool = LogTool(config={'logging': {'level': 'INFO'}})
+        self.assertTrue(logTool.isEnabledFor('error'))
+        self.assertTrue(logTool.isEnabledFor('INFO'))
+        self.assertFalse(logTool.isEnabledFor('debug'))
+        self.assertTrue(LogTool(config={'logging': {'level': 'DEBUG'}}).isEnabledFor('debug'))
+
+    def test_B_Lazy_Message(self):
+        logTool = LogTool(config={'logging': {'level': 'INFO'}})
+        def buildMessage():
+            raise AssertionError('Message built for a disabled level')
+        #Disabled messages are dropped before the message is built, or redis is used
+        self.assertFalse(logTool.log(service='HSS', level='debug', message=buildMessage))
+        self.assertFalse(logTool.log(service='HSS', level='debug', message=lambda: f"{buildMessage()}"))
+
+    def test_C_Buffered_Shipping(self):
+        logTool = LogTool(config={'logging': {'level': 'INFO', 'log_to_console': False, 'log_batch_size': 2}})
+        logTool.redisMessaging = self.RedisMessagingStub()
+        for i in range(5):
+            self.assertTrue(logTool.log(service='HSS', level='info', message=f"Message {i}"))
+        logTool.flushLogMessages()
+        self.assertEqual([logMessage['message'] for logMessage in logTool.redisMessaging.logMessages], [f"Message {i}" for i in range(5)])
+        self.assertEqual(logTool.redisMessaging.logMessages[0]['service'], 'hss')
+
+    def test_D_Buffer_Overflow(self):
+        logTool = LogTool(config={'logging': {'level': 'INFO', 'log_to_console': False, 'log_buffer_size': 2}})
+        logTool.redisMessaging = self.RedisMessagingStub()
+        logTool.redisMessaging.sendAllowed.clear()
+        #Hold the shipper on its first batch, so later messages fill the buffer
+        logTool.log(service='HSS', level='info', message='Shipping')
+        while logTool.logBuffer:
+            pass
+        results = [logTool.log(service='HSS', level='info', message=f"Message {i}") for i in range(3)]
+        self.assertEqual(results, [True, True, False])
+        self.assertEqual(logTool.droppedLogMessages, 1)
+        logTool.redisMessaging.sendAllowed.set()
+        logTool.flushLogMessages()
+        #The shipper thread may still be sending its batch
+        deadline = time.time() + 5
+        while (len(logTool.redisMessaging.logMessages) < 3 or not logTool.redisMessaging.metrics) and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertCountEqual([logMessage['message'] for logMessage in logTool.redisMessaging.logMessages], ['Shipping', 'Message 0', 'Message 1'])
+        self.assertEqual([(metric['metricName'], metric['metricValue']) for metric in logTool.redisMessaging.metrics], [('prom_log_dropped_count', 1.0)])
+
+    def test_E_Concurrent_Drops(self):
+        logTool = LogTool(config={'logging': {'level': 'INFO', 'log_to_console': False, 'log_buffer_size': 1}})
+        logTool.redisMessaging = self.RedisMessagingStub()
+        logTool.redisMessaging.sendAllowed.clear()
+        logTool.log(service='HSS', level='info', message='Shipping')
+        while logTool.logBuffer:
+            pass
+        logTool.log(service='HSS', level='info', message='Buffered')
+        def logMessages():
+            for i in range(1000):
+                logTool.log(service='HSS', level='info', message=f"Message {i}")
+        threads = [threading.Thread(target=logMessages) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        #Every message dropped by every thread is counted
+        self.assertEqual(logTool.droppedLogMessages, 4000)
+        logTool.redisMessaging.sendAllowed.set()
+
+
+if __name__ == '__main__':
+    unittest.main()
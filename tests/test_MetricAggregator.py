@@ -0,0 +1,76 @@
+import unittest
+import os
+import sys
+import threading
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), '../lib'))
+from metricAggregator import MetricAggregator
+
+
+class MetricAggregator_Tests(unittest.TestCase):
+
+    class RedisMessagingStub:
+        def __init__(self):
+            self.metricMessages = []
+
+        def sendMetrics(self, metricList, **kwargs):
+            self.metricMessages.append((metricList, kwargs))
+
+    def getAggregator(self):
+        #A long flush interval keeps the flusher thread from flushing during the test
+        redisMessaging = self.RedisMessagingStub()
+        return MetricAggregator(redisMessaging=redisMessaging, hostname='hss01', flushInterval=3600), redisMessaging
+
+    def test_A_Counters(self):
+        metricAggregator, redisMessaging = self.getAggregator()
+        def sendRequests():
+            for i in range(1000):
+                metricAggregator.sendMetric(serviceName='diameter', metricName='prom_diam_request_count_host', metricType='counter', metricAction='inc',
+                                            metricValue=1.0, metricLabels={'diameter_application_id': 16777251, 'diameter_cmd_code': 316},
+                                            metricExpiry=60, usePrefix=True, prefixHostname='hss01', prefixServiceName='metric')
+        threads = [threading.Thread(target=sendRequests) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        metricAggregator.sendMetric(serviceName='diameter', metricName='prom_diam_request_count_host', metricType='counter', metricAction='inc',
+                                    metricValue=1.0, metricLabels={'diameter_application_id': 16777251, 'diameter_cmd_code': 318})
+        metricAggregator.flushMetrics()
+        #Every increment of a label set is sent as a single change, in a single message
+        self.assertEqual(len(redisMessaging.metricMessages), 1)
+        metricList, kwargs = redisMessaging.metricMessages[0]
+        self.assertEqual({metric['metricLabels']['diameter_cmd_code']: metric['metricValue'] for metric in metricList}, {316: 4000.0, 318: 1.0})
+        self.assertEqual((kwargs['prefixHostname'], kwargs['prefixServiceName']), ('hss01', 'metric'))
+        #Nothing is sent when nothing changed
+        metricAggregator.flushMetrics()
+        self.assertEqual(len(redisMessaging.metricMessages), 1)
+
+    def test_B_Gauges(self):
+        metricAggregator, redisMessaging = self.getAggregator()
+        for metricAction, metricValue in [('inc', 5), ('dec', 2), ('dec', 4)]:
+            metricAggregator.sendMetric(serviceName='diameter', metricName='prom_diam_pending', metricType='gauge', metricAction=metricAction, metricValue=metricValue)
+        for metricValue in [3, 7]:
+            metricAggregator.sendMetric(serviceName='diameter', metricName='prom_diam_depth', metricType='gauge', metricAction='set', metricValue=metricValue)
+        self.assertEqual(metricAggregator.sendMetric(serviceName='diameter', metricName='prom_diam_depth', metricType='gauge', metricAction='set', metricValue='7'),
+                         'Invalid Argument: metricValue must be a digit')
+        metricAggregator.flushMetrics()
+        metricList = {metric['metricName']: metric for metric in redisMessaging.metricMessages[0][0]}
+        #Increments and decrements combine, and the last value set is kept
+        self.assertEqual((metricList['prom_diam_pending']['metricAction'], metricList['prom_diam_pending']['metricValue']), ('dec', 1.0))
+        self.assertEqual((metricList['prom_diam_depth']['metricAction'], metricList['prom_diam_depth']['metricValue']), ('set', 7.0))
+
+    def test_C_Histograms(self):
+        metricAggregator, redisMessaging = self.getAggregator()
+        for metricValue in [0.0005, 0.001, 0.003, 0.02, 5]:
+            metricAggregator.sendMetric(serviceName='diameter', metricName='prom_diam_request_latency_seconds', metricType='histogram', metricAction='observe',
+                                        metricValue=metricValue, metricLabels={'stage': 'total'}, metricBuckets=[0.001, 0.01, 0.1])
+        metricAggregator.flushMetrics()
+        metric = redisMessaging.metricMessages[0][0][0]
+        #Observations are counted per bucket, with a final bucket for those above every bound
+        self.assertEqual(metric['metricAction'], 'observe_buckets')
+        self.assertEqual(metric['metricBuckets'], [0.001, 0.01, 0.1])
+        self.assertEqual(metric['metricBucketCounts'], [2, 1, 1, 1])
+        self.assertAlmostEqual(metric['metricValue'], 5.0245)
+
+
+if __name__ == '__main__':
+    unittest.main()
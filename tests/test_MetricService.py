@@ -0,0 +1,86 @@
+import unittest
+import json
+import threading
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), '../lib'))
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), '../services'))
+#Modules under lib read ../config.yaml relative to the working directory when imported
+os.chdir(os.path.join(os.path.dirname(os.path.realpath(__file__)), '../services'))
+from prometheus_client import CollectorRegistry
+import metricService
+
+
+class MetricService_Tests(unittest.TestCase):
+
+    class LogToolStub:
+        def __init__(self):
+            self.logMessages = []
+
+        def log(self, service, level, message, redisClient=None):
+            self.logMessages.append((level, message() if callable(message) else message))
+            return True
+
+    class RedisMessagingStub:
+        def __init__(self, metricMessages):
+            self.metricMessages = metricMessages
+
+        def awaitMessage(self, **kwargs):
+            return ('metric', self.metricMessages.pop(0))
+
+    def getMetricService(self, metricMessages: list) -> metricService.MetricService:
+        service = metricService.MetricService.__new__(metricService.MetricService)
+        service.redisMessaging = self.RedisMessagingStub([json.dumps(metricList) for metricList in metricMessages])
+        service.logTool = self.LogToolStub()
+        service.registry = CollectorRegistry(auto_describe=True)
+        service.bucketedHistograms = {}
+        service.hostname = 'hss01'
+        return service
+
+    def getBucketedMetric(self, bucketCounts: list, observedSum: float, buckets: list=[0.001, 0.01, 0.1]) -> dict:
+        return {'NAME': 'prom_diam_request_latency_seconds', 'TYPE': 'histogram', 'ACTION': 'observe_buckets', 'VALUE': observedSum,
+                'LABELS': {'stage': 'total'}, 'BUCKETS': buckets, 'BUCKET_COUNTS': bucketCounts}
+
+    def test_A_Observe_Buckets(self):
+        service = self.getMetricService([[self.getBucketedMetric([2, 1, 1, 1], 5.0245)], [self.getBucketedMetric([1, 0, 0, 0], 0.0005)]])
+        service.handleMetrics()
+        service.handleMetrics()
+        #Bucket counts from each flush accumulate, and are exported as cumulative buckets
+        getSampleValue = lambda sampleName, labels: service.registry.get_sample_value(f'prom_diam_request_latency_seconds{sampleName}', {'stage': 'total', **labels})
+        self.assertEqual([getSampleValue('_bucket', {'le': le}) for le in ('0.001', '0.01', '0.1', '+Inf')], [3, 4, 5, 6])
+        self.assertEqual(getSampleValue('_count', {}), 6)
+        self.assertAlmostEqual(getSampleValue('_sum', {}), 5.025)
+        self.assertEqual([level for level, message in service.logTool.logMessages if level != 'debug'], [])
+
+    def test_B_Mismatched_Buckets(self):
+        service = self.getMetricService([[self.getBucketedMetric([1, 0, 0, 0], 0.0005)], [self.getBucketedMetric([1, 0, 0, 0], 0.0005, buckets=[0.001, 0.05, 0.1])],
+                                         [{'NAME': 'prom_diam_request_latency_seconds', 'TYPE': 'histogram', 'ACTION': 'observe_buckets', 'VALUE': 0.0005,
+                                           'LABELS': {'peer': 'mme01'}, 'BUCKETS': [0.001, 0.01, 0.1], 'BUCKET_COUNTS': [1, 0, 0, 0]}]])
+        for i in range(3):
+            service.handleMetrics()
+        #Updates with different bucket edges or label names are skipped and logged, rather than counted into the wrong buckets
+        self.assertEqual(service.registry.get_sample_value('prom_diam_request_latency_seconds_count', {'stage': 'total'}), 1)
+        self.assertEqual([level for level, message in service.logTool.logMessages if level != 'debug'], ['warn', 'warn'])
+
+    def test_C_Concurrent_Collect(self):
+        bucketedHistogram = metricService.BucketedHistogram('prom_diam_request_latency_seconds', '', ['stage'], [0.001, 0.01, 0.1])
+        def observeBuckets():
+            for i in range(1000):
+                bucketedHistogram.observeBuckets(['total'], [0.001, 0.01, 0.1], [1, 1, 0, 0], 0.002)
+        threads = [threading.Thread(target=observeBuckets) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        #Scrapes running alongside updates always see consistent bucket counts
+        while any(thread.is_alive() for thread in threads):
+            for sample in bucketedHistogram.collect()[0].samples:
+                if sample.name.endswith('_bucket') and sample.labels['le'] == '0.01':
+                    self.assertEqual(sample.value % 2, 0)
+        for thread in threads:
+            thread.join()
+        samples = {(sample.name, sample.labels.get('le')): sample.value for sample in bucketedHistogram.collect()[0].samples}
+        self.assertEqual(samples[('prom_diam_request_latency_seconds_bucket', '+Inf')], 8000)
+        self.assertAlmostEqual(samples[('prom_diam_request_latency_seconds_sum', None)], 8.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -88,7 +88,7 @@ def ReadBuffer():
             continue
 
 def SendRequest(request):
-    clientsocket.sendall(bytes.fromhex(request))
+    clientsocket.sendall(request)
     #ReadBuffer()
 
 _thread.start_new_thread(ReadBuffer,())
@@ -53,7 +53,7 @@ DiameterHostname = input("Enter DiameterHostname to send Request to: ")
 
 def SendRequest(request):
     print("Writing request to Queue '" + str(DiameterHostname)  + "_request_queue'")
-    r.hset(str(DiameterHostname) + "_request_queue", "hss_Async_client_" + str(int(time.time())), request)
+    r.hset(str(DiameterHostname) + "_request_queue", "hss_Async_client_" + str(int(time.time())), request.hex())
     print("Written to Queue to send.")
 while True:
     hostname = DiameterHostname